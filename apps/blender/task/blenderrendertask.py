@@ -21,6 +21,7 @@ from apps.blender.resources.scenefileeditor import generate_blender_crop_file
 from apps.blender.task.verificator import BlenderVerificator
 from apps.core.task.coretask import CoreTaskTypeInfo, AcceptClientVerdict, CoreTask
 from apps.rendering.resources.imgrepr import load_as_pil
+from apps.rendering.resources.previewcompositor import PreviewCompositor
 from apps.rendering.resources.renderingtaskcollector import RenderingTaskCollector
 from apps.rendering.resources.utils import save_image_or_log_error
 from apps.rendering.task.framerenderingtask import FrameRenderingTask, FrameRenderingTaskBuilder, FrameRendererOptions
@@ -52,6 +53,9 @@ class PreviewUpdater(object):
         self.preview_res_y = preview_res_y
         self.preview_file_path = preview_file_path
         self.expected_offsets = expected_offsets
+        self.preview = PreviewCompositor(preview_file_path,
+                                         (preview_res_x, preview_res_y),
+                                         PREVIEW_EXT)
 
         # where the match ends - since the chunks have unexpectable sizes, we 
         # don't know where to paste new chunk unless all of the above are in 
@@ -88,20 +92,9 @@ class PreviewUpdater(object):
             img = img.resize((self.preview_res_x, height),
                              resample=Image.BILINEAR)
 
-            if not os.path.exists(self.preview_file_path) \
-               or len(self.chunks) == 1:
-                img_offset = Image.new("RGB", (self.preview_res_x,
-                                               self.preview_res_y))
-                img_offset.paste(img, (0, offset))
-                save_image_or_log_error(img_offset, self.preview_file_path,
-                                        PREVIEW_EXT)
-                img_offset.close()
-            else:
-                img_current = Image.open(self.preview_file_path)
-                img_current.paste(img, (0, offset))
-                save_image_or_log_error(img_current, self.preview_file_path,
-                                        PREVIEW_EXT)
-                img_current.close()
+            if len(self.chunks) == 1:
+                self.preview.clear()
+            self.preview.paste(img, (0, offset))
             img.close()
         except Exception:
             logger.exception("Error in Blender update preview:")
@@ -116,10 +109,7 @@ class PreviewUpdater(object):
         self.chunks = {}
         self.perfect_match_area_y = 0
         self.perfectly_placed_subtasks = 0
-        if os.path.exists(self.preview_file_path):
-            img = Image.new("RGB", (self.preview_res_x, self.preview_res_y))
-            save_image_or_log_error(img, self.preview_file_path, PREVIEW_EXT)
-            img.close()
+        self.preview.clear()
 
 
 class BlenderTaskTypeInfo(CoreTaskTypeInfo):
@@ -142,6 +132,7 @@ class BlenderTaskTypeInfo(CoreTaskTypeInfo):
         if not task:
             pass
         elif task.use_frames:
+            task.save_previews()
             if single:
                 return to_unicode(task.last_preview_path)
             else:
@@ -153,6 +144,7 @@ class BlenderTaskTypeInfo(CoreTaskTypeInfo):
                     except IndexError:
                         result[to_unicode(f)] = None
         else:
+            task.save_previews()
             result = to_unicode(task.preview_task_file_path or
                                 task.preview_file_path)
         return cls._preview_result(result, single=single)
@@ -516,6 +508,23 @@ class BlenderRenderTask(FrameRenderingTask):
     def _update_preview(self, new_chunk_file_path, num_start):
         self.preview_updater.update_preview(new_chunk_file_path, num_start)
 
+    def save_previews(self, force=False):
+        for updater in self._get_preview_updaters():
+            updater.preview.save(force)
+        super().save_previews(force)
+
+    def _new_preview_compositor(self, file_path):
+        # Preview updaters and the task share images of the same files
+        for updater in self._get_preview_updaters():
+            if updater.preview_file_path == file_path:
+                return updater.preview
+        return super()._new_preview_compositor(file_path)
+
+    def _get_preview_updaters(self):
+        if self.preview_updaters:
+            return self.preview_updaters
+        return [self.preview_updater] if self.preview_updater else []
+
     def _update_frame_preview(self, new_chunk_file_path, frame_num, part=1,
                               final=False):
         num = self.frames.index(frame_num)
@@ -528,9 +537,9 @@ class BlenderRenderTask(FrameRenderingTask):
             preview_task_file_path = self._get_preview_task_file_path(num)
             self.last_preview_path = preview_task_file_path
 
-            save_image_or_log_error(scaled, preview_task_file_path, PREVIEW_EXT)
-            save_image_or_log_error(scaled, self._get_preview_file_path(num),
-                                    PREVIEW_EXT)
+            for file_path in [preview_task_file_path,
+                              self._get_preview_file_path(num)]:
+                self._get_preview_compositor(file_path).paste(scaled)
 
             scaled.close()
             img.close()
@@ -557,17 +566,16 @@ class BlenderRenderTask(FrameRenderingTask):
         lower = preview_updater.get_offset(part)
         upper = preview_updater.get_offset(part + 1)
         res_x = preview_updater.preview_res_x
-        for i in range(0, res_x):
-                for j in range(lower, upper):
-                    img_task.putpixel((i, j), color)
+        if upper > lower:
+            img_task.paste(color, (0, lower, res_x, upper))
 
     def _mark_task_area(self, subtask, img_task, color, frame_index=0):
         if not self.use_frames:
             self.mark_part_on_preview(subtask['start_task'], img_task, color, self.preview_updater)
         elif self.total_tasks <= len(self.frames):
-            for i in range(0, int(math.floor(self.res_x * self.scale_factor))):
-                for j in range(0, int(math.floor(self.res_y * self.scale_factor))):
-                    img_task.putpixel((i, j), color)
+            img_task.paste(color, (0, 0,
+                                   int(math.floor(self.res_x * self.scale_factor)),
+                                   int(math.floor(self.res_y * self.scale_factor))))
         else:
             parts = int(self.total_tasks / len(self.frames))
             pu = self.preview_updaters[frame_index]
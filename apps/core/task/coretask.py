@@ -197,13 +197,29 @@ class CoreTask(Task):
         self._mark_subtask_failed(subtask_id)
 
     def computation_finished(self, subtask_id, task_result, result_type=ResultType.DATA):
+        ver_state = self.verify_results(subtask_id, task_result, result_type)
+        self.results_verified(subtask_id, task_result, result_type, ver_state)
+
+    def verify_results(self, subtask_id, task_result, result_type=ResultType.DATA):
+        # Runs in a verification thread, the task is changed only by
+        # results_verified
         if not self.should_accept(subtask_id):
+            return None
+        results = self._interpret_task_results(subtask_id, task_result, result_type)
+        ver_state = self.verificator.check(subtask_id, self.subtasks_given.get(subtask_id),
+                                           results[0], self)
+        return results, ver_state
+
+    def results_verified(self, subtask_id, task_result, result_type, verification):
+        # Subtask may have timed out or been restarted during verification
+        if verification is None or not self.should_accept(subtask_id):
             logger.info("Not accepting results for {}".format(subtask_id))
             return
-        self.interpret_task_results(subtask_id, task_result, result_type)
-        result_files = self.results.get(subtask_id)
-        ver_state = self.verificator.verify(subtask_id, self.subtasks_given.get(subtask_id),
-                                            result_files, self)
+        (result_files, stdout, stderr), ver_state = verification
+        self.results[subtask_id] = result_files
+        self.stdout[subtask_id] = stdout
+        self.stderr[subtask_id] = stderr
+        self.verificator.verified(subtask_id, self.subtasks_given.get(subtask_id), ver_state)
         if ver_state == SubtaskVerificationState.VERIFIED:
             self.accept_results(subtask_id, result_files)
         # TODO Add support for different verification states
@@ -354,12 +370,25 @@ class CoreTask(Task):
         format
         :param bool sort: *default: True* Sort results, if set to True
         """
-        self.stdout[subtask_id] = ""
-        self.stderr[subtask_id] = ""
-        tr_files = self.load_task_results(task_results, result_type, subtask_id)
-        self.results[subtask_id] = self.filter_task_results(tr_files, subtask_id)
+        results, stdout, stderr = self._interpret_task_results(subtask_id, task_results,
+                                                               result_type, sort)
+        self.results[subtask_id] = results
+        self.stdout[subtask_id] = stdout
+        self.stderr[subtask_id] = stderr
+
+    def _interpret_task_results(self, subtask_id, task_results, result_type: int, sort=True):
+        """ Same as interpret_task_results, but the task is not changed
+        :return (list, str, str): result files, stdout and stderr
+        """
+        stdout = {subtask_id: ""}
+        stderr = {subtask_id: ""}
+        tr_files = self.load_task_results(task_results, result_type, subtask_id,
+                                          stderr=stderr)
+        results = self.filter_task_results(tr_files, subtask_id,
+                                           stdout=stdout, stderr=stderr)
         if sort:
-            self.results[subtask_id].sort()
+            results.sort()
+        return results, stdout[subtask_id], stderr[subtask_id]
 
     @handle_key_error
     def result_incoming(self, subtask_id):
@@ -371,15 +400,18 @@ class CoreTask(Task):
     def query_extra_data_for_test_task(self) -> golem_messages.message.ComputeTaskDef:  # noqa
         pass  # Implement in derived methods
 
-    def load_task_results(self, task_result, result_type: int, subtask_id):
+    def load_task_results(self, task_result, result_type: int, subtask_id, stderr=None):
         """ Change results to a list of files. If result_type is equal to ResultType.files this
         function only return task_results without making any changes. If result_type is equal to
         ResultType.data tham task_result is cbor and unzipped and files are saved in tmp_dir.
         :param task_result: list of files of cbor serialized ziped file with files
         :param result_type: int, ResultType element
         :param str subtask_id:
+        :param dict stderr: *default: self.stderr* where the error is saved
         :return:
         """
+        if stderr is None:
+            stderr = self.stderr
         if result_type == ResultType.DATA:
             output_dir = os.path.join(self.tmp_dir, subtask_id)
             if not os.path.exists(output_dir):
@@ -389,10 +421,11 @@ class CoreTask(Task):
             return task_result
         else:
             logger.error("Task result type not supported {}".format(result_type))
-            self.stderr[subtask_id] = "[GOLEM] Task result {} not supported".format(result_type)
+            stderr[subtask_id] = "[GOLEM] Task result {} not supported".format(result_type)
             return []
 
-    def filter_task_results(self, task_results, subtask_id, log_ext=".log", err_log_ext="err.log"):
+    def filter_task_results(self, task_results, subtask_id, log_ext=".log", err_log_ext="err.log",
+                            stdout=None, stderr=None):
         """ From a list of files received in task_results, return only files that don't
         have extension <log_ext> or <err_log_ext>. File with log_ext is saved as stdout
         for this subtask (only one file is currently supported). File with err_log_ext is save
@@ -401,15 +434,21 @@ class CoreTask(Task):
         :param str subtask_id: if of a given subtask
         :param str log_ext: extension that stdout files have
         :param str err_log_ext: extension that stderr files have
+        :param dict stdout: *default: self.stdout* where stdout file is saved
+        :param dict stderr: *default: self.stderr* where stderr file is saved
         :return:
         """
+        if stdout is None:
+            stdout = self.stdout
+        if stderr is None:
+            stderr = self.stderr
 
         filtered_task_results = []
         for tr in task_results:
             if tr.endswith(err_log_ext):
-                self.stderr[subtask_id] = tr
+                stderr[subtask_id] = tr
             elif tr.endswith(log_ext):
-                self.stdout[subtask_id] = tr
+                stdout[subtask_id] = tr
             else:
                 try:
                     new_tr = outer_dir_path(tr)
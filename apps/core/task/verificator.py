@@ -47,16 +47,27 @@ class CoreVerificator(object):
     # it is set in the query_extra_data function
     @handle_key_error_for_state
     def verify(self, subtask_id, subtask_info, tr_files, task):
-        self._check_files(subtask_id, subtask_info, tr_files, task)
-        return self.ver_states[subtask_id]
+        ver_state = self.check(subtask_id, subtask_info, tr_files, task)
+        self.verified(subtask_id, subtask_info, ver_state)
+        return ver_state
+
+    @handle_key_error_for_state
+    def check(self, subtask_id, subtask_info, tr_files, task):
+        """ Verify results without changing the verificator, so it may
+        be called in a verification thread. The outcome is saved by verified.
+        :return SubtaskVerificationState:
+        """
+        return self._check_files(subtask_id, subtask_info, tr_files, task)
+
+    def verified(self, subtask_id, subtask_info, ver_state):
+        self.ver_states[subtask_id] = ver_state
 
     def _check_files(self, subtask_id, subtask_info, tr_files, task):
         for tr_file in tr_files:
             if os.path.isfile(tr_file):
                 if self._verify_result(subtask_id, subtask_info, tr_file, task):
-                    self.ver_states[subtask_id] = SubtaskVerificationState.VERIFIED
-                    return
-        self.ver_states[subtask_id] = SubtaskVerificationState.WRONG_ANSWER
+                    return SubtaskVerificationState.VERIFIED
+        return SubtaskVerificationState.WRONG_ANSWER
 
     def _verify_result(self, subtask_id, subtask_info, tr_file, task):
         """ Override this to change verification method
@@ -72,7 +72,7 @@ class LuxRenderVerificator(RenderingVerificator):
 
     def _check_files(self, subtask_id, subtask_info, tr_files, task):
         # First, assume it is wrong ;p
-        self.ver_states[subtask_id] = SubtaskVerificationState.WRONG_ANSWER
+        ver_state = SubtaskVerificationState.WRONG_ANSWER
 
         try:
             tr_flm_files, tr_preview_files = \
@@ -127,19 +127,20 @@ class LuxRenderVerificator(RenderingVerificator):
                     if is_valid_against_reference == \
                             SubtaskVerificationState.VERIFIED \
                             and is_flm_merging_validation_passed:
-                                self.ver_states[subtask_id] = \
-                                    SubtaskVerificationState.VERIFIED
+                                ver_state = SubtaskVerificationState.VERIFIED
 
                     logger.info("Subtask "
                                 + str(subtask_id)
                                 + " verification result: "
-                                + self.ver_states[subtask_id].name
+                                + ver_state.name
                                 )
 
         except TypeError as e:
             logger.info("Exception during verification of subtask: "
                         + str(subtask_id) + " " + str(e))
 
+        return ver_state
+
     def query_extra_data_for_advanced_verification(self, new_flm):
         files = [os.path.basename(new_flm), os.path.basename(self.test_flm)]
         merge_ctd = deepcopy(self.merge_ctd)
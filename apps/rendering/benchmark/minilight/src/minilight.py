@@ -5,6 +5,7 @@
 #  http://www.hxa.name/minilight
 
 
+from multiprocessing import Pool
 from sys import argv, stdout
 from time import time
 import sys
@@ -13,7 +14,7 @@ sys.path.append("src")
 from .camera import Camera
 from .image import Image
 from .scene import Scene
-from .randommini import Random
+from .randommini import Random, SEED
 from golem.core.common import get_cpu_count
 
 BANNER = '''
@@ -64,38 +65,92 @@ with a newline. E.g.:
 '''
 MODEL_FORMAT_ID = '#MiniLight'
 
+def load_model(filename):
+    with open(filename, 'r') as model_file:
+        if model_file.readline().strip() != MODEL_FORMAT_ID:
+            raise ValueError('invalid model file')
+        for line in model_file:
+            if not line.isspace():
+                iterations = int(line)
+                break
+        image = Image(model_file)
+        camera = Camera(model_file)
+        scene = Scene(model_file, camera.view_position)
+    return iterations, image, camera, scene
+
+
 def make_perf_test(filename, cfg_filename=None, num_cores=1):
-    model_file_pathname = filename
-    image_file_pathname = model_file_pathname + '.ppm'
-    model_file = open(model_file_pathname, 'r')
-    if model_file.readline().strip() != MODEL_FORMAT_ID:
-        raise 'invalid model file'
-    for line in model_file:
-        if not line.isspace():
-            iterations = int(line)
-            break
-    image = Image(model_file)
-    camera = Camera(model_file)
-    scene = Scene(model_file, camera.view_position)
-    model_file.close()
-
-    #render_orig(image, image_file_pathname, camera, scene, iterations)
-    duration = render_taskable(image, image_file_pathname, camera, scene, iterations)
+    """ Render the model with num_cores processes and return the number
+    of rays per second rendered by all of them """
+    image, duration = render_rows(filename, num_cores)
+    iterations = load_model(filename)[0]
 
     numSamples = image.width * image.height * iterations
     print("\nSummary:")
-    print("    Rendering scene with {} rays took {} seconds"
-          .format(numSamples, duration))
+    print("    Rendering scene with {} rays on {} cores took {} seconds"
+          .format(numSamples, num_cores, duration))
     print("    giving an average speed of {} rays/s"
           .format(float(numSamples) / duration))
 
     average = float(numSamples) / duration
-    average = average * num_cores
     if cfg_filename:
         with open(cfg_filename, 'w') as cfg_file:
             cfg_file.write("{0:.1f}".format(average))
     return average
 
+
+# Model loaded by a rendering process, see _init_worker
+_worker_model = None
+
+
+def _init_worker(filename):
+    global _worker_model
+    _worker_model = load_model(filename)
+
+
+def _render_row(y):
+    iterations, image, camera, scene = _worker_model
+    # Each row has its own generator, so the image doesn't depend on how
+    # rows are split between processes
+    random = Random(SEED + y)
+    aspect = float(image.height) / float(image.width)
+    row = []
+    for x in range(image.width):
+        r = camera.pixel_accumulated_radiance(scene, random, image.width,
+                                              image.height, x, y, aspect,
+                                              iterations)
+        row.append(tuple(r))
+    return y, row
+
+
+def render_rows(filename, num_cores=1):
+    """ Render the model row by row in a pool of num_cores processes
+    :return (Image, float): rendered image and rendering time in seconds
+    """
+    image = load_model(filename)[1]
+    rows = list(range(image.height))
+
+    if num_cores <= 1:
+        _init_worker(filename)
+        start = time()
+        results = [_render_row(y) for y in rows]
+        duration = time() - start
+    else:
+        pool = Pool(num_cores, _init_worker, (filename,))
+        try:
+            start = time()
+            results = pool.map(_render_row, rows, chunksize=1)
+            duration = time() - start
+        finally:
+            pool.terminate()
+            pool.join()
+
+    for y, row in results:
+        for x, radiance in enumerate(row):
+            image.add_to_pixel(x, y, radiance)
+    return image, duration
+
+
 def timedafunc(function):
 
     def timedExecution(*args, **kwargs):
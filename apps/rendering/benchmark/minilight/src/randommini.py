@@ -17,8 +17,8 @@ class Random(object):
     #    si = [ ui[i] if (ui[i] >= SEED_MINS[i]) else SEED for i in range(4) ]
     #    self.state0, self.state1, self.state2, self.state3 = si
     #    self.id = "%08X" % self.state3
-    def __init__(self):
-        self.state0 = self.state1 = self.state2 = self.state3 = SEED
+    def __init__(self, seed=SEED):
+        self.state0 = self.state1 = self.state2 = self.state3 = seed
 
     def int32u(self):
         self.state0 = (((self.state0 & 0xFFFFFFFE) << 18) & 0xFFFFFFFF) ^ \
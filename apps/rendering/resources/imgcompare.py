@@ -2,12 +2,18 @@ from __future__ import division
 import logging
 import math
 
+import numpy
+
 from apps.rendering.resources.imgrepr import (EXRImgRepr, ImgRepr, load_img,
                                               PILImgRepr)
 logger = logging.getLogger("apps.rendering")
 
 PSNR_ACCEPTABLE_MIN = 30
 
+# Number of image rows compared at once. Keeps temporary arrays small
+# when comparing 4K and larger images.
+ROWS_PER_STEP = 256
+
 
 def check_size(file_, res_x, res_y):
     img = load_img(file_)
@@ -22,6 +28,49 @@ def calculate_psnr(mse, max_=255):
     return 20 * math.log10(max_) - 10 * math.log10(mse)
 
 
+def crop_array(img, start, box):
+    """
+    Return a part of the image as a numpy array of shape (height, width, 3)
+    :param ImgRepr img:
+    :param start: (x, y) coordinates of the upper left corner of the box
+    :param box: describes side lengths of the box
+    :return numpy.ndarray:
+    """
+    (res_x, res_y) = img.get_size()
+    (x, y) = start
+    (width, height) = box
+    if x < 0 or y < 0 or x + width > res_x or y + height > res_y:
+        raise IndexError("Box {} starting at {} exceeds image of size {}"
+                         .format(box, start, (res_x, res_y)))
+    return img.to_numpy()[y:y + height, x:x + width]
+
+
+def sum_squared_differences(arr1, arr2):
+    """
+    Sum of squared differences between corresponding values of two arrays.
+    Integer arrays are compared exactly, other arrays in double precision.
+    :param numpy.ndarray arr1:
+    :param numpy.ndarray arr2:
+    :return int|float:
+    """
+    if arr1.shape != arr2.shape:
+        raise ValueError("Arrays of different shapes {} and {}"
+                         .format(arr1.shape, arr2.shape))
+
+    if numpy.issubdtype(arr1.dtype, numpy.integer) \
+            and numpy.issubdtype(arr2.dtype, numpy.integer):
+        dtype, result_type = numpy.int64, int
+    else:
+        dtype, result_type = numpy.float64, float
+
+    total = result_type(0)
+    for row in range(0, arr1.shape[0], ROWS_PER_STEP):
+        diff = numpy.subtract(arr1[row:row + ROWS_PER_STEP],
+                              arr2[row:row + ROWS_PER_STEP], dtype=dtype)
+        total += result_type(numpy.vdot(diff, diff))
+    return total
+
+
 def calculate_mse(img1, img2, start1=(0, 0), start2=(0, 0), box=None):
     """
     :param img1:
@@ -31,7 +80,6 @@ def calculate_mse(img1, img2, start1=(0, 0), start2=(0, 0), box=None):
     :param box: describes side lengths of the box
     :return:
     """
-    mse = 0
     if not isinstance(img1, ImgRepr) or not isinstance(img2, ImgRepr):
         raise TypeError("img1 and img2 must be ImgRepr")
 
@@ -45,17 +93,13 @@ def calculate_mse(img1, img2, start1=(0, 0), start2=(0, 0), box=None):
                  'img1 and img2 are of different sizes '
                  'and there is no cropping box provided.')
 
-    for i in range(0, res_x):
-        for j in range(0, res_y):
-            [r1, g1, b1] = img1.get_pixel((start1[0] + i, start1[1] + j))
-            [r2, g2, b2] = img2.get_pixel((start2[0] + i, start2[1] + j))
-            mse += (r1 - r2) * (r1 - r2) + \
-                   (g1 - g2) * (g1 - g2) + \
-                   (b1 - b2) * (b1 - b2)
-
     if res_x <= 0 or res_y <= 0:
         raise ValueError("Image or box resolution must be greater than 0")
 
+    arr1 = crop_array(img1, start1, (res_x, res_y))
+    arr2 = crop_array(img2, start2, (res_x, res_y))
+
+    mse = sum_squared_differences(arr1, arr2)
     mse /= res_x * res_y * 3
     return mse
 
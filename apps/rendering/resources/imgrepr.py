@@ -4,6 +4,7 @@ import logging
 from copy import deepcopy
 import OpenEXR
 import Imath
+import numpy
 from PIL import Image
 
 logger = logging.getLogger("apps.rendering")
@@ -34,6 +35,16 @@ class ImgRepr(object, metaclass=abc.ABCMeta):
     def to_pil(self):
         return
 
+    def to_numpy(self):
+        """ Return image pixels as an array of shape (height, width, 3).
+        Subclasses should override this with a conversion that does not
+        go through get_pixel.
+        :return numpy.ndarray:
+        """
+        (res_x, res_y) = self.get_size()
+        return numpy.array([[self.get_pixel((x, y)) for x in range(res_x)]
+                            for y in range(res_y)])
+
 
 class PILImgRepr(ImgRepr):
     def __init__(self):
@@ -77,6 +88,12 @@ class PILImgRepr(ImgRepr):
     def to_pil(self):
         return self.img
 
+    def to_numpy(self):
+        """ Return image pixels as an uint8 array of shape
+        (height, width, 3)
+        """
+        return numpy.asarray(self.img)
+
 
 class EXRImgRepr(ImgRepr):
     def __init__(self):
@@ -132,6 +149,12 @@ class EXRImgRepr(ImgRepr):
         rgb8 = [im.point(normalize_0_255).convert("L") for im in self.rgb]
         return Image.merge("RGB", rgb8)
 
+    def to_numpy(self):
+        """ Return image pixels as a float32 array of shape
+        (height, width, 3)
+        """
+        return numpy.dstack([numpy.asarray(c) for c in self.rgb])
+
     def to_l_image(self):
         img = self.to_pil()
         return img.convert('L')
@@ -0,0 +1,96 @@
+import logging
+import os
+import time
+
+from PIL import Image, ImageChops
+
+from apps.rendering.resources.utils import save_image_or_log_error
+
+logger = logging.getLogger("apps.rendering")
+
+
+class PreviewCompositor(object):
+    """ Keeps a preview image in memory. Chunks are pasted and areas are
+    filled in place; the image is encoded to file_path only when save() is
+    called, at most once per SAVE_INTERVAL unless forced.
+    Only the location of the image is pickled; an unpickled compositor loads
+    the image from file_path when it is needed.
+    """
+
+    SAVE_INTERVAL = 1.0  # seconds
+
+    def __init__(self, file_path, size, image_format="PNG", mode="RGB"):
+        self.file_path = file_path
+        self.size = size
+        self.image_format = image_format
+        self.mode = mode
+
+        self._image = None
+        self._dirty = False
+        self._saved = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_image'] = None
+        state['_dirty'] = False
+        state['_saved'] = None
+        return state
+
+    @property
+    def image(self) -> Image.Image:
+        if self._image is None:
+            self._image = self._load()
+        return self._image
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def paste(self, im, box=None):
+        """ Pastes an image or fills a box with a color, see Image.paste """
+        self.image.paste(im, box)
+        self._dirty = True
+
+    def add(self, im, offset=(0, 0)):
+        """ Adds an image to the area of the same size at offset
+        (see ImageChops.add) """
+        x, y = offset
+        box = (x, y, x + im.size[0], y + im.size[1])
+        region = self.image.crop(box)
+        if im.mode != region.mode:
+            im = im.convert(region.mode)
+        self.image.paste(ImageChops.add(region, im), box)
+        self._dirty = True
+
+    def clear(self):
+        self._image = Image.new(self.mode, self.size)
+        self._dirty = True
+
+    def save(self, force=False) -> bool:
+        """ Encodes the image if it has been changed since the last save
+        :param bool force: ignore SAVE_INTERVAL
+        :return bool: whether the image was saved
+        """
+        if not self._dirty or self.file_path is None:
+            return False
+        if not force and self._saved is not None \
+                and time.monotonic() - self._saved < self.SAVE_INTERVAL:
+            return False
+
+        save_image_or_log_error(self.image, self.file_path, self.image_format)
+        self._dirty = False
+        self._saved = time.monotonic()
+        return True
+
+    def _load(self) -> Image.Image:
+        if self.file_path and os.path.exists(self.file_path):
+            try:
+                with Image.open(self.file_path) as img:
+                    if img.size == self.size:
+                        return img.convert(self.mode)
+            except (IOError, ValueError) as err:
+                logger.warning("Cannot load preview %r: %r",
+                               self.file_path, err)
+        # Save the new image even if it is not changed
+        self._dirty = True
+        return Image.new(self.mode, self.size)
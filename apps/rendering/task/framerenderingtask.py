@@ -6,7 +6,7 @@ import os
 from bisect import insort
 from collections import OrderedDict, defaultdict
 
-from PIL import Image, ImageChops
+from PIL import Image
 from copy import deepcopy
 
 from apps.core.task.coretask import CoreTask
@@ -20,7 +20,6 @@ from apps.rendering.task.renderingtask import (RenderingTask,
                                                PREVIEW_EXT)
 from apps.rendering.task.verificator import FrameRenderingVerificator
 from golem.core.common import update_dict, to_unicode
-from golem.task.taskbase import ResultType
 from golem.task.taskstate import SubtaskStatus, TaskStatus, SubtaskState
 
 logger = logging.getLogger("apps.rendering")
@@ -92,10 +91,11 @@ class FrameRenderingTask(RenderingTask):
             self._update_task_preview()
 
     @CoreTask.handle_key_error
-    def computation_finished(self, subtask_id, task_result, result_type=ResultType.DATA):
-        super(FrameRenderingTask, self).computation_finished(subtask_id,
-                                                             task_result,
-                                                             result_type)
+    def results_verified(self, subtask_id, task_result, result_type, verification):
+        super(FrameRenderingTask, self).results_verified(subtask_id,
+                                                         task_result,
+                                                         result_type,
+                                                         verification)
         if self.use_frames:
             self._update_subtask_frame_status(subtask_id)
 
@@ -183,27 +183,26 @@ class FrameRenderingTask(RenderingTask):
         empty_color = (0, 0, 0)
         sub = self.subtasks_given[subtask_id]
         for frame in sub['frames']:
-            # __mark_sub_frame() also saves preview_file_path(num)
             self.__mark_sub_frame(sub, frame, empty_color)
 
     def _update_frame_preview(self, new_chunk_file_path, frame_num, part=1, final=False):
         num = self.frames.index(frame_num)
+        preview = self._get_preview_compositor(self._get_preview_file_path(num))
         preview_task_file_path = self._get_preview_task_file_path(num)
         img = load_as_pil(new_chunk_file_path)
 
-        if not final:
-            img = self._paste_new_chunk(img, self._get_preview_file_path(num), part,
-                                        int(self.total_tasks / len(self.frames)))
-
         img_x, img_y = img.size
         img = img.resize((int(round(self.scale_factor * img_x)),
                           int(round(self.scale_factor * img_y))),
                          resample=Image.BILINEAR)
-        save_image_or_log_error(img, self._get_preview_file_path(num),
-                                PREVIEW_EXT)
-        save_image_or_log_error(img, preview_task_file_path, PREVIEW_EXT)
-
+        if final:
+            preview.paste(img)
+        else:
+            self._paste_new_chunk(img, preview, part,
+                                  int(self.total_tasks / len(self.frames)))
         img.close()
+
+        self._get_preview_compositor(preview_task_file_path).paste(preview.image)
         self.last_preview_path = preview_task_file_path
 
     @CoreTask.handle_key_error
@@ -241,28 +240,12 @@ class FrameRenderingTask(RenderingTask):
             state.status = TaskStatus.aborted
         # Otherwise, do not change frame's status.
 
-    def _paste_new_chunk(self, img_chunk, preview_file_path, chunk_num, all_chunks_num):
+    def _paste_new_chunk(self, img_chunk, preview, chunk_num, all_chunks_num):
+        offset = math.floor((chunk_num - 1) * self.res_y * self.scale_factor / all_chunks_num)
         try:
-            img_offset = Image.new("RGB", (int(round(self.res_x * self.scale_factor)),
-                                           int(round(self.res_y * self.scale_factor))))
-            offset = math.floor((chunk_num - 1) * self.res_y * self.scale_factor / all_chunks_num)
-            offset = int(offset)
-            img_offset.paste(img_chunk, (0, offset))
+            preview.add(img_chunk, (0, int(offset)))
         except Exception as err:
-            logger.error("Can't generate preview {}".format(err))
-            img_offset = None
-
-        if not os.path.exists(preview_file_path):
-            return img_offset
-
-        try:
-            img = Image.open(preview_file_path)
-            if img_offset:
-                img = ImageChops.add(img, img_offset)
-            return img
-        except Exception as err:
-            logger.error("Can't add new chunk to preview{}".format(err))
-            return img_offset
+            logger.error("Can't add new chunk to preview {}".format(err))
 
     def _update_frame_task_preview(self):
         sent_color = (0, 255, 0)
@@ -277,16 +260,6 @@ class FrameRenderingTask(RenderingTask):
                 for frame in sub['frames']:
                     self.__mark_sub_frame(sub, frame, failed_color)
 
-    def _open_frame_preview(self, preview_file_path):
-
-        if not os.path.exists(preview_file_path):
-            img = Image.new("RGB", (int(round(self.res_x * self.scale_factor)), 
-                                    int(round(self.res_y * self.scale_factor))))
-            save_image_or_log_error(img, preview_file_path, PREVIEW_EXT)
-            img.close()
-
-        return Image.open(preview_file_path)
-
     def _mark_task_area(self, subtask, img_task, color, frame_index=0):
         if not self.use_frames:
             RenderingTask._mark_task_area(self, subtask, img_task, color)
@@ -303,9 +276,8 @@ class FrameRenderingTask(RenderingTask):
             upper_y = int(math.ceil(part_height) * ((subtask['start_task'] - 1) % parts))
             lower_y = int(math.floor(part_height) * ((subtask['start_task'] - 1) % parts + 1))
 
-        for i in range(lower_x, upper_x):
-            for j in range(upper_y, lower_y):
-                img_task.putpixel((i, j), color)
+        if upper_x > lower_x and lower_y > upper_y:
+            img_task.paste(color, (lower_x, upper_y, upper_x, lower_y))
 
     def _choose_frames(self, frames, start_task, total_tasks):
         if total_tasks <= len(frames):
@@ -382,11 +354,9 @@ class FrameRenderingTask(RenderingTask):
 
     def __mark_sub_frame(self, sub, frame, color):
         idx = self.frames.index(frame)
-        preview_task_file_path = self._get_preview_task_file_path(idx)
-        img_task = self._open_frame_preview(preview_task_file_path)
+        img_task = self._get_preview_compositor(
+            self._get_preview_task_file_path(idx))
         self._mark_task_area(sub, img_task, color, idx)
-        save_image_or_log_error(img_task, preview_task_file_path, PREVIEW_EXT)
-        img_task.close()
 
     def _get_subtask_file_path(self, subtask_dir_list, name_dir, num):
         if subtask_dir_list[num] is None:
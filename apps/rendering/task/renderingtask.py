@@ -7,11 +7,12 @@ from abc import abstractproperty, abstractmethod
 from copy import deepcopy
 from typing import Type
 
-from PIL import Image, ImageChops
+from PIL import Image
 from pathlib import Path
 
 from apps.core.task.coretask import CoreTask, CoreTaskBuilder
 from apps.rendering.resources.imgrepr import load_as_pil
+from apps.rendering.resources.previewcompositor import PreviewCompositor
 from apps.rendering.resources.utils import save_image_or_log_error
 from apps.rendering.task.renderingtaskstate import RendererDefaults
 from apps.rendering.task.verificator import RenderingVerificator
@@ -76,6 +77,8 @@ class RenderingTask(CoreTask):
 
         self.preview_file_path = None
         self.preview_task_file_path = None
+        # preview file path -> PreviewCompositor
+        self.preview_compositors = {}
 
         self.collected_file_names = {}
 
@@ -97,6 +100,11 @@ class RenderingTask(CoreTask):
         self.verificator.total_tasks = self.total_tasks
         self.verificator.root_path = self.root_path
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['preview_compositors'] = {}
+        return state
+
     @CoreTask.handle_key_error
     def computation_failed(self, subtask_id):
         super().computation_failed(subtask_id)
@@ -135,23 +143,24 @@ class RenderingTask(CoreTask):
     def get_preview_file_path(self):
         return self.preview_file_path
 
+    def save_previews(self, force=False):
+        """ Save previews changed since they were last saved. Previews are
+        kept in memory and should be saved before they are requested.
+        :param bool force: save even if a preview has been saved recently
+        """
+        for compositor in self.preview_compositors.values():
+            compositor.save(force)
+
     def _update_preview(self, new_chunk_file_path, num_start):
         img = load_as_pil(new_chunk_file_path)
-
-        img_current = self._open_preview()
-        img_current = ImageChops.add(img_current, img)
-        save_image_or_log_error(img_current, self.preview_file_path,
-                                PREVIEW_EXT)
-        img_current.close()
+        self._get_preview().add(img)
         img.close()
 
     @CoreTask.handle_key_error
     def _remove_from_preview(self, subtask_id):
         empty_color = (0, 0, 0)
-        img = self._open_preview()
-        self._mark_task_area(self.subtasks_given[subtask_id], img, empty_color)
-        save_image_or_log_error(img, self.preview_file_path, PREVIEW_EXT)
-        img.close()
+        self._mark_task_area(self.subtasks_given[subtask_id],
+                             self._get_preview(), empty_color)
 
     def _update_task_preview(self):
         sent_color = (0, 255, 0)
@@ -161,7 +170,8 @@ class RenderingTask(CoreTask):
         preview_task_file_path = "{}".format(os.path.join(self.tmp_dir,
                                                           preview_name))
 
-        img_task = self._open_preview()
+        img_task = self._get_preview_compositor(preview_task_file_path)
+        img_task.paste(self._get_preview().image)
 
         for sub in self.subtasks_given.values():
             if SubtaskStatus.is_computed(sub['status']):
@@ -170,8 +180,6 @@ class RenderingTask(CoreTask):
                                  SubtaskStatus.restarted]:
                 self._mark_task_area(sub, img_task, failed_color)
 
-        save_image_or_log_error(img_task, preview_task_file_path, PREVIEW_EXT)
-        img_task.close()
         self._update_preview_task_file_path(preview_task_file_path)
 
     def _update_preview_task_file_path(self, preview_task_file_path):
@@ -182,9 +190,8 @@ class RenderingTask(CoreTask):
         y = int(round(self.res_y * self.scale_factor))
         upper = max(0, int(math.floor(y / self.total_tasks * (subtask['start_task'] - 1))))
         lower = min(int(math.floor(y / self.total_tasks * (subtask['end_task']))), y)
-        for i in range(0, x):
-            for j in range(upper, lower):
-                img_task.putpixel((i, j), color)
+        if lower > upper:
+            img_task.paste(color, (0, upper, x, lower))
 
     def _put_collected_files_together(self, output_file_name, files, arg):
         task_collector_path = self._get_task_collector_path()
@@ -257,6 +264,25 @@ class RenderingTask(CoreTask):
 
         return Image.open(self.preview_file_path)
 
+    def _get_preview(self):
+        """ Return the in-memory counterpart of _open_preview """
+        if self.preview_file_path is None:
+            preview_name = "current_preview.{}".format(PREVIEW_EXT)
+            self.preview_file_path = os.path.join(self.tmp_dir, preview_name)
+        return self._get_preview_compositor(self.preview_file_path)
+
+    def _get_preview_compositor(self, file_path):
+        compositor = self.preview_compositors.get(file_path)
+        if compositor is None:
+            compositor = self._new_preview_compositor(file_path)
+            self.preview_compositors[file_path] = compositor
+        return compositor
+
+    def _new_preview_compositor(self, file_path):
+        size = (int(round(self.res_x * self.scale_factor)),
+                int(round(self.res_y * self.scale_factor)))
+        return PreviewCompositor(file_path, size, PREVIEW_EXT)
+
     def _use_outer_task_collector(self):
         unsupported_formats = ['EXR', 'EPS']
         if self.output_format.upper() in unsupported_formats:
@@ -29,11 +29,19 @@ class RenderingVerificator(CoreVerificator):
         self.root_path = ""
         self.verified_clients = list()
 
+    def verified(self, subtask_id, subtask_info, ver_state):
+        super(RenderingVerificator, self).verified(subtask_id, subtask_info,
+                                                   ver_state)
+        # Advanced verification is made for the first results of a node
+        if ver_state == SubtaskVerificationState.VERIFIED \
+                and self.advanced_verification \
+                and subtask_info['node_id'] not in self.verified_clients:
+            self.verified_clients.append(subtask_info['node_id'])
+
     def _check_files(self, subtask_id, subtask_info, tr_files, task):
         if self._verify_imgs(subtask_id, subtask_info, tr_files, task):
-            self.ver_states[subtask_id] = SubtaskVerificationState.VERIFIED
-        else:
-            self.ver_states[subtask_id] = SubtaskVerificationState.WRONG_ANSWER
+            return SubtaskVerificationState.VERIFIED
+        return SubtaskVerificationState.WRONG_ANSWER
 
     def _verify_imgs(self, subtask_id, subtask_info, tr_files, task):
         if len(tr_files) == 0:
@@ -52,9 +60,6 @@ class RenderingVerificator(CoreVerificator):
                     subtask_info,
                     subtask_id, task):
                 return False
-            else:
-                self.verified_clients.append(
-                    subtask_info['node_id'])
 
         return True
 
@@ -177,17 +182,14 @@ class FrameRenderingVerificator(RenderingVerificator):
         if self.use_frames and self.total_tasks <= len(self.frames):
             frames_list = subtask_info['frames']
             if len(tr_files) < len(frames_list):
-                self.ver_states[subtask_id] = \
-                    SubtaskVerificationState.WRONG_ANSWER
-                return
+                return SubtaskVerificationState.WRONG_ANSWER
         if not self._verify_imgs(
                 subtask_id,
                 subtask_info,
                 tr_files,
                 task):
-            self.ver_states[subtask_id] = SubtaskVerificationState.WRONG_ANSWER
-        else:
-            self.ver_states[subtask_id] = SubtaskVerificationState.VERIFIED
+            return SubtaskVerificationState.WRONG_ANSWER
+        return SubtaskVerificationState.VERIFIED
 
     def _get_part_img_size(self, subtask_info):
         if not self.use_frames or self.__full_frames():
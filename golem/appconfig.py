@@ -16,6 +16,17 @@ logger = logging.getLogger(__name__)
 MIN_DISK_SPACE = 1000 * 1024
 MIN_MEMORY_SIZE = 1000 * 1024
 MIN_CPU_CORES = 1
+# Number of subtasks that can be computed at the same time. Configured cores
+# and memory are split evenly between them.
+MAX_CONCURRENT_SUBTASKS = 1
+# Number of started Docker containers kept warm for subtasks, 0 disables
+# the container pool
+CONTAINER_POOL_SIZE = 0
+# Number of subtask results verified at the same time by requestor
+VERIFICATION_WORKERS = 2
+# Number of connections opened at the same time to send waiting task
+# results, failures, payments and payment requests
+MAX_DISPATCH_CONNECTIONS = 16
 
 DEFAULT_HARDWARE_PRESET_NAME = "default"
 CUSTOM_HARDWARE_PRESET_NAME = "custom"
@@ -44,6 +55,10 @@ NETWORK_CHECK_INTERVAL = 10.0
 MAX_SENDING_DELAY = 360
 # How frequently task archive should be saved to disk (in seconds)
 TASKARCHIVE_MAINTENANCE_INTERVAL = 30
+# How frequently in-memory local ranks should be saved to database (seconds)
+LOCAL_RANK_FLUSH_INTERVAL = 30
+# How frequently cached file digests should be saved to disk (seconds)
+FILE_HASH_CACHE_SAVE_INTERVAL = 60
 # Filename for task archive disk file
 TASKARCHIVE_FILENAME = "task_archive.pickle"
 # Number of past days task archive will store aggregated information for
@@ -119,6 +134,10 @@ class AppConfig:
             send_pings=SEND_PINGS,
             # hardware
             hardware_preset_name=CUSTOM_HARDWARE_PRESET_NAME,
+            max_concurrent_subtasks=MAX_CONCURRENT_SUBTASKS,
+            container_pool_size=CONTAINER_POOL_SIZE,
+            verification_workers=VERIFICATION_WORKERS,
+            max_dispatch_connections=MAX_DISPATCH_CONNECTIONS,
             # price and trust
             min_price=MIN_PRICE,
             max_price=MAX_PRICE,
@@ -15,11 +15,14 @@ from twisted.internet.defer import (inlineCallbacks, returnValue, gatherResults,
 
 from golem.appconfig import (AppConfig, PUBLISH_BALANCE_INTERVAL,
                              PUBLISH_TASKS_INTERVAL,
-                             TASKARCHIVE_MAINTENANCE_INTERVAL)
+                             TASKARCHIVE_MAINTENANCE_INTERVAL,
+                             LOCAL_RANK_FLUSH_INTERVAL,
+                             FILE_HASH_CACHE_SAVE_INTERVAL)
 from golem.clientconfigdescriptor import ClientConfigDescriptor, ConfigApprover
 from golem.config.presets import HardwarePresetsMixin
 from golem.core.async import AsyncRequest, async_run
 from golem.core.common import to_unicode, string_to_timeout
+from golem.core.filehash import FileHasher, FileHashCacheService
 from golem.core.fileshelper import du
 from golem.core.hardware import HardwarePresets
 from golem.core.keysauth import EllipticalKeysAuth
@@ -44,6 +47,8 @@ from golem.network.p2p.p2pservice import P2PService
 from golem.network.p2p.peersession import PeerSessionInfo
 from golem.network.transport.tcpnetwork import SocketAddress
 from golem.ranking.helper.trust import Trust
+from golem.ranking.manager import database_manager
+from golem.ranking.manager.rank_cache import LocalRankService
 from golem.ranking.ranking import Ranking
 from golem.report import Component, Stage, StatusPublisher, report_calls
 from golem.resource.base.resourceserver import BaseResourceServer
@@ -124,6 +129,7 @@ class Client(HardwarePresetsMixin):
 
         # Initialize database
         self.db = Database(datadir)
+        FileHasher.initialize(datadir)
 
         # Hardware configuration
         HardwarePresets.initialize(self.datadir)
@@ -151,6 +157,9 @@ class Client(HardwarePresetsMixin):
                 int(self.config_desc.network_check_interval)),
             TaskArchiverService(self.task_archiver),
             MessageHistoryService(),
+            LocalRankService(database_manager.local_ranks,
+                             LOCAL_RANK_FLUSH_INTERVAL),
+            FileHashCacheService(FILE_HASH_CACHE_SAVE_INTERVAL),
             DoWorkService(self),
         ]
 
@@ -455,6 +464,7 @@ class Client(HardwarePresetsMixin):
 
         dispatcher.send(signal='golem.monitor', event='shutdown')
 
+        FileHasher.save()
         if self.db:
             self.db.close()
         self._unlock_datadir()
@@ -687,6 +697,9 @@ class Client(HardwarePresetsMixin):
             return self.task_server.task_manager.get_task_dict(task_id)
         return self.task_server.task_manager.get_tasks_dict()
 
+    def get_tasks_snapshot(self):
+        return self.task_server.task_manager.update_feed.snapshot()
+
     def get_subtasks(self, task_id):
         return self.task_server.task_manager.get_subtasks_dict(task_id)
 
@@ -940,9 +953,15 @@ class Client(HardwarePresetsMixin):
 
     def enable_environment(self, env_id):
         self.environments_manager.change_accept_tasks(env_id, True)
+        self._update_environment_support(env_id)
 
     def disable_environment(self, env_id):
         self.environments_manager.change_accept_tasks(env_id, False)
+        self._update_environment_support(env_id)
+
+    def _update_environment_support(self, env_id):
+        if self.task_server:
+            self.task_server.task_keeper.update_environment_support(env_id)
 
     def send_gossip(self, gossip, send_to):
         return self.p2pservice.send_gossip(gossip, send_to)
@@ -1194,8 +1213,14 @@ class TasksPublisherService(LoopingCallService):
         self._task_manager = task_manager
 
     def _run(self):
-        self._rpc_publisher.publish(Task.evt_task_list,
-                                    self._task_manager.get_tasks_dict())
+        update_feed = self._task_manager.update_feed
+        delta = update_feed.update()
+        if delta:
+            self._rpc_publisher.publish(Task.evt_task_updates, delta)
+            # Deprecated: the full list is published, built from the dicts
+            # cached by the feed, for clients not using evt_task_updates yet
+            self._rpc_publisher.publish(Task.evt_task_list,
+                                        update_feed.tasks())
 
 
 class TaskArchiverService(LoopingCallService):
@@ -44,6 +44,10 @@ class ClientConfigDescriptor(object):
         self.max_resource_size = 0
         self.max_memory_size = 0
         self.hardware_preset_name = ""
+        self.max_concurrent_subtasks = 1
+        self.container_pool_size = 0
+        self.verification_workers = 2
+        self.max_dispatch_connections = 16
 
         self.use_distributed_resource_management = 1
 
@@ -84,7 +88,9 @@ class ConfigApprover(object):
     to_int_opt = ['seed_port', 'num_cores', 'opt_peer_num',
                   'waiting_for_task_timeout', 'p2p_session_timeout',
                   'task_session_timeout', 'pings_interval',
-                  'max_results_sending_delay', 'min_price', 'max_price']
+                  'max_results_sending_delay', 'min_price', 'max_price',
+                  'max_concurrent_subtasks', 'container_pool_size',
+                  'verification_workers', 'max_dispatch_connections']
     to_float_opt = ['getting_peers_interval', 'getting_tasks_interval',
                     'computing_trust', 'requesting_trust']
 
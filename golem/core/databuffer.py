@@ -5,10 +5,24 @@ from .variables import LONG_STANDARD_SIZE
 
 
 class DataBuffer:
-    """ Data buffer that helps with network communication. """
+    """ Data buffer that helps with network communication.
+
+    Data is kept in a bytearray together with an offset of the first unread
+    byte. Reading moves the offset instead of copying the rest of the buffer;
+    consumed data is discarded once it takes at least half of the buffer,
+    so appending and reading are amortized O(size of the data).
+    """
     def __init__(self):
         """ Create new data buffer """
-        self.buffered_data = b""
+        self._data = bytearray()
+        self._offset = 0
+
+    @property
+    def buffered_data(self):
+        """ Copy of the data that has not been read yet
+        :return bytes:
+        """
+        return bytes(self._data[self._offset:])
 
     def append_ulong(self, num):
         """
@@ -19,31 +33,30 @@ class DataBuffer:
         if num < 0:
             raise AttributeError("num must be grater than 0")
         bytes_num_rep = struct.pack("!L", num)
-        self.buffered_data += bytes_num_rep
+        self._data += bytes_num_rep
         return bytes_num_rep
 
     def append_bytes(self, data):
         """ Append given bytes to data buffer
         :param bytes data: bytes to append
         """
-        self.buffered_data += data
+        self._data += data
 
     def data_size(self):
         """ Return size of data in buffer
         :return int: size of data in buffer
         """
-        return len(self.buffered_data)
+        return len(self._data) - self._offset
 
     def peek_ulong(self):
         """
         Check long number that is located at the beginning of this data buffer
         :return (long|None): number at the beginning of the buffer if it's there
         """
-        if len(self.buffered_data) < LONG_STANDARD_SIZE:
+        if self.data_size() < LONG_STANDARD_SIZE:
             return None
 
-        (ret_val,) = \
-            struct.unpack("!L", self.buffered_data[0:LONG_STANDARD_SIZE])
+        (ret_val,) = struct.unpack_from("!L", self._data, self._offset)
         return ret_val
 
     def read_ulong(self):
@@ -55,7 +68,7 @@ class DataBuffer:
         if val_ is None:
             raise ValueError(
                 "buffer_data is shorter than {}".format(LONG_STANDARD_SIZE))
-        self.buffered_data = self.buffered_data[LONG_STANDARD_SIZE:]
+        self._consume(LONG_STANDARD_SIZE)
 
         return val_
 
@@ -65,10 +78,11 @@ class DataBuffer:
         :param long num_bytes: how many bytes should be read from buffer
         :return bytes: first <num_bytes> bytes from buffer
         """
-        if num_bytes > len(self.buffered_data):
+        if num_bytes > self.data_size():
             raise AttributeError("num_bytes is grater than buffer length")
 
-        ret_bytes = self.buffered_data[:num_bytes]
+        with memoryview(self._data) as view:
+            ret_bytes = view[self._offset:self._offset + num_bytes].tobytes()
         return ret_bytes
 
     def read_bytes(self, num_bytes):
@@ -79,7 +93,7 @@ class DataBuffer:
         :return bytes: bytes removed form buffer
         """
         val_ = self.peek_bytes(num_bytes)
-        self.buffered_data = self.buffered_data[num_bytes:]
+        self._consume(num_bytes)
 
         return val_
 
@@ -89,7 +103,7 @@ class DataBuffer:
         :return bytes: all data that was in the buffer.
         """
         ret_data = self.buffered_data
-        self.buffered_data = b""
+        self.clear_buffer()
 
         return ret_data
 
@@ -101,8 +115,7 @@ class DataBuffer:
         """
         ret_bytes = None
 
-        if (self.data_size() > LONG_STANDARD_SIZE and
-                self.data_size() >= (self.peek_ulong() + LONG_STANDARD_SIZE)):
+        if self._has_len_prefixed_bytes():
             num_bytes = self.read_ulong()
             ret_bytes = self.read_bytes(num_bytes)
 
@@ -113,8 +126,7 @@ class DataBuffer:
         Generator function that return from buffer datas preceded with
         their length (long)
         """
-        while (self.data_size() > LONG_STANDARD_SIZE and
-               self.data_size() >= (self.peek_ulong() + LONG_STANDARD_SIZE)):
+        while self._has_len_prefixed_bytes():
             num_bytes = self.read_ulong()
             yield self.read_bytes(num_bytes)
 
@@ -128,4 +140,18 @@ class DataBuffer:
 
     def clear_buffer(self):
         """ Remove all data from the buffer """
-        self.buffered_data = b""
+        self._data = bytearray()
+        self._offset = 0
+
+    def _has_len_prefixed_bytes(self):
+        data_size = self.data_size()
+        return (data_size > LONG_STANDARD_SIZE and
+                data_size >= (self.peek_ulong() + LONG_STANDARD_SIZE))
+
+    def _consume(self, num_bytes):
+        self._offset += num_bytes
+        if self._offset == len(self._data):
+            self.clear_buffer()
+        elif self._offset * 2 >= len(self._data):
+            del self._data[:self._offset]
+            self._offset = 0
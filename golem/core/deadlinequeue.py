@@ -0,0 +1,83 @@
+import heapq
+import itertools
+
+__all__ = ['DeadlineQueue']
+
+
+class DeadlineQueue(object):
+    """ Keys ordered by their deadlines, so that periodic timeout checks
+    only look at the keys that have expired.
+
+    Scheduling a key that is already in the queue replaces its deadline.
+    Replaced and cancelled entries stay in the heap and are skipped when they
+    reach its top; the heap is rebuilt when they outnumber the live entries.
+    Scheduling and cancelling take O(log n) time, popping expired keys
+    O(k log n) for k expired keys.
+    """
+
+    def __init__(self):
+        self._heap = []  # (deadline, seq, key)
+        self._deadlines = {}  # key -> (deadline, seq)
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def __iter__(self):
+        return iter(list(self._deadlines))
+
+    def schedule(self, key, deadline):
+        """ Add a key or change its deadline
+        :param key: hashable key
+        :param float deadline: timestamp after which the key expires
+        """
+        current = self._deadlines.get(key)
+        if current is not None and current[0] == deadline:
+            return
+        entry = (deadline, next(self._seq))
+        self._deadlines[key] = entry
+        heapq.heappush(self._heap, entry + (key,))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+
+    def cancel(self, key):
+        self._deadlines.pop(key, None)
+
+    def get_deadline(self, key):
+        entry = self._deadlines.get(key)
+        return entry[0] if entry is not None else None
+
+    def next_deadline(self):
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now):
+        """ Remove and return keys with deadlines earlier than now
+        :param float now: current timestamp
+        :return list: expired keys ordered by their deadlines
+        """
+        expired = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] >= now:
+                return expired
+            _, _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            expired.append(key)
+
+    def clear(self):
+        self._heap = []
+        self._deadlines.clear()
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._deadlines.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)
+
+    def _compact(self):
+        self._heap = [entry + (key,) for key, entry
+                      in self._deadlines.items()]
+        heapq.heapify(self._heap)
@@ -1,4 +1,6 @@
 import abc
+import io
+import shutil
 from hashlib import sha256
 from Crypto.Cipher import AES
 from Crypto import Random
@@ -56,12 +58,22 @@ class FileEncryptor(object, metaclass=abc.ABCMeta):
 
 
 class AESFileEncryptor(FileEncryptor):
+    """ AES-CBC file encryption with a key derived from a secret and a random
+    salt. Encrypted files start with a 16 byte header: a 5 byte prefix
+    and the salt. Files written before the header was versioned start with
+    salt_prefix (version 0); newer ones start with header_prefix followed by
+    a version byte. Both versions use the same encryption.
+    """
 
     aes_mode = AES.MODE_CBC
     block_size = AES.block_size
     chunk_size = 1024
+    # Bytes encrypted or decrypted at once by streams
+    buffer_size = 1024 * 1024
     salt_prefix = b'salt_'
     salt_prefix_len = len(salt_prefix)
+    header_prefix = b'gpkg'
+    version = 1
 
     @classmethod
     def gen_salt(cls, length):
@@ -80,54 +92,164 @@ class AESFileEncryptor(FileEncryptor):
         return digest[:key_len], digest[key_len:total_len]
 
     @classmethod
-    def encrypt(cls, file_in, file_out, secret, key_len=32):
-
+    def encrypting_stream(cls, dst, secret, key_len=32):
+        """ Return a buffered writable stream which encrypts data written
+        to it and writes the ciphertext to dst. The last block is written
+        when the stream is closed; dst is left open.
+        """
         block_size = cls.block_size
         salt = cls.gen_salt(block_size)
         key, iv = cls.get_key_and_iv(secret, salt, key_len, block_size)
-        cipher = AES.new(key, cls.aes_mode, iv)
 
-        with FileHelper(file_in, 'rb') as src, FileHelper(file_out, 'wb') as dst:
+        dst.write(cls.header_prefix + bytes([cls.version]) + salt)
+        raw = _AESEncryptingStream(dst, AES.new(key, cls.aes_mode, iv),
+                                   block_size)
+        return io.BufferedWriter(raw, buffer_size=cls.buffer_size)
 
-            dst.write(cls.salt_prefix + salt)
+    @classmethod
+    def decrypting_stream(cls, src, secret, key_len=32):
+        """ Return a buffered, seekable readable stream of data decrypted
+        from src, which has to be seekable; src is left open.
+        """
+        block_size = cls.block_size
 
-            working = True
-            while working:
+        header = src.read(block_size)
+        prefix = header[:cls.salt_prefix_len]
+        if prefix[:len(cls.header_prefix)] == cls.header_prefix:
+            version = prefix[-1]
+        elif prefix == cls.salt_prefix:
+            version = 0
+        else:
+            raise ValueError("Invalid encrypted file header")
+        if version > cls.version:
+            raise ValueError("Unsupported encrypted file version {}"
+                             .format(version))
 
-                chunk = src.read(cls.chunk_size * block_size)
-                chunk_len = len(chunk)
-                chunk_len_mod = chunk_len % block_size
+        salt = header[cls.salt_prefix_len:]
+        key, iv = cls.get_key_and_iv(secret, salt, key_len, block_size)
+        raw = _AESDecryptingStream(src, key, iv, cls.aes_mode, block_size)
+        return io.BufferedReader(raw, buffer_size=cls.buffer_size)
 
-                if chunk_len == 0 or chunk_len_mod != 0:
-                    pad_len = (block_size - chunk_len_mod) or block_size
-                    chunk += chr(pad_len).encode() * pad_len
-                    working = False
+    @classmethod
+    def encrypt(cls, file_in, file_out, secret, key_len=32):
 
-                dst.write(cipher.encrypt(chunk))
+        with FileHelper(file_in, 'rb') as src, FileHelper(file_out, 'wb') as dst:
+            with cls.encrypting_stream(dst, secret, key_len) as stream:
+                shutil.copyfileobj(src, stream, cls.buffer_size)
 
     @classmethod
     def decrypt(cls, file_in, file_out, secret, key_len=32):
 
-        block_size = cls.block_size
-
         with FileHelper(file_in, 'rb') as src, FileHelper(file_out, 'wb') as dst:
+            with cls.decrypting_stream(src, secret, key_len) as stream:
+                shutil.copyfileobj(stream, dst, cls.buffer_size)
+
+
+class _AESEncryptingStream(io.RawIOBase):
+
+    def __init__(self, dst, cipher, block_size):
+        super().__init__()
+        self._dst = dst
+        self._cipher = cipher
+        self._block_size = block_size
+        self._pending = bytes()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        data = self._pending + bytes(b)
+        length = len(data) - len(data) % self._block_size
+        if length:
+            self._dst.write(self._cipher.encrypt(data[:length]))
+        self._pending = data[length:]
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            pad_len = self._block_size - len(self._pending)
+            self._dst.write(self._cipher.encrypt(
+                self._pending + bytes([pad_len]) * pad_len))
+        super().close()
+
+
+class _AESDecryptingStream(io.RawIOBase):
+    """ CBC mode allows decrypting any block knowing only the preceding one
+    (or the IV), so the stream can seek without decrypting data it skips.
+    """
+
+    def __init__(self, src, key, iv, aes_mode, block_size):
+        super().__init__()
+        self._src = src
+        self._key = key
+        self._iv = iv
+        self._aes_mode = aes_mode
+        self._block_size = block_size
+        self._start = src.tell()
+        self._next_block = None  # index of the block following _prev_block
+        self._prev_block = None
+
+        src.seek(0, io.SEEK_END)
+        encrypted_size = src.tell() - self._start
+        if not encrypted_size or encrypted_size % block_size:
+            raise ValueError("Invalid encrypted file size")
+
+        last_block = self._decrypt_blocks(encrypted_size // block_size - 1, 1)
+        pad_len = min(last_block[-1], block_size)
+
+        self._size = encrypted_size - pad_len
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        elif whence != io.SEEK_SET:
+            raise ValueError("Invalid whence {}".format(whence))
+        if offset < 0:
+            raise ValueError("Negative seek position {}".format(offset))
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, b):
+        length = min(len(b), self._size - self._pos)
+        if length <= 0:
+            return 0
+
+        block_size = self._block_size
+        first = self._pos // block_size
+        last = (self._pos + length - 1) // block_size
+        data = self._decrypt_blocks(first, last - first + 1)
+
+        offset = self._pos - first * block_size
+        b[:length] = data[offset:offset + length]
+        self._pos += length
+        return length
+
+    def _decrypt_blocks(self, first, count):
+        block_size = self._block_size
+        if first == 0:
+            prev_block = self._iv
+            self._src.seek(self._start)
+        elif first == self._next_block:
+            prev_block = self._prev_block
+        else:
+            self._src.seek(self._start + (first - 1) * block_size)
+            prev_block = self._src.read(block_size)
 
-            block = src.read(block_size)
-            salt = block[cls.salt_prefix_len:]
-
-            key, iv = cls.get_key_and_iv(secret, salt, key_len, block_size)
-            cipher = AES.new(key, cls.aes_mode, iv)
-
-            working = True
-            next_chunk = bytes()
-            while working:
-
-                chunk = next_chunk
-                next_chunk = cipher.decrypt(src.read(cls.chunk_size *
-                                                     block_size))
-                if len(next_chunk) == 0:
-                    pad_len = chunk[-1]
-                    chunk = chunk[:-pad_len]
-                    working = False
+        encrypted = self._src.read(count * block_size)
+        self._next_block = first + count
+        self._prev_block = encrypted[-block_size:]
 
-                dst.write(chunk)
+        cipher = AES.new(self._key, self._aes_mode, prev_block)
+        return cipher.decrypt(encrypted)
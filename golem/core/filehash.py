@@ -0,0 +1,285 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from golem.core.common import get_cpu_count
+from golem.core.service import LoopingCallService
+
+logger = logging.getLogger(__name__)
+
+# Size of a single read. hashlib releases the GIL while digesting blocks
+# of this size, so several files can be hashed in parallel threads.
+BLOCK_SIZE = 2 ** 22
+ALGORITHMS = ('sha1', 'sha256')
+
+CACHE_FILE_NAME = 'file_hashes.json'
+CACHE_VERSION = 1
+MAX_CACHE_ENTRIES = 100000
+
+
+def hash_file(file_path, algorithms=ALGORITHMS, block_size=BLOCK_SIZE):
+    """ Compute several digests of a file in a single pass
+    :param str file_path: path to the file
+    :param algorithms: names of hashlib algorithms
+    :param int block_size: data will be read from file in chunks of this size
+    :return dict: algorithm name -> digest (bytes)
+    """
+    hashes = [hashlib.new(algorithm) for algorithm in algorithms]
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buf)
+            if not read:
+                break
+            for h in hashes:
+                h.update(view[:read])
+
+    return {algorithm: h.digest() for algorithm, h in zip(algorithms, hashes)}
+
+
+def _file_key(file_path):
+    """ Describes the state of the file on disk. Cached digests are valid
+    as long as the file's key does not change.
+    """
+    st = os.stat(file_path)
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+class FileHashCache(object):
+    """ Digests of files keyed by (path, size, mtime, inode). Other values
+    computed from the content of a file (e.g. its chunk manifest) can be
+    cached along with the digests. Can be persisted in a JSON file, so that
+    files which have not changed are not rehashed after restart.
+    """
+
+    def __init__(self, cache_path=None, max_entries=MAX_CACHE_ENTRIES):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._lock = Lock()
+        # serializes writes of the cache file
+        self._save_lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, file_path, key):
+        """ Return cached digests of a file or None if the file has
+        changed since it was hashed
+        :param str file_path: absolute path to the file
+        :param list key: current key of the file (see _file_key)
+        :return dict|None: algorithm name -> digest (bytes)
+        """
+        entry = self._get_entry(file_path, key)
+        return entry['digests'] if entry else None
+
+    def set(self, file_path, key, digests):
+        with self._lock:
+            self._entry(file_path, key)['digests'] = digests
+            self._dirty = True
+
+    def get_value(self, file_path, key, name):
+        """ Return a cached value or None if the file has changed since
+        the value was computed
+        :param str name: name of the value
+        """
+        entry = self._get_entry(file_path, key)
+        return entry['values'].get(name) if entry else None
+
+    def set_value(self, file_path, key, name, value):
+        """ Cache a JSON serializable value computed from the file """
+        with self._lock:
+            self._entry(file_path, key)['values'][name] = value
+            self._dirty = True
+
+    def _get_entry(self, file_path, key):
+        """ Return the entry of the file if its key matches and mark it
+        as recently used, so that entries are evicted in LRU order
+        """
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if not entry or entry['key'] != key:
+                return None
+            self._entries.move_to_end(file_path)
+            return entry
+
+    def _entry(self, file_path, key):
+        """ Return the entry of the file, moved to the end of the eviction
+        order. Values of an entry with a different key are dropped.
+        """
+        entry = self._entries.pop(file_path, None)
+        if not entry or entry['key'] != key:
+            entry = dict(key=key, digests=None, values=dict())
+        self._entries[file_path] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def load(self):
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, 'r') as f:
+                content = json.load(f)
+            if content.get('version') != CACHE_VERSION:
+                return
+            entries = OrderedDict(
+                (path, dict(key=entry['key'],
+                            digests=self._decode_digests(entry['digests']),
+                            values=dict(entry.get('values', {}))))
+                for path, entry in content['entries'].items())
+        except (OSError, ValueError, KeyError, TypeError,
+                AttributeError) as exc:
+            logger.warning("Cannot load file hash cache %s: %r",
+                           self.cache_path, exc)
+            return
+
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+
+    def save(self):
+        """ Write the cache file if the cache has changed since it was
+        loaded or saved """
+        if not self.cache_path:
+            return
+
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = OrderedDict(
+                    (path, dict(key=entry['key'],
+                                digests=self._encode_digests(
+                                    entry['digests']),
+                                values=dict(entry['values'])))
+                    for path, entry in self._entries.items())
+                self._dirty = False
+
+            tmp_path = self.cache_path + '.tmp'
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(dict(version=CACHE_VERSION, entries=entries), f)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as exc:
+                logger.warning("Cannot save file hash cache %s: %r",
+                               self.cache_path, exc)
+                with self._lock:
+                    self._dirty = True
+
+    @staticmethod
+    def _encode_digests(digests):
+        if digests is None:
+            return None
+        return {algorithm: digest.hex() for algorithm, digest
+                in digests.items()}
+
+    @staticmethod
+    def _decode_digests(digests):
+        if digests is None:
+            return None
+        return {algorithm: bytes.fromhex(digest) for algorithm, digest
+                in digests.items()}
+
+
+class FileHasher(object):
+    """ Hashes files in a single pass with all supported algorithms and
+    remembers the results. Call initialize(datadir) to make the cache
+    persistent; it is written to disk by save() (see FileHashCacheService).
+    """
+
+    cache = FileHashCache()
+
+    @classmethod
+    def initialize(cls, datadir):
+        cls.cache = FileHashCache(os.path.join(datadir, CACHE_FILE_NAME))
+        cls.cache.load()
+
+    @classmethod
+    def save(cls):
+        cls.cache.save()
+
+    @classmethod
+    def digests(cls, file_path, block_size=BLOCK_SIZE):
+        """ Return digests of a file, computing them only if the file has
+        changed since it was last hashed
+        :param str file_path: path to the file
+        :param int block_size: data will be read from file in chunks of
+        this size
+        :return dict: algorithm name -> digest (bytes)
+        """
+        file_path = os.path.abspath(file_path)
+        key = _file_key(file_path)
+
+        digests = cls.cache.get(file_path, key)
+        if digests is None:
+            digests = hash_file(file_path, block_size=block_size)
+            # Do not cache a file modified while it was being hashed
+            if _file_key(file_path) == key:
+                cls.cache.set(file_path, key, digests)
+        return digests
+
+    @classmethod
+    def cached(cls, file_path, name, compute):
+        """ Return a value computed from the content of a file, calling
+        compute only if the file has changed since the value was cached
+        :param str file_path: path to the file
+        :param str name: name of the value
+        :param compute: function of the file path returning a JSON
+        serializable value
+        """
+        file_path = os.path.abspath(file_path)
+        key = _file_key(file_path)
+
+        value = cls.cache.get_value(file_path, key, name)
+        if value is None:
+            value = compute(file_path)
+            if _file_key(file_path) == key:
+                cls.cache.set_value(file_path, key, name, value)
+        return value
+
+    @classmethod
+    def sha1(cls, file_path, block_size=BLOCK_SIZE):
+        return cls.digests(file_path, block_size)['sha1']
+
+    @classmethod
+    def sha256(cls, file_path, block_size=BLOCK_SIZE):
+        return cls.digests(file_path, block_size)['sha256']
+
+    @classmethod
+    def hash_files(cls, file_paths, max_workers=None):
+        """ Hash files in parallel threads
+        :param file_paths: paths to the files
+        :param int max_workers: number of threads, defaults to number
+        of cpu cores
+        :return dict: file path -> digests (see digests)
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return dict()
+
+        max_workers = min(max_workers or get_cpu_count(), len(file_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(file_paths,
+                               executor.map(cls.digests, file_paths)))
+        return results
+
+
+class FileHashCacheService(LoopingCallService):
+    """ Saves the FileHasher cache every interval_seconds, if it has
+    changed, and on stop """
+
+    def _run(self):
+        FileHasher.save()
+
+    def stop(self):
+        super().stop()
+        FileHasher.save()
@@ -472,19 +472,19 @@ class EllipticalKeysAuth(KeysAuth):
             logger.error("Cannot verify signature: {}".format(exc))
         return False
 
-    def generate_new(self, difficulty):
+    def generate_new(self, difficulty, solver=None):
         """ Generate new pair of keys with given difficulty
         :param int difficulty: desired key difficulty level
+        :param powsolver.PowSolver|None solver: *Default: None* solver searching for keys; if None,
+        powsolver.get_solver() is used
         :raise TypeError: in case of incorrect @difficulty type
         """
+        from golem.core import powsolver
+
         if not isinstance(difficulty, int):
             raise TypeError("Incorrect 'difficulty' type: {}".format(type(difficulty)))
-        min_hash = self._count_min_hash(difficulty)
-        priv_key = mk_privkey(str(get_random_float()))
-        pub_key = privtopub(priv_key)
-        while sha2(self.cnt_key_id(pub_key)) > min_hash:
-            priv_key = mk_privkey(str(get_random_float()))
-            pub_key = privtopub(priv_key)
+        solver = solver or powsolver.get_solver()
+        priv_key, pub_key = solver.generate_key(difficulty)
         self._set_and_save(priv_key, pub_key)
 
     def load_from_file(self, file_name):
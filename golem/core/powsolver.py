@@ -0,0 +1,189 @@
+"""
+Proof of work solvers used to solve crypto-puzzles (see simplechallenge)
+and to generate keys with the required difficulty (see keysauth).
+
+A solution is accepted when sha256 of the puzzle, read as a big-endian
+integer, is not greater than 2 ** (256 - difficulty).
+"""
+import multiprocessing
+import queue
+import time
+from hashlib import sha256
+from typing import Optional, Tuple
+
+from golem.core.keysauth import get_random_float, mk_privkey, privtopub
+from golem.utils import encode_hex
+
+
+def count_min_hash(difficulty: int) -> int:
+    return pow(2, 256 - difficulty)
+
+
+def _search_challenge(challenge: bytes, min_hash: int, start: int,
+                      count: int) -> Optional[int]:
+    """
+    Checks nonces from range <start, start + count). The challenge prefix
+    is hashed once and its hash state is copied for every nonce.
+    :return: the first solution found in the range or None
+    """
+    prefix = sha256(challenge)
+    for solution in range(start, start + count):
+        digest = prefix.copy()
+        digest.update(str(solution).encode())
+        if int.from_bytes(digest.digest(), 'big') <= min_hash:
+            return solution
+    return None
+
+
+def _search_key(min_hash: int, count: int) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Generates up to count random key pairs.
+    :return: the first (private key, public key) pair which key id has
+             the required difficulty or None
+    """
+    for _ in range(count):
+        priv_key = mk_privkey(str(get_random_float()))
+        pub_key = privtopub(priv_key)
+        key_id = encode_hex(pub_key).encode()
+        if int.from_bytes(sha256(key_id).digest(), 'big') <= min_hash:
+            return priv_key, pub_key
+    return None
+
+
+def _challenge_worker(challenge, min_hash, index, workers, chunk_size,
+                      stop, results):
+    """ Checks every workers-th chunk of nonces, starting with index-th """
+    start = index * chunk_size
+    while not stop.is_set():
+        solution = _search_challenge(challenge, min_hash, start, chunk_size)
+        if solution is not None:
+            results.put(solution)
+            return
+        start += workers * chunk_size
+
+
+def _key_worker(min_hash, chunk_size, stop, results):
+    while not stop.is_set():
+        keys = _search_key(min_hash, chunk_size)
+        if keys is not None:
+            results.put(keys)
+            return
+
+
+class PowSolver(object):
+    """ Solves proof of work puzzles in the calling thread """
+
+    # Nonces checked at once
+    CHUNK_SIZE = 4096
+    # Key pairs generated at once
+    KEYS_CHUNK_SIZE = 4
+
+    def solve_challenge(self, challenge: str, difficulty: int) -> int:
+        """
+        :return: the smallest non-negative integer solution of challenge
+        """
+        min_hash = count_min_hash(difficulty)
+        start = 0
+        while True:
+            solution = _search_challenge(challenge.encode(), min_hash,
+                                         start, self.CHUNK_SIZE)
+            if solution is not None:
+                return solution
+            start += self.CHUNK_SIZE
+
+    def generate_key(self, difficulty: int) -> Tuple[bytes, bytes]:
+        """
+        :return: (private key, public key) pair which key id has at least
+                 the given difficulty
+        """
+        min_hash = count_min_hash(difficulty)
+        while True:
+            keys = _search_key(min_hash, self.KEYS_CHUNK_SIZE)
+            if keys is not None:
+                return keys
+
+
+class ParallelPowSolver(PowSolver):
+    """
+    Splits the search across worker processes and stops all of them
+    when the first solution is found. Easy puzzles are solved in the calling
+    thread, since starting processes would take longer than the search.
+    """
+
+    # Highest difficulty solved in the calling thread
+    MAX_LOCAL_CHALLENGE_DIFFICULTY = 14
+    MAX_LOCAL_KEY_DIFFICULTY = 4
+
+    def __init__(self, processes: Optional[int] = None) -> None:
+        self.processes = processes or multiprocessing.cpu_count()
+
+    def solve_challenge(self, challenge: str, difficulty: int) -> int:
+        """
+        :return: an integer solution of challenge; with many processes it is
+                 not necessarily the smallest one
+        """
+        if self.processes < 2 or \
+                difficulty <= self.MAX_LOCAL_CHALLENGE_DIFFICULTY:
+            return super().solve_challenge(challenge, difficulty)
+
+        min_hash = count_min_hash(difficulty)
+        return self._run(_challenge_worker, [
+            (challenge.encode(), min_hash, index, self.processes,
+             self.CHUNK_SIZE) for index in range(self.processes)
+        ])
+
+    def generate_key(self, difficulty: int) -> Tuple[bytes, bytes]:
+        if self.processes < 2 or difficulty <= self.MAX_LOCAL_KEY_DIFFICULTY:
+            return super().generate_key(difficulty)
+
+        min_hash = count_min_hash(difficulty)
+        return self._run(_key_worker, [
+            (min_hash, self.KEYS_CHUNK_SIZE) for _ in range(self.processes)
+        ])
+
+    @staticmethod
+    def _run(target, args_list):
+        stop = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=target,
+                                    args=args + (stop, results),
+                                    daemon=True)
+            for args in args_list
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            while True:
+                try:
+                    return results.get(timeout=1)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in processes):
+                        break
+            # Workers might have put a result just before exiting
+            try:
+                return results.get(timeout=1)
+            except queue.Empty:
+                raise RuntimeError("Proof of work workers failed")
+        finally:
+            stop.set()
+            deadline = time.monotonic() + 1
+            for process in processes:
+                process.join(max(deadline - time.monotonic(), 0))
+                if process.is_alive():
+                    process.terminate()
+            results.close()
+
+
+_solver = ParallelPowSolver()  # type: PowSolver
+
+
+def get_solver() -> PowSolver:
+    return _solver
+
+
+def set_solver(solver: PowSolver) -> None:
+    """ Replaces the solver used by simplechallenge and keysauth """
+    global _solver  # pylint: disable=global-statement
+    _solver = solver
@@ -3,6 +3,7 @@
 from random import sample
 import time
 
+from golem.core import powsolver
 from golem.core.keysauth import get_random, sha2
 
 __author__ = 'Magda.Stasiewicz'
@@ -27,16 +28,15 @@ def create_challenge(history, prev):
     return concat
 
 
-def solve_challenge(challenge, difficulty):
+def solve_challenge(challenge, difficulty, solver=None):
     """
     Solves the puzzle given in string challenge difficulty is required number of zeros in the beginning of binary
     representation of solution's hash returns solution and computation time in seconds
+    :param powsolver.PowSolver|None solver: *Default: None* solver to use; if None, powsolver.get_solver() is used
     """
     start = time.time()
-    min_hash = pow(2, 256 - difficulty)     # could be done prettier
-    solution = 0
-    while sha2(challenge + str(solution)) > min_hash:
-        solution += 1
+    solver = solver or powsolver.get_solver()
+    solution = solver.solve_challenge(challenge, difficulty)
     end = time.time()
     return solution, end - start
 
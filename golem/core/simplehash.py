@@ -1,6 +1,8 @@
 import hashlib
 import base64
 
+from golem.core.filehash import BLOCK_SIZE, FileHasher
+
 
 class SimpleHash(object):
     """ Hash methods wrapper meta-class """
@@ -48,22 +50,14 @@ class SimpleHash(object):
         return cls.base64_encode(cls.hash(data))
 
     @classmethod
-    def hash_file_base64(cls, filename, block_size=2 ** 20):
-        """Return sha1 of data from given file encoded with base64
+    def hash_file_base64(cls, filename, block_size=BLOCK_SIZE):
+        """Return sha1 of data from given file encoded with base64. Files
+        that have not changed since they were last hashed are not read again.
         :param str filename: name of a file that should be read
-        :param int block_size: *Default: 2**20* data will be read from file in chunks of this size
+        :param int block_size: *Default: 2**22* data will be read from file in chunks of this size
         :return str: base64 encoded sha1 of data from file <filename>
         """
-        with open(filename, "rb") as f:
-            sha = hashlib.sha1()
-
-            while True:
-                data = f.read(block_size)
-                if not data:
-                    break
-                sha.update(data)
-
-            return cls.base64_encode(sha.digest())
+        return cls.base64_encode(FileHasher.sha1(filename, block_size))
 
     @classmethod
     def hash_object(cls):
@@ -57,7 +57,7 @@ class IntStatsKeeper(StatsKeeper):
     def increase_stat(self, stat_name, increment=1):
         with self._lock:
             val = getattr(self.session_stats, stat_name)
-            setattr(self.session_stats, stat_name, val + 1)
+            setattr(self.session_stats, stat_name, val + increment)
             global_val = self._retrieve_stat(stat_name)
             if global_val is not None:
                 setattr(self.global_stats, stat_name, global_val + increment)
@@ -48,6 +48,30 @@ class DockerConfigManager(object):
 
         self.container_host_config.update(host_config)
 
+    def slot_host_config(self, slot, slots):
+        """ Return host config for a container running in one of <slots>
+        concurrent computation slots. CPU cores assigned to containers are
+        split into disjoint sets and the memory limit is divided evenly.
+        :param int slot: index of the slot, 0 <= slot < slots
+        :param int slots: number of concurrent computation slots
+        :return dict:
+        """
+        host_config = dict(self.container_host_config)
+        if slots <= 1:
+            return host_config
+
+        cpuset = host_config.get('cpuset')
+        if cpuset:
+            cores = cpuset.split(',')
+            per_slot = max(1, len(cores) // slots)
+            slot_cores = cores[slot * per_slot:(slot + 1) * per_slot]
+            host_config['cpuset'] = ','.join(slot_cores or cores)
+
+        if host_config.get('mem_limit'):
+            host_config['mem_limit'] = host_config['mem_limit'] // slots
+
+        return host_config
+
     @classmethod
     def install(cls, *args, **kwargs):
         if not DockerTaskThread.docker_manager:
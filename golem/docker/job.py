@@ -2,6 +2,7 @@ import atexit
 import logging
 import os
 import posixpath
+import shutil
 import threading
 from os import path
 
@@ -10,7 +11,7 @@ import docker.errors
 from golem.core.common import is_windows, nt_path_to_posix_path, is_osx
 from .client import local_client
 
-__all__ = ['DockerJob']
+__all__ = ['DockerJob', 'PooledDockerJob']
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +93,24 @@ class DockerJob(object):
         self.resources_dir_mod = self._host_dir_chmod(self.resources_dir, "rw")
         self.output_dir_mod = self._host_dir_chmod(self.output_dir, "rw")
 
+        self._write_task_files()
+
+        # The location of the task script when mounted in the container
+        container_script_path = self._get_container_script_path()
+        self.container = self.create_container(
+            local_client(), self.image, self.work_dir, self.resources_dir,
+            self.output_dir, self.host_config, [container_script_path])
+        self.container_id = self.container["Id"]
+        if self.container_id is None:
+            raise KeyError("container does not have key: Id")
+
+        self.running_jobs.append(self)
+        logger.debug("Container {} prepared, image: {}, dirs: {}; {}; {}"
+                     .format(self.container_id, self.image.name,
+                             self.work_dir, self.resources_dir, self.output_dir)
+                     )
+
+    def _write_task_files(self):
         # Save parameters in work_dir/PARAMS_FILE
         params_file_path = self._get_host_params_path()
         with open(params_file_path, "wb") as params_file:
@@ -104,9 +123,20 @@ class DockerJob(object):
         with open(task_script_path, "wb") as script_file:
             script_file.write(bytearray(self.script_src, "utf-8"))
 
-        # Setup volumes for the container
-        client = local_client()
-
+    @classmethod
+    def create_container(cls, client, image, work_dir, resources_dir,
+                         output_dir, host_config, command):
+        """ Create a container with work, resources and output dirs bound
+        to WORK_DIR, RESOURCES_DIR and OUTPUT_DIR
+        :param docker.Client client:
+        :param DockerImage image: Docker image to use
+        :param str work_dir: host directory bound to WORK_DIR
+        :param str resources_dir: host directory bound to RESOURCES_DIR
+        :param str output_dir: host directory bound to OUTPUT_DIR
+        :param dict|None host_config: container host config
+        :param list command: container command
+        :return dict: created container
+        """
         # Docker config requires binds to be specified using posix paths,
         # even on Windows. Hence this function:
         def posix_path(path):
@@ -114,54 +144,46 @@ class DockerJob(object):
                 return nt_path_to_posix_path(path)
             return path
 
-        container_config = dict(self.host_config)
+        container_config = dict(host_config or {})
         cpuset = container_config.pop('cpuset', None)
 
-        if is_windows():
-            environment = None
-        elif is_osx():
-            environment = dict(OSX_USER=1)
-        else:
-            environment = dict(LOCAL_USER_ID=os.getuid())
-
         host_cfg = client.create_host_config(
             binds={
-                posix_path(self.work_dir): {
-                    "bind": self.WORK_DIR,
+                posix_path(work_dir): {
+                    "bind": cls.WORK_DIR,
                     "mode": "rw"
                 },
-                posix_path(self.resources_dir): {
-                    "bind": self.RESOURCES_DIR,
+                posix_path(resources_dir): {
+                    "bind": cls.RESOURCES_DIR,
                     "mode": "ro"
                 },
-                posix_path(self.output_dir): {
-                    "bind": self.OUTPUT_DIR,
+                posix_path(output_dir): {
+                    "bind": cls.OUTPUT_DIR,
                     "mode": "rw"
                 }
             },
             **container_config
         )
 
-        # The location of the task script when mounted in the container
-        container_script_path = self._get_container_script_path()
-        self.container = client.create_container(
-            image=self.image.name,
-            volumes=[self.WORK_DIR, self.RESOURCES_DIR, self.OUTPUT_DIR],
+        return client.create_container(
+            image=image.name,
+            volumes=[cls.WORK_DIR, cls.RESOURCES_DIR, cls.OUTPUT_DIR],
             host_config=host_cfg,
-            command=[container_script_path],
-            working_dir=self.WORK_DIR,
+            command=command,
+            working_dir=cls.WORK_DIR,
             cpuset=cpuset,
-            environment=environment
+            environment=cls.get_environment()
         )
-        self.container_id = self.container["Id"]
-        if self.container_id is None:
-            raise KeyError("container does not have key: Id")
 
-        self.running_jobs.append(self)
-        logger.debug("Container {} prepared, image: {}, dirs: {}; {}; {}"
-                     .format(self.container_id, self.image.name,
-                             self.work_dir, self.resources_dir, self.output_dir)
-                     )
+    @staticmethod
+    def get_environment():
+        """ Environment that makes the image entrypoint run container
+        commands as a user with the same id as the owner of bound dirs """
+        if is_windows():
+            return None
+        elif is_osx():
+            return dict(OSX_USER=1)
+        return dict(LOCAL_USER_ID=os.getuid())
 
     def _cleanup(self):
         if self.container:
@@ -315,3 +337,151 @@ class DockerJob(object):
         for job in DockerJob.running_jobs:
             logger.info("Killing job {}".format(job.container_id))
             job.kill()
+
+
+class PooledDockerJob(DockerJob):
+    """ DockerJob that runs the task script with `docker exec` in a warm
+    container taken from a ContainerPool, instead of creating a container
+    for each job. Work and output dirs of the job are replaced with the ones
+    bound to the warm container; output files are moved to the job's output
+    dir when the script finishes. If the pool has no container to spare,
+    the job runs in a new container, like DockerJob.
+    """
+
+    # Std streams of the task script, relative to the warm container's
+    # work dir
+    STDOUT_FILE = ".stdout"
+    STDERR_FILE = ".stderr"
+
+    def __init__(self, pool, image, script_src, parameters,
+                 resources_dir, work_dir, output_dir,
+                 host_config=None, container_log_level=None):
+        """
+        :param ContainerPool pool: pool to take a warm container from
+        """
+        super(PooledDockerJob, self).__init__(
+            image, script_src, parameters, resources_dir, work_dir,
+            output_dir, host_config, container_log_level)
+        self.pool = pool
+        self.warm_container = None
+        self.job_output_dir = output_dir
+        self.exec_id = None
+        self.exit_code = None
+        self.killed = False
+
+    def _prepare(self):
+        self.warm_container = self.pool.acquire(self.image, self.resources_dir,
+                                                self.host_config)
+        if self.warm_container is None:
+            return super(PooledDockerJob, self)._prepare()
+
+        self.resources_dir_mod = self._host_dir_chmod(self.resources_dir, "rw")
+        self.work_dir = self.warm_container.work_dir
+        self.output_dir = self.warm_container.output_dir
+        try:
+            self._write_task_files()
+        except Exception:
+            self.pool.release(self.warm_container, healthy=False)
+            raise
+
+        self.container_id = self.warm_container.container_id
+        self.container = {"Id": self.container_id}
+        self.state = self.STATE_CREATED
+        self.running_jobs.append(self)
+        logger.debug("Warm container {} prepared, image: {}"
+                     .format(self.container_id, self.image.name))
+
+    def _cleanup(self):
+        if self.warm_container is None:
+            return super(PooledDockerJob, self)._cleanup()
+
+        self.running_jobs.remove(self)
+        self._host_dir_chmod(self.resources_dir, self.resources_dir_mod)
+        healthy = self.exit_code is not None and not self.killed
+        self.pool.release(self.warm_container, healthy)
+        self.warm_container = None
+        self.container = None
+        self.container_id = None
+        self.state = self.STATE_REMOVED
+
+    def start(self):
+        if self.warm_container is None:
+            return super(PooledDockerJob, self).start()
+        if self.state != self.STATE_CREATED:
+            logger.debug("Container {} not started, status = {}"
+                         .format(self.container_id, self.state))
+            return None
+
+        client = local_client()
+        result = client.exec_create(self.container_id, self._get_command(),
+                                    user=self.warm_container.user or '')
+        self.exec_id = result["Id"]
+        self.state = self.STATE_RUNNING
+        logger.debug("Job started in container {}".format(self.container_id))
+        return result
+
+    def wait(self, timeout=None):
+        """Block until the job completes. Jobs running in a warm container
+        time out after the docker client timeout.
+        :param timeout: ignored for jobs in a warm container
+        :returns task script exit code
+        """
+        if self.warm_container is None:
+            return super(PooledDockerJob, self).wait(timeout)
+        if self.state != self.STATE_RUNNING:
+            logger.debug("Cannot wait for container {}, status = {}"
+                         .format(self.container_id, self.state))
+            return -1
+
+        client = local_client()
+        client.exec_start(self.exec_id)
+        self.exit_code = client.exec_inspect(self.exec_id)["ExitCode"]
+        self.state = self.STATE_EXITED
+        self._move_output_files()
+        return self.exit_code
+
+    def kill(self):
+        if self.warm_container is None:
+            return super(PooledDockerJob, self).kill()
+        if self.state != self.STATE_RUNNING:
+            return
+
+        # The container is removed from the pool after the job
+        self.killed = True
+        try:
+            client = local_client()
+            client.kill(self.container_id)
+        except Exception as exc:
+            logger.error("Couldn't kill container {}: {}"
+                         .format(self.container_id, exc))
+
+    def dump_logs(self, stdout_file=None, stderr_file=None):
+        if self.warm_container is None:
+            return super(PooledDockerJob, self).dump_logs(stdout_file,
+                                                          stderr_file)
+        for name, dst in [(self.STDOUT_FILE, stdout_file),
+                          (self.STDERR_FILE, stderr_file)]:
+            src = path.join(self.work_dir, name)
+            if dst and path.exists(src):
+                shutil.copyfile(src, dst)
+
+    def get_status(self):
+        if self.warm_container is None:
+            return super(PooledDockerJob, self).get_status()
+        return self.state
+
+    def _get_command(self):
+        command = "cd {} && exec /usr/bin/python {} >{} 2>{}".format(
+            self.WORK_DIR, self._get_container_script_path(),
+            posixpath.join(self.WORK_DIR, self.STDOUT_FILE),
+            posixpath.join(self.WORK_DIR, self.STDERR_FILE))
+        if self.warm_container.user:
+            # Set by the image entrypoint for the container command
+            command = "export HOME=/home/{}; {}".format(
+                self.warm_container.user, command)
+        return ["/bin/sh", "-c", command]
+
+    def _move_output_files(self):
+        for name in os.listdir(self.output_dir):
+            shutil.move(path.join(self.output_dir, name),
+                        path.join(self.job_output_dir, name))
@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import posixpath
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import docker.errors
+
+from .client import local_client
+from .job import DockerJob
+
+__all__ = ['ContainerPool', 'WarmContainer']
+
+logger = logging.getLogger(__name__)
+
+
+class WarmContainer(object):
+    """ Started container that waits for jobs. Its work and output dirs
+    are owned by the pool and stay bound for the lifetime of the container.
+    """
+
+    # Container command, keeps the container running between jobs
+    IDLE_SCRIPT = ".idle.py"
+    # Created by the idle script when the entrypoint has set up the user
+    READY_FILE = ".ready"
+    IDLE_SCRIPT_SRC = ("import time\n"
+                       "open({!r}, 'w').close()\n"
+                       "while True:\n"
+                       "    time.sleep(60)\n"
+                       .format(posixpath.join(DockerJob.WORK_DIR, READY_FILE)))
+
+    def __init__(self, key, container_id, container_dir, user=None):
+        """
+        :param tuple key: pool key of the container
+        :param str container_id:
+        :param str container_dir: host dir with work and output dirs
+        :param str|None user: container user that runs jobs
+        """
+        self.key = key
+        self.container_id = container_id
+        self.container_dir = container_dir
+        self.work_dir = os.path.join(container_dir, "work")
+        self.output_dir = os.path.join(container_dir, "output")
+        self.user = user
+        self.jobs = 0
+        self.last_used = time.time()
+
+    def __repr__(self):
+        return "WarmContainer({!r}, jobs={})".format(self.container_id,
+                                                     self.jobs)
+
+    def is_ready(self):
+        return os.path.exists(os.path.join(self.work_dir, self.READY_FILE))
+
+    def is_running(self, client):
+        try:
+            inspect = client.inspect_container(self.container_id)
+            return inspect["State"]["Running"]
+        except docker.errors.APIError:
+            logger.debug("Can't inspect container %r", self.container_id,
+                         exc_info=True)
+            return False
+
+    def reset(self):
+        """ Remove files left by the previous job """
+        for dir_ in (self.work_dir, self.output_dir):
+            for name in os.listdir(dir_):
+                path = os.path.join(dir_, name)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+
+
+class ContainerPool(object):
+    """ Keeps started, idle containers for each image, resources dir and
+    host config, so that subtasks of the same task don't pay for container
+    creation, volume binding and start-up every time (see PooledDockerJob).
+
+    A container is checked before it is given to a job and leaves the pool
+    when it has stopped, after a failed or killed job, after max_jobs jobs
+    or when it has been idle for longer than idle_timeout. There are at most
+    max_containers containers; the least recently used idle container
+    makes room for a new one.
+    """
+
+    MAX_CONTAINERS = 4
+    MAX_JOBS = 100
+    IDLE_TIMEOUT = 300  # seconds
+    STARTUP_TIMEOUT = 30  # seconds
+
+    def __init__(self, root_dir, max_containers=MAX_CONTAINERS,
+                 max_jobs=MAX_JOBS, idle_timeout=IDLE_TIMEOUT):
+        """
+        :param str root_dir: directory for work and output dirs of containers
+        :param int max_containers: limit of started containers
+        :param int max_jobs: number of jobs a container is used for
+        :param float idle_timeout: time after idle containers are removed
+        """
+        self.root_dir = root_dir
+        self.max_containers = max_containers
+        self.max_jobs = max_jobs
+        self.idle_timeout = idle_timeout
+
+        self._idle = OrderedDict()  # container id -> WarmContainer
+        self._busy = {}  # container id -> WarmContainer
+        self._starting = 0
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.reused = 0
+        self.missed = 0
+        self.removed = 0
+
+    def __len__(self):
+        return len(self._idle) + len(self._busy)
+
+    @property
+    def metrics(self):
+        requests = self.created + self.reused + self.missed
+        return {
+            'idle': len(self._idle),
+            'busy': len(self._busy),
+            'created': self.created,
+            'reused': self.reused,
+            'missed': self.missed,
+            'removed': self.removed,
+            'reuse_rate': self.reused / requests if requests else 0.0,
+        }
+
+    @staticmethod
+    def get_key(image, resources_dir, host_config):
+        return (image.name, image.id, os.path.abspath(resources_dir),
+                json.dumps(host_config or {}, sort_keys=True))
+
+    def acquire(self, image, resources_dir, host_config=None):
+        """ Take an idle container for a job or start a new one
+        :param DockerImage image:
+        :param str resources_dir: host dir with task resources
+        :param dict|None host_config: container host config
+        :return WarmContainer|None: None if every container is busy
+        """
+        key = self.get_key(image, resources_dir, host_config)
+        client = local_client()
+
+        while True:
+            with self._lock:
+                container = self._take_idle(key)
+                if container is None:
+                    if not self._make_room():
+                        self.missed += 1
+                        return None
+                    self._starting += 1
+                    break
+            if container.is_running(client):
+                self.reused += 1
+                return container
+            logger.debug("Removing stopped container %r", container)
+            with self._lock:
+                self._busy.pop(container.container_id, None)
+            self._remove(container, client)
+
+        try:
+            container = self._start(key, image, resources_dir, host_config,
+                                    client)
+        finally:
+            with self._lock:
+                self._starting -= 1
+        if container is None:
+            self.missed += 1
+            return None
+        with self._lock:
+            self._busy[container.container_id] = container
+        self.created += 1
+        return container
+
+    def release(self, container, healthy=True):
+        """ Return a container after a job
+        :param WarmContainer container:
+        :param bool healthy: False if the job failed or was killed
+        """
+        container.jobs += 1
+        container.last_used = time.time()
+        with self._lock:
+            if self._busy.pop(container.container_id, None) is None:
+                return  # Removed by clear()
+            keep = healthy and container.jobs < self.max_jobs
+        if keep:
+            try:
+                container.reset()
+            except OSError:
+                logger.warning("Can't reset container dirs of %r", container,
+                               exc_info=True)
+                keep = False
+        if keep:
+            with self._lock:
+                self._idle[container.container_id] = container
+        else:
+            self._remove(container)
+
+    def remove_idle(self):
+        """ Remove containers idle for longer than idle_timeout """
+        deadline = time.time() - self.idle_timeout
+        with self._lock:
+            expired = [c for c in self._idle.values() if c.last_used < deadline]
+            for container in expired:
+                del self._idle[container.container_id]
+        for container in expired:
+            self._remove(container)
+
+    def clear(self):
+        """ Remove all containers, including the ones running jobs """
+        with self._lock:
+            containers = list(self._idle.values()) + list(self._busy.values())
+            self._idle.clear()
+            self._busy.clear()
+        for container in containers:
+            self._remove(container)
+
+    def _take_idle(self, key):
+        for container_id, container in reversed(list(self._idle.items())):
+            if container.key == key:
+                del self._idle[container_id]
+                self._busy[container_id] = container
+                return container
+        return None
+
+    def _make_room(self):
+        if len(self) + self._starting < self.max_containers:
+            return True
+        if not self._idle:
+            return False
+        _, evicted = self._idle.popitem(last=False)
+        logger.debug("Evicting idle container %r", evicted)
+        threading.Thread(target=self._remove, args=(evicted,),
+                         daemon=True).start()
+        return True
+
+    def _start(self, key, image, resources_dir, host_config, client):
+        container_dir = os.path.join(self.root_dir, str(uuid.uuid4()))
+        container = WarmContainer(key, None, container_dir)
+        for dir_ in (container.work_dir, container.output_dir):
+            os.makedirs(dir_)
+            DockerJob._host_dir_chmod(dir_, "rw")
+        with open(os.path.join(container.work_dir, container.IDLE_SCRIPT),
+                  "w") as script_file:
+            script_file.write(container.IDLE_SCRIPT_SRC)
+
+        try:
+            command = [posixpath.join(DockerJob.WORK_DIR,
+                                      container.IDLE_SCRIPT)]
+            result = DockerJob.create_container(
+                client, image, container.work_dir, resources_dir,
+                container.output_dir, host_config, command)
+            container.container_id = result["Id"]
+            if DockerJob.get_environment():
+                container.user = "task"
+            client.start(container.container_id)
+
+            deadline = time.time() + self.STARTUP_TIMEOUT
+            while not container.is_ready():
+                if time.time() > deadline \
+                        or not container.is_running(client):
+                    raise RuntimeError("container is not running")
+                time.sleep(0.05)
+            container.reset()
+        except Exception as exc:
+            logger.warning("Can't start warm container for %s: %s",
+                           image.name, exc)
+            self._remove(container, client)
+            return None
+
+        logger.debug("Started warm container %r", container)
+        return container
+
+    def _remove(self, container, client=None):
+        self.removed += 1
+        if container.container_id:
+            try:
+                (client or local_client()).remove_container(
+                    container.container_id, force=True)
+            except docker.errors.APIError:
+                logger.debug("Can't remove container %r", container,
+                             exc_info=True)
+        shutil.rmtree(container.container_dir, ignore_errors=True)
@@ -2,7 +2,7 @@ import logging
 import os
 
 import requests
-from golem.docker.job import DockerJob
+from golem.docker.job import DockerJob, PooledDockerJob
 from golem.task.taskbase import ResultType
 from golem.task.taskthread import TaskThread
 from golem.vm.memorychecker import MemoryChecker
@@ -25,7 +25,8 @@ class DockerTaskThread(TaskThread):
 
     def __init__(self, task_computer, subtask_id, docker_images,
                  orig_script_dir, src_code, extra_data, short_desc,
-                 res_path, tmp_path, timeout, check_mem=False):
+                 res_path, tmp_path, timeout, check_mem=False,
+                 host_config=None, container_pool=None):
 
         if not docker_images:
             raise AttributeError("docker images is None")
@@ -44,6 +45,8 @@ class DockerTaskThread(TaskThread):
         self.job = None
         self.mc = None
         self.check_mem = check_mem
+        self.host_config = host_config
+        self.container_pool = container_pool
 
     def run(self):
         if not self.image:
@@ -61,14 +64,24 @@ class DockerTaskThread(TaskThread):
             if not os.path.exists(output_dir):
                 os.mkdir(output_dir)
 
-            if self.docker_manager:
+            if self.host_config is not None:
+                host_config = self.host_config
+            elif self.docker_manager:
                 host_config = self.docker_manager.container_host_config
             else:
                 host_config = None
 
-            with DockerJob(self.image, self.src_code, self.extra_data,
-                           self.res_path, work_dir, output_dir,
-                           host_config=host_config) as job:
+            if self.container_pool is not None:
+                job = PooledDockerJob(self.container_pool, self.image,
+                                      self.src_code, self.extra_data,
+                                      self.res_path, work_dir, output_dir,
+                                      host_config=host_config)
+            else:
+                job = DockerJob(self.image, self.src_code, self.extra_data,
+                                self.res_path, work_dir, output_dir,
+                                host_config=host_config)
+
+            with job:
                 self.job = job
                 if self.check_mem:
                     self.mc = MemoryChecker()
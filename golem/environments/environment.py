@@ -4,7 +4,7 @@ from os import path
 
 from apps.rendering.benchmark.minilight.src.minilight import make_perf_test
 
-from golem.core.common import get_golem_path
+from golem.core.common import get_cpu_count, get_golem_path
 from golem.model import Performance
 
 
@@ -52,6 +52,11 @@ class UnsupportReason(enum.Enum):
 
 class Environment():
 
+    # Default benchmark results by number of cores. The number of cores is
+    # set by the hardware preset, so the benchmark is run once per preset.
+    # Explicit runs which save the result always measure the performance.
+    _default_benchmark_results = {}
+
     @classmethod
     def get_id(cls):
         """ Get Environment unique id
@@ -139,9 +144,18 @@ class Environment():
 
     @classmethod
     def run_default_benchmark(cls, num_cores=1, save=False):
-        test_file = path.join(get_golem_path(), 'apps', 'rendering',
-                              'benchmark', 'minilight', 'cornellbox.ml.txt')
-        estimated_performance = make_perf_test(test_file, num_cores=1)
+        num_cores = max(1, min(num_cores, get_cpu_count()))
+        estimated_performance = None
+        if not save:
+            estimated_performance = \
+                cls._default_benchmark_results.get(num_cores)
+        if estimated_performance is None:
+            test_file = path.join(get_golem_path(), 'apps', 'rendering',
+                                  'benchmark', 'minilight',
+                                  'cornellbox.ml.txt')
+            estimated_performance = make_perf_test(test_file,
+                                                   num_cores=num_cores)
+            cls._default_benchmark_results[num_cores] = estimated_performance
         if save:
             Performance.update_or_create(cls.get_id(), estimated_performance)
         return estimated_performance
@@ -1,7 +1,11 @@
+import json
 import logging
+import socket
 
+import requests
 import rlp
 from ethereum.utils import zpad
+from web3 import HTTPProvider, IPCProvider
 
 from golem.core.common import get_timestamp_utc
 from .node import NodeProcess
@@ -14,6 +18,14 @@ class Client(object):
 
     node = None
 
+    # Maximum number of calls sent in one JSON-RPC batch request
+    BATCH_SIZE = 100
+    BATCH_TIMEOUT = 10
+    # Receipt fields converted from hex strings to integers, the way web3
+    # formats them
+    RECEIPT_INT_FIELDS = ('blockNumber', 'gasUsed', 'cumulativeGasUsed',
+                          'transactionIndex')
+
     def __init__(self, datadir, port=None, start_node=False):
         if not Client.node:
             Client.node = NodeProcess(datadir, start_node)
@@ -146,6 +158,122 @@ class Client(object):
         """
         return self.web3.eth.getTransactionReceipt(tx_hash)
 
+    def get_block_number_and_receipts(self, tx_hashes):
+        """
+        Returns the current block number and receipts of the given
+        transactions, fetched with batch requests.
+        :param tx_hashes: Transaction hashes
+        :return: (block number, list of receipts or None for transactions
+        which are not mined yet)
+        """
+        calls = [('eth_blockNumber', [])]
+        calls += [('eth_getTransactionReceipt', [h]) for h in tx_hashes]
+        results = self.batch_request(calls)
+        receipts = [self.__format_receipt(r) for r in results[1:]]
+        return int(results[0], 16), receipts
+
+    @staticmethod
+    def balance_request(account, block='latest'):
+        """
+        :return: batch_request call returning the balance of the given account
+        as a hex string
+        """
+        return 'eth_getBalance', [account, block]
+
+    @staticmethod
+    def call_request(_from=None, to=None, gas=90000, gas_price=3000,
+                     value=0, data=None, block='latest'):
+        """
+        :return: batch_request call executing a message call, see call
+        """
+        obj = {
+            'from': _from,
+            'to': to,
+            'gas': hex(gas),
+            'gasPrice': hex(gas_price),
+            'value': hex(value),
+            'data': data,
+        }
+        return 'eth_call', [obj, block]
+
+    def batch_request(self, calls):
+        """
+        Sends JSON-RPC calls to the node in batch requests of up to
+        BATCH_SIZE calls, each batch in a single round trip. Providers other
+        than HTTP and Unix socket IPC get the calls one by one.
+        :param calls: list of (method, params) tuples
+        :return: list of raw results in the order of calls
+        :raise ValueError: if any of the calls returned an error
+        """
+        results = []
+        for i in range(0, len(calls), self.BATCH_SIZE):
+            results += self.__batch_request(calls[i:i + self.BATCH_SIZE])
+        return results
+
+    def __batch_request(self, calls):
+        provider = self.web3.currentProvider
+        if isinstance(provider, HTTPProvider):
+            send = self.__send_http
+        elif isinstance(provider, IPCProvider) and hasattr(socket, 'AF_UNIX'):
+            send = self.__send_ipc
+        else:
+            manager = self.web3._requestManager
+            return [manager.request_blocking(method, params)
+                    for method, params in calls]
+
+        request = [{'jsonrpc': '2.0', 'method': method, 'params': params,
+                    'id': i} for i, (method, params) in enumerate(calls)]
+        responses = json.loads(send(provider, json.dumps(request).encode()))
+        if isinstance(responses, dict):
+            # The node could not parse the batch at all
+            raise ValueError(responses.get('error', responses))
+
+        results = [None] * len(calls)
+        for response in responses:
+            if 'error' in response:
+                raise ValueError(response['error'])
+            results[response['id']] = response.get('result')
+        return results
+
+    def __send_http(self, provider, data):
+        response = requests.post(provider.endpoint_uri, data=data,
+                                 headers={'Content-Type': 'application/json'},
+                                 timeout=self.BATCH_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+
+    def __send_ipc(self, provider, data):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.BATCH_TIMEOUT)
+            sock.connect(provider.ipc_path)
+            sock.sendall(data)
+            response = b''
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    raise ValueError("Ethereum node closed IPC connection")
+                response += chunk
+                # The node doesn't delimit responses; wait until it parses
+                try:
+                    text = response.decode()
+                    json.loads(text)
+                except ValueError:
+                    continue
+                return text
+        finally:
+            sock.close()
+
+    @classmethod
+    def __format_receipt(cls, receipt):
+        if not receipt:
+            return receipt
+        receipt = dict(receipt)
+        for field in cls.RECEIPT_INT_FIELDS:
+            if isinstance(receipt.get(field), str):
+                receipt[field] = int(receipt[field], 16)
+        return receipt
+
     def new_filter(self, from_block="latest", to_block="latest", address=None,
                    topics=None):
         """
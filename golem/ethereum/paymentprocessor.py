@@ -5,7 +5,7 @@ import sys
 import time
 from threading import Lock
 from time import sleep
-from typing import Any, List
+from typing import Any, Dict, List
 
 from ethereum import abi, utils, keys
 from ethereum.transactions import Transaction
@@ -90,6 +90,18 @@ class AbstractToken(object, metaclass=abc.ABCMeta):
             to='0x' + encode_hex(token_address),
             data='0x' + encode_hex(data),
             block='pending')
+        return self._balance_from_result(r)
+
+    def _balance_request(self, token_abi, token_address, addr: str):
+        data = token_abi.encode_function_call('balanceOf', [addr])
+        return self._client.call_request(
+            _from='0x' + encode_hex(addr),
+            to='0x' + encode_hex(token_address),
+            data='0x' + encode_hex(data),
+            block='pending')
+
+    @staticmethod
+    def _balance_from_result(r) -> int:
         if r is None:
             return None
         return 0 if r == '0x' else int(r, 16)
@@ -105,6 +117,18 @@ class AbstractToken(object, metaclass=abc.ABCMeta):
     def get_balance(self, addr: str) -> int:
         pass
 
+    @abc.abstractmethod
+    def get_balance_requests(self, addr: str) -> List[Any]:
+        """
+        Returns Client.batch_request calls for getting the token balance.
+        Their results are passed to balance_from_results.
+        """
+        pass
+
+    @abc.abstractmethod
+    def balance_from_results(self, results: List[Any]) -> int:
+        pass
+
     @abc.abstractmethod
     def batch_transfer(self,
                        privkey: bytes,
@@ -148,6 +172,14 @@ class GNTToken(AbstractToken):
             log.info("TestGNT: {}".format(balance / denoms.ether))
         return balance
 
+    def get_balance_requests(self, addr: str) -> List[Any]:
+        return [self._balance_request(self.__testGNT,
+                                      self.TESTGNT_ADDR,
+                                      decode_hex(addr))]
+
+    def balance_from_results(self, results: List[Any]) -> int:
+        return self._balance_from_result(results[0])
+
     def request_from_faucet(self, privkey: bytes) -> None:
         self._request_from_faucet(self.__testGNT, self.TESTGNT_ADDR, privkey)
 
@@ -228,6 +260,18 @@ class GNTWToken(AbstractToken):
             gntw_balance / denoms.ether))
         return gnt_balance + gntw_balance
 
+    def get_balance_requests(self, addr: str) -> List[Any]:
+        return [
+            self._balance_request(self.__gnt, self.TESTGNT_ADDRESS, addr),
+            self._balance_request(self.__gntw, self.GNTW_ADDRESS, addr),
+        ]
+
+    def balance_from_results(self, results: List[Any]) -> int:
+        balances = [self._balance_from_result(r) for r in results]
+        if None in balances:
+            return None
+        return sum(balances)
+
     def request_from_faucet(self, privkey: bytes) -> None:
         self._request_from_faucet(self.__faucet, self.FAUCET_ADDRESS, privkey)
 
@@ -344,6 +388,44 @@ class GNTWToken(AbstractToken):
         log.info("Process deposit tx: {}".format(encode_hex(tx.hash)))
 
 
+class PaymentBatchPolicy(object):
+    """
+    Decides which awaiting payments go out in the next batch transfer.
+    Every transfer pays the base transaction gas once, so payments are held
+    until the earliest of their deadlines and then sent together with all
+    other awaiting payments. A batch is sent before that once it is full
+    (max_count payments) or worth max_value, as waiting would not make it
+    any cheaper. Batches are limited to max_count payments to stay well
+    below the block gas limit; the most urgent payments go first.
+    """
+
+    # 100 payments: 26800 + 100 * 30000 gas
+    MAX_COUNT = 100
+    MAX_VALUE = 1000 * denoms.ether
+
+    def __init__(self, max_count=MAX_COUNT, max_value=MAX_VALUE) -> None:
+        self.max_count = max_count
+        self.max_value = max_value
+
+    def select(self,
+               payments: List[Payment],
+               deadlines: Dict[str, int],
+               due: bool) -> List[Payment]:
+        """
+        :param payments: awaiting payments
+        :param deadlines: deadlines of awaiting payments by subtask id
+        :param due: whether the earliest deadline has passed
+        :return: payments to send out now, possibly none
+        """
+        if not payments:
+            return []
+        if not due and len(payments) < self.max_count and \
+                sum(p.value for p in payments) < self.max_value:
+            return []
+        ordered = sorted(payments, key=lambda p: deadlines.get(p.subtask, 0))
+        return ordered[:self.max_count]
+
+
 class PaymentProcessor(LoopingCallService):
     # Default deadline in seconds for new payments.
     DEFAULT_DEADLINE = 10 * 60
@@ -370,8 +452,10 @@ class PaymentProcessor(LoopingCallService):
                  client: Client,
                  privkey,
                  faucet=False,
-                 token_factory=GNTToken) -> None:
+                 token_factory=GNTToken,
+                 batch_policy=None) -> None:
         self.__token = token_factory(client)
+        self.__batch_policy = batch_policy or PaymentBatchPolicy()
         self.__client = client
         self.__privkey = privkey
         self.__eth_balance = None
@@ -382,6 +466,8 @@ class PaymentProcessor(LoopingCallService):
         self.__gnt_update_ts = 0
         self._awaiting_lock = Lock()
         self._awaiting = []  # type: List[Any] # Awaiting individual payments
+        # Deadlines of awaiting payments by subtask id
+        self._deadlines = {}  # type: Dict[str, int]
         self._inprogress = {}  # type: Dict[Any,Any] # Sent transactions.
         self.__last_sync_check = time.time()
         self.__sync = False
@@ -550,6 +636,7 @@ class PaymentProcessor(LoopingCallService):
             self._awaiting.append(payment)
             # TODO: Optimize by checking the time once per service update.
             new_deadline = int(time.time()) + deadline
+            self._deadlines[payment.subtask] = new_deadline
             if new_deadline < self.deadline:
                 self.deadline = new_deadline
 
@@ -566,12 +653,16 @@ class PaymentProcessor(LoopingCallService):
                 return False
 
             now = int(time.time())
-            if self.deadline > now:
+            payments = self.__batch_policy.select(self._awaiting,
+                                                  self._deadlines,
+                                                  self.deadline <= now)
+            if not payments:
                 log.info("Next sendout in {} s".format(self.deadline - now))
                 return False
 
-            payments = self._awaiting
-            self._awaiting = []
+            sent = set(p.subtask for p in payments)
+            self._awaiting = [p for p in self._awaiting
+                              if p.subtask not in sent]
 
         tx = self.__token.batch_transfer(self.__privkey, payments)
         if not tx:
@@ -586,12 +677,12 @@ class PaymentProcessor(LoopingCallService):
         log.info("Batch payments: {:.6}, value: {:.6f}"
                  .format(encode_hex(h), value / denoms.ether))
 
-        # If awaiting payments are not empty it means a new payment has been
-        # added between clearing the awaiting list and here. In that case
-        # we shouldn't update the deadline to sys.maxsize.
+        # New payments might have been added since the batch was selected
         with self._awaiting_lock:
-            if not self._awaiting:
-                self.deadline = sys.maxsize
+            for payment in payments:
+                self._deadlines.pop(payment.subtask, None)
+            self.deadline = min(self._deadlines.values(),
+                                default=sys.maxsize)
 
         # Firstly write transaction hash to database. We need the hash to be
         # remembered before sending the transaction to the Ethereum node in
@@ -627,12 +718,14 @@ class PaymentProcessor(LoopingCallService):
 
         confirmed = []
         failed = {}
-        current_block = self.__client.get_block_number()
+        hashes = list(self._inprogress)
+        current_block, receipts = self.__client.get_block_number_and_receipts(
+            ['0x' + encode_hex(h) for h in hashes])
 
-        for h, payments in self._inprogress.items():
+        for h, receipt in zip(hashes, receipts):
+            payments = self._inprogress[h]
             hstr = '0x' + encode_hex(h)
             log.info("Checking {:.6} tx [{}]".format(hstr, len(payments)))
-            receipt = self.__client.get_transaction_receipt(hstr)
             if not receipt:
                 continue
 
@@ -694,16 +787,34 @@ class PaymentProcessor(LoopingCallService):
             for p in payments:
                 self.add(p)
 
-    def get_ether_from_faucet(self):
-        if self.__faucet and self.eth_balance(True) < 0.01 * denoms.ether:
+    def refresh_balances(self):
+        """ Updates ETH and GNT balances with a single batch request """
+        addr = self.eth_address(zpad=False)
+        token_requests = self.__token.get_balance_requests(addr)
+        try:
+            results = self.__client.batch_request(
+                [self.__client.balance_request(addr)] + token_requests)
+        except ValueError as e:
+            log.error("Ethereum RPC: {}".format(e))
+            results = [None] * (len(token_requests) + 1)
+
+        eth_balance = int(results[0], 16) if results[0] is not None else None
+        self._update_eth_balance(eth_balance)
+        self._update_gnt_balance(
+            self.__token.balance_from_results(results[1:]))
+
+    def get_ether_from_faucet(self, refresh=True):
+        if self.__faucet and \
+                self.eth_balance(refresh) < 0.01 * denoms.ether:
             log.info("Requesting tETH")
             addr = keys.privtoaddr(self.__privkey)
             tETH_faucet_donate(addr)
             return False
         return True
 
-    def get_gnt_from_faucet(self):
-        if self.__faucet and self.gnt_balance(True) < 100 * denoms.ether:
+    def get_gnt_from_faucet(self, refresh=True):
+        if self.__faucet and \
+                self.gnt_balance(refresh) < 100 * denoms.ether:
             log.info("Requesting GNT from faucet")
             self.__token.request_from_faucet(self.__privkey)
             return False
@@ -730,11 +841,16 @@ class PaymentProcessor(LoopingCallService):
         self._waiting_for_faucet = True
 
         try:
-            if self.is_synchronized() and \
-                    self.get_ether_from_faucet() and \
-                    self.get_gnt_from_faucet():
+            if not self.is_synchronized():
+                return
+            if self.__faucet:
+                self.refresh_balances()
+            if self.get_ether_from_faucet(False) and \
+                    self.get_gnt_from_faucet(False):
                 self.monitor_progress()
-                self.sendout()
+                # Send all batches which are due
+                while self.sendout():
+                    pass
         finally:
             self._waiting_for_faucet = False
 
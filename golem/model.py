@@ -31,6 +31,17 @@ class Database:
     # Database user schema version, bump to recreate the database
     SCHEMA_VERSION = 6
 
+    # Indexes added without bumping the schema version, created in place in
+    # existing databases: (index name, table, columns)
+    INDEXES = [
+        ('expectedincome_sender_node_subtask', 'expectedincome',
+         ('sender_node', 'subtask')),
+        ('expectedincome_modified_date', 'expectedincome',
+         ('modified_date',)),
+        ('networkmessage_task_subtask_msg_cls', 'networkmessage',
+         ('task', 'subtask', 'msg_cls')),
+    ]
+
     def __init__(self, datadir):
         # TODO: Global database is bad idea. Check peewee for other solutions.
         self.db = db
@@ -70,6 +81,14 @@ class Database:
             db.drop_tables(tables, safe=True)
             Database._set_user_version(Database.SCHEMA_VERSION)
         db.create_tables(tables, safe=True)
+        Database._create_indexes()
+
+    @staticmethod
+    def _create_indexes() -> None:
+        for name, table, columns in Database.INDEXES:
+            columns = ', '.join('"{}"'.format(c) for c in columns)
+            db.execute_sql('CREATE INDEX IF NOT EXISTS "{}" ON "{}" ({})'
+                           .format(name, table, columns))
 
     def close(self):
         if not self.db.is_closed():
@@ -246,6 +265,14 @@ class ExpectedIncome(BaseModel):
     subtask = CharField()
     value = BigIntegerField()
 
+    class Meta:
+        database = db
+        indexes = (
+            # matched against Income primary key
+            (('sender_node', 'subtask'), False),
+            (('modified_date',), False),
+        )
+
     def __repr__(self):
         return "<ExpectedIncome: {!r} v:{:.3f}>"\
             .format(self.subtask, self.value)
@@ -443,6 +470,12 @@ class NetworkMessage(BaseModel):
     msg_cls = CharField(null=False)
     msg_data = BlobField(null=False)
 
+    class Meta:
+        database = db
+        indexes = (
+            (('task', 'subtask', 'msg_cls'), False),
+        )
+
     def as_message(self) -> message.Message:
         msg = pickle.loads(self.msg_data)
         return msg
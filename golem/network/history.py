@@ -3,16 +3,17 @@ import logging
 import operator
 import queue
 import threading
+import time
 from abc import abstractmethod, ABC
 from functools import reduce, wraps
-from typing import List
+from typing import List, Tuple
 
 from golem_messages import message
 from peewee import (PeeweeException, DataError, ProgrammingError,
                     NotSupportedError, Field, IntegrityError)
 
 from golem.core.service import IService
-from golem.model import NetworkMessage, Actor
+from golem.model import NetworkMessage, Actor, db
 
 logger = logging.getLogger('golem.network.history')
 
@@ -24,8 +25,10 @@ class MessageNotFound(Exception):
 class MessageHistoryService(IService):
     """
     The purpose of this class is to:
-    - save NetworkMessages (in background)
-    - remove given NetworkMessages (in background)
+    - save NetworkMessages (in background, in batches of up to
+      MAX_BATCH_SIZE messages written in a single transaction)
+    - remove given NetworkMessages (in background, after saving the batch;
+      duplicate removals are merged)
     - sweep NetworkMessages past their MESSAGE_LIFETIME every ~ SWEEP_INTERVAL
       (in background)
     - retrieve, save and remove NetworkMessages in-place via *_sync methods
@@ -41,6 +44,11 @@ class MessageHistoryService(IService):
     MESSAGE_LIFETIME = datetime.timedelta(days=1)
     SWEEP_INTERVAL = datetime.timedelta(hours=12)
     QUEUE_TIMEOUT = datetime.timedelta(seconds=2).total_seconds()
+    # Messages saved in one transaction
+    MAX_BATCH_SIZE = 1000
+    # Rows per INSERT statement; SQLite limits the number of variables
+    # in a statement to 999
+    INSERT_ROWS = 64
 
     # Decorators (at the end of this file) need to access an instance
     # of MessageHistoryService
@@ -59,6 +67,11 @@ class MessageHistoryService(IService):
         self._remove_queue = queue.Queue()
         self._sweep_ts = datetime.datetime.now()
 
+        self._flushes = 0
+        self._flushed_messages = 0
+        self._last_flush_latency = 0.
+        self._max_flush_latency = 0.
+
     def run(self) -> None:
         """
         Thread activity method.
@@ -97,6 +110,21 @@ class MessageHistoryService(IService):
         while not self._save_queue.empty():
             self._loop()
 
+    @property
+    def metrics(self) -> dict:
+        """
+        Returns queue depths and statistics of saving queued messages;
+        latencies are in seconds.
+        """
+        return dict(
+            save_queue_depth=self._save_queue.qsize(),
+            remove_queue_depth=self._remove_queue.qsize(),
+            flushes=self._flushes,
+            flushed_messages=self._flushed_messages,
+            last_flush_latency=self._last_flush_latency,
+            max_flush_latency=self._max_flush_latency,
+        )
+
     @classmethod
     def get_sync(cls, task: str, **properties) -> List[NetworkMessage]:
         """
@@ -147,6 +175,46 @@ class MessageHistoryService(IService):
             logger.warning("Message '%s' save queued", msg_dict.get('msg_cls'))
             self._save_queue.put(msg_dict)
 
+    def add_many_sync(self, msg_dicts: List[dict]) -> None:
+        """
+        Saves messages in the database in a single transaction.
+        :param msg_dicts: Messages to save
+        """
+        if not msg_dicts:
+            return
+
+        fields = NetworkMessage._meta.fields
+        rows = [{k: v for k, v in msg_dict.items() if k in fields}
+                for msg_dict in msg_dicts]
+        started = time.monotonic()
+
+        try:
+            with db.atomic():
+                for i in range(0, len(rows), self.INSERT_ROWS):
+                    NetworkMessage.insert_many(rows[i:i + self.INSERT_ROWS]) \
+                        .execute()
+        except (DataError, ProgrammingError, NotSupportedError,
+                TypeError, IntegrityError) as exc:
+            # Unrecoverable error; save valid messages one by one
+            logger.warning("Cannot save %d messages at once: %r",
+                           len(msg_dicts), exc)
+            for msg_dict in msg_dicts:
+                self.add_sync(msg_dict)
+        except PeeweeException:
+            # Temporary error
+            logger.warning("Save of %d messages queued", len(msg_dicts))
+            for msg_dict in msg_dicts:
+                self._save_queue.put(msg_dict)
+            return
+
+        latency = time.monotonic() - started
+        self._flushes += 1
+        self._flushed_messages += len(msg_dicts)
+        self._last_flush_latency = latency
+        self._max_flush_latency = max(self._max_flush_latency, latency)
+        logger.debug("Saved %d messages in %.3f s (%d queued)",
+                     len(msg_dicts), latency, self._save_queue.qsize())
+
     def remove(self, task: str, **properties) -> None:
         """
         Appends task id to the removal queue. Has lower priority than adding
@@ -181,6 +249,31 @@ class MessageHistoryService(IService):
                            task, properties)
             self._remove_queue.put((task, properties))
 
+    def remove_many_sync(self, removals: List[Tuple[str, dict]]) -> None:
+        """
+        Removes messages in a single transaction
+        :param removals: (task id, NetworkMessage properties) tuples
+        :return: None
+        """
+        try:
+            with db.atomic():
+                for task, properties in removals:
+                    clauses = self.build_clauses(task=task, **properties)
+                    NetworkMessage.delete() \
+                        .where(reduce(operator.and_, clauses)) \
+                        .execute()
+        except (DataError, ProgrammingError, NotSupportedError,
+                TypeError, IntegrityError):
+            # Unrecoverable error; remove messages one by one
+            for task, properties in removals:
+                self.remove_sync(task, **properties)
+        except PeeweeException:
+            # Temporary error
+            logger.warning("Removal of %d task messages queued",
+                           len(removals))
+            for removal in removals:
+                self._remove_queue.put(removal)
+
     @staticmethod
     def build_clauses(**properties) -> List[bool]:
         """
@@ -203,7 +296,7 @@ class MessageHistoryService(IService):
         """
         Main service loop.
         - calls _sweep every SWEEP_INTERVAL
-        - saves queued (1) messages to database (FIFO)
+        - saves queued (1) messages to database (FIFO), up to MAX_BATCH_SIZE
         - removes queued (2) messages from database
         """
 
@@ -214,21 +307,40 @@ class MessageHistoryService(IService):
             self._sweep()
             self._sweep_ts = now + self.SWEEP_INTERVAL
 
-        # Remove messages
-        try:
-            task, parameters = self._remove_queue.get(False)
-        except queue.Empty:
-            pass
-        else:
-            self.remove_sync(task, **parameters)
-
         # Save messages
+        msg_dicts = []
         try:
-            msg_dict = self._save_queue.get(True, self._queue_timeout)
+            msg_dicts.append(self._save_queue.get(True, self._queue_timeout))
+            while len(msg_dicts) < self.MAX_BATCH_SIZE:
+                msg_dicts.append(self._save_queue.get(False))
         except queue.Empty:
             pass
-        else:
-            self.add_sync(msg_dict)
+        if msg_dicts:
+            self.add_many_sync(msg_dicts)
+
+        # Remove messages
+        removals = self._get_removals()
+        if removals:
+            self.remove_many_sync(removals)
+
+    def _get_removals(self) -> List[Tuple[str, dict]]:
+        """
+        Returns queued removals without duplicates and without removals
+        of some of task's messages when all of them are removed.
+        """
+        removals = dict()
+        while True:
+            try:
+                task, properties = self._remove_queue.get(False)
+            except queue.Empty:
+                break
+            removals[(task, tuple(sorted(properties.items())))] = \
+                (task, properties)
+
+        all_removed = {task for task, properties in removals.values()
+                       if not properties}
+        return [(task, properties) for task, properties in removals.values()
+                if not properties or task not in all_removed]
 
     def _sweep(self) -> None:
         """
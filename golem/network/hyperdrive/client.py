@@ -1,10 +1,17 @@
 import collections
 import json
 import logging
+from io import BytesIO
 from ipaddress import AddressValueError, ip_address
+from threading import Lock
 
 import requests
 from requests import HTTPError
+from twisted.internet import defer
+from twisted.internet.error import ConnectError, TimeoutError
+from twisted.web.client import Agent, FileBodyProducer, HTTPConnectionPool, \
+    ResponseFailed, readBody
+from twisted.web.http_headers import Headers
 
 from golem.resource.client import IClient, ClientOptions
 
@@ -12,10 +19,29 @@ log = logging.getLogger(__name__)
 
 
 class HyperdriveClient(IClient):
+    """ Hyperdrive daemon API client.
+
+    Blocking requests share a keep-alive connection pool per daemon address.
+    Methods with an _async suffix return Deferreds and use a persistent
+    Twisted connection pool; they must be called from the reactor thread.
+    Multiple upload / download commands can be sent in a single request with
+    batch / batch_async.
+    """
 
     CLIENT_ID = 'hyperg'
     VERSION = 1.1
 
+    # max. number of connections kept open to a single daemon
+    POOL_SIZE = 16
+    # HTTP status codes returned by daemons without the 'batch' command
+    BATCH_UNSUPPORTED_CODES = (400, 404, 405, 501)
+
+    _sessions = dict()
+    _sessions_lock = Lock()
+    _async_pool = None
+    _async_semaphore = None
+    _batch_unsupported = set()
+
     def __init__(self, port=3292, host='localhost', timeout=None):
         super(HyperdriveClient, self).__init__()
 
@@ -51,23 +77,66 @@ class HyperdriveClient(IClient):
         return addresses
 
     def add(self, files, client_options=None, **kwargs):
-        response = self._request(
-            command='upload',
-            id=kwargs.get('id'),
-            files=files
-        )
+        response = self._request(**self.upload_command(
+            files=files, id=kwargs.get('id')))
         return response['hash']
 
+    def add_async(self, files, client_options=None, **kwargs):
+        deferred = self._request_async(**self.upload_command(
+            files=files, id=kwargs.get('id')))
+        return deferred.addCallback(lambda response: response['hash'])
+
     def restore(self, multihash, **kwargs):
-        response = self._request(
-            command='upload',
-            id=kwargs.get('id'),
-            hash=multihash
-        )
+        response = self._request(**self.upload_command(
+            multihash=multihash, id=kwargs.get('id')))
         return response['hash']
 
+    def restore_async(self, multihash, **kwargs):
+        deferred = self._request_async(**self.upload_command(
+            multihash=multihash, id=kwargs.get('id')))
+        return deferred.addCallback(lambda response: response['hash'])
+
     def get_file(self, multihash, client_options=None, **kwargs):
         filepath = kwargs.pop('filepath')
+        response = self._request(**self.download_command(
+            multihash, filepath, client_options))
+        return [(filepath, multihash, response['files'])]
+
+    def get_file_async(self, multihash, client_options=None, **kwargs):
+        filepath = kwargs.pop('filepath')
+        deferred = self._request_async(**self.download_command(
+            multihash, filepath, client_options))
+        return deferred.addCallback(
+            lambda response: [(filepath, multihash, response['files'])])
+
+    def pin_add(self, file_path, multihash):
+        response = self._request(**self.upload_command(
+            files=[file_path], multihash=multihash))
+        return response['hash']
+
+    def pin_add_async(self, file_path, multihash):
+        deferred = self._request_async(**self.upload_command(
+            files=[file_path], multihash=multihash))
+        return deferred.addCallback(lambda response: response['hash'])
+
+    def pin_rm(self, multihash):
+        response = self._request(**self.cancel_command(multihash))
+        return response['hash']
+
+    def pin_rm_async(self, multihash):
+        deferred = self._request_async(**self.cancel_command(multihash))
+        return deferred.addCallback(lambda response: response['hash'])
+
+    @staticmethod
+    def upload_command(files=None, multihash=None, **kwargs):
+        command = dict(command='upload', **kwargs)
+        if files is not None:
+            command['files'] = files
+        if multihash is not None:
+            command['hash'] = multihash
+        return command
+
+    def download_command(self, multihash, filepath, client_options=None):
         peers = None
 
         if client_options:
@@ -76,34 +145,101 @@ class HyperdriveClient(IClient):
             if filtered_options:
                 peers = filtered_options.options.get('peers')
 
-        response = self._request(
-            command='download',
-            hash=multihash,
-            dest=filepath,
-            peers=peers
-        )
-        return [(filepath, multihash, response['files'])]
+        return dict(command='download', hash=multihash, dest=filepath,
+                    peers=peers)
 
-    def pin_add(self, file_path, multihash):
-        response = self._request(
-            command='upload',
-            files=[file_path],
-            hash=multihash
-        )
-        return response['hash']
+    @staticmethod
+    def cancel_command(multihash):
+        return dict(command='cancel', hash=multihash)
 
-    def pin_rm(self, multihash):
-        response = self._request(
-            command='cancel',
-            hash=multihash
-        )
-        return response['hash']
+    def batch(self, commands):
+        """ Execute multiple commands in a single request. Commands are sent
+        one by one if the daemon does not support batching.
+        :param list commands: command dicts, e.g. built with upload_command
+        :return list: responses in the order of commands
+        """
+        if self._url not in self._batch_unsupported:
+            try:
+                response = self._request(command='batch', commands=commands)
+                return response['responses']
+            except HTTPError as exc:
+                if not self._is_batch_unsupported(exc.response):
+                    raise
+                self._set_batch_unsupported()
+
+        return [self._request(**command) for command in commands]
+
+    def batch_async(self, commands):
+        """ Non-blocking version of batch. If the daemon does not support
+        batching, commands are sent concurrently over the connection pool.
+        :param list commands: command dicts, e.g. built with upload_command
+        :return Deferred: fired with responses in the order of commands
+        """
+        def send_separately():
+            return defer.gatherResults([
+                self._request_async(**command) for command in commands
+            ], consumeErrors=True).addErrback(lambda f: f.value.subFailure)
+
+        def batch_failed(failure):
+            failure.trap(HTTPError)
+            if not self._is_batch_unsupported(failure.value.response):
+                return failure
+            self._set_batch_unsupported()
+            return send_separately()
+
+        if self._url in self._batch_unsupported:
+            return send_separately()
+
+        deferred = self._request_async(command='batch', commands=commands)
+        deferred.addCallbacks(lambda response: response['responses'],
+                              batch_failed)
+        return deferred
+
+    def _is_batch_unsupported(self, response):
+        return getattr(response, 'status_code', None) in \
+            self.BATCH_UNSUPPORTED_CODES
+
+    def _set_batch_unsupported(self):
+        log.debug('Hyperdrive: command batching is not supported by %s',
+                  self._url)
+        self._batch_unsupported.add(self._url)
+
+    @property
+    def _session(self):
+        with self._sessions_lock:
+            session = self._sessions.get(self._url)
+            if session is None:
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.POOL_SIZE)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                self._sessions[self._url] = session
+            return session
+
+    @classmethod
+    def _agent(cls):
+        from twisted.internet import reactor
+
+        if cls._async_pool is None:
+            pool = HTTPConnectionPool(reactor, persistent=True)
+            pool.maxPersistentPerHost = cls.POOL_SIZE
+            HyperdriveClient._async_pool = pool
+        return Agent(reactor, pool=cls._async_pool)
+
+    @classmethod
+    def _semaphore(cls):
+        # limits the number of concurrent async requests, so that they can be
+        # served by connections kept in the pool
+        if cls._async_semaphore is None:
+            semaphore = defer.DeferredSemaphore(cls.POOL_SIZE)
+            HyperdriveClient._async_semaphore = semaphore
+        return cls._async_semaphore
 
     def _request(self, **data):
-        response = requests.post(url=self._url,
-                                 headers=self._headers,
-                                 data=json.dumps(data),
-                                 timeout=self.timeout)
+        response = self._session.post(url=self._url,
+                                      headers=self._headers,
+                                      data=json.dumps(data),
+                                      timeout=self.timeout)
 
         try:
             response.raise_for_status()
@@ -116,6 +252,56 @@ class HyperdriveClient(IClient):
         if response.content:
             return json.loads(response.content.decode('utf-8'))
 
+    def _request_async(self, **data):
+        return self._semaphore().run(self._send_async, data)
+
+    def _send_async(self, data):
+        body = FileBodyProducer(BytesIO(json.dumps(data).encode('utf-8')))
+        headers = Headers({k.encode(): [v.encode()]
+                           for k, v in self._headers.items()})
+
+        deferred = self._agent().request(b'POST', self._url.encode(),
+                                         headers, body)
+        if self.timeout:
+            from twisted.internet import reactor
+            deferred.addTimeout(self.timeout, reactor)
+
+        deferred.addCallbacks(self._read_response, self._request_failed)
+        return deferred
+
+    @classmethod
+    def _read_response(cls, response):
+        deferred = readBody(response)
+        deferred.addCallback(cls._parse_response, response.code)
+        return deferred
+
+    @staticmethod
+    def _parse_response(content, status_code):
+        if status_code >= 400:
+            text = content.decode('utf-8', 'replace')
+            raise HTTPError('Hyperdrive HTTP {} error: {}'.format(
+                status_code, text), response=AsyncResponse(status_code, text))
+        if content:
+            return json.loads(content.decode('utf-8'))
+
+    @staticmethod
+    def _request_failed(failure):
+        # Translate Twisted connection errors, so that they are retried by
+        # resource managers the same way as errors raised by requests
+        if failure.check(ConnectError, ResponseFailed, TimeoutError,
+                         defer.TimeoutError):
+            raise requests.exceptions.ConnectionError(
+                'Hyperdrive connection error: {}'.format(failure.value))
+        return failure
+
+
+class AsyncResponse(object):
+    """ Minimal response object attached to errors raised by async requests """
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
 
 class HyperdriveClientOptions(ClientOptions):
 
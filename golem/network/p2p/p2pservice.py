@@ -649,11 +649,19 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):
 
     # TASK FUNCTIONS
     ############################
-    def get_tasks_headers(self):
+    def get_tasks_headers(self, task_ids=None):
         """ Return a list of a known tasks headers
+        :param list task_ids: if given, only headers of these tasks are
+                              returned
         :return list: list of task header
         """
-        return self.task_server.get_tasks_headers()
+        return self.task_server.get_tasks_headers(task_ids)
+
+    def get_tasks_digests(self):
+        """ Return digests of known tasks headers
+        :return dict: task_id -> header digest
+        """
+        return self.task_server.get_tasks_digests()
 
     def add_task_header(self, th_dict_repr):
         """ Add new task header to a list of known task headers
@@ -7,11 +7,16 @@ import random
 
 from golem.appconfig import SEND_PEERS_NUM
 from golem.core import variables
+from golem.network.p2p import taskgossip
 from golem.network.transport.session import BasicSafeSession
 from golem.network.transport.tcpnetwork import SafeProtocol
 
 logger = logging.getLogger(__name__)
 
+# Key of the Hello metadata entry which announces that the node supports
+# task header gossip with set summaries, see golem.network.p2p.taskgossip
+TASK_DIGESTS_KEY = 'task_digests'
+
 
 def compare_version(client_ver):
     try:
@@ -165,8 +170,20 @@ class PeerSession(BasicSafeSession):
         self.send(message.GetPeers())
 
     def send_get_tasks(self):
-        """  Send get tasks message """
-        self.send(message.GetTasks())
+        """  Send get tasks message. Peers which support task digests
+        are sent a summary of known task headers instead, see
+        golem.network.p2p.taskgossip """
+        if self.supports_task_digests:
+            digests = self.p2p_service.get_tasks_digests()
+            self.send(taskgossip.GetTaskDigests(
+                summary=taskgossip.summarize(digests)))
+        else:
+            self.send(message.GetTasks())
+
+    @property
+    def supports_task_digests(self):
+        return isinstance(self.metadata, dict) \
+            and bool(self.metadata.get(TASK_DIGESTS_KEY))
 
     def send_remove_task(self, task_id):
         """  Send remove task  message
@@ -318,7 +335,9 @@ class PeerSession(BasicSafeSession):
             self.p2p_service.try_to_add_peer(pi)
 
     def _react_to_get_tasks(self, msg):
-        tasks = self.p2p_service.get_tasks_headers()
+        self._send_tasks(self.p2p_service.get_tasks_headers())
+
+    def _send_tasks(self, tasks):
         if not tasks:
             return
         if len(tasks) > variables.TASK_HEADERS_LIMIT:
@@ -334,6 +353,26 @@ class PeerSession(BasicSafeSession):
                     message.Disconnect.REASON.BadProtocol
                 )
 
+    def _react_to_get_task_digests(self, msg):
+        digests = taskgossip.differing_digests(
+            self.p2p_service.get_tasks_digests(), msg.summary)
+        if digests:
+            self.send(taskgossip.TaskDigests(digests=digests))
+
+    def _react_to_task_digests(self, msg):
+        if not isinstance(msg.digests, dict):
+            return
+        task_ids = taskgossip.wanted_task_ids(
+            self.p2p_service.get_tasks_digests(), msg.digests)
+        if task_ids:
+            self.send(taskgossip.GetTaskHeaders(task_ids=task_ids))
+
+    def _react_to_get_task_headers(self, msg):
+        if not isinstance(msg.task_ids, list):
+            return
+        task_ids = [t for t in msg.task_ids if isinstance(t, str)]
+        self._send_tasks(self.p2p_service.get_tasks_headers(task_ids))
+
     def _react_to_remove_task(self, msg):
         self.p2p_service.remove_task_header(msg.task_id)
 
@@ -430,12 +469,17 @@ class PeerSession(BasicSafeSession):
             node_info=self.p2p_service.node,
             client_ver=variables.APP_VERSION,
             rand_val=self.rand_val,
-            metadata=self.p2p_service.metadata_manager.get_metadata(),
+            metadata=self.__get_metadata(),
             solve_challenge=self.solve_challenge,
             **challenge_kwargs
         )
         self.send(msg, send_unverified=True)
 
+    def __get_metadata(self):
+        metadata = dict(self.p2p_service.metadata_manager.get_metadata() or {})
+        metadata[TASK_DIGESTS_KEY] = True
+        return metadata
+
     def __send_ping(self):
         self.send(message.Ping())
 
@@ -510,6 +554,9 @@ class PeerSession(BasicSafeSession):
             message.GetTasks.TYPE: self._react_to_get_tasks,
             message.Tasks.TYPE: self._react_to_tasks,
             message.RemoveTask.TYPE: self._react_to_remove_task,
+            taskgossip.GetTaskDigests.TYPE: self._react_to_get_task_digests,
+            taskgossip.TaskDigests.TYPE: self._react_to_task_digests,
+            taskgossip.GetTaskHeaders.TYPE: self._react_to_get_task_headers,
             message.FindNode.TYPE: self._react_to_find_node,
             message.RandVal.TYPE: self._react_to_rand_val,
             message.WantToStartTaskSession.TYPE: self._react_to_want_to_start_task_session,  # noqa
@@ -0,0 +1,124 @@
+""" Task header gossip with set summaries.
+
+A node asks a peer for task headers with GetTaskDigests carrying a summary
+of the headers it knows: task ids and header digests (see
+compute_header_digest) are split into SUMMARY_BUCKETS buckets by task id and
+each bucket is represented by a short hash of its entries. The peer compares
+the summary with its own and answers with TaskDigests, {task_id: digest} of
+its headers in buckets whose hashes differ. The node then asks only for the
+headers that are missing or changed on its side with GetTaskHeaders; they
+are sent in a Tasks message.
+
+When both nodes know the same headers, a round costs a summary of a fixed
+size, independent of the number of headers.
+"""
+import hashlib
+
+from golem_messages import message
+
+SUMMARY_BUCKETS = 64
+# summaries with more buckets are ignored
+MAX_SUMMARY_BUCKETS = 1024
+BUCKET_HASH_LEN = 8
+
+# golem_messages uses 1000-1099 for P2P messages
+TASK_GOSSIP_MESSAGE_BASE = 1100
+
+
+class GetTaskDigests(message.Message):
+    """ Request for digests of task headers in buckets whose hashes
+    differ from the given summary """
+    TYPE = TASK_GOSSIP_MESSAGE_BASE + 1
+
+    __slots__ = ['summary'] + message.Message.__slots__
+
+    def __init__(self, summary=None, **kwargs):
+        """
+        :param list summary: bucket hashes, see summarize
+        """
+        self.summary = summary or []
+        super().__init__(**kwargs)
+
+
+class TaskDigests(message.Message):
+    """ Answer to GetTaskDigests """
+    TYPE = TASK_GOSSIP_MESSAGE_BASE + 2
+
+    __slots__ = ['digests'] + message.Message.__slots__
+
+    def __init__(self, digests=None, **kwargs):
+        """
+        :param dict digests: task_id -> header digest
+        """
+        self.digests = digests or {}
+        super().__init__(**kwargs)
+
+
+class GetTaskHeaders(message.Message):
+    """ Request for task headers with the given ids, answered with Tasks """
+    TYPE = TASK_GOSSIP_MESSAGE_BASE + 3
+
+    __slots__ = ['task_ids'] + message.Message.__slots__
+
+    def __init__(self, task_ids=None, **kwargs):
+        self.task_ids = task_ids or []
+        super().__init__(**kwargs)
+
+
+for _cls in (GetTaskDigests, TaskDigests, GetTaskHeaders):
+    message.registered_message_types[_cls.TYPE] = _cls
+
+
+def _bucket(task_id, buckets):
+    task_hash = hashlib.sha256(task_id.encode('utf-8')).digest()
+    return int.from_bytes(task_hash[:4], 'big') % buckets
+
+
+def _buckets(digests, buckets):
+    entries = [[] for _ in range(buckets)]
+    for task_id, digest in digests.items():
+        entries[_bucket(task_id, buckets)].append((task_id, digest))
+    return entries
+
+
+def summarize(digests, buckets=SUMMARY_BUCKETS):
+    """ Summary of a set of task headers
+    :param dict digests: task_id -> header digest
+    :return list: hash of entries of each bucket, empty for empty buckets
+    """
+    summary = []
+    for entries in _buckets(digests, buckets):
+        if not entries:
+            summary.append(b'')
+            continue
+        bucket_hash = hashlib.sha256()
+        for task_id, digest in sorted(entries):
+            bucket_hash.update('{}:{};'.format(task_id, digest).encode())
+        summary.append(bucket_hash.digest()[:BUCKET_HASH_LEN])
+    return summary
+
+
+def differing_digests(digests, summary):
+    """ Entries of digests in buckets whose hashes differ from summary
+    :param dict digests: task_id -> header digest
+    :param list summary: summary of a peer
+    :return dict: task_id -> header digest, empty if summary is malformed
+    """
+    if not isinstance(summary, list) \
+            or not 0 < len(summary) <= MAX_SUMMARY_BUCKETS:
+        return {}
+    own = summarize(digests, len(summary))
+    differing = {i for i, bucket_hash in enumerate(own)
+                 if bucket_hash != summary[i]}
+    return {task_id: digest for task_id, digest in digests.items()
+            if _bucket(task_id, len(summary)) in differing}
+
+
+def wanted_task_ids(digests, peer_digests):
+    """ Ids of task headers which are missing or changed in digests
+    :param dict digests: task_id -> header digest of known headers
+    :param dict peer_digests: task_id -> header digest of peer's headers
+    :return list:
+    """
+    return [task_id for task_id, digest in peer_digests.items()
+            if digests.get(task_id) != digest]
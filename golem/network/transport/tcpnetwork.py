@@ -8,7 +8,7 @@ from threading import Lock
 
 import golem_messages
 from golem.core.hostaddress import get_host_addresses
-from twisted.internet.defer import maybeDeferred
+from twisted.internet.defer import Deferred, maybeDeferred
 from twisted.internet.endpoints import TCP4ServerEndpoint, TCP4ClientEndpoint, \
     TCP6ServerEndpoint, TCP6ClientEndpoint
 from twisted.internet.interfaces import IPullProducer
@@ -25,6 +25,7 @@ from .network import Network, SessionProtocol, IncomingProtocolFactoryWrapper, \
 logger = logging.getLogger(__name__)
 
 MAX_MESSAGE_SIZE = 2 * 1024 * 1024
+CONNECT_STAGGER = 0.3  # seconds between consecutive connection attempts
 
 ##########################
 # Network helper classes #
@@ -219,13 +220,102 @@ class TCPConnectInfo(object):
 ###############
 
 
+class AddressRace(object):
+    """ Connect to the first of given addresses that accepts a connection
+    ("happy eyeballs"). Attempts are started stagger seconds apart or as soon
+    as the previous attempt fails, so an unreachable address doesn't hold up
+    the others for a whole connection timeout. The first established
+    connection wins, pending attempts are cancelled and connections
+    established later are closed.
+    """
+
+    def __init__(self, reactor, addresses, connect, stagger=CONNECT_STAGGER):
+        """
+        :param reactor: reactor used to schedule next attempts
+        :param list addresses: SocketAddresses in order of preference
+        :param fun connect: function that takes a SocketAddress and returns
+                            a Deferred firing with a connected protocol
+        :param float stagger: delay before starting next attempt
+        """
+        self.reactor = reactor
+        self.addresses = list(addresses)
+        self.connect = connect
+        self.stagger = stagger
+        self.deferred = Deferred()
+        self.finished = False
+        self._next = 0
+        self._attempts = set()
+        self._delayed_call = None
+
+    def start(self):
+        """ Start connecting
+        :return Deferred: fires with a connected protocol or with the failure
+                          of the last attempt if every attempt fails
+        """
+        self._start_next()
+        return self.deferred
+
+    def _start_next(self):
+        self._cancel_delayed_call()
+        if self.finished or self._next >= len(self.addresses):
+            return
+
+        address = self.addresses[self._next]
+        self._next += 1
+        defer = maybeDeferred(self.connect, address)
+        self._attempts.add(defer)
+        defer.addCallbacks(self._established, self._failed,
+                           callbackArgs=(defer, address),
+                           errbackArgs=(defer, address))
+
+        if not self.finished and self._delayed_call is None \
+                and self._next < len(self.addresses):
+            self._delayed_call = self.reactor.callLater(self.stagger,
+                                                        self._start_next)
+
+    def _established(self, conn, defer, address):
+        self._attempts.discard(defer)
+        if self.finished:
+            logger.debug("Closing redundant connection to %r", address)
+            conn.transport.loseConnection()
+            return
+        self._finish()
+        self.deferred.callback(conn)
+
+    def _failed(self, failure, defer, address):
+        self._attempts.discard(defer)
+        if self.finished:
+            return
+        logger.debug("Can't connect to %r: %s", address,
+                     failure.getErrorMessage())
+        if self._next < len(self.addresses):
+            self._start_next()
+        elif not self._attempts:
+            self._finish()
+            self.deferred.errback(failure)
+
+    def _finish(self):
+        self.finished = True
+        self._cancel_delayed_call()
+        for defer in list(self._attempts):
+            defer.cancel()
+
+    def _cancel_delayed_call(self):
+        if self._delayed_call and self._delayed_call.active():
+            self._delayed_call.cancel()
+        self._delayed_call = None
+
+
 class TCPNetwork(Network):
-    def __init__(self, protocol_factory, use_ipv6=False, timeout=5):
+    def __init__(self, protocol_factory, use_ipv6=False, timeout=5,
+                 connect_stagger=CONNECT_STAGGER):
         """
         TCP network information
         :param ProtocolFactory protocol_factory: Protocols should be at least ServerProtocol implementation
         :param bool use_ipv6: *Default: False* should network use IPv6 server endpoint?
         :param int timeout: *Default: 5*
+        :param float connect_stagger: delay between starting connection
+                                      attempts to consecutive addresses
         :return None:
         """
         from twisted.internet import reactor
@@ -236,6 +326,7 @@ class TCPNetwork(Network):
             protocol_factory)
         self.use_ipv6 = use_ipv6
         self.timeout = timeout
+        self.connect_stagger = connect_stagger
         self.active_listeners = {}
         self.host_addresses = get_host_addresses()
 
@@ -304,18 +395,15 @@ class TCPNetwork(Network):
             TCPNetwork.__call_failure_callback(failure_callback, **kwargs)
             return
 
-        address = addresses[0].address
-        port = addresses[0].port
+        race = AddressRace(self.reactor, addresses, self.__try_to_connect_to_address, self.connect_stagger)
+        defer = race.start()
 
-        self.__try_to_connect_to_address(address, port,
-                                         self.__connection_to_address_established,
-                                         self.__connection_to_address_failure,
-                                         addresses_to_arg=addresses,
-                                         established_callback_to_arg=established_callback,
-                                         failure_callback_to_arg=failure_callback,
-                                         **kwargs)
+        defer.addCallback(self.__connection_established, established_callback, **kwargs)
+        defer.addErrback(self.__connection_failure, failure_callback, **kwargs)
 
-    def __try_to_connect_to_address(self, address, port, established_callback, failure_callback, **kwargs):
+    def __try_to_connect_to_address(self, socket_address):
+        address = socket_address.address
+        port = socket_address.port
         logger.debug("Connection to host {}: {}".format(address, port))
 
         use_ipv6 = False
@@ -329,10 +417,7 @@ class TCPNetwork(Network):
         else:
             endpoint = TCP4ClientEndpoint(self.reactor, address, port, self.timeout)
 
-        defer = endpoint.connect(self.outgoing_protocol_factory)
-
-        defer.addCallback(self.__connection_established, established_callback, **kwargs)
-        defer.addErrback(self.__connection_failure, failure_callback, **kwargs)
+        return endpoint.connect(self.outgoing_protocol_factory)
 
     def __connection_established(self, conn, established_callback, **kwargs):
         pp = conn.transport.getPeer()
@@ -343,21 +428,6 @@ class TCPNetwork(Network):
         logger.debug("Connection failure. {}".format(err_desc))
         TCPNetwork.__call_failure_callback(failure_callback, **kwargs)
 
-    def __connection_to_address_established(self, conn, **kwargs):
-        established_callback = kwargs.pop("established_callback_to_arg", None)
-        kwargs.pop("failure_callback_to_arg", None)
-        kwargs.pop("addresses_to_arg", None)
-        TCPNetwork.__call_established_callback(established_callback, conn, **kwargs)
-
-    def __connection_to_address_failure(self, **kwargs):
-        established_callback = kwargs.pop("established_callback_to_arg", None)
-        failure_callback = kwargs.pop("failure_callback_to_arg", None)
-        addresses = kwargs.pop("addresses_to_arg", [])
-        if len(addresses) > 1:
-            self.__try_to_connect_to_addresses(addresses[1:], established_callback, failure_callback, **kwargs)
-        else:
-            TCPNetwork.__call_failure_callback(failure_callback, **kwargs)
-
     def __try_to_listen_on_port(self, port, max_port, established_callback, failure_callback, **kwargs):
         if self.use_ipv6:
             ep = TCP6ServerEndpoint(self.reactor, port)
@@ -3,7 +3,7 @@ import uuid
 import time
 
 from golem.network.stun.pystun import FullCone, OpenInternet
-from collections import deque
+from collections import deque, OrderedDict
 
 from golem.core.hostaddress import ip_address_private, ip_network_contains, ipv4_networks
 from golem.core.variables import LISTEN_WAIT_TIME, LISTENING_REFRESH_TIME, LISTEN_PORT_TTL
@@ -91,6 +91,8 @@ class PendingConnectionsServer(TCPServer):
     """ TCP Server that keeps a list of pending connections and tries different methods
     if connection attempt is unsuccessful."""
 
+    MAX_PREFERRED_ADDRESSES = 1000
+
     def __init__(self, config_desc, network):
         """ Create new server
         :param ClientConfigDescriptor config_desc: config descriptor for listening port
@@ -102,6 +104,7 @@ class PendingConnectionsServer(TCPServer):
         self.conn_established_for_type = {}  # Reactions for established connections of certain types
         self.conn_failure_for_type = {}  # Reactions for failed connection attempts of certain types
         self.conn_final_failure_for_type = {}  # Reactions for final connection attempts failure
+        self.preferred_addresses = OrderedDict()  # Addresses that worked last time for node key ids
 
         # Pending listenings
         self.pending_listenings = deque([])  # Ports that should be open for listenings
@@ -150,14 +153,14 @@ class PendingConnectionsServer(TCPServer):
             return
 
         logger.debug('_add_pending_request(%r, %r, %r, %r, %r)', req_type, task_owner, port, key_id, args)
-        # FIXME key_id is ignored
         sockets = [sock for sock in
                    self.get_socket_addresses(task_owner, port, key_id) if
                    self._is_address_accessible(sock)]
 
         pc = PendingConnection(req_type, sockets,
                                self.conn_established_for_type[req_type],
-                               self.conn_failure_for_type[req_type], args)
+                               self.conn_failure_for_type[req_type], args,
+                               key_id=key_id)
 
         self.pending_connections[pc.id] = pc
 
@@ -229,12 +232,25 @@ class PendingConnectionsServer(TCPServer):
 
     def get_socket_addresses(self, node_info, port, key_id):
         socket_addresses = [SocketAddress(i, port) for i in node_info.prv_addresses]
-        if node_info.pub_addr is None:
+        if node_info.pub_addr is not None:
+            if node_info.pub_port:
+                port = node_info.pub_port
+            socket_addresses.append(SocketAddress(node_info.pub_addr, port))
+        return self._prefer_address(socket_addresses, key_id)
+
+    def _prefer_address(self, socket_addresses, key_id):
+        """ Move the address that the last connection with given node
+        was established to at the beginning of the list """
+        preferred = self.preferred_addresses.get(key_id)
+        if preferred is None or preferred not in socket_addresses:
             return socket_addresses
-        if node_info.pub_port:
-            port = node_info.pub_port
-        socket_addresses.append(SocketAddress(node_info.pub_addr, port))
-        return socket_addresses
+        return [preferred] + [sa for sa in socket_addresses if sa != preferred]
+
+    def _remember_address(self, key_id, socket_address):
+        self.preferred_addresses.pop(key_id, None)
+        self.preferred_addresses[key_id] = socket_address
+        while len(self.preferred_addresses) > self.MAX_PREFERRED_ADDRESSES:
+            self.preferred_addresses.popitem(last=False)
 
     def sync_network(self, timeout=1.0):
         for session in frozenset(self.pending_sessions):
@@ -266,6 +282,8 @@ class PendingConnectionsServer(TCPServer):
             if ad in pc.socket_addresses:
                 pc.socket_addresses.remove(ad)
             pc.socket_addresses = [ad] + pc.socket_addresses
+            if pc.key_id:
+                self._remember_address(pc.key_id, ad)
 
 
 class PenConnStatus(object):
@@ -281,13 +299,14 @@ class PendingConnection(object):
     """ Describe pending connections parameters for PendingConnectionsServer  """
     connect_statuses = [PenConnStatus.Inactive, PenConnStatus.Failure]
 
-    def __init__(self, type_, socket_addresses, established=None, failure=None, args=None):
+    def __init__(self, type_, socket_addresses, established=None, failure=None, args=None, key_id=None):
         """ Create new pending connection
         :param int type_: connection type that allows to select proper reactions
         :param list socket_addresses: list of socket_addresses that the node should try to connect to
         :param func|None established: established connection callback
         :param func|None failure: connection errback
         :param dict args: arguments that should be passed to established or failure function
+        :param str|None key_id: key id of the node that the connection is made to
         """
         self.id = str(uuid.uuid4())
         self.socket_addresses = socket_addresses
@@ -296,6 +315,7 @@ class PendingConnection(object):
         self.failure = failure
         self.args = args
         self.type = type_
+        self.key_id = key_id
         self.status = PenConnStatus.Inactive
 
 
@@ -4,98 +4,64 @@ import logging
 from peewee import IntegrityError
 
 from golem.model import LocalRank, GlobalRank, NeighbourLocRank, db
+from golem.ranking.manager.rank_cache import LocalRankCache
 
 logger = logging.getLogger(__name__)
 
+# Local ranks are read from and written to memory while loaded,
+# see LocalRankService
+local_ranks = LocalRankCache()
 
-def increase_positive_computed(node_id, trust_mod):
+
+def _increase(node_id, field_name, trust_mod):
+    if local_ranks.loaded:
+        local_ranks.increase(node_id, field_name, trust_mod)
+        return
+    field = getattr(LocalRank, field_name)
     try:
         with db.transaction():
-            LocalRank.create(node_id=node_id, positive_computed=trust_mod)
+            LocalRank.create(**{'node_id': node_id, field_name: trust_mod})
     except IntegrityError:
-        LocalRank.update(positive_computed=LocalRank.positive_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
+        LocalRank.update({field: field + trust_mod,
+                          LocalRank.modified_date:
+                              str(datetime.datetime.now())}) \
             .where(LocalRank.node_id == node_id).execute()
 
 
+def increase_positive_computed(node_id, trust_mod):
+    _increase(node_id, 'positive_computed', trust_mod)
+
+
 def increase_negative_computed(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_computed=LocalRank.negative_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'negative_computed', trust_mod)
 
 
 def increase_wrong_computed(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, wrong_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(wrong_computed=LocalRank.wrong_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'wrong_computed', trust_mod)
 
 
 def increase_positive_requested(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_requested=LocalRank.positive_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'positive_requested', trust_mod)
 
 
 def increase_negative_requested(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_requested=LocalRank.negative_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'negative_requested', trust_mod)
 
 
 def increase_positive_payment(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_payment=LocalRank.positive_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'positive_payment', trust_mod)
 
 
 def increase_negative_payment(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_payment=LocalRank.negative_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'negative_payment', trust_mod)
 
 
 def increase_positive_resource(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_resource=LocalRank.positive_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'positive_resource', trust_mod)
 
 
 def increase_negative_resource(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_resource=LocalRank.negative_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    _increase(node_id, 'negative_resource', trust_mod)
 
 
 def get_global_rank(node_id):
@@ -115,10 +81,14 @@ def upsert_global_rank(node_id, comp_trust, req_trust, comp_weight, req_weight):
 
 
 def get_local_rank(node_id):
+    if local_ranks.loaded:
+        return local_ranks.get(node_id)
     return LocalRank.select().where(LocalRank.node_id == node_id).first()
 
 
 def get_local_rank_for_all():
+    if local_ranks.loaded:
+        return local_ranks.get_all()
     return LocalRank.select()
 
 
@@ -0,0 +1,168 @@
+import datetime
+import logging
+import time
+from threading import Lock
+
+from golem.core.service import LoopingCallService
+from golem.model import LocalRank, db
+
+logger = logging.getLogger(__name__)
+
+RANK_FIELDS = ('positive_computed', 'negative_computed', 'wrong_computed',
+               'positive_requested', 'negative_requested',
+               'positive_payment', 'negative_payment',
+               'positive_resource', 'negative_resource')
+
+
+class LocalRankCache(object):
+    """ In-memory copy of the LocalRank table.
+
+    Once loaded, local ranks are read from memory only. Increments are
+    applied to the in-memory ranks and accumulated per node until flush()
+    writes them to the database in a single transaction. Increments are
+    written (rather than values) so that rows changed directly in the
+    database are not overwritten.
+    """
+
+    # Rows per INSERT statement; SQLite limits the number of variables
+    # in a statement to 999
+    INSERT_ROWS = 64
+    # Node ids per SELECT ... WHERE node_id IN (...) statement
+    SELECT_IDS = 500
+
+    def __init__(self):
+        self.loaded = False
+        self._ranks = {}  # node_id -> LocalRank
+        self._pending = {}  # node_id -> {field name: increment}
+        self._lock = Lock()
+
+        self._flushes = 0
+        self._flushed_nodes = 0
+        self._flush_time = 0.0
+
+    def load(self):
+        """ Read all local ranks from the database and start serving them
+        from memory """
+        ranks = {rank.node_id: rank for rank in LocalRank.select()}
+        with self._lock:
+            self._ranks = ranks
+            self._pending = {}
+            self.loaded = True
+        logger.debug("Loaded %d local ranks", len(ranks))
+
+    def close(self):
+        """ Write pending increments and go back to reading from and writing
+        to the database directly """
+        with self._lock:
+            self.loaded = False
+            self._ranks = {}
+        self.flush()
+
+    def get(self, node_id):
+        with self._lock:
+            return self._ranks.get(node_id)
+
+    def get_all(self):
+        with self._lock:
+            return list(self._ranks.values())
+
+    def increase(self, node_id, field_name, trust_mod):
+        with self._lock:
+            rank = self._ranks.get(node_id)
+            if rank is None:
+                rank = self._ranks[node_id] = LocalRank(node_id=node_id)
+            setattr(rank, field_name, getattr(rank, field_name) + trust_mod)
+            pending = self._pending.setdefault(node_id, {})
+            pending[field_name] = pending.get(field_name, 0.0) + trust_mod
+
+    def flush(self):
+        """ Write accumulated increments to the database in one transaction.
+        If the transaction fails, increments are kept for the next flush.
+        :return int: number of updated nodes
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        start = time.time()
+        try:
+            self._write(pending)
+        except Exception:
+            with self._lock:
+                for node_id, increments in pending.items():
+                    node_pending = self._pending.setdefault(node_id, {})
+                    for field_name, trust_mod in increments.items():
+                        node_pending[field_name] = \
+                            node_pending.get(field_name, 0.0) + trust_mod
+            raise
+
+        self._flushes += 1
+        self._flushed_nodes += len(pending)
+        self._flush_time += time.time() - start
+        return len(pending)
+
+    def _write(self, pending):
+        node_ids = list(pending)
+        now = str(datetime.datetime.now())
+        with db.atomic():
+            existing = set()
+            for i in range(0, len(node_ids), self.SELECT_IDS):
+                chunk = node_ids[i:i + self.SELECT_IDS]
+                query = LocalRank.select(LocalRank.node_id) \
+                    .where(LocalRank.node_id.in_(chunk))
+                existing.update(rank.node_id for rank in query)
+
+            rows = []
+            for node_id in node_ids:
+                increments = pending[node_id]
+                if node_id in existing:
+                    values = {
+                        getattr(LocalRank, field_name):
+                            getattr(LocalRank, field_name) + trust_mod
+                        for field_name, trust_mod in increments.items()}
+                    values[LocalRank.modified_date] = now
+                    LocalRank.update(values) \
+                        .where(LocalRank.node_id == node_id).execute()
+                else:
+                    row = {field_name: increments.get(field_name, 0.0)
+                           for field_name in RANK_FIELDS}
+                    row['node_id'] = node_id
+                    rows.append(row)
+
+            for i in range(0, len(rows), self.INSERT_ROWS):
+                LocalRank.insert_many(rows[i:i + self.INSERT_ROWS]).execute()
+
+    @property
+    def metrics(self):
+        with self._lock:
+            nodes = len(self._ranks)
+            pending = len(self._pending)
+        flushes = self._flushes
+        return {
+            'nodes': nodes,
+            'pending_nodes': pending,
+            'flushes': flushes,
+            'flushed_nodes': self._flushed_nodes,
+            'avg_flush_time': self._flush_time / flushes if flushes else 0.0,
+        }
+
+
+class LocalRankService(LoopingCallService):
+    """ Loads local ranks into a LocalRankCache on start, flushes them to
+    the database every interval_seconds and on stop """
+
+    def __init__(self, cache: LocalRankCache, interval_seconds: int) -> None:
+        super().__init__(interval_seconds)
+        self._cache = cache
+
+    def start(self, now: bool = False):
+        self._cache.load()
+        super().start(now)
+
+    def stop(self):
+        super().stop()
+        self._cache.close()
+
+    def _run(self):
+        self._cache.flush()
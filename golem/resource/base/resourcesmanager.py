@@ -541,9 +541,8 @@ class AbstractResourceManager(IClientHandler, metaclass=abc.ABCMeta):
         )
 
         if async:
-            self._async_call(client.get_file,
-                             success, error,
-                             **kwargs)
+            deferred = client.get_file_async(**kwargs)
+            deferred.addCallback(success).addErrback(error)
         else:
             try:
                 data = client.get_file(**kwargs)
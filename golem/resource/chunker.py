@@ -0,0 +1,127 @@
+import hashlib
+
+import numpy
+
+__all__ = ['Chunker']
+
+# Number of trailing bytes the rolling hash depends on
+WINDOW = 32
+# Pseudo-random value for each byte, added to the rolling (gear) hash
+GEAR = numpy.array([int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4],
+                                   'little') for i in range(256)],
+                   dtype=numpy.uint32)
+
+
+def _spread_bits(count):
+    """ Positions of count bits spread over all 32 bits of the hash, so that
+    a mask match depends on the whole window """
+    return [WINDOW - 1 - (i * WINDOW) // count for i in range(count)]
+
+
+def _gear_hashes(data):
+    """ Gear hash of the WINDOW bytes ending at each position of data:
+    h[i] = sum(GEAR[data[i - k]] << k for k in range(WINDOW)) mod 2 ** 32.
+    Computed for all positions at once by doubling the window.
+    """
+    hashes = GEAR[numpy.frombuffer(data, dtype=numpy.uint8)]
+    shift = 1
+    while shift < WINDOW:
+        hashes[shift:] += hashes[:-shift] << numpy.uint32(shift)
+        shift *= 2
+    return hashes
+
+
+def _first(positions, start, end):
+    idx = numpy.searchsorted(positions, start)
+    if idx < len(positions) and positions[idx] < end:
+        return int(positions[idx])
+    return None
+
+
+class Chunker(object):
+    """ Content-defined chunking (FastCDC). Chunk boundaries are placed where
+    the rolling hash of the last WINDOW bytes matches a mask, so they move
+    together with the content: inserting or removing bytes changes only
+    the chunks around the edit, not all the following ones.
+
+    Boundaries are never placed less than min_size bytes after the previous
+    one and are forced max_size bytes after it. Before avg_size a mask with
+    more bits is used than after it (normalized chunking), which keeps chunk
+    sizes close to avg_size.
+    """
+
+    def __init__(self, avg_size=2 ** 20, min_size=None, max_size=None):
+        self.avg_size = avg_size
+        self.min_size = max(min_size or avg_size // 4, WINDOW)
+        self.max_size = max_size or avg_size * 4
+        if not self.min_size < self.avg_size < self.max_size:
+            raise ValueError("Invalid chunk sizes: {} {} {}".format(
+                self.min_size, self.avg_size, self.max_size))
+
+        bits = avg_size.bit_length() - 1
+        if not 2 < bits < WINDOW - 2:
+            raise ValueError("Invalid average chunk size: {}"
+                             .format(avg_size))
+        small_bits = _spread_bits(bits + 2)
+        self.mask_small = sum(1 << b for b in small_bits)
+        # Bits of the large mask are a subset of the small mask's bits
+        self.mask_large = sum(1 << b for b in small_bits[:bits - 2])
+
+    def cut_points(self, data, final=True):
+        """ Find chunk boundaries in data, which starts at a boundary
+        :param data: bytes-like object
+        :param bool final: whether data ends at the end of the file; if not,
+        the remainder after the last returned boundary is not a complete chunk
+        :return list: offsets of the end of each chunk
+        """
+        size = len(data)
+        if not size:
+            return []
+
+        hashes = _gear_hashes(data)
+        large = numpy.flatnonzero((hashes & self.mask_large) == 0)
+        small = large[(hashes[large] & self.mask_small) == 0]
+
+        cuts = []
+        start = 0
+        while start < size:
+            cut = self._find_cut(small, large, start, size)
+            if cut is None:
+                if final:
+                    cuts.append(size)
+                break
+            cuts.append(cut)
+            start = cut
+        return cuts
+
+    def _find_cut(self, small, large, start, size):
+        normal = start + self.avg_size - 1
+        end = _first(small, start + self.min_size - 1, normal)
+        if end is None:
+            end = _first(large, normal, start + self.max_size)
+        if end is not None:
+            return end + 1
+        if start + self.max_size <= size:
+            return start + self.max_size
+        return None
+
+    def iter_chunks(self, file_obj):
+        """ Read a file and yield its consecutive chunks
+        :param file_obj: file opened in binary mode
+        :return: generator of bytes
+        """
+        read_size = max(self.max_size, 2 ** 23)
+        buf = b''
+        while True:
+            data = file_obj.read(read_size)
+            final = not data
+            if buf:
+                data = buf + data
+            if not data:
+                return
+
+            start = 0
+            for cut in self.cut_points(data, final):
+                yield data[start:cut]
+                start = cut
+            buf = data[start:]
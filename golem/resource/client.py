@@ -1,5 +1,4 @@
 import abc
-import hashlib
 import inspect
 import logging
 import os
@@ -19,24 +18,13 @@ from requests.packages.urllib3.exceptions import MaxRetryError, TimeoutError, \
 from twisted.internet import threads
 
 from golem.core.async import AsyncRequest, async_run
+from golem.core.filehash import FileHasher
 
 log = logging.getLogger(__name__)
 
 
-SHA1_BLOCK_SIZE = 64
-
-
 def file_sha_256(file_path):
-    sha = hashlib.sha256()
-
-    with open(file_path, 'rb') as f:
-        buf = f.read(SHA1_BLOCK_SIZE)
-
-        while len(buf) > 0:
-            sha.update(buf)
-            buf = f.read(SHA1_BLOCK_SIZE)
-
-    return sha.hexdigest()
+    return FileHasher.sha256(file_path).hex()
 
 
 def file_multihash(file_path):
@@ -57,6 +45,13 @@ class IClient(object):
     def get_file(self, content_hash, client_options=None, **kwargs):
         raise NotImplementedError
 
+    def get_file_async(self, *args, **kwargs):
+        """ Non-blocking get_file. Clients that cannot make asynchronous
+        requests run get_file in a thread.
+        :return Deferred:
+        """
+        return threads.deferToThread(self.get_file, *args, **kwargs)
+
     def id(self, client_options=None, *args, **kwargs):
         raise NotImplementedError
 
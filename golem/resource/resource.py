@@ -4,8 +4,10 @@ import string
 import unicodedata
 import zipfile
 
+from golem.core.filehash import FileHasher
 from golem.core.simplehash import SimpleHash
 from golem.resource.dirmanager import split_path
+from golem.resource.resourcehash import ResourceHash
 
 
 logger = logging.getLogger(__name__)
@@ -32,14 +34,23 @@ class TaskResourceHeader(object):
         return True
 
     @classmethod
-    def build(cls, relative_root, absolute_root):
-        return cls.__build(relative_root, absolute_root)
+    def build(cls, relative_root, absolute_root, with_parts=False):
+        """ Describe files in absolute_root
+        :param bool with_parts: add the chunk manifest of each file, so that
+        only the chunks which are missing are sent (see
+        build_parts_header_delta_from_chosen)
+        """
+        FileHasher.hash_files(os.path.join(root, f)
+                              for root, _, files in os.walk(absolute_root)
+                              for f in files)
+        return cls.__build(relative_root, absolute_root, with_parts=with_parts)
 
     @classmethod
     def build_from_chosen(cls, dir_name, absolute_root, chosen_files=None):
         cur_th = TaskResourceHeader(dir_name)
 
         abs_dirs = split_path(absolute_root)
+        FileHasher.hash_files(chosen_files)
 
         for f in chosen_files:
 
@@ -63,7 +74,7 @@ class TaskResourceHeader(object):
         return cur_th
 
     @classmethod
-    def __build(cls, dir_name, absolute_root, chosen_files=None):
+    def __build(cls, dir_name, absolute_root, chosen_files=None, with_parts=False):
         cur_th = TaskResourceHeader(dir_name)
 
         dirs = [name for name in os.listdir(absolute_root) if os.path.isdir(os.path.join(absolute_root, name))]
@@ -75,7 +86,11 @@ class TaskResourceHeader(object):
                 continue
             hsh = SimpleHash.hash_file_base64(os.path.join(absolute_root, f))
 
-            files_data.append((f, hsh))
+            if with_parts:
+                parts = ResourceHash(absolute_root).get_chunk_hashes(os.path.join(absolute_root, f))
+                files_data.append((f, hsh, parts))
+            else:
+                files_data.append((f, hsh))
 
         # print "{}, {}, {}".format(relative_root, absolute_root, files_data)
 
@@ -83,7 +98,7 @@ class TaskResourceHeader(object):
 
         sub_dir_headers = []
         for d in dirs:
-            child_sub_dir_header = cls.__build(d, os.path.join(absolute_root, d), chosen_files)
+            child_sub_dir_header = cls.__build(d, os.path.join(absolute_root, d), chosen_files, with_parts)
             sub_dir_headers.append(child_sub_dir_header)
 
         cur_th.sub_dir_headers = sub_dir_headers
@@ -98,6 +113,7 @@ class TaskResourceHeader(object):
         cur_th = TaskResourceHeader(header.dir_name)
 
         abs_dirs = split_path(absolute_root)
+        FileHasher.hash_files(chosen_files)
 
         for file_ in chosen_files:
 
@@ -125,6 +141,9 @@ class TaskResourceHeader(object):
         cur_th = TaskResourceHeader(header.dir_name)
         abs_dirs = split_path(absolute_root)
         delta_parts = []
+        # Chunks which are listed in the header are already held by its sender
+        sent_parts = header.get_parts()
+        FileHasher.hash_files(res_parts.keys())
 
         for file_, parts in res_parts.items():
             dir_, file_name = os.path.split(file_)
@@ -141,7 +160,10 @@ class TaskResourceHeader(object):
                     if hsh == last_ref_header.__get_file_hash(file_name):
                         continue
             last_header.files_data.append((file_name, hsh, parts))
-            delta_parts += parts
+            for part in parts:
+                if part not in sent_parts:
+                    sent_parts.add(part)
+                    delta_parts.append(part)
 
         return cur_th, delta_parts
 
@@ -229,6 +251,16 @@ class TaskResourceHeader(object):
     def hash(self):
         return SimpleHash.hash_base64(self.to_string().encode('utf-8'))
 
+    def get_parts(self):
+        """ :return set: chunks listed in the chunk manifests of all files """
+        parts = set()
+        for f in self.files_data:
+            if len(f) > 2:
+                parts.update(f[2])
+        for sub_dir_header in self.sub_dir_headers:
+            parts |= sub_dir_header.get_parts()
+        return parts
+
     def __has_sub_header(self, dir_name):
         return dir_name in [sh.dir_name for sh in self.sub_dir_headers]
 
@@ -2,28 +2,53 @@ import os
 import hashlib
 import base64
 
+from golem.core.filehash import FileHasher
+from golem.resource.chunker import Chunker
+
 
 class ResourceHash:
     def __init__(self, resource_dir):
         self.resource_dir = resource_dir
 
     def split_file(self, filename, block_size=2 ** 20):
-        with open(filename, "rb") as f:
-            file_list = []
-            while True:
-                data = f.read(block_size)
-                if not data:
-                    break
-
-                filehash = os.path.join(self.resource_dir, self.__count_hash(data))
-                filehash = os.path.normpath(filehash)
+        """ Split a file into content-defined chunks (see Chunker) and store
+        them in the resource directory under their hashes. Chunks that are
+        already stored, e.g. for another task or an earlier version of the
+        file, are not written again.
+        :param str filename: file to split
+        :param int block_size: average chunk size
+        :return list: paths to the file's chunks, in order
+        """
+        file_list = []
+        for data in self.__iter_chunks(filename, block_size):
+            filehash = os.path.join(self.resource_dir, self.__count_hash(data))
+            filehash = os.path.normpath(filehash)
 
+            if not os.path.isfile(filehash):
                 with open(filehash, "wb") as fwb:
                     fwb.write(data)
 
-                file_list.append(filehash)
+            file_list.append(filehash)
         return file_list
 
+    def get_chunk_hashes(self, filename, block_size=2 ** 20):
+        """ Chunk manifest of a file: hashes of the chunks split_file
+        would create, without storing them. Manifests are cached by
+        FileHasher until the file changes.
+        :return list: chunk hashes, in order
+        """
+        def chunk_hashes(file_path):
+            return [self.__count_hash(data)
+                    for data in self.__iter_chunks(file_path, block_size)]
+
+        return FileHasher.cached(filename, 'chunks:{}'.format(block_size),
+                                 chunk_hashes)
+
+    @staticmethod
+    def __iter_chunks(filename, block_size):
+        with open(filename, "rb") as f:
+            yield from Chunker(block_size).iter_chunks(f)
+
     def connect_files(self, file_list, res_file):
         with open(res_file, 'wb') as f:
             for file_hash in file_list:
@@ -35,10 +60,7 @@ class ResourceHash:
                         f.write(data)
 
     def get_file_hash(self, filename):
-        with open(filename, "rb") as f:
-            data = f.read()
-            hash_ = self.__count_hash(data)
-        return hash_
+        return self.__encode(FileHasher.sha1(filename))
 
     def set_resource_dir(self, resource_dir):
         self.resource_dir = resource_dir
@@ -46,4 +68,8 @@ class ResourceHash:
     def __count_hash(self, data):
         sha = hashlib.sha1()
         sha.update(data)
-        return base64.urlsafe_b64encode(sha.digest()).decode('utf-8')
+        return self.__encode(sha.digest())
+
+    @staticmethod
+    def __encode(digest):
+        return base64.urlsafe_b64encode(digest).decode('utf-8')
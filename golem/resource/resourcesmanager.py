@@ -58,12 +58,12 @@ class ResourcesManager:
         self.owner = owner
         self.last_prct = 0
 
-    def get_resource_header(self, task_id):
+    def get_resource_header(self, task_id, with_parts=False):
 
         dir_name = self.get_resource_dir(task_id)
 
         if os.path.exists(dir_name):
-            task_res_header = TaskResourceHeader.build("resources", dir_name)
+            task_res_header = TaskResourceHeader.build("resources", dir_name, with_parts)
         else:
             task_res_header = TaskResourceHeader("resources")
 
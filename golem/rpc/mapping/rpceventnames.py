@@ -26,6 +26,8 @@ class Reputation:
 
 class Task:
 
+    evt_task_updates        = 'evt.comp.task.updates'
+    # Deprecated, use evt_task_updates
     evt_task_list           = 'evt.comp.task.list'
     evt_task_status         = 'evt.comp.task.status'
     evt_subtask_status      = 'evt.comp.subtask.status'
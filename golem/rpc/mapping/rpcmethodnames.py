@@ -39,6 +39,7 @@ CORE_METHOD_MAP = dict(
     get_requesting_trust=   'rep.requesting',
 
     get_tasks=              'comp.tasks',
+    get_tasks_snapshot=     'comp.tasks.snapshot',
     get_task=               'comp.task',
     run_test_task=          'comp.tasks.check',
     abort_test_task=        'comp.tasks.check.abort',
@@ -0,0 +1,79 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchLimiter(object):
+    """ Decides whether TaskServer may open a connection to send a waiting
+    task result, task failure, payment or payment request.
+
+    Messages to a node go over its idle pooled session whenever there is one,
+    without limits. Otherwise a new connection is opened; several connections
+    to the same node may be in flight, but at most max_connections in total.
+    A node to which a connection has finally failed is not connected to again
+    for a backoff time, which doubles with each consecutive failure, up to
+    max_backoff. Connections that fail while the node is already backed off
+    do not extend the backoff.
+    """
+
+    BACKOFF = 30  # seconds
+    MAX_BACKOFF = 3600  # seconds
+
+    def __init__(self, max_connections, backoff=BACKOFF,
+                 max_backoff=MAX_BACKOFF):
+        self.max_connections = max_connections
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._connections = 0
+        self._failures = {}  # key_id -> (consecutive failures, retry time)
+
+        self.connected = 0
+        self.limited = 0
+
+    def reset(self, connecting):
+        """ Start a sync_network tick
+        :param list connecting: key ids of nodes, one for each connection
+        which is still being established
+        """
+        self._connections = len(connecting)
+
+    def can_connect(self, key_id):
+        failure = self._failures.get(key_id)
+        if failure is not None and failure[1] > time.time():
+            return False
+        if self._connections >= self.max_connections:
+            self.limited += 1
+            return False
+        return True
+
+    def connecting(self, key_id):
+        """ A connection to the node is being opened """
+        self._connections += 1
+        self.connected += 1
+
+    def failed(self, key_id):
+        """ All attempts to connect to the node have failed """
+        failures, retry_time = self._failures.get(key_id, (0, None))
+        if retry_time is not None and retry_time > time.time():
+            # Other connection to the node has failed meanwhile
+            return
+        failures += 1
+        delay = min(self.backoff * 2 ** (failures - 1), self.max_backoff)
+        self._failures[key_id] = (failures, time.time() + delay)
+        logger.debug("Cannot connect to %r, retrying in %r s", key_id, delay)
+
+    def succeeded(self, key_id):
+        """ A message has been sent to the node """
+        self._failures.pop(key_id, None)
+
+    @property
+    def metrics(self):
+        now = time.time()
+        return {
+            'connecting': self._connections,
+            'backed_off': sum(1 for _, retry_time in self._failures.values()
+                              if retry_time > now),
+            'connected': self.connected,
+            'limited': self.limited,
+        }
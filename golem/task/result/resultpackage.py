@@ -1,7 +1,7 @@
 import abc
 import os
-import uuid
 import zipfile
+from contextlib import contextmanager
 
 from golem.core.fileencrypt import AESFileEncryptor
 from golem.core.simpleserializer import CBORSerializer
@@ -82,35 +82,25 @@ class EncryptingPackager(Packager):
         self._creator = self.creator_class()
         self.key_or_secret = key_or_secret
 
-    def create(self, output_path, disk_files=None, cbor_files=None, **kwargs):
-
-        output_dir = os.path.dirname(output_path)
-        pkg_file_path = os.path.join(output_dir, str(uuid.uuid4()) + ".pkg")
-        out_file_path = super(EncryptingPackager, self).create(pkg_file_path,
-                                                               disk_files=disk_files,
-                                                               cbor_files=cbor_files)
-
-        self.encryptor_class.encrypt(out_file_path,
-                                     output_path,
-                                     self.key_or_secret)
-        return output_path
-
     def extract(self, input_path, output_dir=None, **kwargs):
 
-        input_dir = os.path.dirname(input_path)
-        tmp_file_path = os.path.join(input_dir, str(uuid.uuid4()) + ".dec")
-
-        self.encryptor_class.decrypt(input_path,
-                                     tmp_file_path,
-                                     self.key_or_secret)
-
-        os.remove(input_path)
-        os.rename(tmp_file_path, input_path)
+        if not output_dir:
+            output_dir = os.path.dirname(input_path)
 
-        return self._creator.extract(input_path, output_dir=output_dir)
+        # Members are decrypted while they are being unpacked
+        with open(input_path, 'rb') as src, \
+                self.encryptor_class.decrypting_stream(
+                    src, self.key_or_secret) as stream:
+            return self._creator.extract(stream, output_dir=output_dir)
 
+    @contextmanager
     def generator(self, output_path):
-        return self._creator.generator(output_path)
+        # Files are packed and encrypted in a single pass
+        with open(output_path, 'wb') as dst, \
+                self.encryptor_class.encrypting_stream(
+                    dst, self.key_or_secret) as stream, \
+                self._creator.generator(stream) as obj:
+            yield obj
 
     def write_disk_file(self, obj, file_path, file_name):
         self._creator.write_disk_file(obj, file_path, file_name)
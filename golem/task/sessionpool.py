@@ -0,0 +1,116 @@
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class TaskSessionPool(object):
+    """ Keeps verified task sessions open between exchanges, one per remote
+    node. Task requests, results, failures, payments and payment requests
+    for a node are sent over its pooled session instead of a new connection
+    with a full handshake.
+
+    A pooled session is busy until its current exchange is released (see
+    TaskSession.release) and idle afterwards. Only idle sessions are handed
+    out, so a session carries one exchange at a time; while it is busy,
+    other exchanges with the node use new connections. Idle sessions are
+    dropped after IDLE_TIMEOUT; when there are more than max_sessions pooled
+    sessions, the least recently used ones leave the pool.
+    """
+
+    MAX_SESSIONS = 64
+    IDLE_TIMEOUT = 120  # seconds
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_timeout=IDLE_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()  # key_id -> session
+        self._idle = set()
+
+        self.reused = 0
+        self.missed = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session):
+        return self._sessions.get(session.key_id) is session
+
+    @property
+    def metrics(self):
+        requests = self.reused + self.missed
+        return {
+            'sessions': len(self._sessions),
+            'idle': len(self._idle),
+            'reused': self.reused,
+            'missed': self.missed,
+            'reuse_rate': self.reused / requests if requests else 0.0,
+        }
+
+    def add(self, session):
+        """ Pool a verified session, replacing other session with
+        the same node """
+        key_id = session.key_id
+        if not key_id:
+            return
+        old = self._sessions.pop(key_id, None)
+        if old is not None and old is not session:
+            self._discard(old)
+        self._sessions[key_id] = session
+        while len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            self._discard(evicted)
+
+    def get(self, key_id):
+        """ Return an idle, open session with the given node and mark it busy
+        :return TaskSession|None: None if there is no such session
+        """
+        session = self._sessions.get(key_id) if key_id else None
+        if session is None or session not in self._idle \
+                or not session.conn.opened:
+            self.missed += 1
+            return None
+        self._sessions.move_to_end(key_id)
+        self._idle.discard(session)
+        self.reused += 1
+        return session
+
+    def release(self, session) -> bool:
+        """ Mark session idle
+        :return bool: True if the session is pooled and should stay open
+        """
+        if session not in self:
+            return False
+        self._idle.add(session)
+        return True
+
+    def remove(self, session):
+        if session in self:
+            del self._sessions[session.key_id]
+        self._idle.discard(session)
+
+    def remove_idle(self):
+        """ Drop sessions which have been idle for longer than idle_timeout
+        """
+        now = time.time()
+        for session in list(self._idle):
+            if now - session.last_message_time > self.idle_timeout:
+                logger.debug("Dropping idle task session with %r",
+                             session.key_id)
+                self.remove(session)
+                session.dropped()
+
+    def drop_all(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._idle.clear()
+        for session in sessions:
+            session.dropped()
+
+    def _discard(self, session):
+        # Busy sessions leave the pool and are dropped after their current
+        # exchange is released
+        if session in self._idle:
+            self._idle.discard(session)
+            session.dropped()
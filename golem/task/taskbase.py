@@ -93,11 +93,47 @@ class TaskHeader(object):
     def __repr__(self):
         return '<Header: %r>' % (self.task_id,)
 
+    def __setattr__(self, key, value):
+        # Setting any public attribute invalidates cached representations
+        if not key.startswith('_'):
+            self.__dict__.pop('_cached', None)
+        super().__setattr__(key, value)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_cached', None)
+        return state
+
     def to_binary(self):
-        return self.dict_to_binary(self.to_dict())
+        cached = self._get_cached()
+        if cached[2] is None:
+            cached[2] = self.dict_to_binary(cached[1])
+        return cached[2]
 
     def to_dict(self):
-        return DictSerializer.dump(self, typed=False)
+        """ Dictionary representation of the header. It's cached until
+        the header or its owner changes and must not be modified.
+        """
+        return self._get_cached()[1]
+
+    def _get_cached(self):
+        """ :return list: [owner's state, dict representation,
+                           binary representation or None]
+        """
+        owner_state = self._get_owner_state()
+        cached = self.__dict__.get('_cached')
+        if cached is None or cached[0] != owner_state:
+            cached = self._cached = [
+                owner_state,
+                DictSerializer.dump(self, typed=False),
+                None
+            ]
+        return cached
+
+    def _get_owner_state(self):
+        # Task owner (usually this node's Node) may be changed in place
+        owner = self.task_owner
+        return dict(getattr(owner, '__dict__', None) or owner or {})
 
     @staticmethod
     def from_dict(dictionary):
@@ -263,6 +299,30 @@ class Task(metaclass=abc.ABCMeta):
         """
         return  # Implement in derived class
 
+    def verify_results(self, subtask_id, task_result,
+                       result_type=ResultType.DATA):
+        """ Check results of a finished subtask before they are accepted.
+        Called in a verification worker thread, never for two subtasks
+        of the same task at once. The task may be dumped or used by other
+        threads in the meantime, so it must not be changed here; changes go
+        to results_verified, which is called in the reactor thread.
+        :param subtask_id: finished subtask id
+        :param task_result: task result, can be binary data or list of files
+        :param result_type: ResultType representation
+        :return: verification outcome, passed to results_verified
+        """
+        return None
+
+    def results_verified(self, subtask_id, task_result, result_type,
+                         verification):
+        """ Accept or reject results checked by verify_results
+        :param subtask_id: finished subtask id
+        :param task_result: task result, can be binary data or list of files
+        :param result_type: ResultType representation
+        :param verification: outcome returned by verify_results
+        """
+        self.computation_finished(subtask_id, task_result, result_type)
+
     @abc.abstractmethod
     def computation_failed(self, subtask_id):
         """ Inform that computation of a task with given id has failed
@@ -10,6 +10,7 @@ from pydispatch import dispatcher
 from golem.core.common import deadline_to_timeout
 from golem.core.statskeeper import IntStatsKeeper
 from golem.docker.manager import DockerManager
+from golem.docker.pool import ContainerPool
 from golem.docker.task_thread import DockerTaskThread
 from golem.manager.nodestatesnapshot import TaskChunkStateSnapshot
 from golem.resource.dirmanager import DirManager
@@ -29,9 +30,24 @@ class CompStats(object):
         self.tasks_requested = 0
 
 
+def get_subtask_budget(config_desc):
+    """ Split CPU cores and memory configured in config_desc between
+    concurrently computed subtasks
+    :param ClientConfigDescriptor config_desc:
+    :return (int, int, int): number of slots, cores per slot and memory size
+     per slot
+    """
+    num_cores = int(config_desc.num_cores)
+    slots = int(getattr(config_desc, 'max_concurrent_subtasks', 1))
+    slots = max(1, min(slots, num_cores))
+    return slots, num_cores // slots, int(config_desc.max_memory_size) // slots
+
+
 class TaskComputer(object):
     """ TaskComputer is responsible for task computations that take place in Golem application. Tasks are started
-    in separate threads.
+    in separate threads. Up to max_concurrent_subtasks subtasks are computed at
+    the same time, each of them with its share of configured cores and memory.
+    Only one task request is negotiated at a time.
     """
 
     lock = Lock()
@@ -47,7 +63,9 @@ class TaskComputer(object):
         self.task_server = task_server
         self.waiting_for_task = None
         self.counting_task = False
-        self.counting_thread = None
+        self.counting_threads = {}
+        self.counting_slots = {}
+        self.max_concurrent_subtasks = 1
         self.task_requested = False
         self.runnable = True
         self.listeners = []
@@ -63,6 +81,7 @@ class TaskComputer(object):
         self.waiting_for_task_timeout = None
         self.waiting_for_task_session_timeout = None
 
+        self.container_pool = None
         self.docker_manager = DockerManager.install()
         if use_docker_machine_manager:
             self.docker_manager.check_environment()
@@ -75,20 +94,35 @@ class TaskComputer(object):
 
         self.assigned_subtasks = {}
         self.task_to_subtask_mapping = {}
-        self.max_assigned_tasks = 1
 
         self.delta = None
         self.last_task_timeout_checking = None
         self.support_direct_computation = False
         self.compute_tasks = task_server.config_desc.accept_tasks
 
+    @property
+    def counting_thread(self):
+        """ One of the currently running task threads or None """
+        return next(iter(self.counting_threads.values()), None)
+
+    @counting_thread.setter
+    def counting_thread(self, task_thread):
+        self.counting_threads = {}
+        self.counting_slots = {}
+        if task_thread is not None:
+            self.counting_threads[task_thread.subtask_id] = task_thread
+            self.counting_slots[task_thread.subtask_id] = 0
+
     def task_given(self, ctd):
         if ctd['subtask_id'] in self.assigned_subtasks:
             return False
         self.wait(ttl=self.waiting_for_task_timeout)
         self.assigned_subtasks[ctd['subtask_id']] = ctd
         self.task_to_subtask_mapping[ctd['task_id']] = ctd['subtask_id']
-        self.__request_resource(ctd['task_id'], self.resource_manager.get_resource_header(ctd['task_id']),
+        # Chunk manifests let the requestor send only missing chunks
+        # (ResourceType.PARTS)
+        resource_header = self.resource_manager.get_resource_header(ctd['task_id'], with_parts=True)
+        self.__request_resource(ctd['task_id'], resource_header,
                                 ctd['return_address'], ctd['return_port'], ctd['key_id'], ctd['task_owner'])
         return True
 
@@ -99,7 +133,9 @@ class TaskComputer(object):
                 subtask = self.assigned_subtasks[subtask_id]
 
                 with self.lock:
-                    if self.counting_thread is not None:
+                    if subtask_id in self.counting_threads:
+                        return  # already computing
+                    if not self._has_free_slot():
                         logger.error("Got resource for task: %r"
                             "But I'm busy with another one. Ignoring.",
                             task_id)
@@ -116,6 +152,8 @@ class TaskComputer(object):
         if task_id in self.task_to_subtask_mapping:
             subtask_id = self.task_to_subtask_mapping[task_id]
             if subtask_id in self.assigned_subtasks:
+                if subtask_id in self.counting_threads:
+                    return False
                 subtask = self.assigned_subtasks[subtask_id]
                 if unpack_delta:
                     self.task_server.unpack_delta(self.dir_manager.get_task_resource_dir(task_id), self.delta, task_id)
@@ -157,8 +195,10 @@ class TaskComputer(object):
             task_thread.end_time = time.time()
 
         with self.lock:
-            if self.counting_thread is task_thread:
-                self.counting_thread = None
+            subtask_id = task_thread.subtask_id
+            if self.counting_threads.get(subtask_id) is task_thread:
+                del self.counting_threads[subtask_id]
+                self.counting_slots.pop(subtask_id, None)
 
         work_wall_clock_time = task_thread.end_time - task_thread.start_time
         subtask_id = task_thread.subtask_id
@@ -201,16 +241,19 @@ class TaskComputer(object):
                                               subtask['return_address'], subtask['return_port'], subtask['key_id'],
                                               subtask['task_owner'], self.node_name)
             dispatcher.send(signal='golem.monitor', event='computation_time_spent', success=False, value=work_time_to_be_paid)
-        self.counting_task = None
+        if not self.counting_threads:
+            self.counting_task = None
 
     def run(self):
-        if self.counting_task:
-            if self.counting_thread is not None:
-                self.counting_thread.check_timeout()
-        elif self.compute_tasks and self.runnable:
+        for task_thread in list(self.counting_threads.values()):
+            task_thread.check_timeout()
+        if self.container_pool is not None:
+            self.container_pool.remove_idle()
+
+        if self.compute_tasks and self.runnable:
             if not self.waiting_for_task:
                 if time.time() - self.last_task_request > self.task_request_frequency:
-                    if self.counting_thread is None:
+                    if self._has_free_slot():
                         self.__request_task()
             elif self.use_waiting_ttl:
                 time_ = time.time()
@@ -221,18 +264,15 @@ class TaskComputer(object):
 
     def get_progresses(self):
         ret = {}
-        if self.counting_thread is None:
-            return ret
-
-        c = self.counting_thread
-        tcss = TaskChunkStateSnapshot(
-            c.get_subtask_id(),
-            0.0,
-            0.0,
-            c.get_progress(),
-            c.get_task_short_desc()
-        )  # FIXME: cpu power and estimated time left
-        ret[c.subtask_id] = tcss
+        for c in list(self.counting_threads.values()):
+            tcss = TaskChunkStateSnapshot(
+                c.get_subtask_id(),
+                0.0,
+                0.0,
+                c.get_progress(),
+                c.get_task_short_desc()
+            )  # FIXME: cpu power and estimated time left
+            ret[c.subtask_id] = tcss
 
         return ret
 
@@ -243,7 +283,13 @@ class TaskComputer(object):
         self.waiting_for_task_timeout = config_desc.waiting_for_task_timeout
         self.waiting_for_task_session_timeout = config_desc.waiting_for_task_session_timeout
         self.compute_tasks = config_desc.accept_tasks
+        try:
+            self.max_concurrent_subtasks = get_subtask_budget(config_desc)[0]
+        except (TypeError, ValueError) as err:
+            logger.warning("Invalid computation budget: %r", err)
+            self.max_concurrent_subtasks = 1
         self.change_docker_config(config_desc, run_benchmarks, in_background)
+        self.change_container_pool_config(config_desc)
 
     def config_changed(self):
         for l in self.listeners:
@@ -277,6 +323,25 @@ class TaskComputer(object):
                              done_callback,
                              in_background)
 
+    def change_container_pool_config(self, config_desc):
+        try:
+            size = int(getattr(config_desc, 'container_pool_size', 0))
+        except (TypeError, ValueError) as err:
+            logger.warning("Invalid container pool size: %r", err)
+            size = 0
+
+        if size <= 0:
+            if self.container_pool is not None:
+                self.container_pool.clear()
+            self.container_pool = None
+        elif self.container_pool is not None:
+            self.container_pool.max_containers = size
+        else:
+            self.container_pool = ContainerPool(
+                os.path.join(self.task_server.get_task_computer_root(),
+                             "containers"),
+                max_containers=size)
+
     def register_listener(self, listener):
         self.listeners.append(listener)
 
@@ -288,7 +353,7 @@ class TaskComputer(object):
         self.session_closed()
 
     def session_closed(self):
-        if not self.counting_task:
+        if not self.counting_task or self._has_free_slot():
             self.reset()
 
     def wait(self, wait=True, ttl=None):
@@ -299,7 +364,8 @@ class TaskComputer(object):
             self.waiting_ttl = ttl
 
     def reset(self, computing_task=False):
-        self.counting_task = computing_task
+        if computing_task or not self.counting_threads:
+            self.counting_task = computing_task
         self.use_waiting_ttl = False
         self.task_requested = False
         self.waiting_for_task = None
@@ -307,7 +373,8 @@ class TaskComputer(object):
 
     def __request_task(self):
         with self.lock:
-            perform_request = not self.waiting_for_task and not self.counting_task
+            perform_request = not self.waiting_for_task and \
+                self._has_free_slot()
 
         if not perform_request:
             return
@@ -345,6 +412,7 @@ class TaskComputer(object):
         unique_str = str(uuid.uuid4())
 
         self.reset(computing_task=task_id)
+        slot = self._free_slot()
 
         with self.dir_lock:
             resource_dir = self.resource_manager.get_resource_dir(task_id)
@@ -356,9 +424,15 @@ class TaskComputer(object):
                 os.makedirs(temp_dir)
 
         if docker_images:
+            host_config = None
+            if self.max_concurrent_subtasks > 1:
+                host_config = self.docker_manager.slot_host_config(
+                    slot, self.max_concurrent_subtasks)
             tt = DockerTaskThread(self, subtask_id, docker_images, working_dir,
                                   src_code, extra_data, short_desc,
-                                  resource_dir, temp_dir, task_timeout)
+                                  resource_dir, temp_dir, task_timeout,
+                                  host_config=host_config,
+                                  container_pool=self.container_pool)
         elif self.support_direct_computation:
             tt = PyTaskThread(self, subtask_id, working_dir, src_code,
                               extra_data, short_desc, resource_dir, temp_dir,
@@ -373,15 +447,29 @@ class TaskComputer(object):
                                               subtask['key_id'],
                                               subtask['task_owner'],
                                               self.node_name)
-            self.counting_task = None
+            if not self.counting_threads:
+                self.counting_task = None
             return
 
-        self.counting_thread = tt
+        self._add_counting_thread(tt, slot)
         tt.start()
 
+    def _has_free_slot(self):
+        return len(self.counting_threads) < self.max_concurrent_subtasks
+
+    def _free_slot(self):
+        taken = set(self.counting_slots.values())
+        return next(i for i in range(len(taken) + 1) if i not in taken)
+
+    def _add_counting_thread(self, task_thread, slot):
+        self.counting_threads[task_thread.subtask_id] = task_thread
+        self.counting_slots[task_thread.subtask_id] = slot
+
     def quit(self):
-        if self.counting_thread is not None:
-            self.counting_thread.end_comp()
+        for task_thread in list(self.counting_threads.values()):
+            task_thread.end_comp()
+        if self.container_pool is not None:
+            self.container_pool.clear()
 
 
 class AssignedSubTask(object):
@@ -0,0 +1,145 @@
+import logging
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+def changed_fields(old, new):
+    """ :return dict: items of new which are not in old or differ from it """
+    return {key: value for key, value in new.items()
+            if key not in old or old[key] != value}
+
+
+class TaskUpdateFeed(object):
+    """ Versioned feed of changes to the task and subtask dicts of
+    TaskManager.
+
+    update() rebuilds the dicts of tasks which have been updated since the
+    previous call (see mark_updated) or which are still active, and returns
+    only the fields which differ from the dicts returned before. Dicts of the
+    other tasks are kept in memory and not rebuilt. Each delta gets the next
+    sequence number; a client which has missed a delta gets the current dicts
+    from snapshot() and applies only the deltas with greater numbers.
+
+    Restored tasks which have not been loaded are sent with the dicts stored
+    in their journals and without subtasks, see TaskManager.is_task_loaded.
+    """
+
+    def __init__(self, task_manager):
+        self._task_manager = task_manager
+        self._updated = set()  # task ids
+        self._lock = Lock()
+        self.seq = 0
+        self._tasks = {}  # task_id -> task dict
+        self._subtasks = {}  # task_id -> {subtask_id: subtask dict}
+
+        self._rebuilt = 0
+        self._cached = 0
+
+    def mark_updated(self, task_id):
+        with self._lock:
+            self._updated.add(task_id)
+
+    def update(self):
+        """ Rebuild task and subtask dicts which may have changed
+        :return dict|None: None if nothing has changed, otherwise
+        {
+            'seq': sequence number of this delta,
+            'tasks': {task_id: changed task dict fields},
+            'subtasks': {task_id: {subtask_id: changed subtask dict fields}},
+            'removed_subtasks': {task_id: [ids of removed subtasks]},
+            'deleted': [ids of deleted tasks],
+        }
+        New tasks and subtasks are sent with all fields. Subtasks of deleted
+        tasks are not listed in removed_subtasks.
+        """
+        tm = self._task_manager
+        with self._lock:
+            updated, self._updated = self._updated, set()
+
+        tasks = {}
+        subtasks = {}
+        removed_subtasks = {}
+        task_ids = list(tm.tasks.keys())
+        for task_id in task_ids:
+            # status of the cached dict, a restored task is not loaded
+            if task_id in self._tasks and task_id not in updated \
+                    and self._tasks[task_id]['status'] \
+                    not in tm.activeStatus:
+                self._cached += 1
+                continue
+            self._rebuilt += 1
+
+            task_dict = tm.get_task_dict(task_id)
+            changed = changed_fields(self._tasks.get(task_id, {}), task_dict)
+            if changed:
+                tasks[task_id] = changed
+            self._tasks[task_id] = task_dict
+
+            if not tm.is_task_loaded(task_id):
+                continue
+            cached = self._subtasks.setdefault(task_id, {})
+            removed = set(cached)
+            for subtask_dict in tm.get_subtasks_dict(task_id):
+                subtask_id = subtask_dict['subtask_id']
+                removed.discard(subtask_id)
+                changed = changed_fields(cached.get(subtask_id, {}),
+                                         subtask_dict)
+                if changed:
+                    subtasks.setdefault(task_id, {})[subtask_id] = changed
+                cached[subtask_id] = subtask_dict
+            # e.g. subtask states are cleared when a task is aborted
+            for subtask_id in removed:
+                del cached[subtask_id]
+            if removed:
+                removed_subtasks[task_id] = sorted(removed)
+
+        deleted = list(set(self._tasks) - set(task_ids))
+        for task_id in deleted:
+            del self._tasks[task_id]
+            self._subtasks.pop(task_id, None)
+
+        if not (tasks or subtasks or removed_subtasks or deleted):
+            return None
+        self.seq += 1
+        logger.debug("Task update %d: %d tasks, %d subtasks, "
+                     "%d removed subtasks, %d deleted",
+                     self.seq, len(tasks),
+                     sum(len(s) for s in subtasks.values()),
+                     sum(len(s) for s in removed_subtasks.values()),
+                     len(deleted))
+        return {
+            'seq': self.seq,
+            'tasks': tasks,
+            'subtasks': subtasks,
+            'removed_subtasks': removed_subtasks,
+            'deleted': deleted,
+        }
+
+    def tasks(self):
+        """ :return list: task dicts as of the last delta """
+        return list(self._tasks.values())
+
+    def snapshot(self):
+        """ :return dict: all task and subtask dicts as of the last delta
+        {
+            'seq': sequence number of the last delta,
+            'tasks': [task dicts],
+            'subtasks': {task_id: [subtask dicts]},
+        }
+        """
+        return {
+            'seq': self.seq,
+            'tasks': self.tasks(),
+            'subtasks': {task_id: list(subtasks.values())
+                         for task_id, subtasks in self._subtasks.items()},
+        }
+
+    @property
+    def metrics(self):
+        return {
+            'seq': self.seq,
+            'tasks': len(self._tasks),
+            'rebuilt_tasks': self._rebuilt,
+            'cached_tasks': self._cached,
+        }
@@ -0,0 +1,594 @@
+import logging
+import os
+import pickle
+import struct
+from collections.abc import MutableMapping
+from itertools import chain
+from pathlib import Path
+
+import cbor2
+
+from golem.task.taskstate import ComputerState, SubtaskState, TaskState
+
+logger = logging.getLogger(__name__)
+
+
+class TaskJournal(object):
+    """ Persists a task and its state as a snapshot followed by an append-only
+    journal of changes.
+
+    The journal file is a sequence of length-prefixed CBOR records: a small
+    header (format version, task id and status), a snapshot and deltas
+    appended on every dump. Task and subtask states are stored as CBOR maps.
+    Task objects are defined by applications, so their attributes are stored
+    pickled. Subtask states and items of large dict attributes (e.g. data of
+    each subtask) are split into chunks of CHUNK_SIZE items and only the
+    changed chunks are written.
+
+    A dump may be given the ids of subtasks changed since the previous dump.
+    Chunks of subtask states and of dicts keyed by subtask ids are then
+    serialized only if they hold one of these subtasks, and chunks of other
+    dicts only if their values are mutable or differ from the previous
+    ones. Other task attributes are small and always serialized. Snapshots
+    and dumps without subtask ids serialize the whole task.
+
+    The journal is compacted to a new snapshot when deltas outgrow the
+    snapshot or when a state field stored in the header (see HEADER_FIELDS)
+    changes, so that the header read on startup stays up to date. The header
+    may also hold information about the task given by the caller of dump.
+    """
+
+    VERSION = 1
+    SUFFIX = '.journal'
+
+    PICKLE_PROTOCOL = 2
+    # CBOR tag of state values that can only be pickled
+    PICKLE_TAG = 27001
+    # journals smaller than that are not compacted
+    MIN_COMPACTION_SIZE = 64 * 1024
+    # number of dict items or subtask states stored together
+    CHUNK_SIZE = 32
+    # name of subtask states in the chunk cache, not a valid attribute name
+    SUBTASKS = ' subtasks'
+    # chunks of values of these types are compared instead of pickled
+    IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+    # task state fields copied to the header
+    HEADER_FIELDS = ('status', 'resource_hash')
+
+    _length = struct.Struct('!L')
+
+    def __init__(self, path):
+        self.path = Path(path)
+        # pickled parts of the last dump, None if a snapshot should be written
+        self._written = None
+        # keys, values (if immutable) and pickle of each chunk of the last
+        # dump, by dict attribute name; SUBTASKS for subtask states
+        self._chunk_cache = dict()
+        self._header_fields = None
+        self._snapshot_size = 0
+        self._journal_size = 0
+
+    @classmethod
+    def read_header(cls, path):
+        """ Read the header record without loading the task
+        :param Path path: journal file path
+        :return dict: header with 'version', 'task_id', HEADER_FIELDS keys
+        and information given to dump (keys may be missing in journals
+        written by older versions)
+        """
+        with Path(path).open('rb') as f:
+            data = f.read(cls._length.size)
+            if len(data) < cls._length.size:
+                raise EOFError("Journal {} is empty".format(path))
+            (size,) = cls._length.unpack(data)
+            data = f.read(size)
+
+        if len(data) < size:
+            raise EOFError("Journal {} is truncated".format(path))
+        return cls._check_header(cbor2.loads(data), path)
+
+    def load(self):
+        """ Restore task and its state from the journal
+        :return (Task, TaskState):
+        """
+        with self.path.open('rb') as f:
+            data = f.read()
+
+        records, size = self._read_records(data)
+        if len(records) < 2:
+            raise EOFError("Journal {} is truncated".format(self.path))
+
+        self._check_header(records[0], self.path)
+        stored = self._new_parts()
+        for record in records[1:]:
+            self._apply(stored, record)
+
+        task = self._build_task(stored)
+        state = self._build_state(stored)
+
+        self._header_fields = self._get_header_fields(state)
+        if size < len(data):
+            # a partially written delta; write a new snapshot on next dump
+            logger.warning("Ignoring incomplete record in %s", self.path)
+            self._written = None
+        else:
+            self._written, _ = self._task_parts(task, state)
+            self._snapshot_size = len(data)
+            self._journal_size = len(data)
+        return task, state
+
+    def dump(self, task, state, header_info=None, subtask_ids=None):
+        """ Append changes of the task and its state to the journal. Writes
+        a new snapshot if the journal needs compaction.
+        :param Task task:
+        :param TaskState state:
+        :param header_info: function returning a dict of additional header
+        fields, called only when a snapshot is written
+        :param subtask_ids: ids of subtasks changed since the previous dump,
+        None if any part of the task may have changed
+        """
+        if self._needs_snapshot(state):
+            parts, subtask_chunks = self._task_parts(task, state)
+            self._write_snapshot(parts, subtask_chunks, state, header_info)
+            return
+
+        parts, subtask_chunks = self._task_parts(task, state, subtask_ids)
+
+        record = self._diff(parts, subtask_chunks, state, self._written)
+        if record:
+            frame = self._frame(record)
+            with self.path.open('ab') as f:
+                f.write(frame)
+            self._journal_size += len(frame)
+
+        self._written = parts
+
+    def remove(self):
+        self._written = None
+        self._chunk_cache = dict()
+        self.path.unlink()
+
+    def _needs_snapshot(self, state):
+        if self._written is None or not self.path.exists():
+            return True
+        if self._get_header_fields(state) != self._header_fields:
+            return True
+        compaction_size = max(self._snapshot_size, self.MIN_COMPACTION_SIZE)
+        return self._journal_size - self._snapshot_size > compaction_size
+
+    def _write_snapshot(self, parts, subtask_chunks, state, header_info):
+        header_fields = self._get_header_fields(state)
+        header = dict(header_fields,
+                      version=self.VERSION,
+                      task_id=self.path.stem)
+        for name, value in (header_info() if header_info else {}).items():
+            try:
+                cbor2.dumps(value)
+            except (cbor2.CBOREncodeError, TypeError, ValueError) as exc:
+                logger.warning("Cannot store task %s in %s: %r",
+                               name, self.path, exc)
+            else:
+                header.setdefault(name, value)
+        record = self._diff(parts, subtask_chunks, state, self._new_parts())
+        record['snapshot'] = True
+        data = self._frame(header) + self._frame(record)
+
+        tmp_path = self.path.with_suffix(self.SUFFIX + '.tmp')
+        with tmp_path.open('wb') as f:
+            f.write(data)
+        os.replace(str(tmp_path), str(self.path))
+
+        self._written = parts
+        self._header_fields = header_fields
+        self._snapshot_size = len(data)
+        self._journal_size = len(data)
+
+    # Parts of a task: pickled constructor and attributes of the task,
+    # chunks of large dict attributes, task state and chunks of subtask
+    # states. Changes are found by comparing pickles of the parts, which is
+    # much cheaper than encoding them. Records store the same parts, but
+    # with states encoded as CBOR.
+
+    @classmethod
+    def _get_header_fields(cls, state):
+        return {name: getattr(state, name) for name in cls.HEADER_FIELDS}
+
+    @staticmethod
+    def _new_parts():
+        return dict(constructor=None, attrs={}, dicts={}, state=None,
+                    subtasks=[])
+
+    def _task_parts(self, task, state, subtask_ids=None):
+        """ Pickle parts of the task
+        :param subtask_ids: ids of subtasks changed since the last dump,
+        None if all parts should be pickled
+        :return (dict, list): pickled parts and chunks of subtask states
+        """
+        if self._written is None:
+            subtask_ids = None
+        subtask_ids = None if subtask_ids is None else set(subtask_ids)
+        old_cache, self._chunk_cache = self._chunk_cache, dict()
+        subtask_states = state.subtask_states
+
+        def pickle_chunks(name, chunks, keyed_by_subtask):
+            return self._pickle_chunks(
+                name, chunks, old_cache.get(name) if subtask_ids is not None
+                else None, subtask_ids, keyed_by_subtask)
+
+        parts = self._new_parts()
+        reduced = task.__reduce_ex__(self.PICKLE_PROTOCOL)
+        attributes = reduced[2] if len(reduced) > 2 else None
+
+        if any(reduced[3:]) or not isinstance(attributes, (dict, type(None))):
+            # state that cannot be split into attributes
+            parts['constructor'] = self._pickle(task)
+            attributes = None
+        else:
+            parts['constructor'] = self._pickle(reduced[:2])
+
+        for name, value in (attributes or {}).items():
+            if isinstance(value, dict) and len(value) > self.CHUNK_SIZE:
+                parts['dicts'][name] = pickle_chunks(
+                    name, self._chunks(value),
+                    all(key in subtask_states for key in value))
+            else:
+                parts['attrs'][name] = self._pickle(value)
+
+        fields = dict(vars(state))
+        del fields['subtask_states']
+        parts['state'] = self._pickle(fields)
+
+        subtask_chunks = self._chunks(subtask_states)
+        parts['subtasks'] = pickle_chunks(self.SUBTASKS, subtask_chunks, True)
+        return parts, subtask_chunks
+
+    def _pickle_chunks(self, name, chunks, old_cache, subtask_ids,
+                       keyed_by_subtask):
+        """ Pickle chunks of dict items, reusing pickles of the last dump
+        for chunks which have not changed
+        :param old_cache: cache of chunks of the last dump, None if nothing
+        should be reused
+        :param keyed_by_subtask: True if the dict is keyed by subtask ids
+        :return list: pickled chunks
+        """
+        old_cache = old_cache or []
+        cache = []
+        for index, chunk in enumerate(chunks):
+            keys = [key for key, _ in chunk]
+            # types are compared too, since e.g. 1 == 1.0 == True
+            values = [(type(value), value) for _, value in chunk]
+            if not all(isinstance(value, self.IMMUTABLE_TYPES)
+                       for _, value in values):
+                values = None
+
+            old = old_cache[index] if index < len(old_cache) else None
+            if old is not None and old[0] == keys and (
+                    values is not None and old[1] == values or
+                    values is None and keyed_by_subtask and
+                    subtask_ids.isdisjoint(keys)):
+                blob = old[2]
+            else:
+                blob = self._pickle(chunk)
+            cache.append((keys, values, blob))
+
+        self._chunk_cache[name] = cache
+        return [blob for _, _, blob in cache]
+
+    def _build_task(self, stored):
+        constructor = pickle.loads(stored['constructor'])
+        if not isinstance(constructor, tuple):
+            return constructor
+
+        attributes = {name: pickle.loads(blob)
+                      for name, blob in stored['attrs'].items()}
+        for name, chunks in stored['dicts'].items():
+            attributes[name] = dict(chain.from_iterable(
+                pickle.loads(blob) for blob in chunks))
+
+        func, args = constructor
+        task = func(*args)
+        if hasattr(task, '__setstate__'):
+            task.__setstate__(attributes)
+        else:
+            task.__dict__.update(attributes)
+        return task
+
+    def _build_state(self, stored):
+        state = TaskState()
+        state.__dict__.update(self._decode(stored['state']))
+
+        for chunk in stored['subtasks']:
+            for subtask_id, data in cbor2.loads(chunk):
+                fields = self._decode(data)
+                computer = ComputerState()
+                computer.__dict__.update(fields.pop('computer'))
+
+                subtask_state = SubtaskState()
+                subtask_state.__dict__.update(fields)
+                subtask_state.computer = computer
+                state.subtask_states[subtask_id] = subtask_state
+
+        return state
+
+    # Records
+
+    def _diff(self, parts, subtask_chunks, state, old):
+        """ Build a record with the parts changed since the old ones """
+        record = dict()
+
+        if parts['constructor'] != old['constructor']:
+            record['constructor'] = parts['constructor']
+
+        attrs = {name: blob for name, blob in parts['attrs'].items()
+                 if old['attrs'].get(name) != blob}
+        if attrs:
+            record['attrs'] = attrs
+
+        dicts = dict()
+        for name, chunks in parts['dicts'].items():
+            changed = self._changed_chunks(chunks, old['dicts'].get(name))
+            if changed is not None:
+                dicts[name] = [len(chunks), changed]
+        if dicts:
+            record['dicts'] = dicts
+
+        removed = [name for name in list(old['attrs']) + list(old['dicts'])
+                   if name not in parts['attrs'] and name not in parts['dicts']]
+        if removed:
+            record['removed'] = removed
+
+        if parts['state'] != old['state']:
+            fields = dict(vars(state))
+            del fields['subtask_states']
+            record['state'] = self._encode(fields)
+
+        changed = self._changed_chunks(parts['subtasks'], old['subtasks'])
+        if changed is not None:
+            record['subtasks'] = [len(parts['subtasks']), {
+                index: self._encode_subtasks(subtask_chunks[index])
+                for index in changed
+            }]
+
+        return record
+
+    @staticmethod
+    def _changed_chunks(chunks, old_chunks):
+        """ Changed chunks by index, None if nothing has changed """
+        if old_chunks is None:
+            return dict(enumerate(chunks))
+        changed = {index: blob for index, blob in enumerate(chunks)
+                   if index >= len(old_chunks) or old_chunks[index] != blob}
+        if changed or len(chunks) != len(old_chunks):
+            return changed
+        return None
+
+    @staticmethod
+    def _apply(stored, record):
+        if record.get('snapshot'):
+            stored.update(TaskJournal._new_parts())
+
+        if 'constructor' in record:
+            stored['constructor'] = record['constructor']
+
+        for name, blob in record.get('attrs', {}).items():
+            stored['dicts'].pop(name, None)
+            stored['attrs'][name] = blob
+
+        for name, (length, changed) in record.get('dicts', {}).items():
+            stored['attrs'].pop(name, None)
+            chunks = stored['dicts'].setdefault(name, [])
+            TaskJournal._update_chunks(chunks, length, changed)
+
+        for name in record.get('removed', []):
+            stored['attrs'].pop(name, None)
+            stored['dicts'].pop(name, None)
+
+        if 'state' in record:
+            stored['state'] = record['state']
+
+        if 'subtasks' in record:
+            length, changed = record['subtasks']
+            TaskJournal._update_chunks(stored['subtasks'], length, changed)
+
+    @staticmethod
+    def _update_chunks(chunks, length, changed):
+        del chunks[length:]
+        chunks.extend([None] * (length - len(chunks)))
+        for index, chunk in changed.items():
+            chunks[index] = chunk
+
+    @classmethod
+    def _read_records(cls, data):
+        records = []
+        offset = 0
+        length_size = cls._length.size
+
+        while offset + length_size <= len(data):
+            (size,) = cls._length.unpack_from(data, offset)
+            end = offset + length_size + size
+            if end > len(data):
+                break
+            records.append(cbor2.loads(data[offset + length_size:end]))
+            offset = end
+
+        return records, offset
+
+    @classmethod
+    def _check_header(cls, header, path):
+        if not isinstance(header, dict) or 'version' not in header:
+            raise ValueError("Invalid journal header in {}".format(path))
+        if header['version'] > cls.VERSION:
+            raise ValueError("Unsupported journal version {} in {}"
+                             .format(header['version'], path))
+        return header
+
+    @classmethod
+    def _frame(cls, record):
+        data = cbor2.dumps(record)
+        return cls._length.pack(len(data)) + data
+
+    # Encoding
+
+    @classmethod
+    def _chunks(cls, items):
+        items = list(items.items())
+        return [items[i:i + cls.CHUNK_SIZE]
+                for i in range(0, len(items), cls.CHUNK_SIZE)]
+
+    @classmethod
+    def _pickle(cls, value):
+        return pickle.dumps(value, protocol=cls.PICKLE_PROTOCOL)
+
+    @classmethod
+    def _encode(cls, fields):
+        try:
+            return cbor2.dumps(fields)
+        except (cbor2.CBOREncodeError, TypeError, ValueError):
+            pass
+
+        encoded = dict()
+        for name, value in fields.items():
+            try:
+                cbor2.dumps(value)
+            except (cbor2.CBOREncodeError, TypeError, ValueError):
+                value = cbor2.CBORTag(cls.PICKLE_TAG, cls._pickle(value))
+            encoded[name] = value
+        return cbor2.dumps(encoded)
+
+    @classmethod
+    def _encode_subtasks(cls, chunk):
+        encoded = []
+        for subtask_id, subtask_state in chunk:
+            fields = dict(vars(subtask_state))
+            fields['computer'] = dict(vars(subtask_state.computer))
+            encoded.append([subtask_id, cls._encode(fields)])
+        return cbor2.dumps(encoded)
+
+    @classmethod
+    def _decode(cls, data):
+        fields = cbor2.loads(data)
+        for name, value in fields.items():
+            if isinstance(value, cbor2.CBORTag) and \
+                    value.tag == cls.PICKLE_TAG:
+                fields[name] = pickle.loads(value.value)
+        return fields
+
+
+class SubtaskIndex(object):
+    """ Persists ids of tasks of subtasks, so that a subtask of a restored
+    task can be resolved without loading the task.
+
+    The index is a text file of "<subtask id> <task id>" lines appended when
+    a subtask is added and "<subtask id>" lines appended when it is removed.
+    It is compacted when loaded on startup.
+    """
+
+    FILENAME = 'subtasks.index'
+
+    def __init__(self, directory):
+        self.path = Path(directory) / self.FILENAME
+
+    def exists(self):
+        return self.path.exists()
+
+    def load(self, task_ids):
+        """ :param task_ids: ids of known tasks, entries of other tasks are
+        dropped
+        :return dict: subtask id -> task id
+        """
+        mapping = dict()
+        try:
+            with self.path.open() as f:
+                lines = f.readlines()
+        except OSError:
+            logger.exception('Cannot read subtask index: %s', self.path)
+            return mapping
+
+        for line in lines:
+            # an incomplete trailing line is ignored
+            if not line.endswith('\n'):
+                break
+            fields = line.split()
+            if len(fields) == 2 and fields[1] in task_ids:
+                mapping[fields[0]] = fields[1]
+            elif len(fields) == 1:
+                mapping.pop(fields[0], None)
+        return mapping
+
+    def write(self, mapping):
+        """ Replace the index with entries of mapping """
+        tmp_path = self.path.with_suffix('.tmp')
+        with tmp_path.open('w') as f:
+            f.writelines('{} {}\n'.format(subtask_id, task_id)
+                         for subtask_id, task_id in mapping.items())
+        os.replace(str(tmp_path), str(self.path))
+
+    def add(self, subtask_id, task_id):
+        self._append('{} {}\n'.format(subtask_id, task_id))
+
+    def remove(self, subtask_ids):
+        self._append(''.join('{}\n'.format(subtask_id)
+                             for subtask_id in subtask_ids))
+
+    def _append(self, lines):
+        with self.path.open('a') as f:
+            f.write(lines)
+
+
+class LazyDict(MutableMapping):
+    """ Dictionary of values loaded on first access. Keys of values that
+    have not been loaded yet are added with add_pending. When a pending key
+    is accessed, loader is called with it and should set its value (or
+    discard the key, if the value cannot be loaded).
+    """
+
+    def __init__(self, loader=None):
+        self._data = dict()
+        self._pending = dict()
+        self._loader = loader
+
+    def add_pending(self, key, info=None):
+        """ Add a key whose value will be loaded on first access
+        :param key:
+        :param info: information about the value available before loading
+        """
+        self._data.pop(key, None)
+        self._pending[key] = info
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def pending_info(self, key):
+        return self._pending.get(key)
+
+    def discard(self, key):
+        self._pending.pop(key, None)
+        self._data.pop(key, None)
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            self._loader(key)
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        if key in self._pending:
+            del self._pending[key]
+        else:
+            del self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data or key in self._pending
+
+    def __iter__(self):
+        return iter(list(self._data) + list(self._pending))
+
+    def __len__(self):
+        return len(self._data) + len(self._pending)
+
+    def __repr__(self):
+        return '<LazyDict: %r, pending: %r>' % (self._data,
+                                                list(self._pending))
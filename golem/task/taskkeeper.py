@@ -1,4 +1,6 @@
+import copy
 import golem_messages.message
+import hashlib
 import logging
 import math
 import pathlib
@@ -8,10 +10,11 @@ import time
 
 from typing import Optional
 import typing
-from collections import Counter
+from collections import Counter, OrderedDict
 from semantic_version import Version
 
 from golem.core import common
+from golem.core.deadlinequeue import DeadlineQueue
 from golem.core.variables import APP_VERSION
 from golem.environments.environment import SupportStatus, UnsupportReason
 from .taskbase import TaskHeader
@@ -30,6 +33,79 @@ def compute_subtask_value(price: int, computation_time: int):
     return (price * computation_time + 3599) // 3600
 
 
+def compute_header_digest(signature: Optional[bytes]) -> str:
+    """ Short digest of a signed task header used in task header gossip.
+    Header's signature changes whenever its content changes, so it's enough
+    to hash the signature.
+    """
+    return hashlib.sha256(signature or b'').hexdigest()[:16]
+
+
+class VerifiedHeadersCache(object):
+    """ Bounded LRU cache of task headers which signatures have been
+    verified. Headers are keyed by (task_id, signature); a header is
+    considered verified only if its content is equal to the cached one, so
+    headers gossiped again skip both encoding and signature verification.
+    """
+
+    MAX_ENTRIES = 10000
+    # Not signed keys of task header's dictionary representation
+    UNSIGNED_KEYS = ('last_checking', 'signature')
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.verification_time = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'verification_time': self.verification_time,
+            'avg_verification_time':
+                self.verification_time / self.misses if self.misses else 0.0,
+        }
+
+    def verify(self, th_dict_repr, verify_sig) -> bool:
+        """ Check whether task header's signature is valid
+        :param dict th_dict_repr: task header's dictionary representation
+        :param verify_sig: function verifying the signature of a task header
+                           given its dictionary representation
+        :return bool: True if the header has been verified before or
+                      verify_sig returned True
+        """
+        key = (th_dict_repr['task_id'], th_dict_repr['signature'])
+        content = {k: v for k, v in th_dict_repr.items()
+                   if k not in self.UNSIGNED_KEYS}
+
+        if self._entries.get(key) == content:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        start = time.perf_counter()
+        verified = verify_sig(th_dict_repr)
+        self.verification_time += time.perf_counter() - start
+
+        if verified:
+            self._entries[key] = copy.deepcopy(content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return verified
+
+
 class CompTaskInfo:
     def __init__(self, header: TaskHeader, price: int):
         self.header = header
@@ -73,6 +149,7 @@ class CompTaskKeeper:
         # information about tasks that this node wants to compute
         self.active_tasks = {}
         self.subtask_to_task = {}  # maps subtasks id to tasks id
+        self.deadlines = DeadlineQueue()  # active task ids by deadline
         if not tasks_path.is_dir():
             tasks_path.mkdir()
         self.dump_path = tasks_path / "comp_task_keeper.pickle"
@@ -105,6 +182,8 @@ class CompTaskKeeper:
                 return
         self.active_tasks.update(active_tasks)
         self.subtask_to_task.update(subtask_to_task)
+        for task_id, task in active_tasks.items():
+            self.deadlines.schedule(task_id, task.header.deadline)
 
     def add_request(self, theader: TaskHeader, price: int):
         logger.debug('CT.add_request()')
@@ -120,6 +199,7 @@ class CompTaskKeeper:
             self.active_tasks[task_id].requests += 1
         else:
             self.active_tasks[task_id] = CompTaskInfo(theader, price)
+            self.deadlines.schedule(task_id, theader.deadline)
         self.dump()
 
     @handle_key_error
@@ -171,17 +251,67 @@ class CompTaskKeeper:
         self.dump()
 
     def remove_old_tasks(self):
-        for task_id in frozenset(self.active_tasks):
-            deadline = self.active_tasks[task_id].header.deadline
-            delta = deadline - common.get_timestamp_utc()
-            if delta > 0:
-                continue
+        expired = self.deadlines.pop_expired(common.get_timestamp_utc())
+        for task_id in expired:
             logger.info("Removing comp_task after deadline: %s", task_id)
-            for subtask_id in self.active_tasks[task_id].subtasks:
+            for subtask_id in self.active_tasks.pop(task_id).subtasks:
                 del self.subtask_to_task[subtask_id]
-            del self.active_tasks[task_id]
 
-        self.dump()
+        if expired:
+            self.dump()
+
+
+class IndexedSet:
+    """ Set that keeps its items in a list, so that they can be accessed
+        by position. Adding, removing and sampling an item take O(1) time.
+        Removing an item moves the last item to its position.
+    """
+
+    def __init__(self, items=()):
+        self._items = []
+        self._positions = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if item not in self._positions:
+            self._positions[item] = len(self._items)
+            self._items.append(item)
+
+    def discard(self, item):
+        position = self._positions.pop(item, None)
+        if position is None:
+            return
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+    def remove(self, item):
+        if item not in self._positions:
+            raise KeyError(item)
+        self.discard(item)
+
+    def sample(self, k):
+        """ Return at most k random items """
+        if len(self._items) <= k:
+            return list(self._items)
+        return random.sample(self._items, k)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def __getitem__(self, position):
+        return self._items[position]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return '<IndexedSet: %r>' % (self._items,)
 
 
 class TaskHeaderKeeper:
@@ -191,6 +321,10 @@ class TaskHeaderKeeper:
        Provider uses Taskkeeper to find tasks for itself
     """
 
+    # number of random supported tasks weighted against each other
+    # when choosing a task to compute
+    selection_sample_size = 16
+
     def __init__(
             self,
             environments_manager,
@@ -203,14 +337,18 @@ class TaskHeaderKeeper:
         # all computing tasks that this node knows about
         self.task_headers = {}
         # ids of tasks that this node may try to compute
-        self.supported_tasks = []
+        self.supported_tasks = IndexedSet()
         # results of tasks' support checks
         self.support_status = {}
         # tasks that were removed from network recently, so they won't
-        # be added again to task_headers
-        self.removed_tasks = {}
+        # be added again to task_headers; ordered by removal time
+        self.removed_tasks = OrderedDict()
         # task ids by owner
         self.tasks_by_owner = {}
+        # task ids by environment
+        self.tasks_by_environment = {}
+        # task ids by header deadline
+        self.deadlines = DeadlineQueue()
 
         self.min_price = min_price
         self.app_version = app_version
@@ -358,14 +496,28 @@ class TaskHeaderKeeper:
         if config_desc.min_price == self.min_price:
             return
         self.min_price = config_desc.min_price
-        self.supported_tasks = []
-        for id_, th in self.task_headers.items():
-            supported = self.check_support(th.__dict__)
-            self.support_status[id_] = supported
-            if supported:
-                self.supported_tasks.append(id_)
-            if self.task_archiver:
-                self.task_archiver.add_support_status(id_, supported)
+        self.supported_tasks = IndexedSet()
+        for id_ in self.task_headers:
+            self._update_support(id_)
+
+    def update_environment_support(self, env_id):
+        """Check again which tasks computed in the given environment are
+           supported, e.g. after the environment has been enabled or
+           disabled.
+        :param str env_id: environment id
+        """
+        for id_ in list(self.tasks_by_environment.get(env_id, ())):
+            self._update_support(id_)
+
+    def _update_support(self, id_):
+        supported = self.check_support(self.task_headers[id_].__dict__)
+        self.support_status[id_] = supported
+        if supported:
+            self.supported_tasks.add(id_)
+        else:
+            self.supported_tasks.discard(id_)
+        if self.task_archiver:
+            self.task_archiver.add_support_status(id_, supported)
 
     def add_task_header(self, th_dict_repr):
         """This function will try to add to or update a task header
@@ -378,20 +530,20 @@ class TaskHeaderKeeper:
         """
         try:
             id_ = th_dict_repr["task_id"]
-            update = id_ in list(self.task_headers.keys())
+            update = id_ in self.task_headers
 
             self.check_correct(th_dict_repr)
 
-            if id_ in list(self.removed_tasks.keys()):  # recent
+            if id_ in self.removed_tasks:  # recent
                 logger.info("Received a task which has been already "
                             "cancelled/removed/timeout/banned/etc "
                             "Task id %s .", id_)
                 return True
 
             th = TaskHeader.from_dict(th_dict_repr)
+            old_th = self.task_headers.get(id_)
             self.task_headers[id_] = th
-
-            self._get_tasks_by_owner_set(th.task_owner_key_id).add(id_)
+            self._index_task_header(th, old_th)
 
             self.update_supported_set(th_dict_repr, update)
 
@@ -415,14 +567,14 @@ class TaskHeaderKeeper:
 
         if update_header:
             if not support and id_ in self.supported_tasks:
-                self.supported_tasks.remove(id_)
+                self.supported_tasks.discard(id_)
         elif support:
             logger.info(
                 "Adding task %r support=%r",
                 id_,
                 support
             )
-            self.supported_tasks.append(id_)
+            self.supported_tasks.add(id_)
 
     def check_correct(self, th_dict_repr):
         is_correct, err = self.is_correct(th_dict_repr)
@@ -435,6 +587,24 @@ class TaskHeaderKeeper:
 
         return self.tasks_by_owner[owner_key_id]
 
+    def _index_task_header(self, th, old_th=None):
+        if old_th is not None:
+            self._unindex_task_header(old_th)
+        self._get_tasks_by_owner_set(th.task_owner_key_id).add(th.task_id)
+        self.tasks_by_environment.setdefault(th.environment, set()) \
+            .add(th.task_id)
+        self.deadlines.schedule(th.task_id, th.deadline)
+
+    def _unindex_task_header(self, th):
+        for index, key in [(self.tasks_by_owner, th.task_owner_key_id),
+                           (self.tasks_by_environment, th.environment)]:
+            task_ids = index.get(key)
+            if task_ids is None:
+                continue
+            task_ids.discard(th.task_id)
+            if not task_ids:
+                del index[key]
+
     def check_max_tasks_per_owner(self, owner_key_id):
         owner_task_set = self._get_tasks_by_owner_set(owner_key_id)
 
@@ -457,39 +627,79 @@ class TaskHeaderKeeper:
     def remove_task_header(self, task_id):
         """ Removes task with given id from a list of known task headers.
         """
-        if task_id in self.task_headers:
-            owner_key_id = self.task_headers[task_id].task_owner_key_id
-            del self.task_headers[task_id]
-            if owner_key_id in self.tasks_by_owner:
-                self.tasks_by_owner[owner_key_id].discard(task_id)
-        if task_id in self.supported_tasks:
-            self.supported_tasks.remove(task_id)
+        th = self.task_headers.pop(task_id, None)
+        if th is not None:
+            self._unindex_task_header(th)
+        self.deadlines.cancel(task_id)
+        self.supported_tasks.discard(task_id)
         if task_id in self.support_status:
             del self.support_status[task_id]
+        self.removed_tasks.pop(task_id, None)
         self.removed_tasks[task_id] = time.time()
 
-    def get_task(self) -> TaskHeader:
-        """ Returns random task from supported tasks that may be computed
+    def get_task(self, requestor_trust=None, performance=None) \
+            -> Optional[TaskHeader]:
+        """ Returns random task from supported tasks that may be computed.
+        The task is drawn from a random sample of at most
+        selection_sample_size supported tasks with probability proportional
+        to its weight (see get_task_weight).
+        :param requestor_trust: function returning trust in a requestor
+                                with given key id
+        :param performance: function returning performance of this node
+                            in an environment with given id
         :return TaskHeader|None: returns either None if there are no tasks
                                  that this node may want to compute
         """
-        if self.supported_tasks:
-            tn = random.randrange(0, len(self.supported_tasks))
-            task_id = self.supported_tasks[tn]
-            return self.task_headers[task_id]
+        if not self.supported_tasks:
+            return None
+
+        sample = self.supported_tasks.sample(self.selection_sample_size)
+        headers = [self.task_headers[task_id] for task_id in sample]
+        weights = [self.get_task_weight(th, requestor_trust, performance)
+                   for th in headers]
+
+        point = random.uniform(0, sum(weights))
+        for th, weight in zip(headers, weights):
+            if point < weight:
+                return th
+            point -= weight
+        return random.choice(headers)
+
+    @staticmethod
+    def get_task_weight(th, requestor_trust=None, performance=None):
+        """ Weight of a task in random task selection. It is proportional
+        to task's max price, this node's performance in task's environment
+        and to trust in task's owner (from 0 for trust -1 to 2 for trust 1).
+        :param TaskHeader th: task header
+        :param requestor_trust: function returning trust in a requestor
+                                with given key id or None
+        :param performance: function returning performance of this node
+                            in an environment with given id or None
+        :return float: non-negative weight
+        """
+        weight = max(th.max_price, 0) + 1.0
+        if requestor_trust is not None:
+            trust = requestor_trust(th.task_owner_key_id) or 0.0
+            weight *= 1.0 + max(-1.0, min(trust, 1.0))
+        if performance is not None:
+            weight *= max(performance(th.environment) or 0.0, 0.0)
+        return weight
 
     def remove_old_tasks(self):
-        for t in list(self.task_headers.values()):
-            cur_time = common.get_timestamp_utc()
-            if cur_time > t.deadline:
-                logger.warning("Task owned by %s dies, task_id: %s",
-                               t.task_owner_key_id, t.task_id)
-                self.remove_task_header(t.task_id)
-
-        for task_id, remove_time in list(self.removed_tasks.items()):
-            cur_time = time.time()
-            if cur_time - remove_time > self.removed_task_timeout:
-                del self.removed_tasks[task_id]
+        cur_time = common.get_timestamp_utc()
+        for task_id in self.deadlines.pop_expired(cur_time):
+            th = self.task_headers[task_id]
+            logger.warning("Task owned by %s dies, task_id: %s",
+                           th.task_owner_key_id, th.task_id)
+            self.remove_task_header(th.task_id)
+
+        cur_time = time.time()
+        while self.removed_tasks:
+            task_id = next(iter(self.removed_tasks))
+            if cur_time - self.removed_tasks[task_id] <= \
+                    self.removed_task_timeout:
+                break
+            del self.removed_tasks[task_id]
 
     def request_failure(self, task_id):
         self.remove_task_header(task_id)
@@ -1,4 +1,5 @@
 from golem_messages.message import ComputeTaskDef
+import functools
 import logging
 import pickle
 import time
@@ -9,6 +10,7 @@ from pydispatch import dispatcher
 from apps.appsmanager import AppsManager
 from golem.core.common import HandleKeyError, get_timestamp_utc, \
     timeout_to_deadline, to_unicode, update_dict
+from golem.core.deadlinequeue import DeadlineQueue
 from golem.manager.nodestatesnapshot import LocalTaskStateSnapshot
 from golem.network.transport.tcpnetwork import SocketAddress
 from golem.resource.dirmanager import DirManager
@@ -16,11 +18,14 @@ from golem.resource.hyperdrive.resourcesmanager import HyperdriveResourceManager
 from golem.task.result.resultmanager import EncryptedResultPackageManager
 from golem.task.taskbase import TaskEventListener, Task, \
     ResourceType
+from golem.task.taskfeed import TaskUpdateFeed
 
+from golem.task.taskjournal import LazyDict, SubtaskIndex, TaskJournal
 from golem.task.taskkeeper import CompTaskKeeper, compute_subtask_value
 
 from golem.task.taskstate import TaskState, TaskStatus, SubtaskStatus, \
     SubtaskState
+from golem.task.verificationqueue import VerificationQueue
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +47,8 @@ subtask_priority = {
     SubtaskStatus.resent: 2,
     SubtaskStatus.starting: 3,
     SubtaskStatus.downloading: 4,
-    SubtaskStatus.finished: 5
+    SubtaskStatus.verifying: 5,
+    SubtaskStatus.finished: 6
 }
 
 
@@ -56,7 +62,8 @@ class TaskManager(TaskEventListener):
     def __init__(
             self, node_name, node, keys_auth, listen_address="",
             listen_port=0, root_path="res", use_distributed_resources=True,
-            tasks_dir="tasks", task_persistence=True):
+            tasks_dir="tasks", task_persistence=True,
+            verification_workers=VerificationQueue.MAX_WORKERS):
         super().__init__()
 
         self.apps_manager = AppsManager()
@@ -71,9 +78,11 @@ class TaskManager(TaskEventListener):
         self.keys_auth = keys_auth
         self.key_id = keys_auth.get_key_id()
 
-        self.tasks = {}  # type: Dict[str, Task]
-        self.tasks_states = {}  # type: Dict[str, TaskState]
-        self.subtask2task_mapping = {}  # type: Dict[str, str]
+        # restored tasks are loaded from their journals on first access
+        self.tasks = LazyDict(self._load_task)  # type: Dict[str, Task]
+        self.tasks_states = LazyDict(self._load_task)  # type: Dict[str, TaskState]  # noqa
+        self.subtask2task_mapping = dict()  # type: Dict[str, str]
+        self._journals = {}  # type: Dict[str, TaskJournal]
 
         self.listen_address = listen_address
         self.listen_port = listen_port
@@ -84,6 +93,7 @@ class TaskManager(TaskEventListener):
         self.tasks_dir = tasks_dir / "tmanager"
         if not self.tasks_dir.is_dir():
             self.tasks_dir.mkdir(parents=True)
+        self.subtask_index = SubtaskIndex(self.tasks_dir)
         self.root_path = root_path
         self.dir_manager = DirManager(self.get_task_manager_root())
 
@@ -103,6 +113,18 @@ class TaskManager(TaskEventListener):
             tasks_dir,
             persist=self.task_persistence,
         )
+        self.verification_queue = VerificationQueue(
+            max_workers=verification_workers)
+
+        # ids of tasks and (task id, subtask id) of subtasks by deadline,
+        # see check_timeouts
+        self.task_deadlines = DeadlineQueue()
+        self.subtask_deadlines = DeadlineQueue()
+        # changes to task and subtask dicts, published over RPC
+        self.update_feed = TaskUpdateFeed(self)
+        # task_id -> ids of subtasks changed since the task was dumped,
+        # see notice_task_updated
+        self._changed_subtasks = dict()
 
         if self.task_persistence:
             self.restore_tasks()
@@ -164,6 +186,7 @@ class TaskManager(TaskEventListener):
 
         self.tasks[task_id] = task
         self.tasks_states[task_id] = ts
+        self._schedule_timeouts(task_id)
         self.notice_task_updated(task_id)
         logger.info("Task %s added", task_id)
 
@@ -176,32 +199,87 @@ class TaskManager(TaskEventListener):
                                .format(task_id))
 
         task_state.status = TaskStatus.waiting
+        self._schedule_timeouts(task_id)
         self.notice_task_updated(task_id)
         logger.info("Task %s started", task_id)
 
     def _dump_filepath(self, task_id):
-        return self.tasks_dir / ('%s.pickle' % (task_id,))
+        return self.tasks_dir / ('%s%s' % (task_id, TaskJournal.SUFFIX))
 
-    def dump_task(self, task_id: str) -> None:
+    def _journal(self, task_id):
+        if task_id not in self._journals:
+            self._journals[task_id] = TaskJournal(self._dump_filepath(task_id))
+        return self._journals[task_id]
+
+    def dump_task(self, task_id: str, only_subtasks: bool = False) -> None:
+        """ :param only_subtasks: if True, only subtasks marked as changed
+        (see _subtask_changed) and task attributes which are not specific
+        to subtasks have changed since the last dump """
         logger.debug('DUMP TASK %r', task_id)
+        journal = self._journal(task_id)
+        changed_subtasks = self._changed_subtasks.pop(task_id, set())
         try:
-            data = self.tasks[task_id], self.tasks_states[task_id]
-            filepath = self._dump_filepath(task_id)
-            logger.debug('DUMPING TASK %r', filepath)
-            with filepath.open('wb') as f:
-                pickle.dump(data, f, protocol=2)
-            logger.debug('TASK %s DUMPED in %r', task_id, filepath)
-        except Exception as e:
+            task, state = self.tasks[task_id], self.tasks_states[task_id]
+            logger.debug('DUMPING TASK %r', journal.path)
+            journal.dump(task, state,
+                         functools.partial(self._journal_header_info, task_id),
+                         changed_subtasks if only_subtasks else None)
+            logger.debug('TASK %s DUMPED in %r', task_id, journal.path)
+        except Exception:
             logger.exception(
                 'DUMP ERROR task_id: %r task: %r state: %r',
                 task_id, self.tasks.get(task_id, '<not found>'),
                 self.tasks_states.get(task_id, '<not found>'),
             )
-            if filepath.exists():
-                filepath.unlink()
+            self._journals.pop(task_id, None)
+            if journal.path.exists():
+                journal.path.unlink()
             raise
 
+    def _journal_header_info(self, task_id: str) -> dict:
+        """ Information stored in the header of the task's journal, so that
+        it is available before a restored task is loaded """
+        task = self.tasks[task_id]
+        info = dict(resources=task.get_resources(None, ResourceType.HASHES))
+        try:
+            info['task_dict'] = self.get_task_dict(task_id)
+        except Exception:  # pylint: disable=broad-except
+            logger.debug('Cannot build dict of task %r', task_id,
+                         exc_info=True)
+        return info
+
+    def is_task_loaded(self, task_id: str) -> bool:
+        """ False for restored tasks which have not been loaded yet """
+        return not self.tasks.is_pending(task_id)
+
+    def get_active_tasks_resources(self):
+        """ Resources of active tasks. Resources of restored tasks which have
+        not been loaded yet are read from journal headers if possible.
+        :return list: (task id, resource files, resource hash)
+        """
+        resources = []
+        for task_id in list(self.tasks):
+            if self.tasks.is_pending(task_id):
+                header = self.tasks.pending_info(task_id)
+                if header['status'] not in self.activeStatus:
+                    continue
+                if 'resources' in header:
+                    resources.append((task_id, header['resources'],
+                                      header.get('resource_hash')))
+                    continue
+            task_state = self.tasks_states.get(task_id)
+            if task_state is None \
+                    or task_state.status not in self.activeStatus:
+                continue
+            task = self.tasks[task_id]
+            resources.append((task_id,
+                              task.get_resources(None, ResourceType.HASHES),
+                              task_state.resource_hash))
+        return resources
+
     def remove_dump(self, task_id: str):
+        self._journals.pop(task_id, None)
+        self._changed_subtasks.pop(task_id, None)
         filepath = self._dump_filepath(task_id)
         try:
             filepath.unlink()
@@ -211,36 +289,116 @@ class TaskManager(TaskEventListener):
             logger.warning("Couldn't remove dump file: %s - %s", filepath, e)
 
     def restore_tasks(self) -> None:
+        """ Find dumped tasks. Only headers of the journals and the subtask
+        index are read here, tasks are loaded when they are accessed for the
+        first time.
+        """
         logger.debug('SEARCHING FOR TASKS TO RESTORE')
-        for path in self.tasks_dir.iterdir():
-            if not path.suffix == '.pickle':
+        index_exists = self.subtask_index.exists()
+        for path in list(self.tasks_dir.iterdir()):
+            if path.suffix == '.pickle':
+                path = self._migrate_pickle_dump(path)
+            if path is None or not path.suffix == TaskJournal.SUFFIX:
                 continue
             logger.debug('RESTORE TASKS %r', path)
 
-            task_id = None
+            try:
+                header = TaskJournal.read_header(path)
+            except (ValueError, EOFError, OSError):
+                logger.exception('Problem restoring task from: %s', path)
+                path.unlink()
+                continue
+
+            task_id = header['task_id']
+            self.tasks.add_pending(task_id, header)
+            self.tasks_states.add_pending(task_id, header)
+            if header['status'] in self.activeStatus:
+                # Loaded and scheduled by the next check_timeouts
+                self.task_deadlines.schedule(task_id, 0.0)
+
+            dispatcher.send(
+                signal='golem.taskmanager',
+                event='task_status_updated',
+                task_id=task_id
+            )
+
+        if index_exists:
+            mapping = self.subtask_index.load(set(self.tasks))
+        else:
+            # Tasks dumped before the index was introduced
+            self._load_pending_tasks()
+            mapping = dict(self.subtask2task_mapping)
+        self.subtask2task_mapping.update(mapping)
+        self.subtask_index.write(mapping)
+
+    def _load_task(self, task_id: str) -> None:
+        journal = self._journal(task_id)
+        try:
+            task, state = journal.load()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Problem restoring task from: %s', journal.path)
+            self.tasks.discard(task_id)
+            self.tasks_states.discard(task_id)
+            self.remove_dump(task_id)
+            return
+
+        task.register_listener(self)
+        self.tasks[task_id] = task
+        self.tasks_states[task_id] = state
+
+        # subtasks of tasks which have not been loaded are not in the feed
+        self.update_feed.mark_updated(task_id)
+        for sub in state.subtask_states.values():
+            self.subtask2task_mapping[sub.subtask_id] = task_id
+            # Verification was interrupted, let the subtask time out
+            if sub.subtask_status == SubtaskStatus.verifying:
+                sub.subtask_status = SubtaskStatus.downloading
+        self._schedule_timeouts(task_id)
+
+        logger.debug('TASK %s RESTORED from %r', task_id, journal.path)
+
+    def _load_pending_tasks(self) -> None:
+        for task_id in list(self.tasks):
+            if self.tasks.is_pending(task_id):
+                self._load_task(task_id)
+
+    def _migrate_pickle_dump(self, path):
+        """ Convert a task pickled by a previous version to a journal
+        :return Path|None: journal path or None if the task was not restored
+        """
+        try:
             with path.open('rb') as f:
-                try:
-                    task, state = pickle.load(f)
-                    task.register_listener(self)
-
-                    task_id = task.header.task_id
-                    self.tasks[task_id] = task
-                    self.tasks_states[task_id] = state
-
-                    for sub in state.subtask_states.values():
-                        self.subtask2task_mapping[sub.subtask_id] = task
-
-                    logger.debug('TASK %s RESTORED from %r', task_id, path)
-                except (pickle.UnpicklingError, EOFError, ImportError):
-                    logger.exception('Problem restoring task from: %s', path)
-                    path.unlink()
-
-            if task_id is not None:
-                dispatcher.send(
-                    signal='golem.taskmanager',
-                    event='task_status_updated',
-                    task_id=task_id
-                )
+                task, state = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, ImportError):
+            logger.exception('Problem restoring task from: %s', path)
+            path.unlink()
+            return None
+
+        task_id = task.header.task_id
+        journal = self._journal(task_id)
+        try:
+            journal.dump(task, state)
+        except Exception:  # pylint: disable=broad-except
+            # The pickled task is kept, conversion is retried on next start
+            logger.exception('Cannot convert task dump: %s', path)
+            self._journals.pop(task_id, None)
+            return None
+        path.unlink()
+        for sub in state.subtask_states.values():
+            self.subtask_index.add(sub.subtask_id, task_id)
+        return journal.path
+
+    def _task_ids(self, status_filter):
+        """ Ids of loaded tasks and of restored tasks whose dumped status
+        passes status_filter. Restored tasks with other statuses are not
+        loaded.
+        """
+        for task_id in list(self.tasks):
+            if self.tasks.is_pending(task_id) and status_filter(
+                    self.tasks.pending_info(task_id)['status']):
+                self._load_task(task_id)
+        return [task_id for task_id in self.tasks
+                if not self.tasks.is_pending(task_id)]
 
     @handle_task_key_error
     def resources_send(self, task_id):
@@ -342,15 +500,18 @@ class TaskManager(TaskEventListener):
         ctd['task_owner'] = task.header.task_owner
 
         self.subtask2task_mapping[ctd['subtask_id']] = task_id
+        if self.task_persistence:
+            self.subtask_index.add(ctd['subtask_id'], task_id)
         self.__add_subtask_to_tasks_states(
             node_name, node_id, price, ctd, address,
         )
-        self.notice_task_updated(task_id)
+        self.notice_task_updated(task_id, ctd['subtask_id'])
         return ctd, False, extra_data.should_wait
 
     def get_tasks_headers(self):
         ret = []
-        for tid, task in self.tasks.items():
+        for tid in self._task_ids(lambda s: s in self.activeStatus):
+            task = self.tasks[tid]
             status = self.tasks_states[tid].status
             if task.needs_computation() and status in self.activeStatus:
                 ret.append(task.header)
@@ -399,6 +560,7 @@ class TaskManager(TaskEventListener):
             logger.warning("This is not my subtask {}".format(subtask_id))
             return
         subtask_state.value = value
+        self._subtask_changed(task_id, subtask_id)
 
     @handle_subtask_key_error
     def get_value(self, subtask_id):
@@ -413,19 +575,87 @@ class TaskManager(TaskEventListener):
     @handle_subtask_key_error
     def computed_task_received(self, subtask_id, result, result_type):
         task_id = self.subtask2task_mapping[subtask_id]
+        if not self._results_expected(task_id, subtask_id):
+            return False
+
+        self.tasks[task_id].computation_finished(
+            subtask_id, result, result_type,
+        )
+        return self._results_checked(task_id, subtask_id)
+
+    def verify_computed_task(self, subtask_id, result, result_type,
+                             callback):
+        """ Same as computed_task_received, but results are verified in
+        the verification queue instead of the calling thread
+        :param callback: called in the reactor thread with True if results
+                         have been accepted and False otherwise
+        The subtask is marked as verifying until the verification is done,
+        so that results received again are rejected. If the subtask is
+        restarted or removed (e.g. by abort_task) in the meantime, the
+        outcome of the verification is dropped.
+        """
+        task_id = self.subtask2task_mapping.get(subtask_id)
+        task = self.tasks.get(task_id) if task_id else None
+        if task is None:
+            log_subtask_key_error(self, subtask_id)
+            callback(False)
+            return
+        if not self._results_expected(task_id, subtask_id):
+            callback(False)
+            return
+        subtask_state = self.tasks_states[task_id].subtask_states[subtask_id]
+        subtask_state.subtask_status = SubtaskStatus.verifying
+        self.notice_task_updated(task_id, subtask_id)
+
+        def verified(verification):
+            if not self._verification_pending(task_id, subtask_id):
+                callback(False)
+                return
+            task.results_verified(subtask_id, result, result_type,
+                                  verification)
+            callback(self._results_checked(task_id, subtask_id))
+
+        def verification_failed(exc):
+            if self._verification_pending(task_id, subtask_id):
+                subtask_state.subtask_status = SubtaskStatus.downloading
+                self.task_computation_failure(
+                    subtask_id, "Result verification failed: {}".format(exc))
+            callback(False)
+
+        self.verification_queue.submit(
+            task_id,
+            functools.partial(task.verify_results, subtask_id, result,
+                              result_type),
+            verified,
+            verification_failed,
+            priority=task.get_progress() or 0.0,
+        )
 
+    def _results_expected(self, task_id, subtask_id):
         subtask_state = self.tasks_states[task_id].subtask_states[subtask_id]
         subtask_status = subtask_state.subtask_status
 
         if not SubtaskStatus.is_computed(subtask_status):
             logger.warning("Result for subtask {} when subtask state is {}"
                            .format(subtask_id, subtask_status))
-            self.notice_task_updated(task_id)
+            self.notice_task_updated(task_id, subtask_id)
             return False
+        return True
 
-        self.tasks[task_id].computation_finished(
-            subtask_id, result, result_type,
-        )
+    def _verification_pending(self, task_id, subtask_id):
+        """ :return bool: True if results of the subtask are still being
+        verified, False if the task or the subtask has changed since """
+        task_state = self.tasks_states.get(task_id)
+        subtask_state = task_state.subtask_states.get(subtask_id) \
+            if task_id in self.tasks and task_state else None
+        if subtask_state is None \
+                or subtask_state.subtask_status != SubtaskStatus.verifying:
+            logger.warning("Subtask %r of task %r changed during "
+                           "verification", subtask_id, task_id)
+            return False
+        return True
+
+    def _results_checked(self, task_id, subtask_id):
         ss = self.tasks_states[task_id].subtask_states[subtask_id]
         ss.subtask_progress = 1.0
         ss.subtask_rem_time = 0.0
@@ -437,7 +667,7 @@ class TaskManager(TaskEventListener):
         if not self.tasks[task_id].verify_subtask(subtask_id):
             logger.debug("Subtask {} not accepted\n".format(subtask_id))
             ss.subtask_status = SubtaskStatus.failure
-            self.notice_task_updated(task_id)
+            self.notice_task_updated(task_id, subtask_id)
             return False
 
         if self.tasks_states[task_id].status in self.activeStatus:
@@ -449,7 +679,7 @@ class TaskManager(TaskEventListener):
                     self.tasks_states[task_id].status = TaskStatus.finished
                 else:
                     logger.debug("Task {} not accepted".format(task_id))
-        self.notice_task_updated(task_id)
+        self.notice_task_updated(task_id, subtask_id)
         return True
 
     @handle_subtask_key_error
@@ -462,7 +692,7 @@ class TaskManager(TaskEventListener):
         if not SubtaskStatus.is_computed(subtask_status):
             logger.warning("Result for subtask {} when subtask state is {}"
                            .format(subtask_id, subtask_status))
-            self.notice_task_updated(task_id)
+            self.notice_task_updated(task_id, subtask_id)
             return False
 
         self.tasks[task_id].computation_failed(subtask_id)
@@ -472,7 +702,7 @@ class TaskManager(TaskEventListener):
         ss.subtask_status = SubtaskStatus.failure
         ss.stderr = str(err)
 
-        self.notice_task_updated(task_id)
+        self.notice_task_updated(task_id, subtask_id)
         return True
 
     def task_result_incoming(self, subtask_id):
@@ -487,7 +717,7 @@ class TaskManager(TaskEventListener):
                 task.result_incoming(subtask_id)
                 states.subtask_status = SubtaskStatus.downloading
 
-                self.notify_update_task(task_id)
+                self.notice_task_updated(task_id, subtask_id)
             else:
                 logger.error("Unknown task id: {}".format(task_id))
         else:
@@ -496,32 +726,66 @@ class TaskManager(TaskEventListener):
 
     # CHANGE TO RETURN KEY_ID (check IF SUBTASK COMPUTER HAS KEY_ID
     def check_timeouts(self):
+        """ Mark active tasks and computed subtasks past their deadlines as
+        timed out. Only tasks and subtasks whose scheduled deadlines have
+        passed are checked, see _schedule_timeouts.
+        :return list: ids of nodes whose subtasks have timed out
+        """
         nodes_with_timeouts = []
-        for t in list(self.tasks.values()):
-            th = t.header
-            if self.tasks_states[th.task_id].status not in self.activeStatus:
+        cur_time = get_timestamp_utc()
+
+        timed_out = set()
+        for task_id in self.task_deadlines.pop_expired(cur_time):
+            if task_id not in self.tasks:
+                continue
+            th = self.tasks[task_id].header
+            if self.tasks_states[task_id].status not in self.activeStatus:
+                continue
+            if cur_time <= th.deadline:
+                self.task_deadlines.schedule(task_id, th.deadline)
+                continue
+            logger.info("Task {} dies".format(task_id))
+            self.tasks_states[task_id].status = TaskStatus.timeout
+            timed_out.add(task_id)
+            self.notice_task_updated(task_id)
+
+        for task_id, subtask_id in self.subtask_deadlines.pop_expired(cur_time):
+            ts = self.tasks_states.get(task_id)
+            if ts is None or (ts.status not in self.activeStatus
+                              and task_id not in timed_out):
+                continue
+            s = ts.subtask_states.get(subtask_id)
+            if s is None or not SubtaskStatus.is_computed(s.subtask_status):
                 continue
-            cur_time = get_timestamp_utc()
-            if cur_time > th.deadline:
-                logger.info("Task {} dies".format(th.task_id))
-                self.tasks_states[th.task_id].status = TaskStatus.timeout
-                self.notice_task_updated(th.task_id)
-            ts = self.tasks_states[th.task_id]
-            for s in list(ts.subtask_states.values()):
-                if SubtaskStatus.is_computed(s.subtask_status):
-                    if cur_time > s.deadline:
-                        logger.info("Subtask {} dies".format(s.subtask_id))
-                        s.subtask_status = SubtaskStatus.failure
-                        nodes_with_timeouts.append(s.computer.node_id)
-                        t.computation_failed(s.subtask_id)
-                        s.stderr = "[GOLEM] Timeout"
-                        self.notice_task_updated(th.task_id)
+            if cur_time <= s.deadline:
+                self.subtask_deadlines.schedule((task_id, subtask_id),
+                                                s.deadline)
+                continue
+            logger.info("Subtask {} dies".format(subtask_id))
+            s.subtask_status = SubtaskStatus.failure
+            nodes_with_timeouts.append(s.computer.node_id)
+            self.tasks[task_id].computation_failed(subtask_id)
+            s.stderr = "[GOLEM] Timeout"
+            self.notice_task_updated(task_id, subtask_id)
         return nodes_with_timeouts
 
+    def _schedule_timeouts(self, task_id):
+        """ (Re)schedule timeout checks of a task and its computed subtasks.
+        Has to be called whenever the task becomes active or its deadlines
+        change.
+        """
+        self.task_deadlines.schedule(task_id,
+                                     self.tasks[task_id].header.deadline)
+        for ss in self.tasks_states[task_id].subtask_states.values():
+            if SubtaskStatus.is_computed(ss.subtask_status):
+                self.subtask_deadlines.schedule((task_id, ss.subtask_id),
+                                                ss.deadline)
+
     def get_progresses(self):
         tasks_progresses = {}
 
-        for t in list(self.tasks.values()):
+        for task_id in self._task_ids(lambda s: s != TaskStatus.finished):
+            t = self.tasks[task_id]
             if t.get_progress() < 1.0:
                 ltss = LocalTaskStateSnapshot(
                     t.header.task_id,
@@ -556,6 +820,7 @@ class TaskManager(TaskEventListener):
                 ss.subtask_status = SubtaskStatus.restarted
 
         task.header.signature = self.sign_task_header(task.header)
+        self._schedule_timeouts(task_id)
 
         logger.info("Task %s restarted", task_id)
         self.notice_task_updated(task_id)
@@ -569,8 +834,9 @@ class TaskManager(TaskEventListener):
         subtask_state = task_state.subtask_states[subtask_id]
         subtask_state.subtask_status = SubtaskStatus.restarted
         subtask_state.stderr = "[GOLEM] Restarted"
+        self._schedule_timeouts(task_id)
 
-        self.notice_task_updated(task_id)
+        self.notice_task_updated(task_id, subtask_id)
 
     @handle_task_key_error
     def restart_frame_subtasks(self, task_id, frame):
@@ -594,9 +860,14 @@ class TaskManager(TaskEventListener):
     def abort_task(self, task_id):
         self.tasks[task_id].abort()
         self.tasks_states[task_id].status = TaskStatus.aborted
-        for sub in list(self.tasks_states[task_id].subtask_states.values()):
+        subtask_states = self.tasks_states[task_id].subtask_states
+        for sub in list(subtask_states.values()):
             del self.subtask2task_mapping[sub.subtask_id]
-        self.tasks_states[task_id].subtask_states.clear()
+            self.subtask_deadlines.cancel((task_id, sub.subtask_id))
+        if self.task_persistence and subtask_states:
+            self.subtask_index.remove(list(subtask_states))
+        subtask_states.clear()
+        self.task_deadlines.cancel(task_id)
 
         self.notice_task_updated(task_id)
 
@@ -606,9 +877,14 @@ class TaskManager(TaskEventListener):
 
     @handle_task_key_error
     def delete_task(self, task_id):
-        for sub in list(self.tasks_states[task_id].subtask_states.values()):
+        subtask_states = self.tasks_states[task_id].subtask_states
+        for sub in list(subtask_states.values()):
             del self.subtask2task_mapping[sub.subtask_id]
-        self.tasks_states[task_id].subtask_states.clear()
+            self.subtask_deadlines.cancel((task_id, sub.subtask_id))
+        if self.task_persistence and subtask_states:
+            self.subtask_index.remove(list(subtask_states))
+        subtask_states.clear()
+        self.task_deadlines.cancel(task_id)
 
         self.tasks[task_id].unregister_listener(self)
         del self.tasks[task_id]
@@ -647,9 +923,13 @@ class TaskManager(TaskEventListener):
         return [sub.subtask_id for sub in
                 list(self.tasks_states[task_id].subtask_states.values())]
 
-    def change_config(self, root_path, use_distributed_resource_management):
+    def change_config(self, root_path, use_distributed_resource_management,
+                      verification_workers=None):
         self.dir_manager = DirManager(root_path)
         self.use_distributed_resources = use_distributed_resource_management
+        if verification_workers:
+            self.verification_queue.change_config(
+                max_workers=verification_workers)
 
     @handle_task_key_error
     def change_timeouts(self, task_id, full_task_timeout, subtask_timeout):
@@ -658,11 +938,17 @@ class TaskManager(TaskEventListener):
         task.header.subtask_timeout = subtask_timeout
         task.full_task_timeout = full_task_timeout
         task.header.last_checking = time.time()
+        self._schedule_timeouts(task_id)
 
     def get_task_id(self, subtask_id):
         return self.subtask2task_mapping[subtask_id]
 
     def get_task_dict(self, task_id):
+        if self.tasks.is_pending(task_id):
+            # the dict stored when the task was dumped, see dump_task
+            task_dict = self.tasks.pending_info(task_id).get('task_dict')
+            if task_dict is not None:
+                return dict(task_dict)
         task = self.tasks[task_id]
         task_type_name = task.task_definition.task_type.lower()
         task_type = self.task_types[task_type_name]
@@ -776,15 +1062,27 @@ class TaskManager(TaskEventListener):
 
         (self.tasks_states[ctd['task_id']].
             subtask_states[ctd['subtask_id']]) = ss
+        self.subtask_deadlines.schedule((ctd['task_id'], ctd['subtask_id']),
+                                        ss.deadline)
+
+    def _subtask_changed(self, task_id, subtask_id):
+        """ Mark a subtask to be dumped with the next dump of its task """
+        if self.task_persistence:
+            self._changed_subtasks.setdefault(task_id, set()).add(subtask_id)
 
     def notify_update_task(self, task_id):
         self.notice_task_updated(task_id)
 
     @handle_task_key_error
-    def notice_task_updated(self, task_id):
+    def notice_task_updated(self, task_id, subtask_id=None):
+        """ :param subtask_id: id of the subtask which has changed, None if
+        the task may have changed otherwise (e.g. several subtasks have) """
+        self.update_feed.mark_updated(task_id)
         # self.save_state()
         if self.task_persistence:
-            self.dump_task(task_id)
+            if subtask_id is not None:
+                self._subtask_changed(task_id, subtask_id)
+            self.dump_task(task_id, only_subtasks=subtask_id is not None)
         dispatcher.send(
             signal='golem.taskmanager',
             event='task_status_updated',
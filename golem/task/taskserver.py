@@ -4,6 +4,7 @@ import datetime
 from typing import Iterable, Optional
 
 from golem_messages import message
+import functools
 import itertools
 import logging
 import os
@@ -22,11 +23,14 @@ from golem.network.transport.tcpserver import (
 from golem.ranking.helper.trust import Trust
 from golem.task.benchmarkmanager import BenchmarkManager
 from golem.task.deny import get_deny_set
-from golem.task.taskbase import TaskHeader, ResourceType
+from golem.task.dispatchlimiter import DispatchLimiter
+from golem.task.taskbase import TaskHeader
 from golem.task.taskconnectionshelper import TaskConnectionsHelper
 from golem.environments.environment import SupportStatus, UnsupportReason
-from .taskcomputer import TaskComputer
-from .taskkeeper import TaskHeaderKeeper
+from .taskcomputer import TaskComputer, get_subtask_budget
+from .taskkeeper import TaskHeaderKeeper, VerifiedHeadersCache, \
+    compute_header_digest
+from .sessionpool import TaskSessionPool
 from .taskmanager import TaskManager
 from .tasksession import TaskSession
 import weakref
@@ -68,14 +72,10 @@ class TaskResourcesMixin(object):
         if not self.task_manager.task_persistence:
             return
 
-        states = dict(self.task_manager.tasks_states)
-
-        for task_id, task_state in states.items():
-            task = self.task_manager.tasks[task_id]
-            files = task.get_resources(None, ResourceType.HASHES)
-
+        for task_id, files, resource_hash in \
+                self.task_manager.get_active_tasks_resources():
             logger.info("Restoring task '%s' resources", task_id)
-            self._restore_resources(files, task_id, task_state.resource_hash)
+            self._restore_resources(files, task_id, resource_hash)
 
     def _restore_resources(self,
                            files: Iterable[str],
@@ -85,7 +85,7 @@ class TaskResourcesMixin(object):
         resource_manager = self._get_resource_manager()
 
         try:
-            _, resource_hash = resource_manager.add_task(
+            _, new_resource_hash = resource_manager.add_task(
                 files, task_id, resource_hash=resource_hash, async=False)
         except ConnectionError as exc:
             self._restore_resources_error(task_id, exc)
@@ -94,9 +94,11 @@ class TaskResourcesMixin(object):
                 return self._restore_resources(files, task_id)
             self._restore_resources_error(task_id, exc)
         else:
-            task_state = self.task_manager.tasks_states[task_id]
-            task_state.resource_hash = resource_hash
-            self.task_manager.notify_update_task(task_id)
+            # a restored task is not loaded if its resources are unchanged
+            if new_resource_hash != resource_hash:
+                task_state = self.task_manager.tasks_states[task_id]
+                task_state.resource_hash = new_resource_hash
+                self.task_manager.notify_update_task(task_id)
 
     def _restore_resources_error(self, task_id, error):
         logger.error("Cannot restore task '%s' resources: %r", task_id, error)
@@ -156,6 +158,7 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
             client.environments_manager,
             min_price=config_desc.min_price,
             task_archiver=task_archiver)
+        self.verified_headers = VerifiedHeadersCache()
         self.task_manager = TaskManager(
             config_desc.node_name,
             self.node,
@@ -163,7 +166,8 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
             root_path=TaskServer.__get_task_manager_root(client.datadir),
             use_distributed_resources=config_desc.
             use_distributed_resource_management,
-            tasks_dir=os.path.join(client.datadir, 'tasks'))
+            tasks_dir=os.path.join(client.datadir, 'tasks'),
+            verification_workers=config_desc.verification_workers)
         benchmarks = self.task_manager.apps_manager.get_benchmarks()
         self.benchmark_manager = BenchmarkManager(config_desc.node_name, self,
                                                   client.datadir, benchmarks)
@@ -176,6 +180,9 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         self.task_connections_helper.task_server = self
         self.task_sessions = {}
         self.task_sessions_incoming = weakref.WeakSet()
+        self.session_pool = TaskSessionPool()
+        self.dispatch_limiter = DispatchLimiter(
+            config_desc.max_dispatch_connections)
 
         self.max_trust = 1.0
         self.min_trust = 0.0
@@ -227,6 +234,9 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
     def sync_network(self):
         super().sync_network(timeout=self.last_message_time_threshold)
         self._sync_pending()
+        # Results and failures are sent first, so that waiting payments and
+        # payment requests do not use up connections they could get
+        self.dispatch_limiter.reset(self._dispatch_connections())
         self.__send_waiting_results()
         self.send_waiting_payments()
         self.send_waiting_payment_requests()
@@ -235,6 +245,7 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         self._sync_forwarded_session_requests()
         self.__remove_old_tasks()
         self.__remove_old_sessions()
+        self.session_pool.remove_idle()
         self._remove_old_listenings()
         if next(tmp_cycler) == 0:
             logger.debug('TASK SERVER TASKS DUMP: %r', self.task_manager.tasks)
@@ -245,17 +256,26 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         return self.task_keeper.environments_manager.get_environment_by_id(
             env_id)
 
+    def get_environment_performance(self, env_id):
+        env = self.get_environment_by_id(env_id)
+        if env is not None:
+            return env.get_performance()
+        return 0.0
+
     # This method chooses random task from the network to compute on our machine
     def request_task(self):
-        theader = self.task_keeper.get_task()
+        # trust and performance are read from the database, query them once
+        theader = self.task_keeper.get_task(
+            requestor_trust=functools.lru_cache()(
+                self.client.get_requesting_trust),
+            performance=functools.lru_cache()(
+                self.get_environment_performance),
+        )
         if theader is None:
             return None
         try:
-            env = self.get_environment_by_id(theader.environment)
-            if env is not None:
-                performance = env.get_performance()
-            else:
-                performance = 0.0
+            performance = self.get_environment_performance(
+                theader.environment)
             supported = self.should_accept_requestor(theader.task_owner_key_id)
             if self.config_desc.min_price > theader.max_price:
                 supported = supported.join(SupportStatus.err({
@@ -266,6 +286,8 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
                                                           supported)
             else:
                 price = int(theader.max_price)
+                _, num_cores, max_memory_size = \
+                    get_subtask_budget(self.config_desc)
                 self.task_manager.add_comp_task_request(
                     theader=theader, price=price)
                 args = {
@@ -275,8 +297,8 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
                     'estimated_performance': performance,
                     'price': self.config_desc.min_price,
                     'max_resource_size': self.config_desc.max_resource_size,
-                    'max_memory_size': self.config_desc.max_memory_size,
-                    'num_cores': self.config_desc.num_cores
+                    'max_memory_size': max_memory_size,
+                    'num_cores': num_cores
                 }
                 self._add_pending_request(
                     TASK_CONN_TYPES['task_request'], theader.task_owner,
@@ -347,27 +369,49 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
             except Exception as exc:
                 logger.error("Error closing incoming session: %s", exc)
 
-    def get_tasks_headers(self):
+        self.session_pool.drop_all()
+
+    def get_tasks_headers(self, task_ids=None):
+        """ Return dict representations of known task headers
+        :param list task_ids: if given, only headers of these tasks are
+                              returned
+        :return list:
+        """
         ths_tk = self.task_keeper.get_all_tasks()
         ths_tm = self.task_manager.get_tasks_headers()
-        ret = [th.to_dict() for th in ths_tk + ths_tm]
+        ths = ths_tk + ths_tm
+        if task_ids is not None:
+            task_ids = set(task_ids)
+            ths = [th for th in ths if th.task_id in task_ids]
+        ret = [th.to_dict() for th in ths]
         return ret
 
+    def get_tasks_digests(self):
+        """ Return digests of known task headers
+        :return dict: task_id -> header digest
+        """
+        ths_tk = self.task_keeper.get_all_tasks()
+        ths_tm = self.task_manager.get_tasks_headers()
+        return {th.task_id: compute_header_digest(th.signature)
+                for th in ths_tk + ths_tm}
+
     def add_task_header(self, th_dict_repr):
         try:
+            task_id = th_dict_repr["task_id"]
+            key_id = th_dict_repr["task_owner_key_id"]
+
+            header = self.task_keeper.task_headers.get(task_id)
+            if header is not None \
+                    and th_dict_repr["signature"] == header.signature:
+                # Already known, no need to verify the signature again
+                return True
+
             if not self.verify_header_sig(th_dict_repr):
                 raise Exception("Invalid signature")
 
-            task_id = th_dict_repr["task_id"]
-            key_id = th_dict_repr["task_owner_key_id"]
             task_ids = list(self.task_manager.tasks.keys())
-            new_sig = True
 
-            if task_id in self.task_keeper.task_headers:
-                header = self.task_keeper.task_headers[task_id]
-                new_sig = th_dict_repr["signature"] != header.signature
-
-            if task_id not in task_ids and key_id != self.node.key and new_sig:
+            if task_id not in task_ids and key_id != self.node.key:
                 self.task_keeper.add_task_header(th_dict_repr)
 
             return True
@@ -376,6 +420,10 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
             return False
 
     def verify_header_sig(self, th_dict_repr):
+        return self.verified_headers.verify(th_dict_repr,
+                                            self._verify_header_sig)
+
+    def _verify_header_sig(self, th_dict_repr):
         _bin = TaskHeader.dict_to_binary(th_dict_repr)
         _sig = th_dict_repr["signature"]
         _key = th_dict_repr["task_owner_key_id"]
@@ -390,6 +438,7 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
     def remove_task_session(self, task_session):
         self.remove_pending_conn(task_session.conn_id)
         self.remove_responses(task_session.conn_id)
+        self.session_pool.remove(task_session)
 
         for tsk in list(self.task_sessions.keys()):
             if self.task_sessions[tsk] == task_session:
@@ -447,7 +496,10 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         self.last_message_time_threshold = config_desc.task_session_timeout
         self.task_manager.change_config(
             self.__get_task_manager_root(self.client.datadir),
-            config_desc.use_distributed_resource_management)
+            config_desc.use_distributed_resource_management,
+            config_desc.verification_workers)
+        self.dispatch_limiter.max_connections = \
+            config_desc.max_dispatch_connections
         self.task_computer.change_config(
             config_desc, run_benchmarks=run_benchmarks)
         self.task_keeper.change_config(config_desc)
@@ -592,6 +644,43 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         else:
             session.dropped()
 
+    def _add_pending_request(self, req_type, task_owner, port, key_id, args):
+        # Send the request through an open session with the node if possible
+        if self.active and req_type != TASK_CONN_TYPES['start_session']:
+            session = self.session_pool.get(
+                key_id or getattr(task_owner, 'key', None))
+            if session is not None:
+                logger.debug('Reusing task session with %r for %r',
+                             session.key_id, req_type)
+                self.conn_established_for_type[req_type](
+                    session, session.conn_id, **args)
+                return
+        super()._add_pending_request(req_type, task_owner, port, key_id, args)
+
+    def _dispatch(self, req_type, task_owner, port, key_id, args):
+        """ Send a waiting message through an idle pooled session with
+        the node or through a new connection, if DispatchLimiter allows it.
+        Several messages to the same node may be dispatched in one tick.
+        :return bool: whether the message has been dispatched
+        """
+        session = self.session_pool.get(key_id) if self.active else None
+        if session is not None:
+            self.conn_established_for_type[req_type](
+                session, session.conn_id, **args)
+            return True
+        if not self.dispatch_limiter.can_connect(key_id):
+            return False
+        self.dispatch_limiter.connecting(key_id)
+        self._add_pending_request(req_type=req_type, task_owner=task_owner,
+                                  port=port, key_id=key_id, args=args)
+        return True
+
+    def _dispatch_connections(self):
+        """ :return list: key ids of nodes to which waiting messages are being
+        sent through connections that are not established yet """
+        return [pc.key_id for pc in self.pending_connections.values()
+                if pc.type in DISPATCH_CONN_TYPES]
+
     def get_socket_addresses(self, node_info, port, key_id):
         if self.client.get_suggested_conn_reverse(key_id):
             return []
@@ -604,6 +693,7 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
 
     def quit(self):
         self.task_computer.quit()
+        self.task_manager.verification_queue.stop()
 
     def receive_subtask_computation_time(self, subtask_id, computation_time):
         self.task_manager.set_computation_time(subtask_id, computation_time)
@@ -731,6 +821,7 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
     def __connection_for_task_result_established(self, session, conn_id,
                                                  waiting_task_result):
         self.remove_forwarded_session_request(waiting_task_result.owner_key_id)
+        self.dispatch_limiter.succeeded(waiting_task_result.owner_key_id)
         session.key_id = waiting_task_result.owner_key_id
         session.conn_id = conn_id
         self._mark_connected(conn_id, session.address, session.port)
@@ -765,12 +856,14 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
     def __connection_for_task_failure_established(self, session, conn_id,
                                                   key_id, subtask_id, err_msg):
         self.remove_forwarded_session_request(key_id)
+        self.dispatch_limiter.succeeded(key_id)
         session.key_id = key_id
         session.conn_id = conn_id
         self._mark_connected(conn_id, session.address, session.port)
         self.task_sessions[subtask_id] = session
         session.send_hello()
         session.send_task_failure(subtask_id, err_msg)
+        session.end_exchange()
 
     def __connection_for_task_failure_failure(self, conn_id, key_id,
                                               subtask_id, err_msg):
@@ -899,16 +992,18 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         logger.info("Cannot connect to task {} owner".format(
             waiting_task_result.subtask_id))
 
-        waiting_task_result.lastSendingTrial = time.time()
-        waiting_task_result.delayTime = \
+        self.dispatch_limiter.failed(waiting_task_result.owner_key_id)
+        waiting_task_result.last_sending_trial = time.time()
+        waiting_task_result.delay_time = \
             self.config_desc.max_results_sending_delay
-        waiting_task_result.alreadySending = False
+        waiting_task_result.already_sending = False
         self.remove_pending_conn(conn_id)
         self.remove_responses(conn_id)
 
     def __connection_for_task_failure_final_failure(self, conn_id, key_id,
                                                     subtask_id, err_msg):
         logger.info("Cannot connect to task {} owner".format(subtask_id))
+        self.dispatch_limiter.failed(key_id)
         self.task_computer.session_timeout()
         self.remove_pending_conn(conn_id)
         self.remove_responses(conn_id)
@@ -933,6 +1028,7 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         # obj - Payment
         logger.debug('connection_for_payment_established(%r)', obj)
 
+        self.dispatch_limiter.succeeded(obj.get_sender_node().key)
         self.new_session_prepare(
             session=session,
             subtask_id=obj.subtask,
@@ -941,12 +1037,14 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         self._mark_connected(conn_id, session.address, session.port)
         session.send_hello()
         session.inform_worker_about_payment(obj)
+        session.end_exchange()
 
     def connection_for_payment_request_established(self, session, conn_id,
                                                    obj):
         # obj - ExpectedIncome
         logger.debug('connection_for_payment_request_established(%r)', obj)
 
+        self.dispatch_limiter.succeeded(obj.get_sender_node().key)
         self.new_session_prepare(
             session=session,
             subtask_id=obj.subtask,
@@ -955,6 +1053,12 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
         self._mark_connected(conn_id, session.address, session.port)
         session.send_hello()
         session.request_payment(obj)
+        session.end_exchange()
+
+    def connection_for_payment_final_failure(self, conn_id, obj):
+        # obj - Payment or ExpectedIncome
+        logger.debug('connection_for_payment_final_failure(%r)', obj)
+        self.dispatch_limiter.failed(obj.get_sender_node().key)
 
     def noop(self, *args, **kwargs):
         args_, kwargs_ = args, kwargs  # avoid params name collision in logger
@@ -1005,7 +1109,6 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
             if hasattr(elem, '_last_try') and (datetime.datetime.now() - elem._last_try) < datetime.timedelta(seconds=30):  # noqa
                 continue
             logger.debug('_send_waiting(): %r', elem)
-            elem._last_try = datetime.datetime.now()
             subtask_id = subtask_id_getter(elem)
             sessions = self._find_sessions(subtask_id)
 
@@ -1020,15 +1123,16 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
                     logger.debug('Invalid port in %r', elem)
                     elems_set.remove(elem)
                     continue
-                self._add_pending_request(
-                    req_type=req_type,
-                    task_owner=p2p_node,
-                    port=p2p_node.prv_port,
-                    key_id=None,
-                    args={
-                        'obj': elem
-                    })
-                return
+                if self._dispatch(
+                        req_type=req_type,
+                        task_owner=p2p_node,
+                        port=p2p_node.prv_port,
+                        key_id=p2p_node.key,
+                        args={
+                            'obj': elem
+                        }):
+                    elem._last_try = datetime.datetime.now()
+                continue
             for session in sessions:
                 if isinstance(session, weakref.ref):
                     session = session()
@@ -1062,17 +1166,18 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
 
             if not wtr.already_sending:
                 if now - wtr.last_sending_trial > wtr.delay_time:
-                    wtr.already_sending = True
-                    wtr.last_sending_trial = now
                     session = self.task_sessions.get(subtask_id, None)
                     if session:
                         self.__connection_for_task_result_established(
                             session, session.conn_id, wtr)
                     else:
                         args = {'waiting_task_result': wtr}
-                        self._add_pending_request(
-                            TASK_CONN_TYPES['task_result'], wtr.owner,
-                            wtr.owner_port, wtr.owner_key_id, args)
+                        if not self._dispatch(
+                                TASK_CONN_TYPES['task_result'], wtr.owner,
+                                wtr.owner_port, wtr.owner_key_id, args):
+                            continue
+                    wtr.already_sending = True
+                    wtr.last_sending_trial = now
 
         for subtask_id in list(self.failures_to_send.keys()):
             wtf = self.failures_to_send[subtask_id]
@@ -1088,11 +1193,11 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
                     'subtask_id': wtf.subtask_id,
                     'err_msg': wtf.err_msg
                 }
-                self._add_pending_request(TASK_CONN_TYPES['task_failure'],
-                                          wtf.owner, wtf.owner_port,
-                                          wtf.owner_key_id, args)
-
-        self.failures_to_send.clear()
+                if not self._dispatch(TASK_CONN_TYPES['task_failure'],
+                                      wtf.owner, wtf.owner_port,
+                                      wtf.owner_key_id, args):
+                    continue
+            del self.failures_to_send[subtask_id]
 
     def __connection_for_payment_failure(self, *args, **kwargs):
         if 'conn_id' in kwargs:
@@ -1155,9 +1260,9 @@ class TaskServer(PendingConnectionsServer, TaskResourcesMixin):
             TASK_CONN_TYPES['start_session']:
             self.__connection_for_start_session_final_failure,
             TASK_CONN_TYPES['payment']:
-            self.noop,
+            self.connection_for_payment_final_failure,
             TASK_CONN_TYPES['payment_request']:
-            self.noop,
+            self.connection_for_payment_final_failure,
         })
 
     def _set_listen_established(self):
@@ -1214,6 +1319,14 @@ TASK_CONN_TYPES = {
     'payment_request': 11,
 }
 
+# Connections opened to send waiting messages, limited by DispatchLimiter
+DISPATCH_CONN_TYPES = frozenset([
+    TASK_CONN_TYPES['task_result'],
+    TASK_CONN_TYPES['task_failure'],
+    TASK_CONN_TYPES['payment'],
+    TASK_CONN_TYPES['payment_request'],
+])
+
 
 class TaskListenTypes(object):
     StartSession = 1
@@ -1,4 +1,3 @@
-import functools
 import hashlib
 import logging
 import os
@@ -40,17 +39,6 @@ def call_task_computer_and_drop_after_attr_error(*args, **kwargs):
     args[0].dropped()
 
 
-def dropped_after():
-    def inner(f):
-        @functools.wraps(f)
-        def curry(self, *args, **kwargs):
-            result = f(self, *args, **kwargs)
-            self.dropped()
-            return result
-        return curry
-    return inner
-
-
 class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
                   history.IMessageHistoryProvider):
     """ Session for Golem task network """
@@ -82,6 +70,9 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
         # messages waiting to be send (because connection hasn't been
         # verified yet)
         self.msgs_to_send = []
+        # whether an exchange, which expects no answer, has ended before
+        # the connection was verified (see end_exchange)
+        self.exchange_ended = False
         # information about user that should be rewarded (or punished)
         # for the result
         self.result_owner = None
@@ -117,6 +108,20 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
             if self.key_id:
                 self.task_server.remove_resource_peer(self.task_id, self.key_id)
 
+    def release(self):
+        """ Finish the current exchange. Sessions kept in task server's
+        session pool stay open for next exchanges with the node, other ones
+        are dropped. """
+        if not self.task_server.session_pool.release(self):
+            self.dropped()
+
+    def end_exchange(self):
+        """ Finish the current exchange, which expects no answer. Unlike
+        release(), sessions outside the pool stay open; a session which is
+        not verified yet becomes idle once it is pooled. """
+        if not self.task_server.session_pool.release(self):
+            self.exchange_ended = True
+
     #######################
     # SafeSession methods #
     #######################
@@ -223,9 +228,10 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
         self.conn.producer = None
         self.dropped()
 
-    @dropped_after()
     def result_received(self, extra_data, decrypt=True):
-        """ Inform server about received result
+        """ Inform server about received result. Results are verified in
+        task manager's verification queue, session is released when they
+        have been accepted or rejected.
         :param dict extra_data: dictionary with information about
                                 received result
         :param bool decrypt: tells whether result decryption should
@@ -237,11 +243,13 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
 
         if not subtask_id:
             logger.error("No task_id value in extra_data for received data ")
+            self.release()
             return
 
         if result_type is None:
             logger.error("No information about result_type for received data ")
             self._reject_subtask_result(subtask_id)
+            self.release()
             return
 
         if result_type == ResultType.DATA:
@@ -252,19 +260,25 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
             except Exception as err:
                 logger.error("Can't load result data {}".format(err))
                 self._reject_subtask_result(subtask_id)
+                self.release()
                 return
 
-        self.task_manager.computed_task_received(
+        result_owner = self.result_owner
+
+        def verified(_accepted):
+            if self.task_manager.verify_subtask(subtask_id):
+                self.task_server.accept_result(subtask_id, result_owner)
+                self.send(message.SubtaskResultAccepted(subtask_id=subtask_id))
+            else:
+                self._reject_subtask_result(subtask_id)
+            self.release()
+
+        self.task_manager.verify_computed_task(
             subtask_id,
             result,
-            result_type
+            result_type,
+            verified,
         )
-        if not self.task_manager.verify_subtask(subtask_id):
-            self._reject_subtask_result(subtask_id)
-            return
-
-        self.task_server.accept_result(subtask_id, self.result_owner)
-        self.send(message.SubtaskResultAccepted(subtask_id=subtask_id))
 
     @log_error()
     def inform_worker_about_payment(self, payment):
@@ -415,6 +429,8 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
 
     def send_hello(self):
         """ Send first hello message, that should begin the communication """
+        if self.verified:
+            return
         self.send(
             message.Hello(
                 client_key_id=self.task_server.get_key_id(),
@@ -464,7 +480,7 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
                     reason=reasons.NotMyTask,
                 )
             )
-            self.dropped()
+            self.release()
         elif ctd:
             self.send(message.TaskToCompute(compute_task_def=ctd))
         elif wait:
@@ -476,7 +492,7 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
                     reason=reasons.NoMoreSubtasks,
                 )
             )
-            self.dropped()
+            self.release()
 
     @handle_attr_error_with_task_computer
     @history.provider_history
@@ -505,8 +521,9 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
 
     def _react_to_waiting_for_results(self, _):
         self.task_computer.session_closed()
-        if not self.msgs_to_send:
-            self.disconnect(message.Disconnect.REASON.NoMoreMessages)
+        if self.msgs_to_send or self.task_server.session_pool.release(self):
+            return
+        self.disconnect(message.Disconnect.REASON.NoMoreMessages)
 
     def _react_to_cannot_compute_task(self, msg):
         if self.task_manager.get_node_id_for_subtask(msg.subtask_id) == self.key_id:  # noqa
@@ -514,14 +531,14 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
                 msg.subtask_id,
                 'Task computation rejected: {}'.format(msg.reason)
             )
-        self.dropped()
+        self.release()
 
     @history.provider_history
     def _react_to_cannot_assign_task(self, msg):
         self.task_computer.task_request_rejected(msg.task_id, msg.reason)
         self.task_server.remove_task_header(msg.task_id)
         self.task_computer.session_closed()
-        self.dropped()
+        self.release()
 
     def _react_to_report_computed_task(self, msg):
         if msg.subtask_id in self.task_manager.subtask2task_mapping:
@@ -620,16 +637,16 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
     @history.provider_history
     def _react_to_subtask_result_accepted(self, msg):
         self.task_server.subtask_accepted(msg.subtask_id)
-        self.dropped()
+        self.release()
 
     @history.provider_history
     def _react_to_subtask_result_rejected(self, msg):
         self.task_server.subtask_rejected(msg.subtask_id)
-        self.dropped()
+        self.release()
 
     def _react_to_task_failure(self, msg):
         self.task_server.subtask_failure(msg.subtask_id, msg.err)
-        self.dropped()
+        self.release()
 
     def _react_to_delta_parts(self, msg):
         self.task_computer.wait_for_resources(self.task_id, msg.delta_header)
@@ -682,9 +699,13 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin,
         if self.rand_val == msg.rand_val:
             self.verified = True
             self.task_server.verified_conn(self.conn_id, )
+            self.task_server.session_pool.add(self)
             for msg in self.msgs_to_send:
                 self.send(msg)
             self.msgs_to_send = []
+            if self.exchange_ended:
+                self.exchange_ended = False
+                self.task_server.session_pool.release(self)
         else:
             self.disconnect(message.Disconnect.REASON.Unverified)
 
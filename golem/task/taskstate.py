@@ -91,6 +91,7 @@ class TaskStatus(object):
 class SubtaskStatus(object):
     starting = "Starting"
     downloading = "Downloading"
+    verifying = "Verifying"
     resent = "Failed - Resent"
     finished = "Finished"
     failure = "Failure"
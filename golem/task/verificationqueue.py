@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict
+
+from twisted.internet import threads
+from twisted.python.threadpool import ThreadPool
+
+__all__ = ['VerificationQueue']
+
+logger = logging.getLogger(__name__)
+
+
+class _Verification(object):
+
+    def __init__(self, task_id, verify, success, error):
+        self.task_id = task_id
+        self.verify = verify
+        self.success = success
+        self.error = error
+        self.queued = time.time()
+        self.duration = 0.0
+
+
+class VerificationQueue(object):
+    """ Runs verification of subtask results in a bounded pool of worker
+    threads, so that checking results (merging, rendering and comparing
+    images, running external verification tools) doesn't block the reactor.
+
+    Verifications of tasks with higher priority (e.g. nearly finished
+    tasks) are started first, the ones with equal priority in submission
+    order. At most max_per_task verifications of a single task run at the
+    same time, because task verificators keep per task state.
+
+    The queue should be used from the reactor thread only; success and error
+    callbacks are called in the reactor thread as well.
+    """
+
+    MAX_WORKERS = 2
+    MAX_PER_TASK = 1
+
+    def __init__(self, max_workers=MAX_WORKERS, max_per_task=MAX_PER_TASK,
+                 reactor=None, threadpool=None):
+        """
+        :param int max_workers: number of verifications run at the same time
+        :param int max_per_task: number of verifications of a single task
+                                 run at the same time
+        :param reactor: reactor that callbacks are called in, the global
+                        reactor by default
+        :param threadpool: pool of worker threads, created on first use
+                           by default
+        """
+        self.max_workers = max_workers
+        self.max_per_task = max_per_task
+        self._reactor = reactor
+        self._threadpool = threadpool
+
+        self._queue = []  # (-priority, seq, _Verification)
+        self._seq = itertools.count()
+        self._running = defaultdict(int)  # task id -> running verifications
+        self._running_total = 0
+
+        self.started = 0
+        self.verified = 0
+        self.failed = 0
+        self.max_wait_time = 0.0
+        self._wait_time = 0.0
+        self._verification_time = 0.0
+
+    def __len__(self):
+        return len(self._queue)
+
+    @property
+    def metrics(self):
+        done = self.verified + self.failed
+        return {
+            'queued': len(self._queue),
+            'running': self._running_total,
+            'verified': self.verified,
+            'failed': self.failed,
+            'avg_wait_time':
+                self._wait_time / self.started if self.started else 0.0,
+            'max_wait_time': self.max_wait_time,
+            'avg_verification_time':
+                self._verification_time / done if done else 0.0,
+        }
+
+    def submit(self, task_id, verify, success, error, priority=0.0):
+        """ Queue a verification
+        :param str task_id: task that verified results belong to
+        :param verify: function run in a worker thread
+        :param success: called with the result of verify
+        :param error: called with the exception raised by verify
+        :param float priority: verifications with higher priority start first
+        """
+        verification = _Verification(task_id, verify, success, error)
+        heapq.heappush(self._queue, (-priority, next(self._seq), verification))
+        self._dispatch()
+
+    def change_config(self, max_workers=None, max_per_task=None):
+        if max_workers is not None:
+            self.max_workers = max_workers
+            if isinstance(self._threadpool, ThreadPool):
+                self._threadpool.adjustPoolsize(maxthreads=max(max_workers, 1))
+        if max_per_task is not None:
+            self.max_per_task = max_per_task
+        self._dispatch()
+
+    def stop(self):
+        if isinstance(self._threadpool, ThreadPool) \
+                and self._threadpool.started:
+            self._threadpool.stop()
+
+    def _dispatch(self):
+        skipped = []
+        while self._queue and self._running_total < self.max_workers:
+            entry = heapq.heappop(self._queue)
+            verification = entry[2]
+            if self._running[verification.task_id] >= self.max_per_task:
+                skipped.append(entry)
+                continue
+            self._start(verification)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+    def _start(self, verification):
+        self._running[verification.task_id] += 1
+        self._running_total += 1
+        self.started += 1
+
+        wait_time = time.time() - verification.queued
+        self._wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+        deferred = threads.deferToThreadPool(self._get_reactor(),
+                                             self._get_threadpool(),
+                                             self._run, verification)
+        deferred.addCallbacks(self._verified, self._verification_failed,
+                              callbackArgs=(verification,),
+                              errbackArgs=(verification,))
+        deferred.addErrback(self._callback_failed, verification)
+
+    @staticmethod
+    def _run(verification):
+        start = time.time()
+        try:
+            return verification.verify()
+        finally:
+            verification.duration = time.time() - start
+
+    def _verified(self, result, verification):
+        self.verified += 1
+        self._finished(verification)
+        verification.success(result)
+
+    def _verification_failed(self, failure, verification):
+        self.failed += 1
+        self._finished(verification)
+        logger.warning("Verification of task %r results failed: %s",
+                       verification.task_id, failure.getErrorMessage())
+        verification.error(failure.value)
+
+    @staticmethod
+    def _callback_failed(failure, verification):
+        logger.error("Error in verification callback of task %r: %s",
+                     verification.task_id, failure.getTraceback())
+
+    def _finished(self, verification):
+        self._verification_time += verification.duration
+        self._running_total -= 1
+        self._running[verification.task_id] -= 1
+        if not self._running[verification.task_id]:
+            del self._running[verification.task_id]
+        self._dispatch()
+
+    def _get_reactor(self):
+        if self._reactor is None:
+            from twisted.internet import reactor
+            self._reactor = reactor
+        return self._reactor
+
+    def _get_threadpool(self):
+        if self._threadpool is None:
+            reactor = self._get_reactor()
+            self._threadpool = ThreadPool(minthreads=0,
+                                          maxthreads=max(self.max_workers, 1),
+                                          name="verification")
+            self._threadpool.start()
+            reactor.addSystemEventTrigger('during', 'shutdown', self.stop)
+        return self._threadpool
@@ -15,6 +15,9 @@ class IncomesKeeper(object):
     """Keeps information about payments received from other nodes
     """
 
+    # Expected incomes asked for payment in a single run
+    REQUEST_LIMIT = 50
+
     def start(self):
         pass
 
@@ -22,32 +25,48 @@ class IncomesKeeper(object):
         pass
 
     def run_once(self):
-        delta = datetime.datetime.now() - datetime.timedelta(minutes=10)
+        """ Remove expected incomes which have been paid and ask for the
+        remaining ones, if they have not been asked for in the last 10 minutes.
+        Both are done with set-based queries, so that the cost of a run does
+        not depend on the number of incomes received in the past.
+        """
+        now = datetime.datetime.now()
+        delta = now - datetime.timedelta(minutes=10)
         with db.atomic():
-            expected_incomes = ExpectedIncome\
-                    .select()\
-                    .where(ExpectedIncome.modified_date < delta)\
-                    .order_by(-ExpectedIncome.id)\
-                    .limit(50)\
+            paid = ExpectedIncome\
+                .select(ExpectedIncome.id)\
+                .join(Income, on=(
+                    (Income.sender_node == ExpectedIncome.sender_node) &
+                    (Income.subtask == ExpectedIncome.subtask) &
+                    (Income.task == ExpectedIncome.task)))\
+                .where(ExpectedIncome.modified_date < delta)
+            removed = ExpectedIncome\
+                .delete()\
+                .where(ExpectedIncome.id.in_(paid))\
+                .execute()
+
+            expected_incomes = list(ExpectedIncome
+                                    .select()
+                                    .where(ExpectedIncome.modified_date < delta)
+                                    .order_by(-ExpectedIncome.id)
+                                    .limit(self.REQUEST_LIMIT))
+            if expected_incomes:
+                ExpectedIncome\
+                    .update(modified_date=now)\
+                    .where(ExpectedIncome.id.in_(
+                        [e.id for e in expected_incomes]))\
                     .execute()
 
-            for expected_income in expected_incomes:
-                is_subtask_paid = Income.select().where(
-                    Income.sender_node == expected_income.sender_node,
-                    Income.task == expected_income.task,
-                    Income.subtask == expected_income.subtask)\
-                    .exists()
-
-                if is_subtask_paid:
-                    expected_income.delete_instance()
-
-                else:  # ask for payment
-                    expected_income.modified_date = datetime.datetime.now()
-                    expected_income.save()
-                    dispatcher.send(
-                        signal="golem.transactions",
-                        event="expected_income",
-                        expected_income=expected_income)
+        if removed:
+            logger.debug("Removed %d paid expected incomes", removed)
+
+        # ask for payment
+        for expected_income in expected_incomes:
+            expected_income.modified_date = now
+            dispatcher.send(
+                signal="golem.transactions",
+                event="expected_income",
+                expected_income=expected_income)
 
     def received(self, sender_node_id,
                  task_id,
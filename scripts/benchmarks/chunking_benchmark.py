@@ -0,0 +1,83 @@
+"""
+Measure how much of a resource file has to be sent again after it is
+edited. A file is edited in several iterations (as between test renders of
+a scene); after each one, chunks which the provider does not hold from
+earlier versions are counted. Fixed-size blocks (how ResourceHash.split_file
+used to work) are compared against content-defined chunks (Chunker).
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.chunking_benchmark [--size 64]
+"""
+import hashlib
+import io
+import os
+import random
+import time
+
+import click
+
+from golem.resource.chunker import Chunker
+
+
+def _fixed_blocks(data, block_size):
+    for start in range(0, len(data), block_size):
+        yield data[start:start + block_size]
+
+
+def _content_defined(data, block_size):
+    return Chunker(block_size).iter_chunks(io.BytesIO(data))
+
+
+def _edit(rand, data, edits):
+    """ Insert, overwrite or remove a few short byte runs """
+    data = bytearray(data)
+    for _ in range(edits):
+        offset = rand.randrange(len(data))
+        length = rand.randint(1, 256)
+        kind = rand.choice(['insert', 'overwrite', 'remove'])
+        if kind == 'insert':
+            data[offset:offset] = os.urandom(length)
+        elif kind == 'overwrite':
+            data[offset:offset + length] = os.urandom(length)
+        else:
+            del data[offset:offset + length]
+    return bytes(data)
+
+
+@click.command()
+@click.option("--size", default=64, help="File size in MiB")
+@click.option("--block-size", default=2 ** 20, help="(Average) chunk size")
+@click.option("--iterations", default=5, help="Number of edits of the file")
+@click.option("--edits", default=3, help="Changes made in each iteration")
+def run(size, block_size, iterations, edits):
+    rand = random.Random(0)
+    versions = [os.urandom(size * 2 ** 20)]
+    for _ in range(iterations):
+        versions.append(_edit(rand, versions[-1], edits))
+
+    for name, split in [("fixed", _fixed_blocks),
+                        ("cdc", _content_defined)]:
+        held = set()
+        sent = 0
+        total = 0
+        start = time.perf_counter()
+        for i, data in enumerate(versions):
+            version_sent = 0
+            for chunk in split(data, block_size):
+                digest = hashlib.sha1(chunk).digest()
+                if digest not in held:
+                    held.add(digest)
+                    version_sent += len(chunk)
+            # the first version is sent in full either way
+            if i:
+                sent += version_sent
+                total += len(data)
+        elapsed = time.perf_counter() - start
+        print("{:<6} {} edited versions of a {} MiB file: sent {:.1f} MiB "
+              "of {:.1f} MiB ({:.1%}), chunking {:.0f} MiB/s".format(
+                  name, iterations, size, sent / 2 ** 20, total / 2 ** 20,
+                  sent / total, len(versions) * size / elapsed))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,55 @@
+"""
+Feed length-prefixed message streams to SafeProtocol in small chunks and
+measure how fast they are split into messages. Message deserialization is
+replaced with a no-op, so only the framing layer is measured.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.databuffer_benchmark [--chunk-size 4096]
+"""
+import struct
+import time
+from unittest import mock
+
+import click
+
+from golem.network.transport.tcpnetwork import SafeProtocol
+
+MB = 1024 * 1024
+STREAM_SIZES = (1 * MB, 10 * MB, 100 * MB)
+
+
+def _framed_stream(size, message_size):
+    message = b"m" * message_size
+    frame = struct.pack("!L", len(message)) + message
+    return frame * max(1, size // len(frame))
+
+
+def _feed(stream, chunk_size):
+    protocol = SafeProtocol(server=mock.Mock())
+    protocol.opened = True
+    protocol.session = mock.Mock()
+
+    with mock.patch('golem.network.transport.tcpnetwork.golem_messages.load',
+                    side_effect=lambda data, *_: len(data)):
+        start = time.perf_counter()
+        view = memoryview(stream)
+        for i in range(0, len(stream), chunk_size):
+            protocol.dataReceived(view[i:i + chunk_size].tobytes())
+        elapsed = time.perf_counter() - start
+
+    return protocol.session.interpret.call_count, elapsed
+
+
+@click.command()
+@click.option("--chunk-size", default=4096, help="Size of received chunks")
+@click.option("--message-size", default=MB, help="Size of a single message")
+def run(chunk_size, message_size):
+    for size in STREAM_SIZES:
+        stream = _framed_stream(size, message_size)
+        messages, elapsed = _feed(stream, chunk_size)
+        print("{:>4} MB stream: {} messages in {:.3f}s ({:.1f} MB/s)".format(
+            size // MB, messages, elapsed, len(stream) / MB / elapsed))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,79 @@
+"""
+Time a timeout check tick with many subtask states: a full scan of all
+subtask states (how TaskManager.check_timeouts used to work) against
+popping expired entries from DeadlineQueue. A few subtasks expire on each
+tick.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.deadline_queue_benchmark [--subtasks 50000]
+"""
+import random
+import time
+
+import click
+
+from golem.core.common import get_timestamp_utc
+from golem.core.deadlinequeue import DeadlineQueue
+
+
+class SubtaskState(object):
+
+    def __init__(self, subtask_id, deadline):
+        self.subtask_id = subtask_id
+        self.deadline = deadline
+        self.expired = False
+
+
+def _scan(states, cur_time):
+    expired = []
+    for s in states.values():
+        if not s.expired and cur_time > s.deadline:
+            s.expired = True
+            expired.append(s.subtask_id)
+    return expired
+
+
+def _pop(queue, states, cur_time):
+    expired = queue.pop_expired(cur_time)
+    for subtask_id in expired:
+        states[subtask_id].expired = True
+    return expired
+
+
+@click.command()
+@click.option("--subtasks", default=50000, help="Number of subtask states")
+@click.option("--ticks", default=100, help="Number of timeout checks")
+@click.option("--expiring", default=5, help="Subtasks expiring on each tick")
+def run(subtasks, ticks, expiring):
+    now = get_timestamp_utc()
+    deadlines = [now + 3600 + random.random() * 3600
+                 for _ in range(subtasks - ticks * expiring)]
+    deadlines += [now + tick for tick in range(ticks)
+                  for _ in range(expiring)]
+
+    results = {}
+    for name in ["scan", "queue"]:
+        states = {str(i): SubtaskState(str(i), d)
+                  for i, d in enumerate(deadlines)}
+        queue = DeadlineQueue()
+        for s in states.values():
+            queue.schedule(s.subtask_id, s.deadline)
+
+        expired = 0
+        start = time.perf_counter()
+        for tick in range(ticks):
+            cur_time = now + tick + 0.5
+            if name == "scan":
+                expired += len(_scan(states, cur_time))
+            else:
+                expired += len(_pop(queue, states, cur_time))
+        elapsed = time.perf_counter() - start
+        results[name] = expired
+        print("{:<6} {} ticks, {} subtask states, {} expired: "
+              "{:.3f} ms per tick".format(name, ticks, subtasks, expired,
+                                          elapsed / ticks * 1000))
+    assert results["scan"] == results["queue"]
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
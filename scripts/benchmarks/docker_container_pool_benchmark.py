@@ -0,0 +1,84 @@
+"""
+Run a series of short subtasks the way DockerTaskThread does: in a new
+container each (DockerJob) and in warm containers taken from ContainerPool
+(PooledDockerJob). Subtask throughput and per-subtask wall time are
+compared. Requires a running Docker daemon and the golemfactory/base image.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.docker_container_pool_benchmark [--subtasks 20]
+"""
+import os
+import tempfile
+import time
+
+import click
+
+from golem.docker.image import DockerImage
+from golem.docker.job import DockerJob, PooledDockerJob
+from golem.docker.pool import ContainerPool
+
+SCRIPT = ("import time\n"
+          "import params\n"
+          "time.sleep(params.duration)\n"
+          "with open('/golem/output/result.txt', 'w') as f:\n"
+          "    f.write('done')\n")
+
+
+def _run_subtask(make_job, tmp_dir, index, duration):
+    work_dir = os.path.join(tmp_dir, str(index), "work")
+    output_dir = os.path.join(tmp_dir, str(index), "output")
+    os.makedirs(work_dir)
+    os.makedirs(output_dir)
+
+    with make_job(SCRIPT, {'duration': duration}, work_dir, output_dir) \
+            as job:
+        job.start()
+        exit_code = job.wait()
+        job.dump_logs(os.path.join(output_dir, "stdout.log"),
+                      os.path.join(output_dir, "stderr.log"))
+    assert exit_code == 0
+    assert os.path.exists(os.path.join(output_dir, "result.txt"))
+
+
+@click.command()
+@click.option("--subtasks", default=20, help="Number of subtasks")
+@click.option("--duration", default=0.5,
+              help="Subtask script run time in seconds")
+@click.option("--image", default="golemfactory/base:1.2",
+              help="Image used for subtasks")
+def run(subtasks, duration, image):
+    repository, tag = image.split(":")
+    image = DockerImage(repository, tag=tag)
+
+    with tempfile.TemporaryDirectory(dir=os.path.expanduser("~")) as root:
+        resources_dir = os.path.join(root, "resources")
+        os.makedirs(resources_dir)
+        pool = ContainerPool(os.path.join(root, "containers"))
+
+        def new_container(script, params, work_dir, output_dir):
+            return DockerJob(image, script, params, resources_dir,
+                             work_dir, output_dir)
+
+        def warm_container(script, params, work_dir, output_dir):
+            return PooledDockerJob(pool, image, script, params, resources_dir,
+                                   work_dir, output_dir)
+
+        try:
+            for name, make_job in [('new', new_container),
+                                   ('pooled', warm_container)]:
+                tmp_dir = os.path.join(root, name)
+                start = time.perf_counter()
+                for i in range(subtasks):
+                    _run_subtask(make_job, tmp_dir, i, duration)
+                elapsed = time.perf_counter() - start
+                print("{:<7} {} subtasks in {:.2f}s, {:.2f} subtasks/s, "
+                      "{:.0f} ms overhead per subtask"
+                      .format(name, subtasks, elapsed, subtasks / elapsed,
+                              (elapsed / subtasks - duration) * 1000))
+            print("pool: {}".format(pool.metrics))
+        finally:
+            pool.clear()
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,71 @@
+"""
+Replay a gossip storm: every peer sends the same set of signed task headers
+over and over. Headers are verified the way previous versions of
+TaskServer.verify_header_sig did (encode and verify every header) and through
+VerifiedHeadersCache, then average time per received header is compared.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.header_verification_benchmark [--tasks 100]
+"""
+import random
+import tempfile
+import time
+import uuid
+
+import click
+
+from golem.core.keysauth import EllipticalKeysAuth
+from golem.network.p2p.node import Node
+from golem.task.taskbase import TaskHeader
+from golem.task.taskkeeper import VerifiedHeadersCache
+
+
+def _signed_headers(keys_auth, tasks):
+    node = Node(node_name="node", key=keys_auth.get_key_id(),
+                pub_addr="1.2.3.4", pub_port=40103)
+    headers = []
+    for _ in range(tasks):
+        header = TaskHeader("node", str(uuid.uuid4()), "1.2.3.4", 40103,
+                            keys_auth.get_key_id(), "BLENDER",
+                            task_owner=node, deadline=time.time() + 3600,
+                            subtask_timeout=600, max_price=10)
+        header.signature = keys_auth.sign(header.to_binary())
+        headers.append(header.to_dict())
+    return headers
+
+
+@click.command()
+@click.option("--tasks", default=100, help="Number of distinct headers")
+@click.option("--repeats", default=20, help="How many times each header "
+                                            "is received")
+def run(tasks, repeats):
+    with tempfile.TemporaryDirectory() as datadir:
+        keys_auth = EllipticalKeysAuth(datadir)
+        headers = _signed_headers(keys_auth, tasks)
+
+    def verify_sig(th_dict_repr):
+        return keys_auth.verify(th_dict_repr["signature"],
+                                TaskHeader.dict_to_binary(th_dict_repr),
+                                th_dict_repr["task_owner_key_id"])
+
+    storm = headers * repeats
+    random.shuffle(storm)
+
+    start = time.perf_counter()
+    assert all(verify_sig(th) for th in storm)
+    elapsed = time.perf_counter() - start
+    print("{:<8} {} headers in {:.3f}s, {:.1f} us per header"
+          .format('verify', len(storm), elapsed, elapsed / len(storm) * 1e6))
+
+    cache = VerifiedHeadersCache()
+    start = time.perf_counter()
+    assert all(cache.verify(th, verify_sig) for th in storm)
+    elapsed = time.perf_counter() - start
+    print("{:<8} {} headers in {:.3f}s, {:.1f} us per header"
+          .format('cached', len(storm), elapsed, elapsed / len(storm) * 1e6))
+    print("hit rate {hit_rate:.2f}, {avg_verification_time:.6f}s per "
+          "verification".format(**cache.metrics))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
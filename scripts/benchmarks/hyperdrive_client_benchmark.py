@@ -0,0 +1,114 @@
+"""
+Send upload commands to a local stub of the Hyperdrive daemon and compare
+a new connection per request, the pooled client, command batching and
+asynchronous requests.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.hyperdrive_client_benchmark [--count 1000]
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import click
+import requests
+
+from golem.network.hyperdrive.client import HyperdriveClient
+
+
+class StubDaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # like the Node.js HTTP server used by the daemon
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        data = json.loads(self.rfile.read(length).decode('utf-8'))
+
+        if data['command'] == 'batch':
+            result = dict(responses=[dict(hash=str(i))
+                                     for i, _ in enumerate(data['commands'])])
+        else:
+            result = dict(hash='hash')
+
+        body = json.dumps(result).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class StubDaemon(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def _unpooled(client, commands):
+    for command in commands:
+        requests.post(url=client._url, headers=client._headers,
+                      data=json.dumps(command)).json()
+
+
+def _pooled(client, commands):
+    for command in commands:
+        client._request(**command)
+
+
+def _batched(client, commands, batch_size):
+    for i in range(0, len(commands), batch_size):
+        client.batch(commands[i:i + batch_size])
+
+
+def _async(client, commands):
+    from twisted.internet import defer, reactor
+
+    def run():
+        deferred = defer.gatherResults([
+            client._request_async(**command) for command in commands
+        ])
+        deferred.addBoth(lambda _: reactor.stop())
+
+    reactor.callWhenRunning(run)
+    reactor.run()
+
+
+def _measure(method, *args):
+    start = time.perf_counter()
+    method(*args)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--count", default=1000, help="Number of upload commands")
+@click.option("--batch-size", default=50, help="Commands per batch")
+def run(count, batch_size):
+    server = StubDaemon(('127.0.0.1', 0), StubDaemonHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = HyperdriveClient(port=server.server_address[1],
+                              host='127.0.0.1')
+    commands = [client.upload_command(files=['file_{}'.format(i)], id=str(i))
+                for i in range(count)]
+
+    results = [
+        ('new connection per request', _measure(_unpooled, client, commands)),
+        ('pooled connections', _measure(_pooled, client, commands)),
+        ('batches of {}'.format(batch_size),
+         _measure(_batched, client, commands, batch_size)),
+        ('async, pooled', _measure(_async, client, commands)),
+    ]
+
+    for name, elapsed in results:
+        print("{:<28} {} commands in {:.3f}s ({:.0f} commands/s)".format(
+            name, count, elapsed, count / elapsed))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
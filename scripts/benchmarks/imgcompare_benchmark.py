@@ -0,0 +1,69 @@
+"""
+Compare the speed of the pixel-by-pixel MSE calculation that used to be
+done in apps.rendering.resources.imgcompare with the array based one.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.imgcompare_benchmark [--no-reference]
+"""
+import time
+
+import click
+import numpy
+from PIL import Image
+
+from apps.rendering.resources.imgcompare import calculate_mse
+from apps.rendering.resources.imgrepr import PILImgRepr
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160),
+}
+
+
+def _random_img(size, seed):
+    rand = numpy.random.RandomState(seed)
+    pixels = rand.randint(0, 256, (size[1], size[0], 3)).astype(numpy.uint8)
+    img = PILImgRepr()
+    img.load_from_pil_object(Image.fromarray(pixels))
+    return img
+
+
+def _reference_mse(img1, img2):
+    (res_x, res_y) = img1.get_size()
+    mse = 0
+    for i in range(0, res_x):
+        for j in range(0, res_y):
+            [r1, g1, b1] = img1.get_pixel((i, j))
+            [r2, g2, b2] = img2.get_pixel((i, j))
+            mse += (r1 - r2) * (r1 - r2) + \
+                   (g1 - g2) * (g1 - g2) + \
+                   (b1 - b2) * (b1 - b2)
+    return mse / (res_x * res_y * 3)
+
+
+def _timeit(fun, *args):
+    start = time.perf_counter()
+    result = fun(*args)
+    return result, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--reference/--no-reference", default=True,
+              help="Also time the pixel-by-pixel implementation")
+def run(reference):
+    for name, size in RESOLUTIONS.items():
+        img1 = _random_img(size, 0)
+        img2 = _random_img(size, 1)
+
+        mse, elapsed = _timeit(calculate_mse, img1, img2)
+        print("{}: array MSE {:.4f} in {:.3f}s".format(name, mse, elapsed))
+
+        if reference:
+            ref_mse, ref_elapsed = _timeit(_reference_mse, img1, img2)
+            print("{}: pixel loop MSE {:.4f} in {:.3f}s (speedup x{:.0f})"
+                  .format(name, ref_mse, ref_elapsed,
+                          ref_elapsed / elapsed))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,110 @@
+"""
+Reconcile expected incomes against a temporary database with a long history
+of received incomes: row by row, with one query per expected income (how
+IncomesKeeper.run_once used to work), against the set-based
+IncomesKeeper.run_once. Runs are repeated until no expected income is due.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.incomes_keeper_benchmark [--history 100000]
+"""
+import datetime
+import shutil
+import tempfile
+import time
+
+import click
+
+from golem.model import Database, ExpectedIncome, Income, db
+from golem.network.p2p.node import Node
+from golem.transactions.incomeskeeper import IncomesKeeper
+
+ROWS_PER_INSERT = 100
+
+
+def _run_once_rowwise():
+    delta = datetime.datetime.now() - datetime.timedelta(minutes=10)
+    with db.atomic():
+        expected_incomes = ExpectedIncome\
+            .select()\
+            .where(ExpectedIncome.modified_date < delta)\
+            .order_by(-ExpectedIncome.id)\
+            .limit(IncomesKeeper.REQUEST_LIMIT)\
+            .execute()
+
+        for expected_income in expected_incomes:
+            is_subtask_paid = Income.select().where(
+                Income.sender_node == expected_income.sender_node,
+                Income.task == expected_income.task,
+                Income.subtask == expected_income.subtask)\
+                .exists()
+            if is_subtask_paid:
+                expected_income.delete_instance()
+            else:
+                expected_income.modified_date = datetime.datetime.now()
+                expected_income.save()
+
+
+def _insert(model, rows):
+    with db.atomic():
+        for i in range(0, len(rows), ROWS_PER_INSERT):
+            model.insert_many(rows[i:i + ROWS_PER_INSERT]).execute()
+
+
+def _populate(history, pending, nodes):
+    incomes = [{'sender_node': 'node{}'.format(i % nodes),
+                'task': 'task{}'.format(i // 100),
+                'subtask': 'subtask{}'.format(i),
+                'transaction': 'tx{}'.format(i),
+                'block_number': i,
+                'value': 1} for i in range(history)]
+    _insert(Income, incomes)
+
+    # half of the expected incomes have been paid already
+    due = datetime.datetime.now() - datetime.timedelta(hours=1)
+    node = Node()
+    expected = [{'sender_node': 'node{}'.format(i % nodes),
+                 'sender_node_details': node,
+                 'task': 'task{}'.format(i // 100),
+                 'subtask': 'subtask{}'.format(i),
+                 'value': 1,
+                 'modified_date': due}
+                for i in range(history - pending // 2, history + pending // 2)]
+    _insert(ExpectedIncome, expected)
+
+
+@click.command()
+@click.option("--history", default=100000, help="Number of received incomes")
+@click.option("--pending", default=1000, help="Number of expected incomes")
+@click.option("--nodes", default=100, help="Number of distinct senders")
+def run(history, pending, nodes):
+    results = {}
+    for name in ["rowwise", "set-based"]:
+        datadir = tempfile.mkdtemp()
+        database = Database(datadir)
+        try:
+            _populate(history, pending, nodes)
+            run_once = _run_once_rowwise if name == "rowwise" \
+                else IncomesKeeper().run_once
+
+            runs = 0
+            start = time.perf_counter()
+            while True:
+                run_once()
+                runs += 1
+                delta = datetime.datetime.now() - datetime.timedelta(minutes=10)
+                if not ExpectedIncome.select().where(
+                        ExpectedIncome.modified_date < delta).exists():
+                    break
+            elapsed = time.perf_counter() - start
+            results[name] = ExpectedIncome.select().count()
+            print("{:<9} {} incomes, {} expected: {} runs, {:.1f} ms per run, "
+                  "{:.3f} s total".format(name, history, pending, runs,
+                                          elapsed / runs * 1000, elapsed))
+        finally:
+            database.close()
+            shutil.rmtree(datadir)
+    assert results["rowwise"] == results["set-based"]
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
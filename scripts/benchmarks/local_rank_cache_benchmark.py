@@ -0,0 +1,63 @@
+"""
+Measure trust reads (Ranking.get_computing_trust) and trust updates
+(Trust.COMPUTED.increase) per second against a temporary database: with
+every call going to SQLite (local ranks not loaded) and with local ranks
+kept in LocalRankCache and flushed once at the end.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.local_rank_cache_benchmark [--calls 2000]
+"""
+import random
+import shutil
+import tempfile
+import time
+
+import click
+
+from golem.model import Database
+from golem.ranking.helper.trust import Trust
+from golem.ranking.manager import database_manager as dm
+from golem.ranking.ranking import Ranking
+
+
+def _measure(calls, nodes):
+    ranking = Ranking(None)
+    node_ids = [random.choice(nodes) for _ in range(calls)]
+
+    start = time.perf_counter()
+    for node_id in node_ids:
+        Trust.COMPUTED.increase(node_id, 1.0)
+    if dm.local_ranks.loaded:
+        dm.local_ranks.flush()
+    writes = calls / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for node_id in node_ids:
+        ranking.get_computing_trust(node_id)
+    reads = calls / (time.perf_counter() - start)
+    return reads, writes
+
+
+@click.command()
+@click.option("--calls", default=2000, help="Number of reads and updates")
+@click.option("--nodes", default=200, help="Number of distinct nodes")
+def run(calls, nodes):
+    node_ids = ["node{}".format(i) for i in range(nodes)]
+    for name in ["database", "cache"]:
+        datadir = tempfile.mkdtemp()
+        database = Database(datadir)
+        try:
+            if name == "cache":
+                dm.local_ranks.load()
+            reads, writes = _measure(calls, node_ids)
+            if name == "cache":
+                dm.local_ranks.close()
+            print("{:<9} {:>10.0f} reads/s {:>10.0f} updates/s".format(
+                name, reads, writes))
+        finally:
+            database.close()
+            shutil.rmtree(datadir)
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
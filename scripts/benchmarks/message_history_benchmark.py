@@ -0,0 +1,77 @@
+"""
+Save a stream of network messages to a temporary database, one message per
+transaction like previous versions of MessageHistoryService did and in
+batches written by MessageHistoryService.add_many_sync, then compare
+the sustained ingestion rate.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.message_history_benchmark [--messages 5000]
+"""
+import datetime
+import tempfile
+import time
+import uuid
+
+import click
+
+from golem.model import Actor, Database, NetworkMessage
+from golem.network.history import MessageHistoryService
+
+
+def _build_dicts(count, subtasks_per_task=10):
+    task = None
+    msg_dicts = []
+    for i in range(count):
+        if i % subtasks_per_task == 0:
+            task = str(uuid.uuid4())
+        msg_dicts.append(dict(
+            task=task,
+            subtask=str(uuid.uuid4()),
+            node=str(uuid.uuid4()),
+            msg_date=datetime.datetime.now(),
+            msg_cls='ReportComputedTask',
+            msg_data=b'0' * 256,
+            local_role=Actor.Provider,
+            remote_role=Actor.Requestor,
+        ))
+    return msg_dicts
+
+
+def _save_one_by_one(service, msg_dicts):
+    for msg_dict in msg_dicts:
+        service.add_sync(msg_dict)
+
+
+def _save_batched(service, msg_dicts):
+    batch_size = service.MAX_BATCH_SIZE
+    for i in range(0, len(msg_dicts), batch_size):
+        service.add_many_sync(msg_dicts[i:i + batch_size])
+
+
+@click.command()
+@click.option("--messages", default=5000, help="Number of messages")
+def run(messages):
+    for name, method in [('single', _save_one_by_one),
+                         ('batched', _save_batched)]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            database = Database(tmp_dir)
+            service = MessageHistoryService()
+            msg_dicts = _build_dicts(messages)
+
+            start = time.perf_counter()
+            method(service, msg_dicts)
+            elapsed = time.perf_counter() - start
+
+            assert NetworkMessage.select().count() == messages
+            print("{:<8} {} messages in {:.3f}s, {:.0f} messages/s"
+                  .format(name, messages, elapsed, messages / elapsed))
+            if name == 'batched':
+                print("max flush latency {:.3f}s"
+                      .format(service.metrics['max_flush_latency']))
+
+            database.db.close()
+            MessageHistoryService.instance = None
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,40 @@
+"""
+Run the default environment benchmark (minilight Cornell box) with an
+increasing number of processes and print the rendering time and the measured
+rays per second for each of them. Rendered images are compared to the
+single-core one.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.minilight_benchmark [--cores 1,2,4]
+"""
+from os import path
+
+import click
+
+from apps.rendering.benchmark.minilight.src.minilight import render_rows, \
+    load_model
+from golem.core.common import get_cpu_count, get_golem_path
+
+TEST_FILE = path.join(get_golem_path(), 'apps', 'rendering', 'benchmark',
+                      'minilight', 'cornellbox.ml.txt')
+
+
+@click.command()
+@click.option("--cores", default="1,2,4",
+              help="Comma separated numbers of rendering processes")
+def run(cores):
+    iterations, image, _, _ = load_model(TEST_FILE)
+    rays = image.width * image.height * iterations
+    print("{} cpus available, {} rays per run".format(get_cpu_count(), rays))
+
+    reference = None
+    for num_cores in [int(c) for c in cores.split(",")]:
+        image, duration = render_rows(TEST_FILE, num_cores)
+        if reference is None:
+            reference = image.pixels
+        print("{:<2} cores: {:.3f}s, {:.1f} rays/s, same image: {}".format(
+            num_cores, duration, rays / duration, image.pixels == reference))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,59 @@
+"""
+Solve challenges of increasing difficulty with the loop used by previous
+versions of simplechallenge.solve_challenge, PowSolver and ParallelPowSolver
+and compare average time to solution.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.powsolver_benchmark [--max-difficulty 20]
+"""
+import time
+
+import click
+
+from golem.core.keysauth import sha2
+from golem.core.powsolver import ParallelPowSolver, PowSolver
+from golem.core.simplechallenge import accept_challenge, create_challenge
+
+
+class NaiveSolver(PowSolver):
+
+    def solve_challenge(self, challenge, difficulty):
+        min_hash = pow(2, 256 - difficulty)
+        solution = 0
+        while sha2(challenge + str(solution)) > min_hash:
+            solution += 1
+        return solution
+
+
+@click.command()
+@click.option("--min-difficulty", default=8, help="Lowest difficulty")
+@click.option("--max-difficulty", default=20, help="Highest difficulty")
+@click.option("--step", default=4, help="Difficulty step")
+@click.option("--challenges", default=5,
+              help="Number of challenges per difficulty")
+@click.option("--processes", default=None, type=int,
+              help="ParallelPowSolver processes; CPU count by default")
+def run(min_difficulty, max_difficulty, step, challenges, processes):
+    parallel = ParallelPowSolver(processes)
+    parallel.MAX_LOCAL_CHALLENGE_DIFFICULTY = 0
+    solvers = [('naive', NaiveSolver()),
+               ('single', PowSolver()),
+               ('parallel', parallel)]
+
+    print("{:>10} {}".format('difficulty', ' '.join(
+        '{:>10}'.format(name) for name, _ in solvers)))
+    for difficulty in range(min_difficulty, max_difficulty + 1, step):
+        puzzles = [create_challenge([], None) for _ in range(challenges)]
+        times = []
+        for _, solver in solvers:
+            start = time.perf_counter()
+            for challenge in puzzles:
+                solution = solver.solve_challenge(challenge, difficulty)
+                assert accept_challenge(challenge, solution, difficulty)
+            times.append((time.perf_counter() - start) / challenges)
+        print("{:>10} {}".format(difficulty, ' '.join(
+            '{:>9.4f}s'.format(t) for t in times)))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
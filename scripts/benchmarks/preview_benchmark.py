@@ -0,0 +1,93 @@
+"""
+Accept the chunks of an animation, updating frame previews like previous
+versions of FrameRenderingTask did (reopen, add and encode the preview twice
+for every chunk, mark areas pixel by pixel) and with PreviewCompositor
+(paste in memory, fill areas, encode once when previews are requested),
+then compare the time spent.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.preview_benchmark [--frames 20]
+"""
+import math
+import os
+import tempfile
+import time
+
+import click
+from PIL import Image, ImageChops
+
+from apps.rendering.resources.previewcompositor import PreviewCompositor
+
+SENT_COLOR = (0, 255, 0)
+
+
+def _chunk_box(size, part, parts):
+    height = int(math.floor(size[1] / parts))
+    return 0, (part - 1) * height, size[0], part * height
+
+
+def _legacy(tmp_dir, chunk, size, frames, parts):
+    for frame in range(frames):
+        preview_path = os.path.join(tmp_dir, 'preview{}.png'.format(frame))
+        task_path = os.path.join(tmp_dir, 'task_preview{}.png'.format(frame))
+        for part in range(1, parts + 1):
+            box = _chunk_box(size, part, parts)
+            img_offset = Image.new("RGB", size)
+            img_offset.paste(chunk, box[:2])
+            if os.path.exists(preview_path):
+                img = ImageChops.add(Image.open(preview_path), img_offset)
+            else:
+                img = img_offset
+            img.save(preview_path, "PNG")
+            img.save(task_path, "PNG")
+
+            # mark the next subtask as sent
+            if part < parts:
+                img_task = Image.open(task_path)
+                x0, y0, x1, y1 = _chunk_box(size, part + 1, parts)
+                for i in range(x0, x1):
+                    for j in range(y0, y1):
+                        img_task.putpixel((i, j), SENT_COLOR)
+                img_task.save(task_path, "PNG")
+
+
+def _compositor(tmp_dir, chunk, size, frames, parts):
+    compositors = []
+    for frame in range(frames):
+        preview = PreviewCompositor(
+            os.path.join(tmp_dir, 'preview{}.png'.format(frame)), size)
+        task_preview = PreviewCompositor(
+            os.path.join(tmp_dir, 'task_preview{}.png'.format(frame)), size)
+        compositors += [preview, task_preview]
+        for part in range(1, parts + 1):
+            preview.add(chunk, _chunk_box(size, part, parts)[:2])
+            task_preview.paste(preview.image)
+            if part < parts:
+                task_preview.paste(SENT_COLOR,
+                                   _chunk_box(size, part + 1, parts))
+    for compositor in compositors:
+        compositor.save(force=True)
+
+
+@click.command()
+@click.option("--frames", default=20, help="Number of frames")
+@click.option("--parts", default=4, help="Number of subtasks per frame")
+@click.option("--width", default=1280, help="Preview width")
+@click.option("--height", default=720, help="Preview height")
+def run(frames, parts, width, height):
+    size = (width, height)
+    chunk = Image.new("RGB", (width, int(height / parts)), (10, 20, 30))
+
+    for name, method in [('legacy', _legacy),
+                         ('compositor', _compositor)]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            start = time.perf_counter()
+            method(tmp_dir, chunk, size, frames, parts)
+            elapsed = time.perf_counter() - start
+            print("{:<10} {} chunks in {:.3f}s, {:.1f} ms per chunk"
+                  .format(name, frames * parts, elapsed,
+                          elapsed * 1000 / (frames * parts)))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
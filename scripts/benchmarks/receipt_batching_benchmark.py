@@ -0,0 +1,93 @@
+"""
+Fetch the receipts of pending payment transactions from a mock JSON-RPC node
+which adds a fixed latency to every HTTP request: one eth_getTransactionReceipt
+request per transaction plus eth_blockNumber (how
+PaymentProcessor.monitor_progress used to work) against
+Client.get_block_number_and_receipts, which sends them in batch requests.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.receipt_batching_benchmark [--txs 200]
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import click
+from web3 import Web3, HTTPProvider
+
+from golem.ethereum import Client
+
+RECEIPT = {'blockNumber': '0x539', 'gasUsed': '0xd6d9',
+           'blockHash': '0x' + 64 * 'f', 'status': '0x1'}
+RESULTS = {'eth_blockNumber': '0x545', 'eth_getTransactionReceipt': RECEIPT}
+
+
+class MockNodeHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        request = json.loads(body.decode())
+        self.server.round_trips += 1
+        time.sleep(self.server.latency)
+
+        calls = request if isinstance(request, list) else [request]
+        responses = [{'jsonrpc': '2.0', 'id': call['id'],
+                      'result': RESULTS[call['method']]} for call in calls]
+        if not isinstance(request, list):
+            responses = responses[0]
+
+        data = json.dumps(responses).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_):
+        pass
+
+
+def _sequential(client, tx_hashes):
+    block_number = client.get_block_number()
+    receipts = [client.get_transaction_receipt(h) for h in tx_hashes]
+    return block_number, receipts
+
+
+def _batched(client, tx_hashes):
+    return client.get_block_number_and_receipts(tx_hashes)
+
+
+@click.command()
+@click.option("--txs", default=200, help="Number of pending transactions")
+@click.option("--latency", default=5.0, help="Node latency in milliseconds")
+def run(txs, latency):
+    server = HTTPServer(('127.0.0.1', 0), MockNodeHandler)
+    server.latency = latency / 1000
+    server.round_trips = 0
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    client = Client.__new__(Client)
+    client.web3 = Web3(HTTPProvider(
+        'http://127.0.0.1:{}'.format(server.server_port)))
+    tx_hashes = ['0x{:064x}'.format(i) for i in range(txs)]
+
+    try:
+        for name, fetch in [("sequential", _sequential),
+                            ("batched", _batched)]:
+            server.round_trips = 0
+            start = time.perf_counter()
+            _, receipts = fetch(client, tx_hashes)
+            elapsed = time.perf_counter() - start
+            assert len(receipts) == txs
+            print("{:<10} {} receipts: {} round trips, {:.3f} s".format(
+                name, txs, server.round_trips, elapsed))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,90 @@
+"""
+Pack and encrypt a result file of the given sizes, then decrypt and unpack
+it: in two passes through a temporary file, with 16 KiB encryption chunks
+(how EncryptingPackager used to work), and in a single pass through
+encrypting and decrypting streams (EncryptingPackager).
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.result_package_benchmark [--sizes 100,2048]
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import click
+
+from golem.core.fileencrypt import AESFileEncryptor, FileEncryptor
+from golem.task.result.resultpackage import EncryptingPackager, ZipPackager
+
+MB = 1024 * 1024
+
+
+class ChunkedEncryptor(AESFileEncryptor):
+    buffer_size = AESFileEncryptor.chunk_size * AESFileEncryptor.block_size
+
+
+def _two_pass_create(secret, output_path, files):
+    zip_path = output_path + '.pkg'
+    ZipPackager().create(zip_path, files)
+    ChunkedEncryptor.encrypt(zip_path, output_path, secret)
+    os.remove(zip_path)
+
+
+def _two_pass_extract(secret, input_path, output_dir):
+    zip_path = input_path + '.dec'
+    ChunkedEncryptor.decrypt(input_path, zip_path, secret)
+    ZipPackager().extract(zip_path, output_dir=output_dir)
+    os.remove(zip_path)
+
+
+def _stream_create(secret, output_path, files):
+    EncryptingPackager(secret).create(output_path, files)
+
+
+def _stream_extract(secret, input_path, output_dir):
+    EncryptingPackager(secret).extract(input_path, output_dir=output_dir)
+
+
+def _write_file(path, size):
+    chunk = os.urandom(MB)
+    with open(path, 'wb') as f:
+        for _ in range(size // MB):
+            f.write(chunk)
+
+
+@click.command()
+@click.option("--sizes", default="100", help="Comma separated sizes in MB")
+def run(sizes):
+    secret = FileEncryptor.gen_secret(10, 20)
+    work_dir = tempfile.mkdtemp()
+    try:
+        for size in [int(s) * MB for s in sizes.split(",")]:
+            result_path = os.path.join(work_dir, 'result.exr')
+            _write_file(result_path, size)
+
+            for name, create, extract in [
+                    ("two-pass", _two_pass_create, _two_pass_extract),
+                    ("stream", _stream_create, _stream_extract)]:
+                package_path = os.path.join(work_dir, 'package')
+                output_dir = os.path.join(work_dir, 'extracted')
+
+                start = time.perf_counter()
+                create(secret, package_path, [result_path])
+                created = time.perf_counter() - start
+
+                start = time.perf_counter()
+                extract(secret, package_path, output_dir)
+                extracted = time.perf_counter() - start
+
+                print("{:<9} {:>5} MB: create {:6.2f}s, extract {:6.2f}s"
+                      .format(name, size // MB, created, extracted))
+                os.remove(package_path)
+                shutil.rmtree(output_dir)
+            os.remove(result_path)
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
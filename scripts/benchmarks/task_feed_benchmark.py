@@ -0,0 +1,108 @@
+"""
+Compare publishing the full task list on every tick (how TasksPublisherService
+used to work) with publishing TaskUpdateFeed deltas. Most tasks are finished;
+the active ones update the progress of one subtask on each tick. Reports the
+time spent building and serializing the published data and its size.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.task_feed_benchmark [--tasks 500]
+"""
+import json
+import time
+
+import click
+
+from golem.task.taskfeed import TaskUpdateFeed
+from golem.task.taskstate import SubtaskState, TaskState, TaskStatus
+
+
+class TaskManager(object):
+    """ Builds dicts of the same shape and size as TaskManager does """
+
+    def __init__(self, tasks, active, subtasks):
+        self.activeStatus = [TaskStatus.computing]
+        self.tasks = {}
+        self.tasks_states = {}
+        for i in range(tasks):
+            task_id = 'task-{}'.format(i)
+            state = TaskState()
+            state.status = TaskStatus.computing if i < active \
+                else TaskStatus.finished
+            for j in range(subtasks):
+                ss = SubtaskState()
+                ss.subtask_id = '{}-{}'.format(task_id, j)
+                ss.subtask_definition = 'Frame {}, part 1/1'.format(j)
+                state.subtask_states[ss.subtask_id] = ss
+            self.tasks[task_id] = task_id
+            self.tasks_states[task_id] = state
+
+    def get_task_dict(self, task_id):
+        state = self.tasks_states[task_id]
+        task_dict = {
+            'id': task_id,
+            'type': 'Blender',
+            'name': 'Blender task {}'.format(task_id),
+            'preview': '/tmp/golem/{}/preview.png'.format(task_id),
+            'options': {
+                'output_path': '/tmp/golem/{}/output'.format(task_id),
+                'format': 'PNG',
+                'resolution': [1920, 1080],
+                'frames': list(range(len(state.subtask_states))),
+                'compositing': False,
+            },
+            'resources': ['/tmp/golem/{}/scene.blend'.format(task_id)],
+            'subtasks': len(state.subtask_states),
+            'progress': sum(ss.subtask_progress for ss
+                            in state.subtask_states.values()),
+        }
+        task_dict.update(state.to_dictionary())
+        return task_dict
+
+    def get_tasks_dict(self):
+        return [self.get_task_dict(task_id) for task_id in self.tasks]
+
+    def is_task_loaded(self, task_id):
+        return True
+
+    def get_subtasks_dict(self, task_id):
+        return [ss.to_dictionary() for ss
+                in self.tasks_states[task_id].subtask_states.values()]
+
+
+def _tick(tm, tick):
+    for state in tm.tasks_states.values():
+        if state.status != TaskStatus.computing:
+            continue
+        states = list(state.subtask_states.values())
+        states[tick % len(states)].subtask_progress += 0.01
+
+
+@click.command()
+@click.option("--tasks", default=500, help="Number of tasks")
+@click.option("--active", default=5, help="Number of active tasks")
+@click.option("--subtasks", default=20, help="Number of subtasks per task")
+@click.option("--ticks", default=50, help="Number of publishes")
+def run(tasks, active, subtasks, ticks):
+    for name in ["list", "feed"]:
+        tm = TaskManager(tasks, active, subtasks)
+        feed = TaskUpdateFeed(tm)
+        if name == "feed":
+            feed.update()
+
+        published = 0
+        start = time.perf_counter()
+        for tick in range(ticks):
+            _tick(tm, tick)
+            if name == "list":
+                data = tm.get_tasks_dict()
+            else:
+                data = feed.update()
+            published += len(json.dumps(data))
+        elapsed = time.perf_counter() - start
+        print("{:<5} {} ticks, {} tasks ({} active): {:.3f} ms and {} bytes "
+              "per tick".format(name, ticks, tasks, active,
+                                elapsed / ticks * 1000, published // ticks))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,125 @@
+"""
+Compare task header gossip between two nodes which already share most of
+their task headers: the full exchange (GetTasks answered with a random
+sample of all known headers) and the exchange with set summaries (see
+golem.network.p2p.taskgossip). Reported are the number of rounds needed
+until the asking node knows every changed header, bytes sent in those rounds
+and bytes sent in a steady-state round, when both nodes know the same
+headers.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.task_gossip_benchmark [--tasks 1000]
+"""
+import random
+import time
+import types
+import uuid
+
+import click
+
+from golem.core.common import timeout_to_deadline
+from golem.core.simpleserializer import CBORSerializer
+from golem.core.variables import APP_VERSION, TASK_HEADERS_LIMIT
+from golem.environments.environmentsmanager import EnvironmentsManager
+from golem.network.p2p import taskgossip
+from golem.task.taskkeeper import TaskHeaderKeeper
+from golem.task.taskserver import TaskServer
+
+
+def _header(task_id, signature):
+    return {
+        "task_id": task_id,
+        "node_name": "node",
+        "task_owner": {"node_name": "node", "key": str(uuid.uuid4())},
+        "task_owner_address": "10.10.10.10",
+        "task_owner_port": 40102,
+        "task_owner_key_id": str(uuid.uuid4()),
+        "environment": "BLENDER",
+        "last_checking": time.time(),
+        "deadline": timeout_to_deadline(3600),
+        "subtask_timeout": 600,
+        "max_price": 10,
+        "min_version": APP_VERSION,
+        "signature": signature,
+    }
+
+
+def _server(headers):
+    keeper = TaskHeaderKeeper(EnvironmentsManager(), min_price=0.0,
+                              max_tasks_per_requestor=len(headers))
+    for header in headers:
+        keeper.add_task_header(header)
+    return types.SimpleNamespace(
+        task_keeper=keeper,
+        task_manager=types.SimpleNamespace(get_tasks_headers=list))
+
+
+def _sample(headers):
+    if len(headers) > TASK_HEADERS_LIMIT:
+        headers = random.sample(headers, TASK_HEADERS_LIMIT)
+    return headers
+
+
+def _full_round(asking, responding):
+    """ :return (int, list): bytes sent and received headers """
+    headers = _sample(TaskServer.get_tasks_headers(responding))
+    return len(CBORSerializer.dumps(headers)), headers
+
+
+def _summary_round(asking, responding):
+    asking_digests = TaskServer.get_tasks_digests(asking)
+    summary = taskgossip.summarize(asking_digests)
+    sent = len(CBORSerializer.dumps(summary))
+
+    digests = taskgossip.differing_digests(
+        TaskServer.get_tasks_digests(responding), summary)
+    if not digests:
+        return sent, []
+    sent += len(CBORSerializer.dumps(digests))
+
+    task_ids = taskgossip.wanted_task_ids(asking_digests, digests)
+    if not task_ids:
+        return sent, []
+    sent += len(CBORSerializer.dumps(task_ids))
+
+    headers = _sample(TaskServer.get_tasks_headers(responding, task_ids))
+    return sent + len(CBORSerializer.dumps(headers)), headers
+
+
+@click.command()
+@click.option("--tasks", default=1000, help="Number of known tasks")
+@click.option("--changed", default=10, help="Number of new or changed tasks")
+def run(tasks, changed):
+    task_ids = [str(uuid.uuid4()) for _ in range(tasks)]
+    headers = [_header(task_id, uuid.uuid4().bytes * 2)
+               for task_id in task_ids]
+    changed_ids = set(random.sample(task_ids, changed))
+    updated = [_header(h["task_id"], uuid.uuid4().bytes * 2)
+               if h["task_id"] in changed_ids else h for h in headers]
+
+    for name, gossip_round in [('full', _full_round),
+                               ('summary', _summary_round)]:
+        asking, responding = _server(headers), _server(updated)
+        missing = set(changed_ids)
+        rounds = sent = 0
+        start = time.perf_counter()
+        while missing and rounds < 1000:
+            round_sent, received = gossip_round(asking, responding)
+            sent += round_sent
+            for header in received:
+                asking.task_keeper.add_task_header(header)
+                missing.discard(header["task_id"])
+            rounds += 1
+        elapsed = time.perf_counter() - start
+
+        # both nodes know the same headers now
+        asking = _server(updated)
+        steady_sent, _ = gossip_round(asking, responding)
+        print("{:<8} {} rounds, {:.1f} kB sent, {:.1f} kB and {:.1f} ms "
+              "per round; steady state: {} bytes per round"
+              .format(name, rounds, sent / 1024, sent / rounds / 1024,
+                      elapsed / rounds * 1000, steady_sent))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
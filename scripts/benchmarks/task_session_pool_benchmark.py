@@ -0,0 +1,139 @@
+"""
+Deliver results from several providers to a requestor stub listening on
+localhost. Every delivery either opens a new connection with a hello /
+rand val handshake, like previous versions of TaskServer did, or goes
+through a session kept in TaskSessionPool. Connection setups and result
+delivery latency percentiles are compared.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.task_session_pool_benchmark [--providers 8]
+"""
+import socket
+import socketserver
+import threading
+import time
+
+import click
+
+from golem.task.sessionpool import TaskSessionPool
+
+
+class StubRequestorHandler(socketserver.StreamRequestHandler):
+    # Replies to: hello, rand_val (handshake) and report (result delivery)
+    REPLIES = {b'hello\n': b'hello\n', b'rand_val\n': b'rand_val\n',
+               b'report\n': b'ack\n'}
+
+    def handle(self):
+        for line in self.rfile:
+            self.wfile.write(self.REPLIES[line])
+
+
+class StubRequestor(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Conn(object):
+    def __init__(self, address):
+        self.sock = socket.create_connection(address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile('rb')
+        self.opened = True
+
+    def request(self, line):
+        self.sock.sendall(line)
+        return self.file.readline()
+
+    def close(self):
+        self.opened = False
+        self.file.close()
+        self.sock.close()
+
+
+class _Session(object):
+    """ Minimal stand-in for TaskSession: a verified connection """
+
+    def __init__(self, key_id, address):
+        self.key_id = key_id
+        self.conn = _Conn(address)
+        self.conn.request(b'hello\n')
+        self.conn.request(b'rand_val\n')
+        self.last_message_time = time.time()
+
+    def send_report(self):
+        self.conn.request(b'report\n')
+        self.last_message_time = time.time()
+
+    def dropped(self):
+        self.conn.close()
+
+
+def _deliver_fresh(address, key_id, pool, stats):
+    session = _Session(key_id, address)
+    stats['setups'] += 1
+    session.send_report()
+    session.dropped()
+
+
+def _deliver_pooled(address, key_id, pool, stats):
+    session = pool.get(key_id)
+    if session is None:
+        session = _Session(key_id, address)
+        stats['setups'] += 1
+        pool.add(session)
+    session.send_report()
+    if not pool.release(session):
+        session.dropped()
+
+
+def _provider(deliver, address, key_id, results, latencies, stats):
+    pool = TaskSessionPool()
+    for _ in range(results):
+        start = time.perf_counter()
+        deliver(address, key_id, pool, stats)
+        latencies.append(time.perf_counter() - start)
+    pool.drop_all()
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+@click.command()
+@click.option("--providers", default=8, help="Number of providers")
+@click.option("--results", default=200, help="Results sent by each provider")
+def run(providers, results):
+    server = StubRequestor(('127.0.0.1', 0), StubRequestorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    for name, deliver in [('fresh', _deliver_fresh),
+                          ('pooled', _deliver_pooled)]:
+        latencies = []
+        stats = {'setups': 0}
+        threads = [
+            threading.Thread(target=_provider,
+                             args=(deliver, server.server_address,
+                                   'provider_{}'.format(i), results,
+                                   latencies, stats))
+            for i in range(providers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        print("{:<7} {} results in {:.2f}s, {} connection setups, "
+              "p50 {:.2f} ms, p99 {:.2f} ms"
+              .format(name, len(latencies), elapsed, stats['setups'],
+                      _percentile(latencies, 50) * 1000,
+                      _percentile(latencies, 99) * 1000))
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,102 @@
+"""
+Dump a task with many subtasks after every subtask update, pickling the whole
+task like previous versions of TaskManager did and appending changes to
+a TaskJournal, then compare time and bytes written.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.taskjournal_benchmark [--subtasks 5000]
+"""
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from golem.task.taskjournal import TaskJournal
+from golem.task.taskstate import SubtaskState, SubtaskStatus, TaskState
+
+
+class BenchmarkTask(object):
+
+    def __init__(self, subtasks):
+        self.subtasks_given = {
+            'subtask_{}'.format(i): dict(node_id='node_{}'.format(i % 50),
+                                         start_task=i, end_task=i,
+                                         status=SubtaskStatus.starting)
+            for i in range(subtasks)
+        }
+        self.collected_file_names = {}
+
+
+def _task_with_state(subtasks):
+    task = BenchmarkTask(subtasks)
+    state = TaskState()
+    for subtask_id in task.subtasks_given:
+        subtask_state = SubtaskState()
+        subtask_state.subtask_id = subtask_id
+        subtask_state.subtask_status = SubtaskStatus.starting
+        state.subtask_states[subtask_id] = subtask_state
+    return task, state
+
+
+def _finish_subtask(task, state, i):
+    subtask_id = 'subtask_{}'.format(i)
+    task.subtasks_given[subtask_id]['status'] = SubtaskStatus.finished
+    task.collected_file_names[i] = 'result_{}.png'.format(i)
+    state.subtask_states[subtask_id].subtask_status = SubtaskStatus.finished
+
+
+def _pickle_dumps(path, task, state, updates):
+    written = 0
+    for i in range(updates):
+        _finish_subtask(task, state, i)
+        data = pickle.dumps((task, state), protocol=2)
+        with path.open('wb') as f:
+            f.write(data)
+        written += len(data)
+    return written
+
+
+def _journal_dumps(path, task, state, updates):
+    journal = TaskJournal(path)
+    journal.dump(task, state)
+    written = 0
+    for i in range(updates):
+        _finish_subtask(task, state, i)
+        size = path.stat().st_size
+        journal.dump(task, state)
+        written += max(path.stat().st_size - size, 0)
+    return written
+
+
+@click.command()
+@click.option("--subtasks", default=5000, help="Number of subtasks")
+@click.option("--updates", default=200, help="Number of subtask updates")
+def run(subtasks, updates):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pickle_path = Path(tmp_dir) / 'task.pickle'
+        journal_path = Path(tmp_dir) / ('task' + TaskJournal.SUFFIX)
+
+        for name, method, path in [('pickle', _pickle_dumps, pickle_path),
+                                   ('journal', _journal_dumps, journal_path)]:
+            task, state = _task_with_state(subtasks)
+            start = time.perf_counter()
+            written = method(path, task, state, updates)
+            elapsed = time.perf_counter() - start
+            print("{:<8} {} dumps in {:.3f}s, {:.1f} KiB written per dump"
+                  .format(name, updates, elapsed,
+                          written / updates / 1024))
+
+        start = time.perf_counter()
+        TaskJournal.read_header(journal_path)
+        print("journal header read in {:.6f}s"
+              .format(time.perf_counter() - start))
+
+        start = time.perf_counter()
+        TaskJournal(journal_path).load()
+        print("journal loaded in {:.3f}s".format(time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
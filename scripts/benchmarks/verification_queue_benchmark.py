@@ -0,0 +1,124 @@
+"""
+Verify a batch of simulated subtask results the way TaskManager does: inline
+in the reactor thread (computed_task_received) and in VerificationQueue
+(verify_computed_task). Each verification compares two random images with
+numpy. Total time and the longest reactor stall, measured with a LoopingCall
+ticking every 10 ms, are compared.
+
+Usage (from the repository root):
+    python -m scripts.benchmarks.verification_queue_benchmark [--results 40]
+"""
+import time
+
+import click
+import numpy
+from twisted.internet import reactor, task
+from twisted.internet.defer import Deferred, inlineCallbacks
+
+from golem.task.verificationqueue import VerificationQueue
+
+TICK = 0.01
+
+
+class StallMonitor(object):
+
+    def __init__(self):
+        self.last = None
+        self.max_stall = 0.0
+        self.loop = task.LoopingCall(self._tick)
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.max_stall = 0.0
+        self.loop.start(TICK)
+
+    def stop(self):
+        self.loop.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.max_stall = max(self.max_stall, now - self.last - TICK)
+        self.last = now
+
+
+def _verify(size):
+    first = numpy.random.random((size, size, 3))
+    second = first + numpy.random.normal(0, 0.01, first.shape)
+    return float(numpy.mean((first - second) ** 2)) < 0.01
+
+
+def _sleep(seconds):
+    d = Deferred()
+    reactor.callLater(seconds, d.callback, None)
+    return d
+
+
+def _inline(results, size):
+    for _ in range(results):
+        assert _verify(size)
+        # computed_task_received is called once per received result
+        yield _sleep(0)
+
+
+def _queued(queue, results, size):
+    done = Deferred()
+    left = [results]
+
+    def verified(accepted):
+        assert accepted
+        left[0] -= 1
+        if not left[0]:
+            done.callback(None)
+
+    for i in range(results):
+        queue.submit("task{}".format(i % 4), lambda: _verify(size), verified,
+                     done.errback, priority=i / results)
+    return done
+
+
+@inlineCallbacks
+def _run(results, size, workers):
+    monitor = StallMonitor()
+
+    monitor.start()
+    start = time.perf_counter()
+    for d in _inline(results, size):
+        yield d
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    print("{:<10} {} results in {:.2f}s, longest reactor stall {:.0f} ms"
+          .format("inline", results, elapsed, monitor.max_stall * 1000))
+
+    for max_workers in workers:
+        queue = VerificationQueue(max_workers=max_workers, max_per_task=1)
+        monitor.start()
+        start = time.perf_counter()
+        yield _queued(queue, results, size)
+        elapsed = time.perf_counter() - start
+        monitor.stop()
+        print("{:<10} {} results in {:.2f}s, longest reactor stall {:.0f} ms"
+              .format("queue({})".format(max_workers), results, elapsed,
+                      monitor.max_stall * 1000))
+        print("           {}".format(queue.metrics))
+        queue.stop()
+
+
+@click.command()
+@click.option("--results", default=40, help="Number of verified results")
+@click.option("--size", default=600, help="Verified image size in pixels")
+@click.option("--workers", default="1,2,4",
+              help="Comma separated verification worker counts")
+def run(results, size, workers):
+    workers = [int(w) for w in workers.split(",")]
+
+    def main():
+        d = _run(results, size, workers)
+        d.addErrback(lambda failure: failure.printTraceback())
+        d.addBoth(lambda _: reactor.stop())
+
+    reactor.callWhenRunning(main)
+    reactor.run()
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -399,6 +399,7 @@ class TestBlenderTask(TempDirFixture, LogTestCase):
         img1.close()
 
         bt._update_frame_preview(file1, 1, part=1, final=True)
+        bt.save_previews()
         img = Image.open(file3)
         self.assertTrue(img.size == (300, 200))
         img = Image.open(file4)
@@ -55,16 +55,24 @@ class TestCoreVerificator(TempDirFixture, LogTestCase):
 
     def test_check_files(self):
         cv = CoreVerificator()
-        cv._check_files("SUBTASK X", dict(), [], Mock())
+        cv.verify("SUBTASK X", dict(), [], Mock())
         assert cv.get_verification_state("SUBTASK X") == SubtaskVerificationState.WRONG_ANSWER
 
         files = self.additional_dir_content([3])
-        cv._check_files("SUBTASK X2", dict(), files, Mock())
+        cv.verify("SUBTASK X2", dict(), files, Mock())
         assert cv.get_verification_state("SUBTASK X2") == SubtaskVerificationState.VERIFIED
 
         files = self.additional_dir_content([3])
-        cv._check_files("SUBTASK Y", dict(), [files[0]], Mock())
+        cv.verify("SUBTASK Y", dict(), [files[0]], Mock())
         assert cv.get_verification_state("SUBTASK Y") == SubtaskVerificationState.VERIFIED
 
-        cv._check_files("SUBTASK Z", dict(), ["not a file"], Mock())
+        cv.verify("SUBTASK Z", dict(), ["not a file"], Mock())
         assert cv.get_verification_state("SUBTASK Z") == SubtaskVerificationState.WRONG_ANSWER
+
+    def test_check(self):
+        cv = CoreVerificator()
+        files = self.additional_dir_content([1])
+        assert cv.check("SUBTASK X", dict(), files, Mock()) == SubtaskVerificationState.VERIFIED
+        assert "SUBTASK X" not in cv.ver_states
+        cv.verified("SUBTASK X", dict(), SubtaskVerificationState.VERIFIED)
+        assert cv.is_verified("SUBTASK X")
@@ -465,6 +465,36 @@ class TestCoreTask(LogTestCase, TestDirFixture):
         }
         c.accept_results("SUBTASK1", None)
 
+    def test_verify_results(self):
+        task = self._get_core_task()
+        subtask_id = "xxyyzz"
+        task.subtasks_given[subtask_id] = {
+            "status": SubtaskStatus.downloading, "node_id": "Node 1"}
+        files_dir = os.path.join(task.tmp_dir, subtask_id)
+        files = self.additional_dir_content([2], sub_dir=files_dir)
+        shutil.move(files[1], files[1] + ".log")
+        files[1] += ".log"
+
+        verification = task.verify_results(subtask_id, files,
+                                           ResultType.FILES)
+        # the task is not changed in a verification thread
+        assert subtask_id not in task.results
+        assert subtask_id not in task.stdout
+        assert subtask_id not in task.verificator.ver_states
+
+        task.results_verified(subtask_id, files, ResultType.FILES,
+                              verification)
+        assert task.results[subtask_id] == [outer_dir_path(files[0])]
+        assert task.stdout[subtask_id] == files[1]
+        assert task.stderr[subtask_id] == ""
+        assert task.verificator.is_verified(subtask_id)
+        assert task.subtasks_given[subtask_id]["status"] == \
+            SubtaskStatus.finished
+
+        # results of finished subtasks are not verified again
+        assert task.verify_results(subtask_id, files, ResultType.FILES) \
+            is None
+
     def test_create_path_in_load_task_result(self):
         c = self._get_core_task()
         assert not os.path.isdir(os.path.join(c.tmp_dir, "subtask1"))
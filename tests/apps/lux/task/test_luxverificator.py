@@ -19,10 +19,10 @@ class TestLuxRenderVerificator(TempDirFixture, LogTestCase, PEP8MixIn):
 
     def test_check_files(self):
         lrv = LuxRenderVerificator(AdvanceRenderingVerificationOptions)
-        lrv._check_files("SUBTASK1", {}, [], Mock())
+        lrv.verify("SUBTASK1", {}, [], Mock())
         assert lrv.get_verification_state("SUBTASK1") == SubtaskVerificationState.WRONG_ANSWER
         lrv.advanced_verification = False
-        lrv._check_files("SUBTASK2", {}, ["not existing"], Mock())
+        lrv.verify("SUBTASK2", {}, ["not existing"], Mock())
         assert lrv.get_verification_state("SUBTASK2") == SubtaskVerificationState.WRONG_ANSWER
 
     @patch("apps.lux.task.verificator.LocalComputer")
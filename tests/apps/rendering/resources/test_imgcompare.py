@@ -1,5 +1,6 @@
 import os
 
+import numpy
 from PIL import Image
 
 from apps.rendering.resources.imgcompare import *
@@ -9,7 +10,9 @@ from apps.rendering.resources.imgcompare import (advance_verify_img,
                                                  compare_imgs,
                                                  compare_pil_imgs,
                                                  calculate_mse,
-                                                 calculate_psnr, logger)
+                                                 calculate_psnr, crop_array,
+                                                 logger,
+                                                 sum_squared_differences)
 from apps.rendering.resources.imgrepr import load_img, PILImgRepr
 
 from golem.testutils import TempDirFixture, PEP8MixIn
@@ -167,6 +170,69 @@ class TestCompareImgFunctions(TempDirFixture, LogTestCase, PEP8MixIn):
 
         assert calculate_mse(img1, img2, start1=(0, 0), start2=(2, 2), box=(7, 7)) == 0
 
+    def test_calculate_mse_matches_pixel_loop(self):
+        rand = numpy.random.RandomState(0)
+        imgs = []
+        for _ in range(2):
+            img = PILImgRepr()
+            img.load_from_pil_object(Image.fromarray(
+                rand.randint(0, 256, (30, 40, 3)).astype(numpy.uint8)))
+            imgs.append(img)
+
+        start1, start2, box = (5, 2), (1, 9), (20, 15)
+        expected = 0
+        for i in range(box[0]):
+            for j in range(box[1]):
+                p1 = imgs[0].get_pixel((start1[0] + i, start1[1] + j))
+                p2 = imgs[1].get_pixel((start2[0] + i, start2[1] + j))
+                expected += sum((c1 - c2) ** 2 for c1, c2 in zip(p1, p2))
+        expected /= box[0] * box[1] * 3
+
+        assert calculate_mse(imgs[0], imgs[1], start1, start2, box) == \
+            expected
+
+        exr_img1 = get_exr_img_repr()
+        exr_img2 = get_exr_img_repr(alt=True)
+        expected = 0
+        for i in range(10):
+            for j in range(10):
+                p1 = exr_img1.get_pixel((i, j))
+                p2 = exr_img2.get_pixel((i, j))
+                expected += sum((c1 - c2) ** 2 for c1, c2 in zip(p1, p2))
+        expected /= 10 * 10 * 3
+
+        assert abs(calculate_mse(exr_img1, exr_img2) - expected) < 1e-12
+
+    def test_crop_array(self):
+        img = get_pil_img_repr(self.temp_file_name("img.png"), (10, 8))
+        img.set_pixel((3, 2), (1, 2, 3))
+
+        arr = crop_array(img, (3, 2), (4, 5))
+        assert arr.shape == (5, 4, 3)
+        assert arr[0][0].tolist() == [1, 2, 3]
+        assert arr[1][1].tolist() == [255, 0, 0]
+
+        with self.assertRaises(IndexError):
+            crop_array(img, (7, 0), (4, 5))
+        with self.assertRaises(IndexError):
+            crop_array(img, (0, 4), (4, 5))
+        with self.assertRaises(IndexError):
+            crop_array(img, (-1, 0), (4, 5))
+
+    def test_sum_squared_differences(self):
+        arr1 = numpy.array([[0, 255], [10, 20]], dtype=numpy.uint8)
+        arr2 = numpy.array([[255, 0], [20, 10]], dtype=numpy.uint8)
+        result = sum_squared_differences(arr1, arr2)
+        assert isinstance(result, int)
+        assert result == 2 * 255 ** 2 + 2 * 10 ** 2
+
+        result = sum_squared_differences(arr1.astype(numpy.float32) / 2,
+                                         arr2.astype(numpy.float32) / 2)
+        assert isinstance(result, float)
+        assert result == (2 * 255 ** 2 + 2 * 10 ** 2) / 4
+
+        with self.assertRaises(ValueError):
+            sum_squared_differences(arr1, arr2[0])
 
     def test_compare_imgs(self):
         img1_path = self.temp_file_name("img1.png")
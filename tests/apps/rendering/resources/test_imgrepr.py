@@ -89,6 +89,19 @@ class TestPILImgRepr(TempDirFixture, PEP8MixIn):
         assert p_copy.get_pixel((5, 3)) == [200, 210, 220]
         assert p.get_pixel((5, 3)) == [255, 0, 0]
 
+    def test_to_numpy(self):
+        img_path = self.temp_file_name('img.png')
+        p = get_pil_img_repr(img_path, size=(10, 7))
+        p.set_pixel((3, 5), [10, 11, 12])
+
+        arr = p.to_numpy()
+        assert arr.shape == (7, 10, 3)
+        assert arr[5][3].tolist() == [10, 11, 12]
+        assert arr[3][5].tolist() == [255, 0, 0]
+        for x in range(10):
+            for y in range(7):
+                assert arr[y][x].tolist() == p.get_pixel((x, y))
+
 
 def almost_equal(v1, v2):
     assert abs(v1 - v2) < 0.001
@@ -185,6 +198,16 @@ class TestExrImgRepr(TempDirFixture, PEP8MixIn):
         img3 = img_alt.to_pil(use_extremas=True)
         assert isinstance(img3, Image.Image)
 
+    def test_to_numpy(self):
+        e = get_exr_img_repr()
+        e.set_pixel((2, 7), [0.1, 0.2, 0.3])
+
+        arr = e.to_numpy()
+        assert arr.shape == (10, 10, 3)
+        for x in range(10):
+            for y in range(10):
+                assert arr[y][x].tolist() == e.get_pixel((x, y))
+
     def test_to_l_image(self):
         e = get_exr_img_repr()
         img = e.to_l_image()
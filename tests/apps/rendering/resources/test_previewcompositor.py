@@ -0,0 +1,79 @@
+import os
+import pickle
+from unittest.mock import patch
+
+from PIL import Image
+
+from apps.rendering.resources.previewcompositor import PreviewCompositor
+from golem.testutils import TempDirFixture
+
+
+class TestPreviewCompositor(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tempdir, "preview.png")
+        self.compositor = PreviewCompositor(self.path, (10, 20))
+
+    def test_new_image(self):
+        assert self.compositor.image.size == (10, 20)
+        assert self.compositor.image.getpixel((0, 0)) == (0, 0, 0)
+        assert self.compositor.dirty
+        assert self.compositor.save()
+        assert os.path.isfile(self.path)
+
+    def test_load_image(self):
+        Image.new("RGB", (10, 20), (1, 2, 3)).save(self.path)
+        assert self.compositor.image.getpixel((5, 5)) == (1, 2, 3)
+        assert not self.compositor.dirty
+
+        # An image of a different size is not used
+        Image.new("RGB", (20, 20), (1, 2, 3)).save(self.path)
+        compositor = PreviewCompositor(self.path, (10, 20))
+        assert compositor.image.getpixel((5, 5)) == (0, 0, 0)
+
+    def test_paste_and_fill(self):
+        self.compositor.paste(Image.new("RGB", (10, 5), (0, 255, 0)), (0, 5))
+        self.compositor.paste((255, 0, 0), (0, 15, 10, 20))
+        image = self.compositor.image
+        assert image.getpixel((0, 4)) == (0, 0, 0)
+        assert image.getpixel((9, 5)) == (0, 255, 0)
+        assert image.getpixel((9, 14)) == (0, 0, 0)
+        assert image.getpixel((9, 19)) == (255, 0, 0)
+
+    def test_add(self):
+        chunk = Image.new("RGBA", (10, 10), (100, 100, 100, 255))
+        self.compositor.add(chunk, (0, 10))
+        self.compositor.add(chunk, (0, 10))
+        assert self.compositor.image.getpixel((0, 9)) == (0, 0, 0)
+        assert self.compositor.image.getpixel((0, 10)) == (200, 200, 200)
+
+    def test_save_debounced(self):
+        self.compositor.paste((1, 1, 1), (0, 0, 1, 1))
+        assert self.compositor.save()
+        assert not self.compositor.save()
+
+        self.compositor.paste((2, 2, 2), (0, 0, 1, 1))
+        with patch('apps.rendering.resources.previewcompositor.'
+                   'save_image_or_log_error') as save:
+            assert not self.compositor.save()
+            assert self.compositor.dirty
+            assert self.compositor.save(force=True)
+        save.assert_called_once_with(self.compositor.image, self.path, "PNG")
+        assert not self.compositor.dirty
+
+    def test_clear(self):
+        self.compositor.paste((1, 1, 1), (0, 0, 10, 20))
+        self.compositor.clear()
+        assert self.compositor.image.getpixel((5, 5)) == (0, 0, 0)
+        assert self.compositor.dirty
+
+    def test_pickle(self):
+        self.compositor.paste((1, 1, 1), (0, 0, 10, 20))
+        self.compositor.save()
+        self.compositor.paste((2, 2, 2), (0, 0, 10, 20))
+
+        compositor = pickle.loads(pickle.dumps(self.compositor))
+        assert compositor.file_path == self.path
+        assert not compositor.dirty
+        assert compositor.image.getpixel((5, 5)) == (1, 1, 1)
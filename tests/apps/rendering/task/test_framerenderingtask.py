@@ -83,6 +83,7 @@ class TestFrameRenderingTask(TestDirFixture, LogTestCase):
         task.accept_results("SUBTASK1", [img_file])
         assert task.num_tasks_received == 1
         assert task.collected_file_names[3] == img_file
+        task.save_previews()
         preview_img = Image.open(task.preview_file_path)
         assert preview_img.getpixel((100, 100)) == (0, 0, 255)
         preview_img.close()
@@ -145,7 +146,27 @@ class TestFrameRenderingTask(TestDirFixture, LogTestCase):
         new_img.save(img_path)
         frame_task._update_frame_preview(img_path, 5, 2)
         frame_task._update_frame_preview(img_path, 7, 2)
+
+        preview = frame_task._get_preview_compositor(
+            frame_task._get_preview_file_path(0))
+        assert preview.image.getpixel((5, 5)) == (0, 255, 0)
+        assert preview.image.getpixel((5, 15)) == (255, 0, 0)
+        task_preview = frame_task._get_preview_compositor(
+            frame_task.last_preview_path)
+        assert task_preview.image.getpixel((5, 15)) == (255, 0, 0)
+
+        new_img = Image.new("RGB", (10, 20), (0, 0, 255))
+        img_path = self.temp_file_name("image3.png")
+        new_img.save(img_path)
         frame_task._update_frame_preview(img_path, 7, 1, True)
+        assert frame_task.last_preview_path == \
+            frame_task._get_preview_task_file_path(1)
+        assert not os.path.exists(frame_task.last_preview_path)
+
+        frame_task.save_previews()
+        preview_img = Image.open(frame_task.last_preview_path)
+        assert preview_img.getpixel((5, 15)) == (0, 0, 255)
+        preview_img.close()
 
     def test_paste_new_chunk(self):
         task = self._get_frame_task()
@@ -153,24 +174,17 @@ class TestFrameRenderingTask(TestDirFixture, LogTestCase):
         task.res_y = 20
         task.scale_factor = 1
         preview_path = self.temp_file_name("image1.png")
+        preview = task._get_preview_compositor(preview_path)
         with self.assertLogs(logger, level="ERROR") as l:
-            assert task._paste_new_chunk("not an image", preview_path, 1, 10) is None
-        assert any("Can't generate preview" in log for log in l.output)
-        with open(preview_path, 'w') as f:
-            f.write("not an image, again not an image")
-        with self.assertLogs(logger, level="ERROR") as l:
-            assert task._paste_new_chunk("not an image", preview_path, 1, 10) is None
+            task._paste_new_chunk("not an image", preview, 1, 10)
         assert any("Can't add new chunk to preview" in log for log in l.output)
-        assert any("Can't generate preview" in log for log in l.output)
 
         img = Image.new("RGB", (10, 10), (0, 122, 0))
-        img.save(preview_path)
-        with self.assertLogs(logger, level="ERROR"):
-            new_img = task._paste_new_chunk("nota image", preview_path, 1, 10)
-        assert isinstance(new_img, Image.Image)
         with self.assertNoLogs(logger, level="ERROR"):
-            new_img = task._paste_new_chunk(img, preview_path, 1, 10)
-        assert isinstance(new_img, Image.Image)
+            task._paste_new_chunk(img, preview, 2, 2)
+            task._paste_new_chunk(img, preview, 2, 2)
+        assert preview.image.getpixel((0, 9)) == (0, 0, 0)
+        assert preview.image.getpixel((0, 10)) == (0, 244, 0)
 
     def test_mark_task_area(self):
         task = self._get_frame_task()
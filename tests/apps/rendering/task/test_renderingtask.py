@@ -126,6 +126,7 @@ class TestRenderingTask(TestDirFixture, LogTestCase):
         img.save(rt.preview_file_path, PREVIEW_EXT)
         img.close()
         rt._remove_from_preview("xxyyzz")
+        rt.save_previews()
         img = rt._open_preview()
 
         max_x, max_y = 800 - 1, 600 - 1
@@ -197,6 +198,7 @@ class TestRenderingTask(TestDirFixture, LogTestCase):
         task.restart_subtask("DEF")
         assert task.subtasks_given["DEF"]["status"] == SubtaskStatus.restarted
 
+        task.save_previews()
         assert path.isfile(task.preview_file_path)
         assert task.num_tasks_received == -1
 
@@ -142,6 +142,19 @@ class TestRenderingVerificator(TempDirFixture, LogTestCase, PEP8MixIn):
         rv.verification_options.probability = 0.0
         assert rv._choose_adv_ver_file(list(range(5)), {"node_id": "NodeX"}) is None
 
+    def test_verified(self):
+        rv = RenderingVerificator()
+        rv.verified("id1", {"node_id": "NodeX"}, SubtaskVerificationState.VERIFIED)
+        assert rv.is_verified("id1")
+        assert rv.verified_clients == []
+
+        rv.advanced_verification = True
+        rv.verified("id2", {"node_id": "NodeX"}, SubtaskVerificationState.WRONG_ANSWER)
+        assert rv.verified_clients == []
+        rv.verified("id3", {"node_id": "NodeX"}, SubtaskVerificationState.VERIFIED)
+        rv.verified("id4", {"node_id": "NodeX"}, SubtaskVerificationState.VERIFIED)
+        assert rv.verified_clients == ["NodeX"]
+
     def test_error_in_change_scope(self):
         rv = RenderingVerificator()
         rv.tmp_dir = None
@@ -172,22 +185,22 @@ class TestFrameRenderingVerificator(TempDirFixture):
         frv = FrameRenderingVerificator()
         frv.total_tasks = 20
         frv.use_frames = False
-        frv._check_files("id1", {"frames": [3]}, [], Mock())
+        frv.verify("id1", {"frames": [3]}, [], Mock())
         assert frv.ver_states["id1"] == SubtaskVerificationState.WRONG_ANSWER
 
         frv.use_frames = True
         frv.frames = [3, 4, 5, 6]
-        frv._check_files("id1", {"frames": [3]}, [], Mock())
+        frv.verify("id1", {"frames": [3]}, [], Mock())
         assert frv.ver_states["id1"] == SubtaskVerificationState.WRONG_ANSWER
 
         frv.total_tasks = 2
-        frv._check_files("id1", {"frames": [3]}, [], Mock())
+        frv.verify("id1", {"frames": [3]}, [], Mock())
         assert frv.ver_states["id1"] == SubtaskVerificationState.WRONG_ANSWER
 
-        frv._check_files("id1", {"frames": [3, 4]}, ["file1"], Mock())
+        frv.verify("id1", {"frames": [3, 4]}, ["file1"], Mock())
         assert frv.ver_states["id1"] == SubtaskVerificationState.WRONG_ANSWER
 
-        frv._check_files("id1", {"frames": [3, 4], "start_task": 1}, ["file1", "file2"], Mock())
+        frv.verify("id1", {"frames": [3, 4], "start_task": 1}, ["file1", "file2"], Mock())
         assert frv.ver_states["id1"] == SubtaskVerificationState.WRONG_ANSWER
 
     def test_get_part_img_size(self):
@@ -0,0 +1,83 @@
+import struct
+import unittest
+
+from golem.core.databuffer import DataBuffer
+
+
+class TestDataBuffer(unittest.TestCase):
+
+    def test_ulong(self):
+        db = DataBuffer()
+        assert db.peek_ulong() is None
+        with self.assertRaises(ValueError):
+            db.read_ulong()
+        with self.assertRaises(AttributeError):
+            db.append_ulong(-1)
+
+        assert db.append_ulong(7) == struct.pack("!L", 7)
+        db.append_ulong(2 ** 32 - 1)
+        assert db.data_size() == 8
+        assert db.peek_ulong() == 7
+        assert db.read_ulong() == 7
+        assert db.read_ulong() == 2 ** 32 - 1
+        assert db.data_size() == 0
+
+    def test_bytes(self):
+        db = DataBuffer()
+        db.append_bytes(b"abc")
+        db.append_bytes(bytearray(b"def"))
+        assert db.buffered_data == b"abcdef"
+        assert db.peek_bytes(2) == b"ab"
+        assert db.read_bytes(2) == b"ab"
+        assert db.buffered_data == b"cdef"
+        assert db.read_bytes(3) == b"cde"
+        assert db.data_size() == 1
+        with self.assertRaises(AttributeError):
+            db.peek_bytes(2)
+
+        db.append_bytes(b"gh")
+        assert db.read_all() == b"fgh"
+        assert db.data_size() == 0
+        assert db.read_all() == b""
+
+    def test_len_prefixed_bytes(self):
+        db = DataBuffer()
+        assert db.read_len_prefixed_bytes() is None
+
+        db.append_len_prefixed_bytes(b"first")
+        db.append_len_prefixed_bytes(b"second")
+        assert db.read_len_prefixed_bytes() == b"first"
+        assert db.read_len_prefixed_bytes() == b"second"
+        assert db.read_len_prefixed_bytes() is None
+
+        # data received in chunks
+        data = DataBuffer()
+        for i in range(1, 100):
+            data.append_len_prefixed_bytes(bytes([i]) * i * 10)
+        stream = data.read_all()
+
+        received = []
+        for i in range(0, len(stream), 7):
+            db.append_bytes(stream[i:i + 7])
+            received.extend(db.get_len_prefixed_bytes())
+
+        assert received == [bytes([i]) * i * 10 for i in range(1, 100)]
+        assert db.data_size() == 0
+
+    def test_clear_buffer(self):
+        db = DataBuffer()
+        db.append_len_prefixed_bytes(b"data")
+        db.read_ulong()
+        db.clear_buffer()
+        assert db.data_size() == 0
+        assert db.buffered_data == b""
+        assert db.peek_ulong() is None
+
+    def test_reads_do_not_keep_consumed_data(self):
+        db = DataBuffer()
+        db.append_len_prefixed_bytes(b"x" * 100)
+        for _ in range(1000):
+            db.append_len_prefixed_bytes(b"x" * 100)
+            assert db.read_len_prefixed_bytes() == b"x" * 100
+            assert db.data_size() == 104
+            assert len(db._data) <= 2 * db.data_size()
@@ -0,0 +1,51 @@
+import unittest
+
+from golem.core.deadlinequeue import DeadlineQueue
+
+
+class TestDeadlineQueue(unittest.TestCase):
+
+    def test_pop_expired(self):
+        queue = DeadlineQueue()
+        queue.schedule("b", 20.0)
+        queue.schedule("a", 10.0)
+        queue.schedule("c", 30.0)
+        assert len(queue) == 3
+        assert queue.next_deadline() == 10.0
+
+        assert queue.pop_expired(10.0) == []
+        assert queue.pop_expired(25.0) == ["a", "b"]
+        assert "a" not in queue
+        assert list(queue) == ["c"]
+        assert queue.pop_expired(25.0) == []
+
+    def test_reschedule_and_cancel(self):
+        queue = DeadlineQueue()
+        queue.schedule("a", 10.0)
+        queue.schedule("b", 10.0)
+        queue.schedule("a", 30.0)
+        queue.cancel("b")
+        queue.cancel("unknown")
+        assert queue.get_deadline("a") == 30.0
+        assert queue.get_deadline("b") is None
+
+        assert queue.pop_expired(20.0) == []
+        assert queue.next_deadline() == 30.0
+        queue.schedule("a", 5.0)
+        assert queue.pop_expired(20.0) == ["a"]
+        assert not queue
+        assert queue.next_deadline() is None
+
+    def test_unorderable_keys(self):
+        queue = DeadlineQueue()
+        queue.schedule(("task", "subtask1"), 10.0)
+        queue.schedule(("task", None), 10.0)
+        assert len(queue.pop_expired(11.0)) == 2
+
+    def test_compaction(self):
+        queue = DeadlineQueue()
+        for i in range(1000):
+            queue.schedule("a", float(i))
+        assert len(queue._heap) < 100
+        assert queue.pop_expired(998.0) == []
+        assert queue.pop_expired(1000.0) == ["a"]
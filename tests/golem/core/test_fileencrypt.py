@@ -1,3 +1,4 @@
+import io
 import os
 import random
 
@@ -98,6 +99,49 @@ class TestAESFileEncryptor(TestDirFixture):
 
         self.assertFalse(decrypted)
 
+    def test_streams(self):
+        """ Test encrypting and decrypting streams """
+        secret = FileEncryptor.gen_secret(10, 20)
+        data = os.urandom(100000)
+        encrypted = io.BytesIO()
+
+        with AESFileEncryptor.encrypting_stream(encrypted, secret) as stream:
+            for i in range(0, len(data), 999):
+                stream.write(data[i:i + 999])
+        assert encrypted.getvalue()[:5] == b'gpkg\x01'
+
+        encrypted.seek(0)
+        with AESFileEncryptor.decrypting_stream(encrypted, secret) as stream:
+            assert stream.read() == data
+            for offset, length in [(0, 10), (65535, 17), (99990, 100),
+                                   (16, 16), (1, 0)]:
+                stream.seek(offset)
+                assert stream.read(length) == data[offset:offset + length]
+            assert stream.seek(0, io.SEEK_END) == len(data)
+
+    def test_decrypt_versions(self):
+        """ Test decrypting files with unversioned and unknown headers """
+        secret = FileEncryptor.gen_secret(10, 20)
+        decrypted_path = self.test_file_path + ".dec"
+        AESFileEncryptor.encrypt(self.test_file_path, self.enc_file_path,
+                                 secret)
+        with open(self.enc_file_path, 'rb') as f:
+            encrypted = f.read()
+
+        # files encrypted before the header was versioned
+        with open(self.enc_file_path, 'wb') as f:
+            f.write(AESFileEncryptor.salt_prefix + encrypted[5:])
+        AESFileEncryptor.decrypt(self.enc_file_path, decrypted_path, secret)
+        with open(self.test_file_path, 'rb') as f1, \
+                open(decrypted_path, 'rb') as f2:
+            assert f1.read() == f2.read()
+
+        with open(self.enc_file_path, 'wb') as f:
+            f.write(b'gpkg\x7f' + encrypted[5:])
+        with self.assertRaises(ValueError):
+            AESFileEncryptor.decrypt(self.enc_file_path, decrypted_path,
+                                     secret)
+
     def test_get_key_and_iv(self):
         """ Test helper methods: gen_salt and get_key_and_iv """
         salt = AESFileEncryptor.gen_salt(AESFileEncryptor.block_size)
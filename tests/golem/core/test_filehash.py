@@ -0,0 +1,174 @@
+import hashlib
+import os
+from unittest.mock import patch
+
+from golem.core import filehash
+from golem.core.filehash import FileHashCache, FileHasher, \
+    FileHashCacheService, hash_file
+from golem.testutils import TempDirFixture
+
+
+class TestHashFile(TempDirFixture):
+
+    def test_digests(self):
+        file_path = os.path.join(self.path, 'file.bin')
+        data = os.urandom(3 * 1024 + 17)
+        with open(file_path, 'wb') as out:
+            out.write(data)
+
+        for block_size in [1, 64, 1024, 2 ** 20]:
+            digests = hash_file(file_path, block_size=block_size)
+            assert digests['sha1'] == hashlib.sha1(data).digest()
+            assert digests['sha256'] == hashlib.sha256(data).digest()
+
+        digests = hash_file(file_path, algorithms=('md5',))
+        assert digests == {'md5': hashlib.md5(data).digest()}
+
+    def test_empty_file(self):
+        file_path = os.path.join(self.path, 'empty')
+        open(file_path, 'wb').close()
+        assert hash_file(file_path)['sha1'] == hashlib.sha1(b'').digest()
+
+
+class TestFileHasher(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        FileHasher.initialize(self.path)
+
+    def tearDown(self):
+        FileHasher.cache = FileHashCache()
+        super().tearDown()
+
+    def _write(self, name, data):
+        file_path = os.path.join(self.path, name)
+        with open(file_path, 'wb') as out:
+            out.write(data)
+        return file_path
+
+    def test_cache(self):
+        file_path = self._write('file', b'abc')
+
+        with patch('golem.core.filehash.hash_file',
+                   wraps=filehash.hash_file) as hash_file_mock:
+            assert FileHasher.sha1(file_path) == hashlib.sha1(b'abc').digest()
+            assert FileHasher.sha256(file_path) == \
+                hashlib.sha256(b'abc').digest()
+            assert hash_file_mock.call_count == 1
+
+            # size and mtime change
+            self._write('file', b'abcd')
+            assert FileHasher.sha1(file_path) == \
+                hashlib.sha1(b'abcd').digest()
+            assert hash_file_mock.call_count == 2
+
+    def test_persistence(self):
+        file_path = self._write('file', b'abc')
+        FileHasher.sha1(file_path)
+        FileHasher.save()
+        assert os.path.isfile(os.path.join(self.path,
+                                           filehash.CACHE_FILE_NAME))
+
+        FileHasher.initialize(self.path)
+        with patch('golem.core.filehash.hash_file') as hash_file_mock:
+            assert FileHasher.sha1(file_path) == hashlib.sha1(b'abc').digest()
+            hash_file_mock.assert_not_called()
+
+    def test_corrupted_cache_file(self):
+        with open(os.path.join(self.path, filehash.CACHE_FILE_NAME), 'w') as f:
+            f.write('{not json')
+
+        FileHasher.initialize(self.path)
+        assert not FileHasher.cache
+
+    def test_max_entries(self):
+        FileHasher.cache.max_entries = 2
+        paths = [self._write(str(i), str(i).encode()) for i in range(3)]
+        for path in paths:
+            FileHasher.digests(path)
+
+        assert len(FileHasher.cache) == 2
+        key = filehash._file_key(paths[0])
+        assert FileHasher.cache.get(paths[0], key) is None
+
+    def test_lru_eviction(self):
+        FileHasher.cache.max_entries = 2
+        paths = [self._write(str(i), str(i).encode()) for i in range(3)]
+        FileHasher.digests(paths[0])
+        FileHasher.digests(paths[1])
+        # Reading an entry makes it the most recently used one
+        FileHasher.digests(paths[0])
+        FileHasher.digests(paths[2])
+
+        cache = FileHasher.cache
+        assert cache.get(paths[0], filehash._file_key(paths[0])) is not None
+        assert cache.get(paths[1], filehash._file_key(paths[1])) is None
+
+    def test_save_only_changed(self):
+        cache_path = os.path.join(self.path, filehash.CACHE_FILE_NAME)
+        file_path = self._write('file', b'abc')
+        FileHasher.save()
+        assert not os.path.exists(cache_path)
+
+        FileHasher.sha1(file_path)
+        FileHasher.save()
+        assert os.path.isfile(cache_path)
+
+        os.remove(cache_path)
+        FileHasher.sha1(file_path)
+        FileHasher.save()
+        assert not os.path.exists(cache_path)
+
+    def test_service(self):
+        file_path = self._write('file', b'abc')
+        cache_path = os.path.join(self.path, filehash.CACHE_FILE_NAME)
+        service = FileHashCacheService(interval_seconds=60)
+        service.start(now=False)
+
+        FileHasher.sha1(file_path)
+        service._run()
+        assert os.path.isfile(cache_path)
+
+        os.remove(cache_path)
+        FileHasher.sha256(self._write('other', b'def'))
+        service.stop()
+        assert os.path.isfile(cache_path)
+
+    def test_hash_files(self):
+        assert FileHasher.hash_files([]) == dict()
+
+        data = {self._write(str(i), os.urandom(100 + i)): i for i in range(8)}
+        with open(next(iter(data)), 'rb') as f:
+            expected = hashlib.sha256(f.read()).digest()
+
+        results = FileHasher.hash_files(data.keys(), max_workers=4)
+        assert set(results) == set(data)
+        assert results[next(iter(data))]['sha256'] == expected
+        # The cache is saved by FileHashCacheService
+        assert not os.path.exists(os.path.join(self.path,
+                                               filehash.CACHE_FILE_NAME))
+
+    def test_cached(self):
+        file_path = self._write('file', b'abc')
+
+        def compute(path):
+            calls.append(path)
+            return [len(calls)]
+        calls = []
+
+        assert FileHasher.cached(file_path, 'value', compute) == [1]
+        assert FileHasher.cached(file_path, 'value', compute) == [1]
+        assert FileHasher.cached(file_path, 'other', compute) == [2]
+        assert len(calls) == 2
+
+        # Digests and values of the same file are kept together
+        FileHasher.sha1(file_path)
+        assert FileHasher.cached(file_path, 'value', compute) == [1]
+
+        FileHasher.save()
+        FileHasher.initialize(self.path)
+        assert FileHasher.cached(file_path, 'value', compute) == [1]
+        assert len(calls) == 2
+
+        self._write('file', b'abcd')
+        assert FileHasher.cached(file_path, 'value', compute) == [3]
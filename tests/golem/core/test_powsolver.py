@@ -0,0 +1,90 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from golem.core import powsolver
+from golem.core.keysauth import EllipticalKeysAuth, sha2
+from golem.core.powsolver import ParallelPowSolver, PowSolver
+from golem.core.simplechallenge import accept_challenge, create_challenge, \
+    solve_challenge
+from golem.tools.testwithappconfig import TestWithKeysAuth
+
+
+def _solve_naive(challenge, difficulty):
+    min_hash = pow(2, 256 - difficulty)
+    solution = 0
+    while sha2(challenge + str(solution)) > min_hash:
+        solution += 1
+    return solution
+
+
+class TestPowSolver(TestCase):
+
+    def test_solve_challenge(self):
+        solver = PowSolver()
+        solver.CHUNK_SIZE = 16
+        for difficulty in range(1, 10):
+            challenge = create_challenge([], None)
+            solution = solver.solve_challenge(challenge, difficulty)
+            assert solution == _solve_naive(challenge, difficulty)
+            assert accept_challenge(challenge, solution, difficulty)
+
+    def test_generate_key(self):
+        priv_key, pub_key = PowSolver().generate_key(3)
+        assert powsolver.privtopub(priv_key) == pub_key
+        assert sha2(powsolver.encode_hex(pub_key)) <= pow(2, 256 - 3)
+
+
+class TestParallelPowSolver(TestCase):
+
+    def setUp(self):
+        self.solver = ParallelPowSolver(processes=2)
+        self.solver.MAX_LOCAL_CHALLENGE_DIFFICULTY = 0
+        self.solver.MAX_LOCAL_KEY_DIFFICULTY = 0
+        self.solver.CHUNK_SIZE = 64
+
+    def test_solve_challenge(self):
+        challenge = create_challenge([], None)
+        solution = self.solver.solve_challenge(challenge, 10)
+        assert accept_challenge(challenge, solution, 10)
+
+    def test_solve_challenge_locally(self):
+        self.solver.MAX_LOCAL_CHALLENGE_DIFFICULTY = 10
+        challenge = create_challenge([], None)
+        with patch('multiprocessing.Process') as process:
+            solution = self.solver.solve_challenge(challenge, 10)
+        assert not process.called
+        assert solution == _solve_naive(challenge, 10)
+
+    def test_generate_key(self):
+        priv_key, pub_key = self.solver.generate_key(4)
+        assert powsolver.privtopub(priv_key) == pub_key
+        assert sha2(powsolver.encode_hex(pub_key)) <= pow(2, 256 - 4)
+
+    def test_workers_failed(self):
+        with self.assertRaises(RuntimeError):
+            self.solver._run(_exit_worker, [(), ()])
+
+
+def _exit_worker(stop, results):
+    pass
+
+
+class TestSolverSelection(TestWithKeysAuth):
+
+    def tearDown(self):
+        powsolver.set_solver(ParallelPowSolver())
+        super().tearDown()
+
+    def test_set_solver(self):
+        solver = PowSolver()
+        powsolver.set_solver(solver)
+        assert powsolver.get_solver() is solver
+
+        with patch.object(solver, 'solve_challenge', return_value=7) as solve:
+            assert solve_challenge('challenge', 5)[0] == 7
+        solve.assert_called_once_with('challenge', 5)
+
+    def test_generate_new_key(self):
+        keys_auth = EllipticalKeysAuth(self.path)
+        keys_auth.generate_new(3, solver=PowSolver())
+        assert keys_auth.get_difficulty() >= 3
@@ -0,0 +1,208 @@
+import os
+import uuid
+
+from mock import patch
+
+from golem.docker.image import DockerImage
+from golem.docker.job import DockerJob, PooledDockerJob
+from golem.docker.pool import ContainerPool, WarmContainer
+from golem.testutils import TempDirFixture
+
+
+class FakeClient(object):
+    """ Runs containers and `docker exec` commands on the host: started
+    containers are marked ready, exec commands write an output file """
+
+    def __init__(self):
+        self.containers = {}  # container id -> work dir, output dir
+        self.running = {}
+        self.removed = []
+        self.execs = {}
+
+    def create_host_config(self, binds, **_):
+        return binds
+
+    def create_container(self, host_config, **_):
+        container_id = str(uuid.uuid4())
+        dirs = {bind["bind"]: host_dir for host_dir, bind
+                in host_config.items()}
+        self.containers[container_id] = (dirs[DockerJob.WORK_DIR],
+                                         dirs[DockerJob.OUTPUT_DIR])
+        return {"Id": container_id}
+
+    def start(self, container_id):
+        self.running[container_id] = True
+        work_dir, _ = self.containers[container_id]
+        open(os.path.join(work_dir, WarmContainer.READY_FILE), "w").close()
+
+    def inspect_container(self, container_id):
+        return {"State": {"Running": self.running.get(container_id, False)}}
+
+    def remove_container(self, container_id, force=False):
+        self.running.pop(container_id, None)
+        self.removed.append(container_id)
+
+    def kill(self, container_id):
+        self.running[container_id] = False
+
+    def exec_create(self, container_id, cmd, user=''):
+        exec_id = str(uuid.uuid4())
+        self.execs[exec_id] = container_id
+        return {"Id": exec_id}
+
+    def exec_start(self, exec_id):
+        work_dir, output_dir = self.containers[self.execs[exec_id]]
+        with open(os.path.join(output_dir, "result.txt"), "w") as f:
+            f.write("result")
+        with open(os.path.join(work_dir, PooledDockerJob.STDOUT_FILE),
+                  "w") as f:
+            f.write("stdout")
+
+    def exec_inspect(self, exec_id):
+        return {"ExitCode": 0}
+
+
+class TestContainerPool(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.client = FakeClient()
+        patcher = patch('golem.docker.pool.local_client',
+                        return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.pool = ContainerPool(os.path.join(self.tempdir, "containers"),
+                                  max_containers=2, max_jobs=3)
+        self.image = DockerImage("golemfactory/base", tag="1.2")
+        self.resources_dir = os.path.join(self.tempdir, "resources")
+        os.makedirs(self.resources_dir)
+
+    def _acquire(self, host_config=None):
+        return self.pool.acquire(self.image, self.resources_dir, host_config)
+
+    def test_acquire_and_release(self):
+        container = self._acquire()
+        assert container.container_id in self.client.running
+        assert os.listdir(container.work_dir) == []
+        assert self.pool.metrics['busy'] == 1
+
+        open(os.path.join(container.output_dir, "out.txt"), "w").close()
+        self.pool.release(container)
+        assert os.listdir(container.output_dir) == []
+        assert self.pool.metrics['idle'] == 1
+
+        assert self._acquire() is container
+        assert self._acquire({'cpuset': '1'}) is not container
+        assert self.pool.metrics['created'] == 2
+        assert self.pool.metrics['reused'] == 1
+
+    def test_limits(self):
+        first, second = self._acquire(), self._acquire()
+        assert self._acquire() is None
+        assert self.pool.metrics['missed'] == 1
+
+        # Least recently used idle container makes room for a new one
+        self.pool.release(first)
+        self.pool.release(second)
+        third = self._acquire({'cpuset': '1'})
+        assert third is not None
+        assert len(self.pool) == 2
+        assert self._acquire() is second
+
+    def test_max_jobs(self):
+        container = self._acquire()
+        for _ in range(2):
+            self.pool.release(container)
+            assert self._acquire() is container
+        self.pool.release(container)
+        assert container.container_id in self.client.removed
+        assert not os.path.exists(container.container_dir)
+        assert self._acquire() is not container
+
+    def test_health_check(self):
+        container = self._acquire()
+        self.pool.release(container, healthy=False)
+        assert container.container_id in self.client.removed
+        assert not self.pool
+
+        container = self._acquire()
+        self.pool.release(container)
+        self.client.running[container.container_id] = False
+        new_container = self._acquire()
+        assert new_container is not container
+        assert container.container_id in self.client.removed
+        assert len(self.pool) == 1
+
+    def test_start_failure(self):
+        self.client.start = lambda container_id: None
+        self.pool.STARTUP_TIMEOUT = 0
+        assert self._acquire() is None
+        assert len(self.client.removed) == 1
+        assert not self.pool
+
+    def test_remove_idle(self):
+        idle, busy = self._acquire(), self._acquire()
+        self.pool.release(idle)
+        idle.last_used -= self.pool.idle_timeout + 1
+        busy.last_used -= self.pool.idle_timeout + 1
+        self.pool.remove_idle()
+        assert self.client.removed == [idle.container_id]
+
+        self.pool.clear()
+        assert self.client.removed == [idle.container_id, busy.container_id]
+        self.pool.release(busy)
+        assert not self.pool
+
+    @patch('golem.docker.job.local_client')
+    def test_pooled_job(self, local_client):
+        local_client.return_value = self.client
+        work_dir = os.path.join(self.tempdir, "work")
+        output_dir = os.path.join(self.tempdir, "output")
+        os.makedirs(work_dir)
+        os.makedirs(output_dir)
+
+        for _ in range(2):
+            job = PooledDockerJob(self.pool, self.image, "print 'test'",
+                                  {"x": 1}, self.resources_dir, work_dir,
+                                  output_dir)
+            with job:
+                container = job.warm_container
+                assert job.get_status() == DockerJob.STATE_CREATED
+                with open(os.path.join(container.work_dir,
+                                       DockerJob.PARAMS_FILE)) as f:
+                    assert f.read() == "x = 1\n"
+                job.start()
+                assert job.wait() == 0
+                stdout_file = os.path.join(output_dir, "stdout.log")
+                job.dump_logs(stdout_file, None)
+            assert job.get_status() == DockerJob.STATE_REMOVED
+            assert sorted(os.listdir(output_dir)) == ["result.txt",
+                                                      "stdout.log"]
+            os.remove(stdout_file)
+            os.remove(os.path.join(output_dir, "result.txt"))
+
+        assert self.pool.metrics['created'] == 1
+        assert self.pool.metrics['reused'] == 1
+
+    @patch('golem.docker.job.local_client')
+    def test_killed_pooled_job(self, local_client):
+        local_client.return_value = self.client
+        job = PooledDockerJob(self.pool, self.image, "", None,
+                              self.resources_dir, self.tempdir, self.tempdir)
+        with job:
+            container_id = job.container_id
+            job.start()
+            job.kill()
+        assert self.client.removed == [container_id]
+        assert not self.pool
+
+    @patch('golem.docker.job.local_client')
+    @patch('golem.docker.job.DockerJob._prepare')
+    def test_pooled_job_without_container(self, prepare, _):
+        self.pool.max_containers = 0
+        job = PooledDockerJob(self.pool, self.image, "", None,
+                              self.resources_dir, self.tempdir, self.tempdir)
+        job._prepare()
+        assert job.warm_container is None
+        assert prepare.called
@@ -32,6 +32,23 @@ class TestDockerConfigManager(unittest.TestCase):
         assert cm.container_host_config['cpuset']
         assert cm.container_host_config['mem_limit']
 
+    def test_slot_host_config(self):
+        cm = DockerConfigManager()
+        cm.container_host_config.update(cpuset='0,1,2,3,4', mem_limit=4000)
+
+        assert cm.slot_host_config(0, 1) == cm.container_host_config
+
+        configs = [cm.slot_host_config(slot, 2) for slot in range(2)]
+        assert configs[0]['cpuset'] == '0,1'
+        assert configs[1]['cpuset'] == '2,3'
+        assert all(c['mem_limit'] == 2000 for c in configs)
+        assert cm.container_host_config['cpuset'] == '0,1,2,3,4'
+        assert cm.container_host_config['mem_limit'] == 4000
+
+        # more slots than cores
+        cm.container_host_config.update(cpuset='0')
+        assert cm.slot_host_config(1, 2)['cpuset'] == '0'
+
     def test_failing_build_config(self):
 
         cm = DockerConfigManager()
@@ -1,5 +1,8 @@
 from os import path
+from unittest.mock import patch
 
+from apps.rendering.benchmark.minilight.src.minilight import render_rows
+from golem.core.common import get_golem_path
 from golem.testutils import DatabaseFixture
 
 from golem.environments.environment import Environment
@@ -51,3 +54,38 @@ class EnvTest(DatabaseFixture, PEP8MixIn):
         assert Environment.get_performance() == 0.0
         assert Environment.run_default_benchmark(save=True) > 0.0
         assert Environment.get_performance() > 0.0
+
+    @patch('golem.environments.environment.get_cpu_count', return_value=2)
+    @patch('golem.environments.environment.make_perf_test',
+           return_value=100.0)
+    def test_run_default_benchmark_cached(self, perf_test, _):
+        Environment._default_benchmark_results.clear()
+        assert Environment.run_default_benchmark(num_cores=2) == 100.0
+        assert Environment.run_default_benchmark(num_cores=2) == 100.0
+        assert perf_test.call_count == 1
+        assert perf_test.call_args[1]['num_cores'] == 2
+
+        # more cores than available
+        assert Environment.run_default_benchmark(num_cores=8) == 100.0
+        assert perf_test.call_count == 1
+
+        Environment.run_default_benchmark(num_cores=1)
+        assert perf_test.call_count == 2
+
+        # Explicit runs are not served from the cache, but refresh it
+        perf_test.return_value = 120.0
+        assert Environment.run_default_benchmark(num_cores=2,
+                                                 save=True) == 120.0
+        assert perf_test.call_count == 3
+        assert Environment.get_performance() == 120.0
+        assert Environment.run_default_benchmark(num_cores=2) == 120.0
+        assert perf_test.call_count == 3
+        Environment._default_benchmark_results.clear()
+
+    def test_benchmark_image_independent_of_cores(self):
+        test_file = path.join(get_golem_path(), 'apps', 'rendering',
+                              'benchmark', 'minilight', 'cornellbox.ml.txt')
+        image, _ = render_rows(test_file, num_cores=1)
+        image_mp, _ = render_rows(test_file, num_cores=2)
+        assert image.pixels == image_mp.pixels
+        assert any(image.pixels)
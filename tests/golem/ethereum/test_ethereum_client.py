@@ -1,8 +1,13 @@
+import json
 import logging
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest import mock
 
 from ethereum.transactions import Transaction
 from ethereum.utils import zpad
+from web3 import Web3, HTTPProvider
 
 from golem.ethereum import Client
 from golem.testutils import TempDirFixture
@@ -81,3 +86,89 @@ class EthereumClientTest(TempDirFixture):
 
         entries = client.get_filter_changes(filter_id)
         assert not entries
+
+
+class MockNodeHandler(BaseHTTPRequestHandler):
+    """ Answers JSON-RPC requests from server.results and records them """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        request = json.loads(body.decode())
+        self.server.round_trips.append(request)
+
+        calls = request if isinstance(request, list) else [request]
+        responses = []
+        for call in calls:
+            result = self.server.results[call['method']]
+            if isinstance(result, Exception):
+                response = {'error': {'code': -32000, 'message': str(result)}}
+            else:
+                response = {'result': result}
+            response.update(jsonrpc='2.0', id=call['id'])
+            responses.append(response)
+        if not isinstance(request, list):
+            responses = responses[0]
+
+        data = json.dumps(responses).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_):
+        pass
+
+
+class EthereumClientBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), MockNodeHandler)
+        self.server.round_trips = []
+        self.server.results = {}
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        self.client = Client.__new__(Client)
+        self.client.web3 = Web3(HTTPProvider(
+            'http://127.0.0.1:{}'.format(self.server.server_port)))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_receipts_in_one_round_trip(self):
+        receipt = {'blockNumber': '0x539', 'gasUsed': '0xd6d9',
+                   'blockHash': '0x' + 64 * 'f', 'status': '0x1'}
+        self.server.results = {'eth_blockNumber': '0x545',
+                               'eth_getTransactionReceipt': receipt}
+        hashes = ['0x' + 64 * str(i) for i in range(5)]
+
+        block_number, receipts = \
+            self.client.get_block_number_and_receipts(hashes)
+        assert block_number == 0x545
+        assert len(receipts) == 5
+        assert receipts[0]['blockNumber'] == 1337
+        assert receipts[0]['gasUsed'] == 55001
+        assert receipts[0]['status'] == '0x1'
+
+        assert len(self.server.round_trips) == 1
+        batch = self.server.round_trips[0]
+        assert [c['method'] for c in batch] == \
+            ['eth_blockNumber'] + ['eth_getTransactionReceipt'] * 5
+        assert [c['params'] for c in batch[1:]] == [[h] for h in hashes]
+
+    def test_batch_size(self):
+        self.server.results = {'eth_getBalance': '0x1'}
+        calls = [Client.balance_request('0x' + 40 * 'a')] * 250
+        assert self.client.batch_request(calls) == ['0x1'] * 250
+        assert [len(r) for r in self.server.round_trips] == [100, 100, 50]
+
+    def test_batch_error(self):
+        self.server.results = {'eth_getBalance': '0x1',
+                               'eth_call': Exception('execution error')}
+        with self.assertRaises(ValueError):
+            self.client.batch_request([
+                Client.balance_request('0x' + 40 * 'a'),
+                Client.call_request(to='0x' + 40 * 'b', data='0x')])
+        assert len(self.server.round_trips) == 1
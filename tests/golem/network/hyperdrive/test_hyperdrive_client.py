@@ -3,6 +3,9 @@ import uuid
 
 import mock
 from requests import HTTPError
+from requests.exceptions import ConnectionError
+from twisted.internet import defer
+from twisted.internet.error import ConnectionRefusedError
 
 from golem.network.hyperdrive.client import HyperdriveClient, \
     HyperdriveClientOptions
@@ -95,8 +98,100 @@ class TestHyperdriveClient(unittest.TestCase):
 
             assert client.pin_rm(multihash) == self.response['hash']
 
+    def test_session(self):
+        client = HyperdriveClient()
+        session = client._session
+
+        assert HyperdriveClient()._session is session
+        assert HyperdriveClient(port=1234)._session is not session
+
+    def test_batch(self):
+        client = HyperdriveClient(port=3293)
+        commands = [client.upload_command(files=['file'], id='id'),
+                    client.download_command('hash', '/path')]
+        responses = [dict(hash='hash'), dict(files=['file'])]
+
+        with mock.patch.object(HyperdriveClient, '_request',
+                               return_value=dict(responses=responses)) as req:
+            assert client.batch(commands) == responses
+            req.assert_called_once_with(command='batch', commands=commands)
+
+    def test_batch_unsupported(self):
+        client = HyperdriveClient(port=3294)
+        commands = [client.upload_command(files=['file'], id='id'),
+                    client.cancel_command('hash')]
+        error = HTTPError(response=mock.Mock(status_code=400))
+
+        def request(**data):
+            if data['command'] == 'batch':
+                raise error
+            return data
+
+        with mock.patch.object(HyperdriveClient, '_request',
+                               side_effect=request) as req:
+            assert client.batch(commands) == commands
+            assert req.call_count == 3
+
+            # batching is not attempted again
+            req.reset_mock()
+            assert client.batch(commands) == commands
+            assert req.call_count == 2
+
+        error.response.status_code = 500
+        with mock.patch.object(HyperdriveClient, '_request',
+                               side_effect=error):
+            with self.assertRaises(HTTPError):
+                HyperdriveClient(port=3295).batch(commands)
+
+    def test_batch_async_unsupported(self):
+        client = HyperdriveClient(port=3296)
+        commands = [client.cancel_command('hash_1'),
+                    client.cancel_command('hash_2')]
+
+        def request(**data):
+            if data['command'] == 'batch':
+                return defer.fail(
+                    HTTPError(response=mock.Mock(status_code=404)))
+            return defer.succeed(dict(hash=data['hash']))
+
+        with mock.patch.object(HyperdriveClient, '_request_async',
+                               side_effect=request):
+            result = client.batch_async(commands)
+
+        assert result.result == [dict(hash='hash_1'), dict(hash='hash_2')]
+
+    @mock.patch('golem.network.hyperdrive.client.readBody')
+    def test_request_async(self, read_body):
+        client = HyperdriveClient()
+        agent = mock.Mock()
+        agent.request.return_value = defer.succeed(mock.Mock(code=200))
+        read_body.return_value = defer.succeed(b'{"hash": "hash"}')
+
+        with mock.patch.object(HyperdriveClient, '_agent',
+                               return_value=agent):
+            result = client.pin_rm_async('hash')
+        assert result.result == 'hash'
+
+        read_body.return_value = defer.succeed(b'error')
+        agent.request.return_value = defer.succeed(mock.Mock(code=500))
+        with mock.patch.object(HyperdriveClient, '_agent',
+                               return_value=agent):
+            result = client.get_file_async('hash', filepath='/path')
+        failure = result.result
+        result.addErrback(lambda _: None)
+        assert isinstance(failure.value, HTTPError)
+        assert failure.value.response.status_code == 500
+
+        agent.request.return_value = defer.fail(ConnectionRefusedError())
+        with mock.patch.object(HyperdriveClient, '_agent',
+                               return_value=agent):
+            result = client.add_async(['file'])
+        failure = result.result
+        result.addErrback(lambda _: None)
+        assert isinstance(failure.value, ConnectionError)
+
     @mock.patch('json.loads')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_request(self, post, json_loads):
         client = HyperdriveClient()
         response = mock.Mock()
@@ -106,7 +201,7 @@ class TestHyperdriveClient(unittest.TestCase):
         assert json_loads.called
 
     @mock.patch('json.loads')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_request_exception(self, post, json_loads):
         client = HyperdriveClient()
         response = mock.Mock()
@@ -121,7 +216,7 @@ class TestHyperdriveClient(unittest.TestCase):
             assert not json_loads.called
 
     @mock.patch('json.loads')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_request_http_error(self, post, json_loads):
         client = HyperdriveClient()
         response = mock.Mock()
@@ -10,9 +10,11 @@ import unittest.mock as mock
 from golem import testutils
 from golem.core.keysauth import KeysAuth
 from golem.core.variables import APP_VERSION, PROTOCOL_CONST
+from golem.network.p2p import taskgossip
 from golem.network.p2p.node import Node
 from golem.network.p2p.p2pservice import P2PService
-from golem.network.p2p.peersession import (PeerSession, PeerSessionInfo)
+from golem.network.p2p.peersession import (PeerSession, PeerSessionInfo,
+                                           TASK_DIGESTS_KEY)
 from golem.tools.assertlogs import LogTestCase
 from golem.tools.testwithappconfig import TestWithKeysAuth
 from golem.core.variables import TASK_HEADERS_LIMIT
@@ -39,7 +41,8 @@ class TestPeerSession(TestWithKeysAuth, LogTestCase, testutils.PEP8MixIn):
         self.peer_session.conn.server.keys_auth.get_key_id.return_value = \
             key_id = 'server_key_id'
         self.peer_session.conn.server.metadata_manager.\
-            get_metadata.return_value = metadata = 'metadata'
+            get_metadata.return_value = {'key': 'value'}
+        metadata = {'key': 'value', TASK_DIGESTS_KEY: True}
         self.peer_session.conn.server.cur_port = port = random.randint(1, 50000)
         self.peer_session.conn_type = self.peer_session.CONN_TYPE_SERVER
         self.peer_session.start()
@@ -124,7 +127,8 @@ class TestPeerSession(TestWithKeysAuth, LogTestCase, testutils.PEP8MixIn):
         self.peer_session.conn.server.keys_auth.get_key_id.return_value = \
             key_id = 'client_key_id'
         self.peer_session.conn.server.metadata_manager.\
-            get_metadata.return_value = metadata = 'metadata'
+            get_metadata.return_value = {'key': 'value'}
+        metadata = {'key': 'value', TASK_DIGESTS_KEY: True}
         self.peer_session.conn.server.cur_port = port = random.randint(1, 50000)
         self.peer_session.conn_type = self.peer_session.CONN_TYPE_CLIENT
         self.peer_session.start()
@@ -345,6 +349,81 @@ class TestPeerSession(TestWithKeysAuth, LogTestCase, testutils.PEP8MixIn):
         assert len(sent_tasks) <= TASK_HEADERS_LIMIT
         assert len(sent_tasks) == len(set(sent_tasks))
 
+    def test_send_get_tasks(self):
+        peer_session = PeerSession(mock.MagicMock())
+        peer_session.send = mock.MagicMock()
+        peer_session.p2p_service.get_tasks_digests.return_value = \
+            digests = {'task_id': 'digest'}
+
+        peer_session.send_get_tasks()
+        assert isinstance(peer_session.send.call_args[0][0],
+                          message.GetTasks)
+
+        peer_session.metadata = {TASK_DIGESTS_KEY: True}
+        peer_session.send_get_tasks()
+        msg = peer_session.send.call_args[0][0]
+        assert isinstance(msg, taskgossip.GetTaskDigests)
+        assert msg.summary == taskgossip.summarize(digests)
+
+    def test_task_digests_exchange(self):
+        asking = PeerSession(mock.MagicMock())
+        responding = PeerSession(mock.MagicMock())
+        for peer_session in [asking, responding]:
+            peer_session.send = mock.MagicMock()
+        asking.p2p_service.get_tasks_digests.return_value = \
+            {'same': 'digest', 'changed': 'old'}
+        responding.p2p_service.get_tasks_digests.return_value = \
+            {'same': 'digest', 'changed': 'new', 'missing': 'digest'}
+        responding.p2p_service.get_tasks_headers.return_value = \
+            headers = [{'task_id': 'changed'}, {'task_id': 'missing'}]
+
+        asking.metadata = {TASK_DIGESTS_KEY: True}
+        asking.send_get_tasks()
+        responding._react_to_get_task_digests(asking.send.call_args[0][0])
+        msg = responding.send.call_args[0][0]
+        assert isinstance(msg, taskgossip.TaskDigests)
+        assert {'changed', 'missing'} <= set(msg.digests)
+
+        asking._react_to_task_digests(msg)
+        msg = asking.send.call_args[0][0]
+        assert isinstance(msg, taskgossip.GetTaskHeaders)
+        assert sorted(msg.task_ids) == ['changed', 'missing']
+
+        responding._react_to_get_task_headers(msg)
+        responding.p2p_service.get_tasks_headers.assert_called_once_with(
+            msg.task_ids)
+        assert responding.send.call_args[0][0].tasks == headers
+
+    def test_task_digests_exchange_in_sync(self):
+        peer_session = PeerSession(mock.MagicMock())
+        peer_session.send = mock.MagicMock()
+        peer_session.p2p_service.get_tasks_digests.return_value = \
+            digests = {'task_id': 'digest'}
+
+        peer_session._react_to_get_task_digests(taskgossip.GetTaskDigests(
+            summary=taskgossip.summarize(digests)))
+        peer_session._react_to_task_digests(taskgossip.TaskDigests(
+            digests=digests))
+        peer_session._react_to_get_task_digests(taskgossip.GetTaskDigests(
+            summary='malformed'))
+        assert not peer_session.send.called
+
+    def test_react_to_tasks(self):
+        peer_session = PeerSession(mock.MagicMock())
+        peer_session.disconnect = mock.MagicMock()
+        add_task_header = peer_session.p2p_service.add_task_header
+        headers = [{'task_id': 'task_id'}, {'task_id': 'task_id_2'}]
+
+        add_task_header.return_value = True
+        peer_session._react_to_tasks(message.Tasks(headers))
+        assert add_task_header.call_count == 2
+        assert not peer_session.disconnect.called
+
+        add_task_header.return_value = False
+        peer_session._react_to_tasks(message.Tasks(headers[:1]))
+        peer_session.disconnect.assert_called_once_with(
+            message.Disconnect.REASON.BadProtocol)
+
 
 class TestPeerSessionInfo(unittest.TestCase):
 
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from golem.network.p2p import taskgossip
+from golem.testutils import PEP8MixIn
+
+
+class TestTaskGossip(TestCase, PEP8MixIn):
+    PEP8_FILES = ['golem/network/p2p/taskgossip.py']
+
+    def test_summarize(self):
+        digests = {'task_{}'.format(i): 'digest' for i in range(100)}
+        summary = taskgossip.summarize(digests)
+        assert len(summary) == taskgossip.SUMMARY_BUCKETS
+        assert taskgossip.summarize({}) == \
+            [b''] * taskgossip.SUMMARY_BUCKETS
+        assert taskgossip.summarize(dict(digests)) == summary
+
+        digests['task_0'] = 'changed'
+        changed = taskgossip.summarize(digests)
+        assert sum(a != b for a, b in zip(summary, changed)) == 1
+
+    def test_differing_digests(self):
+        digests = {'task_{}'.format(i): 'digest' for i in range(100)}
+        summary = taskgossip.summarize(digests)
+        assert taskgossip.differing_digests(digests, summary) == {}
+
+        changed = dict(digests, task_0='changed', new_task='digest')
+        differing = taskgossip.differing_digests(changed, summary)
+        assert {'task_0', 'new_task'} <= set(differing)
+        assert len(differing) < len(changed)
+        assert all(changed[t] == d for t, d in differing.items())
+
+        # Summaries with a different number of buckets are accepted
+        summary = taskgossip.summarize(digests, buckets=4)
+        differing = taskgossip.differing_digests(changed, summary)
+        assert {'task_0', 'new_task'} <= set(differing)
+
+        assert taskgossip.differing_digests(changed, None) == {}
+        assert taskgossip.differing_digests(changed, []) == {}
+        assert taskgossip.differing_digests(
+            changed, [b''] * (taskgossip.MAX_SUMMARY_BUCKETS + 1)) == {}
+
+    def test_wanted_task_ids(self):
+        digests = {'same': 'digest', 'changed': 'old', 'local': 'digest'}
+        peer_digests = {'same': 'digest', 'changed': 'new',
+                        'missing': 'digest'}
+        assert sorted(taskgossip.wanted_task_ids(digests, peer_digests)) == \
+            ['changed', 'missing']
@@ -208,11 +208,11 @@ class TestMessageHistoryService(DatabaseFixture):
     def test_loop_add_sync(self):
         self.service._sweep = Mock()
         self.service._queue_timeout = 0.1
-        self.service.add_sync = Mock()
+        self.service.add_many_sync = Mock()
 
         # No message
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service.add_many_sync.called
 
         # Add message
         msg = self._build_dict()
@@ -220,21 +220,37 @@ class TestMessageHistoryService(DatabaseFixture):
 
         # With message
         self.service._loop()
-        assert self.service.add_sync.called
+        self.service.add_many_sync.assert_called_once_with([msg])
 
         # No message again, since it was popped from the queue
-        self.service.add_sync.reset_mock()
+        self.service.add_many_sync.reset_mock()
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service.add_many_sync.called
+
+    def test_loop_add_batch(self):
+        self.service._sweep = Mock()
+        self.service._queue_timeout = 0.1
+        self.service.MAX_BATCH_SIZE = 3
+        msgs = [self._build_dict() for _ in range(5)]
+        for msg in msgs:
+            self.service._save_queue.put(msg)
+
+        self.service._loop()
+        assert message_count() == 3
+        assert self.service.metrics['save_queue_depth'] == 2
+
+        self.service._loop()
+        assert message_count() == 5
+        assert self.service.metrics['save_queue_depth'] == 0
 
     def test_loop_remove_sync(self):
         self.service._sweep = Mock()
         self.service._queue_timeout = 0.1
-        self.service.remove_sync = Mock()
+        self.service.remove_many_sync = Mock()
 
         # No tuple
         self.service._loop()
-        assert not self.service.remove_sync.called
+        assert not self.service.remove_many_sync.called
 
         # Add tuple
         task = str(uuid.uuid4())
@@ -243,12 +259,78 @@ class TestMessageHistoryService(DatabaseFixture):
 
         # With tuple
         self.service._loop()
-        assert self.service.remove_sync.called
+        self.service.remove_many_sync.assert_called_once_with([(task, props)])
 
         # Not tuple again, since it was popped from the queue
-        self.service.remove_sync.reset_mock()
+        self.service.remove_many_sync.reset_mock()
         self.service._loop()
-        assert not self.service.remove_sync.called
+        assert not self.service.remove_many_sync.called
+
+    def test_get_removals_merged(self):
+        task_1, task_2 = str(uuid.uuid4()), str(uuid.uuid4())
+        props = dict(subtask=str(uuid.uuid4()))
+
+        self.service._remove_queue.put((task_1, props))
+        self.service._remove_queue.put((task_1, {}))
+        self.service._remove_queue.put((task_2, props))
+        self.service._remove_queue.put((task_2, dict(props)))
+
+        removals = self.service._get_removals()
+        assert sorted(removals) == sorted([(task_1, {}), (task_2, props)])
+        assert self.service._remove_queue.empty()
+
+    def test_add_many_sync(self):
+        msgs = [self._build_dict() for _ in range(150)]
+        self.service.add_many_sync(msgs)
+        assert message_count() == 150
+
+        metrics = self.service.metrics
+        assert metrics['flushes'] == 1
+        assert metrics['flushed_messages'] == 150
+        assert metrics['max_flush_latency'] >= \
+            metrics['last_flush_latency'] > 0
+
+    def test_add_many_sync_fail(self):
+        msgs = [self._build_dict() for _ in range(2)]
+        self.service.add_sync = Mock()
+
+        with patch('golem.model.NetworkMessage.insert_many',
+                   side_effect=IntegrityError):
+            self.service.add_many_sync(msgs)
+        assert self.service.add_sync.call_count == 2
+        assert self.service._save_queue.empty()
+
+        with patch('golem.model.NetworkMessage.insert_many',
+                   side_effect=PeeweeException):
+            self.service.add_many_sync(msgs)
+        assert self.service._save_queue.qsize() == 2
+        assert message_count() == 0
+
+    def test_remove_many_sync(self):
+        task = str(uuid.uuid4())
+        subtask = str(uuid.uuid4())
+        for msg in [self._build_msg(task, subtask), self._build_msg(task),
+                    self._build_msg()]:
+            msg.save()
+
+        self.service.remove_many_sync([(task, dict(subtask=subtask))])
+        assert message_count() == 2
+        self.service.remove_many_sync([(task, {})])
+        assert message_count() == 1
+
+    def test_remove_many_sync_fail(self):
+        removals = [(str(uuid.uuid4()), {})]
+        self.service.remove_sync = Mock()
+
+        with patch('golem.network.history.db.atomic',
+                   side_effect=DataError):
+            self.service.remove_many_sync(removals)
+        assert self.service.remove_sync.called
+
+        with patch('golem.network.history.db.atomic',
+                   side_effect=PeeweeException):
+            self.service.remove_many_sync(removals)
+        assert self.service._remove_queue.get(block=False) == removals[0]
 
 
 class TestMessageHistoryProvider(DatabaseFixture):
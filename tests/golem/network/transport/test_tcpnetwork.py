@@ -1,9 +1,15 @@
 import logging
 import os
 import struct
+import threading
+import time
 from unittest import mock
 from unittest import TestCase
 
+from twisted.internet.defer import Deferred
+from twisted.internet.protocol import Factory, Protocol
+from twisted.internet.task import Clock
+
 MagicMock = mock.MagicMock
 
 from golem.core.common import config_logging
@@ -17,11 +23,16 @@ from golem.network.transport.tcpnetwork import (DataProducer, DataConsumer,
                                                 EncryptDataProducer,
                                                 DecryptDataConsumer,
                                                 BasicProtocol,
+                                                ServerProtocol,
                                                 logger, SocketAddress,
-                                                MAX_MESSAGE_SIZE)
+                                                MAX_MESSAGE_SIZE,
+                                                AddressRace, TCPNetwork,
+                                                TCPConnectInfo)
+from golem.network.transport.network import ProtocolFactory, SessionFactory
 from golem.tools.assertlogs import LogTestCase
 from golem.tools.captureoutput import captured_output
 from golem.tools.testwithappconfig import TestWithKeysAuth
+from golem.tools.testwithreactor import TestWithReactor
 
 
 class TestDataProducerAndConsumer(TestWithKeysAuth):
@@ -228,6 +239,147 @@ class TestBasicProtocol(LogTestCase):
         self.assertIsNone(protocol.dataReceived(data))
         protocol.transport.loseConnection.assert_called_once_with()
 
+
+class TestAddressRace(TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.addresses = [SocketAddress('10.0.0.{}'.format(i), 40102)
+                          for i in range(1, 4)]
+        self.attempts = {}
+
+    def _connect(self, address):
+        self.attempts[address.address] = Deferred()
+        return self.attempts[address.address]
+
+    def _race(self):
+        race = AddressRace(self.clock, self.addresses, self._connect,
+                           stagger=0.3)
+        results = []
+        race.start().addBoth(results.append)
+        return race, results
+
+    def test_staggered_attempts(self):
+        race, results = self._race()
+        assert list(self.attempts) == ['10.0.0.1']
+        self.clock.advance(0.2)
+        assert list(self.attempts) == ['10.0.0.1']
+        self.clock.advance(0.1)
+        assert sorted(self.attempts) == ['10.0.0.1', '10.0.0.2']
+
+        conn = MagicMock()
+        self.attempts['10.0.0.2'].callback(conn)
+        assert results == [conn]
+        assert race.finished
+        # Slower attempt is cancelled, next one is never started
+        assert self.attempts['10.0.0.1'].called
+        self.clock.advance(10)
+        assert '10.0.0.3' not in self.attempts
+        assert not self.clock.getDelayedCalls()
+
+    def test_failure_starts_next_attempt(self):
+        _, results = self._race()
+        self.attempts['10.0.0.1'].errback(ConnectionRefusedError())
+        assert '10.0.0.2' in self.attempts
+
+        conn = MagicMock()
+        self.attempts['10.0.0.2'].callback(conn)
+        assert results == [conn]
+
+    def test_all_attempts_failed(self):
+        _, results = self._race()
+        self.clock.pump([0.3, 0.3])
+        assert len(self.attempts) == 3
+        for address in ['10.0.0.3', '10.0.0.1']:
+            self.attempts[address].errback(ConnectionRefusedError())
+        assert not results
+        self.attempts['10.0.0.2'].errback(ConnectionRefusedError())
+        assert len(results) == 1
+        assert results[0].check(ConnectionRefusedError)
+
+    def test_redundant_connection_closed(self):
+        race, results = self._race()
+        self.clock.advance(0.3)
+        first, second = MagicMock(), MagicMock()
+        race._established(first, self.attempts['10.0.0.1'],
+                          self.addresses[0])
+        race._established(second, self.attempts['10.0.0.2'],
+                          self.addresses[1])
+        assert results == [first]
+        assert not first.transport.loseConnection.called
+        second.transport.loseConnection.assert_called_once_with()
+
+
+class _Session(object):
+    def __init__(self, conn):
+        self.conn = conn
+
+    def dropped(self):
+        pass
+
+
+class TestTCPNetworkConnect(TestWithReactor):
+    # Non-routable address, connection attempts are never answered
+    BLACKHOLE = '10.255.255.1'
+
+    def setUp(self):
+        self.reactor = self._get_reactor()
+        self.listening_port = None
+        listening = threading.Event()
+
+        def listen():
+            self.listening_port = self.reactor.listenTCP(
+                0, Factory.forProtocol(Protocol), interface='127.0.0.1')
+            listening.set()
+
+        self.reactor.callFromThread(listen)
+        assert listening.wait(5)
+        self.port = self.listening_port.getHost().port
+
+        protocol_factory = ProtocolFactory(ServerProtocol, MagicMock(),
+                                           SessionFactory(_Session))
+        self.network = TCPNetwork(protocol_factory, timeout=5,
+                                  connect_stagger=0.1)
+
+    def tearDown(self):
+        self.reactor.callFromThread(self.listening_port.stopListening)
+
+    def _connect(self, addresses):
+        done = threading.Event()
+        result = {}
+
+        def established(session, **_):
+            result['session'] = session
+            done.set()
+
+        def failure(**_):
+            done.set()
+
+        connect_info = TCPConnectInfo(addresses, established, failure)
+        start = time.time()
+        self.reactor.callFromThread(self.network.connect, connect_info,
+                                    conn_id='conn')
+        assert done.wait(10)
+        return result.get('session'), time.time() - start
+
+    def test_blackholed_addresses_first(self):
+        addresses = [SocketAddress(self.BLACKHOLE, self.port),
+                     SocketAddress(self.BLACKHOLE, self.port + 1),
+                     SocketAddress('127.0.0.1', self.port)]
+        session, elapsed = self._connect(addresses)
+        assert session is not None
+        assert session.conn.transport.getPeer().port == self.port
+        # Sequential attempts would wait for a timeout of each blackholed
+        # address first
+        assert elapsed < self.network.timeout
+        self.reactor.callFromThread(session.conn.transport.loseConnection)
+
+    def test_all_addresses_unreachable(self):
+        addresses = [SocketAddress('127.0.0.1', self.port + 1)]
+        session, _ = self._connect(addresses)
+        assert session is None
+
+
 class TestSocketAddress(TestCase):
     def test_zone_index(self):
         base_address = "fe80::3"
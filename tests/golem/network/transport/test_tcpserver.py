@@ -156,6 +156,40 @@ class TestPendingConnectionServer(unittest.TestCase):
         assert pending_conn.status == PenConnStatus.Connected
         assert SocketAddress("10.10.10.1", self.port) == pending_conn.socket_addresses[0]
 
+    def test_preferred_address(self):
+        server = PendingConnectionsServer(None, Network())
+        req_type = 0
+        server.conn_established_for_type[req_type] = lambda x: x
+        server.conn_failure_for_type[req_type] = server.final_conn_failure
+
+        res = server.get_socket_addresses(self.node_info, self.port,
+                                          self.key_id)
+        assert res[0] == SocketAddress("10.10.10.2", self.port)
+
+        server._add_pending_request(req_type, self.node_info, self.port,
+                                    self.key_id, args={})
+        pending_conn = next(iter(server.pending_connections.values()))
+        assert pending_conn.key_id == self.key_id
+        server._mark_connected(pending_conn.id, "10.10.10.1", self.port)
+
+        res = server.get_socket_addresses(self.node_info, self.port,
+                                          self.key_id)
+        assert res == [SocketAddress("10.10.10.1", self.port),
+                       SocketAddress("10.10.10.2", self.port)]
+        res = server.get_socket_addresses(self.node_info, self.port, "other")
+        assert res[0] == SocketAddress("10.10.10.2", self.port)
+
+        # Address that is no longer advertised by the node is not used
+        self.node_info.pub_addr = "10.10.10.3"
+        res = server.get_socket_addresses(self.node_info, self.port,
+                                          self.key_id)
+        assert res == [SocketAddress("10.10.10.2", self.port),
+                       SocketAddress("10.10.10.3", self.port)]
+
+        server.MAX_PREFERRED_ADDRESSES = 1
+        server._remember_address("other", res[1])
+        assert list(server.preferred_addresses) == ["other"]
+
     def test_sync_pending(self):
         network = Network()
         server = PendingConnectionsServer(None, network)
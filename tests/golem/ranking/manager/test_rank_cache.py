@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from golem.model import LocalRank
+from golem.ranking.helper.trust import Trust
+from golem.ranking.manager import database_manager as dm
+from golem.ranking.manager.rank_cache import LocalRankCache, \
+    LocalRankService
+from golem.testutils import DatabaseFixture, PEP8MixIn
+
+
+class TestLocalRankCache(DatabaseFixture, PEP8MixIn):
+    PEP8_FILES = ['golem/ranking/manager/rank_cache.py']
+
+    def setUp(self):
+        super().setUp()
+        self.cache = LocalRankCache()
+
+    def tearDown(self):
+        if dm.local_ranks.loaded:
+            dm.local_ranks.close()
+        super().tearDown()
+
+    def test_increase_and_flush(self):
+        LocalRank.create(node_id="ABC", positive_computed=2.0)
+        self.cache.load()
+        assert self.cache.get("ABC").positive_computed == 2.0
+        assert self.cache.get("DEF") is None
+
+        self.cache.increase("ABC", 'positive_computed', 1.5)
+        self.cache.increase("ABC", 'negative_payment', 1.0)
+        self.cache.increase("DEF", 'wrong_computed', 3.0)
+        assert self.cache.get("ABC").positive_computed == 3.5
+        assert self.cache.get("DEF").wrong_computed == 3.0
+        assert len(self.cache.get_all()) == 2
+        # not written yet
+        assert LocalRank.get(node_id="ABC").positive_computed == 2.0
+        assert LocalRank.select().count() == 1
+        assert self.cache.metrics['pending_nodes'] == 2
+
+        # rows changed in the meantime are not overwritten
+        LocalRank.update(positive_computed=LocalRank.positive_computed + 1) \
+            .where(LocalRank.node_id == "ABC").execute()
+
+        assert self.cache.flush() == 2
+        assert self.cache.flush() == 0
+        abc = LocalRank.get(node_id="ABC")
+        assert abc.positive_computed == 4.5
+        assert abc.negative_payment == 1.0
+        assert LocalRank.get(node_id="DEF").wrong_computed == 3.0
+        assert self.cache.metrics['flushed_nodes'] == 2
+
+    def test_failed_flush_keeps_increments(self):
+        self.cache.load()
+        self.cache.increase("ABC", 'positive_computed', 1.0)
+        with patch.object(self.cache, '_write', side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.cache.flush()
+        self.cache.increase("ABC", 'positive_computed', 1.0)
+        assert self.cache.flush() == 1
+        assert LocalRank.get(node_id="ABC").positive_computed == 2.0
+
+    def test_many_nodes(self):
+        self.cache.load()
+        for i in range(LocalRankCache.INSERT_ROWS * 3):
+            self.cache.increase(str(i), 'positive_requested', 1.0)
+        self.cache.flush()
+        assert LocalRank.select().count() == LocalRankCache.INSERT_ROWS * 3
+
+    def test_database_manager(self):
+        dm.increase_positive_computed("ABC", 1.0)
+        dm.local_ranks.load()
+        Trust.COMPUTED.increase("ABC", 2.0)
+        Trust.PAYMENT.decrease("DEF", 1.0)
+        assert dm.get_local_rank("ABC").positive_computed == 3.0
+        assert len(dm.get_local_rank_for_all()) == 2
+        assert LocalRank.get(node_id="ABC").positive_computed == 1.0
+
+        dm.local_ranks.close()
+        assert LocalRank.get(node_id="ABC").positive_computed == 3.0
+        assert dm.get_local_rank("DEF").negative_payment == 1.0
+        dm.increase_positive_computed("ABC", 1.0)
+        assert dm.get_local_rank("ABC").positive_computed == 4.0
+
+    def test_service(self):
+        service = LocalRankService(self.cache, interval_seconds=30)
+        service.start()
+        assert self.cache.loaded
+        self.cache.increase("ABC", 'positive_resource', 1.0)
+        service._run()
+        assert LocalRank.get(node_id="ABC").positive_resource == 1.0
+        self.cache.increase("ABC", 'positive_resource', 1.0)
+        service.stop()
+        assert not self.cache.loaded
+        assert LocalRank.get(node_id="ABC").positive_resource == 2.0
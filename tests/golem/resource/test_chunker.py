@@ -0,0 +1,102 @@
+import io
+import os
+import random
+import unittest
+
+from golem.resource.chunker import Chunker, GEAR
+from golem.resource.resourcehash import ResourceHash
+from golem.testutils import PEP8MixIn, TempDirFixture
+
+
+def _cut_points(chunker, data):
+    """ Byte by byte FastCDC """
+    gear = [int(g) for g in GEAR]
+    cuts = []
+    start = 0
+    while start < len(data):
+        end = min(start + chunker.max_size, len(data))
+        cut = end
+        h = 0
+        for i in range(start, end):
+            h = ((h << 1) + gear[data[i]]) & 0xffffffff
+            size = i - start + 1
+            if size < chunker.min_size:
+                continue
+            mask = chunker.mask_small if size < chunker.avg_size \
+                else chunker.mask_large
+            if not h & mask:
+                cut = i + 1
+                break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def _random_bytes(rand, size):
+    return bytes(rand.getrandbits(8) for _ in range(size))
+
+
+class TestChunker(unittest.TestCase, PEP8MixIn):
+    PEP8_FILES = ['golem/resource/chunker.py']
+
+    def test_cut_points(self):
+        rand = random.Random(0)
+        chunker = Chunker(avg_size=256, min_size=64, max_size=1024)
+        for size in [0, 1, 63, 64, 1024, 1025, 20000]:
+            data = _random_bytes(rand, size)
+            assert chunker.cut_points(data) == _cut_points(chunker, data)
+
+        # repeated content is cut at max_size
+        assert chunker.cut_points(bytes(3000)) == [1024, 2048, 3000]
+        assert chunker.cut_points(bytes(3000), final=False) == [1024, 2048]
+
+    def test_iter_chunks(self):
+        chunker = Chunker(avg_size=4096)
+        data = os.urandom(2 ** 23 + 2 ** 20)
+        cuts = chunker.cut_points(data)
+        chunks = list(chunker.iter_chunks(io.BytesIO(data)))
+        assert b''.join(chunks) == data
+        assert [len(c) for c in chunks] == \
+            [end - start for start, end in zip([0] + cuts, cuts)]
+        assert list(chunker.iter_chunks(io.BytesIO(b''))) == []
+
+    def test_insert(self):
+        chunker = Chunker(avg_size=1024)
+        data = os.urandom(2 ** 18)
+        edited = data[:100000] + b'inserted' + data[100000:]
+        chunks = list(chunker.iter_chunks(io.BytesIO(data)))
+        edited_chunks = list(chunker.iter_chunks(io.BytesIO(edited)))
+        changed = set(edited_chunks) - set(chunks)
+        assert 0 < len(changed) <= 3
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            Chunker(avg_size=1024, min_size=2048)
+        with self.assertRaises(ValueError):
+            Chunker(avg_size=1024, max_size=1024)
+        with self.assertRaises(ValueError):
+            Chunker(avg_size=2 ** 31)
+
+
+class TestResourceHash(TempDirFixture):
+
+    def test_split_file(self):
+        resource_dir = os.path.join(self.path, 'resources')
+        os.makedirs(resource_dir)
+        file_path = os.path.join(self.path, 'file')
+        data = os.urandom(2 ** 17)
+        with open(file_path, 'wb') as f:
+            f.write(data + data)
+
+        resource_hash = ResourceHash(resource_dir)
+        parts = resource_hash.split_file(file_path, block_size=4096)
+        assert [os.path.basename(p) for p in parts] == \
+            resource_hash.get_chunk_hashes(file_path, block_size=4096)
+        # repeated content is stored once
+        assert len(os.listdir(resource_dir)) < len(parts)
+
+        assert resource_hash.split_file(file_path, block_size=4096) == parts
+        result_path = os.path.join(self.path, 'result')
+        resource_hash.connect_files(parts, result_path)
+        with open(result_path, 'rb') as f:
+            assert f.read() == data + data
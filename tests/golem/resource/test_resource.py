@@ -1,6 +1,7 @@
 import os
 from golem.resource.resource import TaskResourceHeader, TaskResource
 from golem.resource.dirmanager import DirManager
+from golem.resource.resourcehash import ResourceHash
 from golem.testutils import TempDirFixture
 
 
@@ -48,7 +49,39 @@ class TestTaskResourceHeader(TempDirFixture):
             TaskResourceHeader.build_header_delta_from_header(None, None, None)
 
 
+    def testBuildPartsHeaderDelta(self):
+        res_dir = self.dir_manager.get_task_resource_dir('task2')
+        parts_dir = self.dir_manager.get_resource_dir()
+        data = os.urandom(2 ** 23)
+        with open(self.file1, 'wb') as f:
+            f.write(data)
+        res_parts = {self.file1: [os.path.basename(p) for p in
+                                  ResourceHash(parts_dir).split_file(self.file1)]}
+
+        header = TaskResourceHeader.build("resource", res_dir, with_parts=True)
+        files_data = {f[0]: f for f in header.files_data}
+        self.assertEqual(files_data['file1'][2], res_parts[self.file1])
+        self.assertEqual(files_data['file2'][2], [])
+        self.assertEqual(header.get_parts(), set(res_parts[self.file1]))
+
+        delta, parts = TaskResourceHeader.build_parts_header_delta_from_chosen(
+            TaskResourceHeader("resource"), res_dir, res_parts)
+        self.assertEqual(parts, res_parts[self.file1])
+
+        # Only chunks around the edit are missing from the older version
+        with open(self.file1, 'wb') as f:
+            f.write(data[:2 ** 22] + b'edited' + data[2 ** 22:])
+        res_parts = {self.file1: [os.path.basename(p) for p in
+                                  ResourceHash(parts_dir).split_file(self.file1)]}
+        delta, parts = TaskResourceHeader.build_parts_header_delta_from_chosen(
+            header, res_dir, res_parts)
+        self.assertEqual(delta.files_data[0][2], res_parts[self.file1])
+        self.assertTrue(0 < len(parts) <= 2)
+        self.assertFalse(set(parts) & header.get_parts())
+
+
 class TestTaskResource(TempDirFixture):
 
     def testInit(self):
         self.assertIsNotNone(TaskResource(self.path))
+
@@ -1,6 +1,7 @@
 import os
 import shutil
 import uuid
+import zipfile
 
 from golem.core.fileencrypt import FileEncryptor
 from golem.resource.dirmanager import DirManager
@@ -124,6 +125,27 @@ class TestEncryptingPackager(TestDirFixture):
         self.assertTrue(len(files) == len(self.file_list))
         shutil.rmtree(self.out_dir)
 
+    def testExtractLargeFile(self):
+        large_file = os.path.join(self.res_dir, 'large_file')
+        data = os.urandom(3 * 1024 * 1024 + 7)
+        with open(large_file, 'wb') as f:
+            f.write(data)
+
+        ep = EncryptingPackager(self.secret)
+        ep.create(self.out_path, [large_file])
+        with open(self.out_path, 'rb') as f:
+            assert data[:1024] not in f.read()
+
+        extract_dir = os.path.join(self.out_dir, 'extracted')
+        files, _ = ep.extract(self.out_path, output_dir=extract_dir)
+        assert files == ['large_file']
+        with open(os.path.join(extract_dir, 'large_file'), 'rb') as f:
+            assert f.read() == data
+        # the package is left encrypted
+        with self.assertRaises(zipfile.BadZipFile):
+            ZipPackager().extract(self.out_path, output_dir=extract_dir)
+        shutil.rmtree(self.out_dir)
+
 
 class TestEncryptingTaskResultPackager(TestDirFixture):
 
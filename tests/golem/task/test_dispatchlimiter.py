@@ -0,0 +1,66 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from golem.task.dispatchlimiter import DispatchLimiter
+from golem.testutils import PEP8MixIn
+
+
+class TestDispatchLimiter(TestCase, PEP8MixIn):
+    PEP8_FILES = ['golem/task/dispatchlimiter.py']
+
+    def test_limit(self):
+        limiter = DispatchLimiter(2)
+        limiter.reset(['abc'])
+        assert limiter.can_connect('def')
+        limiter.connecting('def')
+        assert not limiter.can_connect('abc')
+        assert not limiter.can_connect('ghi')
+        assert limiter.metrics['connecting'] == 2
+        assert limiter.metrics['limited'] == 2
+
+        limiter.reset([])
+        assert limiter.can_connect('ghi')
+        limiter.max_connections = 0
+        assert not limiter.can_connect('ghi')
+
+    def test_several_connections_per_node(self):
+        limiter = DispatchLimiter(3)
+        limiter.reset(['abc'])
+        assert limiter.can_connect('abc')
+        limiter.connecting('abc')
+        assert limiter.can_connect('abc')
+        limiter.connecting('abc')
+        assert not limiter.can_connect('abc')
+        assert limiter.metrics['connecting'] == 3
+
+    @patch('golem.task.dispatchlimiter.time.time')
+    def test_backoff(self, time_mock):
+        time_mock.return_value = 1000.0
+        limiter = DispatchLimiter(10, backoff=30, max_backoff=100)
+
+        limiter.failed('abc')
+        assert not limiter.can_connect('abc')
+        assert limiter.can_connect('def')
+        assert limiter.metrics['backed_off'] == 1
+        time_mock.return_value = 1031.0
+        assert limiter.can_connect('abc')
+
+        limiter.failed('abc')
+        time_mock.return_value = 1031.0 + 59
+        assert not limiter.can_connect('abc')
+        time_mock.return_value = 1031.0 + 61
+        assert limiter.can_connect('abc')
+
+        # Concurrent connections failing during the backoff do not count
+        limiter.failed('abc')
+        limiter.failed('abc')
+        assert limiter._failures['abc'][0] == 3
+        time_mock.return_value = 1092.0 + 99
+        assert not limiter.can_connect('abc')
+        time_mock.return_value = 1092.0 + 101
+        assert limiter.can_connect('abc')
+
+        limiter.failed('abc')
+        limiter.succeeded('abc')
+        assert limiter.can_connect('abc')
+        assert limiter.metrics['backed_off'] == 0
@@ -0,0 +1,114 @@
+import time
+from unittest import TestCase
+from unittest.mock import Mock
+
+from golem.task.sessionpool import TaskSessionPool
+
+
+def _session(key_id):
+    session = Mock(key_id=key_id, last_message_time=time.time())
+    session.conn.opened = True
+    return session
+
+
+class TestTaskSessionPool(TestCase):
+
+    def setUp(self):
+        self.pool = TaskSessionPool(max_sessions=2, idle_timeout=10)
+
+    def test_get(self):
+        session = _session('node_1')
+        self.pool.add(session)
+        assert session in self.pool
+        # Sessions are busy when pooled
+        assert self.pool.get('node_1') is None
+
+        self.pool.release(session)
+        assert self.pool.get('node_1') is session
+        assert self.pool.get('node_2') is None
+        assert self.pool.get(None) is None
+
+        session.conn.opened = False
+        self.pool.release(session)
+        assert self.pool.get('node_1') is None
+        assert self.pool.metrics['reused'] == 1
+        assert self.pool.metrics['missed'] == 4
+
+    def test_concurrent_exchanges(self):
+        session = _session('node_1')
+        self.pool.add(session)
+        self.pool.release(session)
+
+        # The second exchange with the node does not get the busy session
+        assert self.pool.get('node_1') is session
+        assert self.pool.get('node_1') is None
+
+        self.pool.release(session)
+        assert self.pool.get('node_1') is session
+
+    def test_add_without_key(self):
+        self.pool.add(_session(None))
+        assert not self.pool
+
+    def test_release(self):
+        session = _session('node_1')
+        assert not self.pool.release(session)
+
+        self.pool.add(session)
+        assert self.pool.release(session)
+        assert self.pool.metrics['idle'] == 1
+        self.pool.get('node_1')
+        assert self.pool.metrics['idle'] == 0
+
+    def test_remove(self):
+        session = _session('node_1')
+        self.pool.add(session)
+        self.pool.release(session)
+        self.pool.remove(session)
+        assert session not in self.pool
+        assert self.pool.metrics['idle'] == 0
+        assert not session.dropped.called
+
+    def test_replace(self):
+        busy, idle = _session('node_1'), _session('node_1')
+        self.pool.add(busy)
+        self.pool.add(idle)
+        assert busy not in self.pool
+        assert not busy.dropped.called
+
+        self.pool.release(idle)
+        self.pool.add(_session('node_1'))
+        assert idle.dropped.called
+
+    def test_max_sessions(self):
+        sessions = [_session('node_{}'.format(i)) for i in range(3)]
+        for session in sessions:
+            self.pool.add(session)
+            self.pool.release(session)
+        assert len(self.pool) == 2
+        assert sessions[0] not in self.pool
+        assert sessions[0].dropped.called
+        assert not sessions[1].dropped.called
+
+    def test_remove_idle(self):
+        busy, idle, old = [_session('node_{}'.format(i)) for i in range(3)]
+        self.pool.max_sessions = 3
+        for session in [busy, idle, old]:
+            self.pool.add(session)
+        self.pool.release(idle)
+        self.pool.release(old)
+        busy.last_message_time = old.last_message_time = time.time() - 20
+
+        self.pool.remove_idle()
+        assert old.dropped.called
+        assert old not in self.pool
+        assert not idle.dropped.called
+        assert not busy.dropped.called
+
+    def test_drop_all(self):
+        sessions = [_session('node_{}'.format(i)) for i in range(2)]
+        for session in sessions:
+            self.pool.add(session)
+        self.pool.drop_all()
+        assert not self.pool
+        assert all(session.dropped.called for session in sessions)
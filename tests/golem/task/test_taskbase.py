@@ -2,7 +2,7 @@ from unittest import TestCase
 
 from mock import Mock, patch
 
-from golem.core.simpleserializer import CBORSerializer
+from golem.core.simpleserializer import CBORSerializer, DictSerializer
 from golem.docker.image import DockerImage
 from golem.network.p2p.node import Node
 from golem.task.taskbase import (Task, TaskBuilder, TaskHeader,
@@ -51,6 +51,33 @@ class TestTaskBase(LogTestCase):
 
         assert bin_deserialized == task_header_bin
 
+    def test_header_cached_representations(self):
+        node = Node(node_name="test node", pub_port=40103)
+        task_header = TaskHeader(
+            "ABC", "xyz", "10.10.10.10", 1023, "key", "DEFAULT",
+            task_owner=node
+        )
+
+        with patch('golem.task.taskbase.DictSerializer.dump',
+                   wraps=DictSerializer.dump) as dump:
+            task_header_dict = task_header.to_dict()
+            task_header_bin = task_header.to_binary()
+            assert task_header.to_dict() is task_header_dict
+            assert task_header.to_binary() is task_header_bin
+            assert dump.call_count == 1
+
+            task_header.deadline = 100
+            assert task_header.to_dict()["deadline"] == 100
+            assert task_header.to_binary() != task_header_bin
+            assert dump.call_count == 2
+
+            node.pub_port = 40104
+            assert task_header.to_dict()["task_owner"]["pub_port"] == 40104
+            assert dump.call_count == 3
+
+        assert "_cached" not in task_header.__getstate__()
+        assert "_cached" not in task_header.to_dict()
+
 
 class TestTaskBuilder(TestCase):
     def test_build_definition(self) -> None:
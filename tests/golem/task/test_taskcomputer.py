@@ -10,7 +10,8 @@ from golem.client import ClientTaskComputerEventListener
 from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core.common import timeout_to_deadline
 from golem.task.taskbase import ResultType
-from golem.task.taskcomputer import TaskComputer, PyTaskThread, logger
+from golem.task.taskcomputer import TaskComputer, PyTaskThread, logger, \
+    get_subtask_budget
 from golem.testutils import DatabaseFixture, TempDirFixture
 from golem.tools.ci import ci_skip
 from golem.tools.assertlogs import LogTestCase
@@ -135,7 +136,8 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
                              timeout_to_deadline(10))
         self.assertEqual(tc.task_to_subtask_mapping["xyz"], "xxyyzz")
         tc.task_server.request_resource.assert_called_with(
-            "xyz",  tc.resource_manager.get_resource_header("xyz"),
+            "xyz",  tc.resource_manager.get_resource_header(
+                "xyz", with_parts=True),
             "10.10.10.10", 10203, "key", "owner")
 
         assert tc.task_resource_collected("xyz")
@@ -183,7 +185,8 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
                              timeout_to_deadline(5))
         self.assertEqual(tc.task_to_subtask_mapping["xyz"], "aabbcc")
         tc.task_server.request_resource.assert_called_with(
-            "xyz",  tc.resource_manager.get_resource_header("xyz"),
+            "xyz",  tc.resource_manager.get_resource_header(
+                "xyz", with_parts=True),
             "10.10.10.10", 10203, "key", "owner")
         self.assertTrue(tc.task_resource_collected("xyz"))
         self.__wait_for_tasks(tc)
@@ -315,6 +318,98 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         assert not task_computer.session_closed.called
         assert start.called
 
+    def test_concurrent_subtasks(self):
+        task_server = self.task_server
+        task_server.config_desc.num_cores = 4
+        task_server.config_desc.max_concurrent_subtasks = 2
+        task_server.config_desc.task_request_interval = 0
+        task_server.config_desc.accept_tasks = True
+        tc = TaskComputer("ABC", task_server, use_docker_machine_manager=False)
+        assert tc.max_concurrent_subtasks == 2
+
+        def new_thread(subtask_id):
+            thread = mock.Mock(subtask_id=subtask_id, end_time=1.0,
+                               start_time=0.0, error=False, error_msg=None,
+                               result={'data': [], 'result_type': 0})
+            thread.get_subtask_id.return_value = subtask_id
+            thread.get_progress.return_value = 0.5
+            tc.assigned_subtasks[subtask_id] = ComputeTaskDef(task_id='t')
+            tc._add_counting_thread(thread, tc._free_slot())
+            return thread
+
+        first = new_thread('first')
+        tc.reset(computing_task='t')
+        tc.last_task_request = 0
+        tc.run()
+        assert task_server.request_task.call_count == 1
+        first.check_timeout.assert_called_once_with()
+
+        tc.waiting_for_task = None
+        second = new_thread('second')
+        assert tc.counting_slots == {'first': 0, 'second': 1}
+        tc.last_task_request = 0
+        tc.run()
+        assert task_server.request_task.call_count == 1
+        second.check_timeout.assert_called_once_with()
+        assert set(tc.get_progresses()) == {'first', 'second'}
+
+        # a rejected request does not reset running computations
+        tc.resource_request_rejected('other', 'reason')
+        assert tc.counting_task == 't'
+
+        tc.task_computed(first)
+        assert tc.counting_task == 't'
+        assert tc.counting_thread is second
+        assert tc._free_slot() == 0
+        tc.run()
+        assert task_server.request_task.call_count == 2
+
+        tc.task_computed(second)
+        assert tc.counting_task is None
+        assert tc.counting_thread is None
+        assert task_server.send_results.call_count == 2
+        assert tc.stats.get_stats('computed_tasks') == (2, 2)
+
+        tc.quit()
+
+    def test_get_subtask_budget(self):
+        config_desc = ClientConfigDescriptor()
+        config_desc.num_cores = 8
+        config_desc.max_memory_size = 4096
+        assert get_subtask_budget(config_desc) == (1, 8, 4096)
+
+        config_desc.max_concurrent_subtasks = 3
+        assert get_subtask_budget(config_desc) == (3, 2, 1365)
+
+        config_desc.num_cores = 2
+        assert get_subtask_budget(config_desc) == (2, 1, 2048)
+
+        config_desc.max_concurrent_subtasks = 0
+        assert get_subtask_budget(config_desc) == (1, 2, 4096)
+
+    def test_container_pool_config(self):
+        task_server = self.task_server
+        tc = TaskComputer("ABC", task_server, use_docker_machine_manager=False)
+        assert tc.container_pool is None
+
+        config_desc = ClientConfigDescriptor()
+        config_desc.container_pool_size = 2
+        tc.change_container_pool_config(config_desc)
+        pool = tc.container_pool
+        assert pool.max_containers == 2
+        assert pool.root_dir.startswith(self.path)
+
+        config_desc.container_pool_size = 3
+        tc.change_container_pool_config(config_desc)
+        assert tc.container_pool is pool
+        assert pool.max_containers == 3
+
+        config_desc.container_pool_size = 0
+        with mock.patch.object(pool, 'clear') as clear:
+            tc.change_container_pool_config(config_desc)
+        assert clear.called
+        assert tc.container_pool is None
+
     @staticmethod
     def __wait_for_tasks(tc):
         if tc.counting_thread is not None:
@@ -0,0 +1,144 @@
+from unittest import TestCase
+
+from golem.task.taskfeed import TaskUpdateFeed, changed_fields
+from golem.task.taskstate import SubtaskState, TaskState, TaskStatus
+from golem.testutils import PEP8MixIn
+
+
+class TaskManagerStub(object):
+
+    def __init__(self):
+        self.tasks = {}
+        self.tasks_states = {}
+        self.activeStatus = [TaskStatus.computing, TaskStatus.waiting]
+        self.built = []
+        self.pending = set()  # ids of tasks which have not been loaded
+
+    def add_task(self, task_id, status=TaskStatus.waiting, subtasks=0):
+        self.tasks[task_id] = task_id
+        state = self.tasks_states[task_id] = TaskState()
+        state.status = status
+        for i in range(subtasks):
+            ss = SubtaskState()
+            ss.subtask_id = '{}-{}'.format(task_id, i)
+            state.subtask_states[ss.subtask_id] = ss
+
+    def get_task_dict(self, task_id):
+        self.built.append(task_id)
+        state = self.tasks_states[task_id]
+        return {
+            'id': task_id,
+            'status': state.status,
+            'options': {'resolution': [1920, 1080]},
+        }
+
+    def is_task_loaded(self, task_id):
+        return task_id not in self.pending
+
+    def get_subtasks_dict(self, task_id):
+        return [ss.to_dictionary() for ss
+                in self.tasks_states[task_id].subtask_states.values()]
+
+
+class TestTaskUpdateFeed(TestCase, PEP8MixIn):
+    PEP8_FILES = ['golem/task/taskfeed.py']
+
+    def setUp(self):
+        self.tm = TaskManagerStub()
+        self.feed = TaskUpdateFeed(self.tm)
+
+    def test_changed_fields(self):
+        assert changed_fields({'a': 1, 'b': [1]}, {'a': 1, 'b': [1]}) == {}
+        assert changed_fields({'a': 1, 'b': [1]}, {'a': 2, 'b': [1, 2]}) \
+            == {'a': 2, 'b': [1, 2]}
+        assert changed_fields({}, {'a': 1}) == {'a': 1}
+
+    def test_update(self):
+        assert self.feed.update() is None
+        self.tm.add_task('active', subtasks=2)
+        self.tm.add_task('finished', status=TaskStatus.finished)
+
+        delta = self.feed.update()
+        assert delta['seq'] == 1
+        assert delta['tasks']['active']['options'] == \
+            {'resolution': [1920, 1080]}
+        assert set(delta['tasks']) == {'active', 'finished'}
+        assert set(delta['subtasks']['active']) == {'active-0', 'active-1'}
+        assert delta['deleted'] == []
+
+        # Active tasks are rebuilt, other ones are not
+        self.tm.built.clear()
+        assert self.feed.update() is None
+        assert self.tm.built == ['active']
+        assert self.feed.seq == 1
+
+        # Only changed fields are sent
+        self.tm.tasks_states['active'].subtask_states['active-1'] \
+            .subtask_progress = 0.5
+        self.tm.tasks_states['finished'].status = TaskStatus.aborted
+        self.feed.mark_updated('finished')
+        delta = self.feed.update()
+        assert delta == {
+            'seq': 2,
+            'tasks': {'finished': {'status': TaskStatus.aborted}},
+            'subtasks': {'active': {'active-1': {'progress': 0.5}}},
+            'removed_subtasks': {},
+            'deleted': [],
+        }
+
+        del self.tm.tasks['finished']
+        delta = self.feed.update()
+        assert delta['seq'] == 3
+        assert delta['deleted'] == ['finished']
+        assert self.feed.metrics['tasks'] == 1
+
+    def test_removed_subtasks(self):
+        self.tm.add_task('task', subtasks=2)
+        self.feed.update()
+
+        # abort_task clears subtask states
+        self.tm.tasks_states['task'].subtask_states.clear()
+        self.tm.tasks_states['task'].status = TaskStatus.aborted
+        self.feed.mark_updated('task')
+        delta = self.feed.update()
+        assert delta['removed_subtasks'] == {'task': ['task-0', 'task-1']}
+        assert self.feed.snapshot()['subtasks'] == {'task': []}
+        assert self.feed.update() is None
+
+    def test_not_loaded_task(self):
+        self.tm.add_task('task', status=TaskStatus.finished, subtasks=1)
+        self.tm.pending.add('task')
+        delta = self.feed.update()
+        assert set(delta['tasks']) == {'task'}
+        assert delta['subtasks'] == {}
+
+        # Loaded tasks are marked as updated
+        self.tm.pending.clear()
+        self.feed.mark_updated('task')
+        delta = self.feed.update()
+        assert delta['tasks'] == {}
+        assert set(delta['subtasks']['task']) == {'task-0'}
+
+    def test_snapshot(self):
+        self.tm.add_task('task', subtasks=1)
+        assert self.feed.snapshot() == {'seq': 0, 'tasks': [],
+                                        'subtasks': {}}
+        self.feed.update()
+        # Changes made after the last delta are not in the snapshot
+        self.tm.tasks_states['task'].status = TaskStatus.computing
+
+        snapshot = self.feed.snapshot()
+        assert snapshot['seq'] == 1
+        assert snapshot['tasks'] == [{
+            'id': 'task',
+            'status': TaskStatus.waiting,
+            'options': {'resolution': [1920, 1080]},
+        }]
+        assert [s['subtask_id'] for s in snapshot['subtasks']['task']] == \
+            ['task-0']
+
+        # Applying deltas to a snapshot gives the current dicts
+        tasks = {t['id']: t for t in snapshot['tasks']}
+        for task_id, fields in self.feed.update()['tasks'].items():
+            tasks[task_id].update(fields)
+        assert tasks['task'] == self.tm.get_task_dict('task')
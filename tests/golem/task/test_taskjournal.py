@@ -0,0 +1,259 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from golem.task.taskjournal import LazyDict, SubtaskIndex, TaskJournal
+from golem.task.taskstate import SubtaskState, TaskState, TaskStatus
+from golem.testutils import TempDirFixture
+
+
+class JournaledTask(object):
+
+    def __init__(self):
+        self.task_id = 'task_id'
+        self.subtasks_given = {}
+        self.total_tasks = 10
+        self.listeners = []
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['listeners']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.listeners = []
+
+
+class TestTaskJournal(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.path = self.new_path / ('task_id' + TaskJournal.SUFFIX)
+        self.journal = TaskJournal(self.path)
+        self.task = JournaledTask()
+        self.state = TaskState()
+        self.state.status = TaskStatus.waiting
+
+    def _add_subtask(self, subtask_id):
+        self.task.subtasks_given[subtask_id] = {'node_id': 'node',
+                                                'status': 'Starting'}
+        subtask_state = SubtaskState()
+        subtask_state.subtask_id = subtask_id
+        subtask_state.computer.node_id = 'node'
+        self.state.subtask_states[subtask_id] = subtask_state
+
+    def _load(self):
+        return TaskJournal(self.path).load()
+
+    def test_dump_and_load(self):
+        self._add_subtask('subtask_1')
+        self.state.extra_data = {'preview': {1, 2}}
+        self.journal.dump(self.task, self.state)
+
+        task, state = self._load()
+        assert isinstance(task, JournaledTask)
+        assert task.subtasks_given == self.task.subtasks_given
+        assert task.total_tasks == 10
+        assert task.listeners == []
+        assert state.status == TaskStatus.waiting
+        assert state.extra_data == {'preview': {1, 2}}
+        subtask_state = state.subtask_states['subtask_1']
+        assert subtask_state.subtask_id == 'subtask_1'
+        assert subtask_state.computer.node_id == 'node'
+
+    def test_read_header(self):
+        self.journal.dump(self.task, self.state)
+        header = TaskJournal.read_header(self.path)
+        assert header == dict(version=TaskJournal.VERSION,
+                              task_id='task_id',
+                              status=TaskStatus.waiting,
+                              resource_hash=None)
+
+    def test_header_info(self):
+        header_info = Mock(return_value={'resources': ['/a/b']})
+        self.journal.dump(self.task, self.state, header_info)
+        header = TaskJournal.read_header(self.path)
+        assert header['resources'] == ['/a/b']
+        assert header_info.call_count == 1
+
+        # Header info is updated with snapshots only
+        self.journal.dump(self.task, self.state, header_info)
+        assert header_info.call_count == 1
+
+        # A change of a header field writes a snapshot
+        self.state.resource_hash = 'abc'
+        self.journal.dump(self.task, self.state, header_info)
+        assert header_info.call_count == 2
+        assert TaskJournal.read_header(self.path)['resource_hash'] == 'abc'
+
+        # Info which cannot be encoded is not stored
+        header_info.return_value = {'resources': object(), 'task_dict': {}}
+        self.state.status = TaskStatus.finished
+        self.journal.dump(self.task, self.state, header_info)
+        header = TaskJournal.read_header(self.path)
+        assert header['status'] == TaskStatus.finished
+        assert 'resources' not in header
+        assert header['task_dict'] == {}
+        assert self._load()[1].status == TaskStatus.finished
+
+    def test_appends_changes(self):
+        for i in range(100):
+            self._add_subtask('subtask_{}'.format(i))
+        self.journal.dump(self.task, self.state)
+        size = self.path.stat().st_size
+
+        self.journal.dump(self.task, self.state)
+        assert self.path.stat().st_size == size
+
+        self._add_subtask('subtask_100')
+        self.state.subtask_states['subtask_0'].subtask_status = 'Finished'
+        self.task.total_tasks = 11
+        self.journal.dump(self.task, self.state)
+        appended = self.path.stat().st_size - size
+        assert 0 < appended < size / 2
+
+        del self.task.subtasks_given['subtask_1']
+        del self.state.subtask_states['subtask_2']
+        self.journal.dump(self.task, self.state)
+
+        task, state = self._load()
+        assert task.subtasks_given == self.task.subtasks_given
+        assert task.total_tasks == 11
+        assert set(state.subtask_states) == set(self.state.subtask_states)
+        assert state.subtask_states['subtask_0'].subtask_status == 'Finished'
+
+    def test_dump_changed_subtasks(self):
+        for i in range(100):
+            self._add_subtask('subtask_{}'.format(i))
+        self.task.part_files = {i: 'part_{}'.format(i) for i in range(100)}
+        self.task.frame_parts = {i: [i] for i in range(100)}
+        self.journal.dump(self.task, self.state)
+
+        self.task.subtasks_given['subtask_50']['status'] = 'Finished'
+        self.state.subtask_states['subtask_50'].subtask_status = 'Finished'
+        self.task.part_files[3] = 'result_3'
+        self.task.frame_parts[3].append(50)
+        self._add_subtask('subtask_100')
+        with patch.object(TaskJournal, '_pickle',
+                          wraps=TaskJournal._pickle) as pickle_mock:
+            self.journal.dump(self.task, self.state,
+                              subtask_ids=['subtask_50', 'subtask_100'])
+        # changed chunks of subtasks_given and subtask states, all chunks of
+        # frame_parts (mutable values), the changed chunk of part_files,
+        # other attributes and the state
+        assert pickle_mock.call_count == 2 + 2 + 4 + 1 + 4
+
+        task, state = self._load()
+        assert task.subtasks_given == self.task.subtasks_given
+        assert task.part_files == self.task.part_files
+        assert task.frame_parts == self.task.frame_parts
+        assert set(state.subtask_states) == set(self.state.subtask_states)
+        assert state.subtask_states['subtask_50'].subtask_status == \
+            'Finished'
+
+        # Subtasks which are not given are not serialized
+        self.task.subtasks_given['subtask_1']['status'] = 'Finished'
+        self.journal.dump(self.task, self.state, subtask_ids=[])
+        assert self._load()[0].subtasks_given['subtask_1']['status'] == \
+            'Starting'
+        self.journal.dump(self.task, self.state)
+        assert self._load()[0].subtasks_given['subtask_1']['status'] == \
+            'Finished'
+
+    def test_status_change_writes_snapshot(self):
+        self.journal.dump(self.task, self.state)
+        self.state.status = TaskStatus.finished
+        self.journal.dump(self.task, self.state)
+
+        header = TaskJournal.read_header(self.path)
+        assert header['status'] == TaskStatus.finished
+        assert self._load()[1].status == TaskStatus.finished
+
+    def test_compaction(self):
+        self.journal.MIN_COMPACTION_SIZE = 0
+        self._add_subtask('subtask')
+        self.journal.dump(self.task, self.state)
+        snapshot_size = self.path.stat().st_size
+
+        for i in range(50):
+            self.state.subtask_states['subtask'].stdout = 'x' * i
+            self.journal.dump(self.task, self.state)
+            assert self.path.stat().st_size <= 3 * snapshot_size
+
+        assert self._load()[1].subtask_states['subtask'].stdout == 'x' * 49
+
+    def test_load_skips_incomplete_record(self):
+        self.journal.dump(self.task, self.state)
+        self.task.total_tasks = 20
+        self.journal.dump(self.task, self.state)
+        with self.path.open('ab') as f:
+            f.write(b'\x00\x00\x10\x00incomplete')
+
+        journal = TaskJournal(self.path)
+        task, _ = journal.load()
+        assert task.total_tasks == 20
+
+        # a new snapshot replaces the incomplete record
+        journal.dump(task, self.state)
+        assert self._load()[0].total_tasks == 20
+
+    def test_invalid_journal(self):
+        self.path.write_bytes(b'')
+        with self.assertRaises(EOFError):
+            TaskJournal.read_header(self.path)
+        with self.assertRaises(EOFError):
+            self._load()
+
+    def test_remove(self):
+        self.journal.dump(self.task, self.state)
+        self.journal.remove()
+        assert not self.path.exists()
+
+
+class TestSubtaskIndex(TempDirFixture):
+
+    def test_load(self):
+        index = SubtaskIndex(self.tempdir)
+        assert not index.exists()
+        assert index.load({'task'}) == {}
+
+        index.add('sub1', 'task')
+        index.add('sub2', 'task')
+        index.add('sub3', 'deleted')
+        index.remove(['sub2'])
+        assert index.exists()
+        assert index.load({'task'}) == {'sub1': 'task'}
+
+        # an incomplete trailing line is ignored
+        with index.path.open('a') as f:
+            f.write('sub4 ta')
+        assert index.load({'task'}) == {'sub1': 'task'}
+
+        index.write({'sub5': 'task'})
+        assert index.load({'task'}) == {'sub5': 'task'}
+
+
+class TestLazyDict(TestCase):
+
+    def test_loads_pending(self):
+        loader = Mock(side_effect=lambda key: lazy.__setitem__(key, 'value'))
+        lazy = LazyDict(loader)
+        lazy.add_pending('key', 'info')
+
+        assert 'key' in lazy
+        assert list(lazy) == ['key']
+        assert len(lazy) == 1
+        assert lazy.is_pending('key')
+        assert lazy.pending_info('key') == 'info'
+        loader.assert_not_called()
+
+        assert lazy['key'] == 'value'
+        assert lazy['key'] == 'value'
+        loader.assert_called_once_with('key')
+        assert not lazy.is_pending('key')
+
+    def test_failed_load(self):
+        lazy = LazyDict(lambda key: lazy.discard(key))
+        lazy.add_pending('key')
+        assert lazy.get('key') is None
+        assert 'key' not in lazy
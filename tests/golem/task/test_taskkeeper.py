@@ -1,3 +1,4 @@
+from collections import Counter
 from datetime import datetime
 from golem_messages.message import ComputeTaskDef
 from pathlib import Path
@@ -15,7 +16,7 @@ from golem.network.p2p.node import Node
 from golem.task.taskbase import TaskHeader
 from golem.task.taskkeeper import CompTaskInfo
 from golem.task.taskkeeper import TaskHeaderKeeper, CompTaskKeeper,\
-    CompSubtaskInfo, logger
+    CompSubtaskInfo, IndexedSet, VerifiedHeadersCache, logger
 from golem.testutils import PEP8MixIn
 from golem.testutils import TempDirFixture
 from golem.tools.assertlogs import LogTestCase
@@ -158,6 +159,77 @@ class TestTaskHeaderKeeper(LogTestCase):
         self.assertEqual(task_header["max_price"], th.max_price)
         self.assertEqual(task_header["task_id"], th.task_id)
 
+    def test_get_task_weighted(self):
+        tk = TaskHeaderKeeper(EnvironmentsManager(), 10)
+        e = Environment()
+        e.accept_tasks = True
+        tk.environments_manager.add_environment(e)
+
+        for task_id, owner in [("cheap", "kkkk"), ("expensive", "kkkk"),
+                               ("distrusted", "bad")]:
+            task_header = get_dict_task_header(task_id)
+            task_header["task_owner_key_id"] = owner
+            if task_id != "cheap":
+                task_header["max_price"] = 1000
+            assert tk.add_task_header(task_header)
+
+        def trust(key_id):
+            return -1.0 if key_id == "bad" else 0.5
+
+        chosen = Counter(
+            tk.get_task(requestor_trust=trust).task_id for _ in range(300))
+        assert chosen["distrusted"] == 0
+        assert chosen["expensive"] > chosen["cheap"]
+
+        th = tk.task_headers["expensive"]
+        assert tk.get_task_weight(th) == 1001
+        assert tk.get_task_weight(th, trust, lambda env: 2.0) == 1001 * 3
+        assert tk.get_task_weight(th, lambda _: None, lambda _: 0.0) == 0
+
+        tk.selection_sample_size = 1
+        assert tk.get_task(requestor_trust=lambda _: -1.0) is not None
+
+    def test_update_environment_support(self):
+        tk = TaskHeaderKeeper(EnvironmentsManager(), 10)
+        e = Environment()
+        tk.environments_manager.add_environment(e)
+        assert tk.add_task_header(get_dict_task_header("xyz"))
+        assert tk.tasks_by_environment == {"DEFAULT": {"xyz"}}
+        assert "xyz" not in tk.supported_tasks
+
+        e.accept_tasks = True
+        tk.update_environment_support("DEFAULT")
+        assert "xyz" in tk.supported_tasks
+        assert tk.get_support_status("xyz").is_ok()
+
+        tk.remove_task_header("xyz")
+        assert tk.tasks_by_environment == {}
+        assert tk.tasks_by_owner == {}
+        assert "xyz" not in tk.supported_tasks
+
+    def test_remove_old_tasks_updated_deadline(self):
+        tk = TaskHeaderKeeper(EnvironmentsManager(), 10)
+        task_header = get_dict_task_header()
+        task_header["deadline"] = timeout_to_deadline(0.5)
+        assert tk.add_task_header(task_header)
+        task_header["deadline"] = timeout_to_deadline(10)
+        assert tk.add_task_header(task_header)
+
+        time.sleep(0.6)
+        tk.remove_old_tasks()
+        assert "xyz" in tk.task_headers
+
+        tk.task_headers["xyz"].deadline = get_timestamp_utc() - 1
+        tk.deadlines.schedule("xyz", tk.task_headers["xyz"].deadline)
+        tk.remove_old_tasks()
+        assert "xyz" not in tk.task_headers
+        assert "xyz" in tk.removed_tasks
+
+        tk.removed_task_timeout = 0
+        time.sleep(0.01)
+        tk.remove_old_tasks()
+        assert "xyz" not in tk.removed_tasks
+
     def test_old_tasks(self):
         tk = TaskHeaderKeeper(EnvironmentsManager(), 10)
         e = Environment()
@@ -429,6 +501,92 @@ class TestTaskHeaderKeeper(LogTestCase):
                        'ntasks': 1}, reasons)
 
 
+class TestIndexedSet(TestCase):
+    def test_add_and_discard(self):
+        items = IndexedSet(["a", "b", "c"])
+        items.add("a")
+        assert len(items) == 3
+        assert items[0] == "a"
+
+        items.discard("a")
+        items.discard("x")
+        assert len(items) == 2
+        assert "a" not in items
+        assert set(items) == {"b", "c"}
+        assert items[0] == "c"
+
+        with self.assertRaises(KeyError):
+            items.remove("a")
+        items.remove("c")
+        assert list(items) == ["b"]
+
+    def test_sample(self):
+        items = IndexedSet(range(100))
+        assert sorted(IndexedSet(range(3)).sample(5)) == [0, 1, 2]
+        sample = items.sample(10)
+        assert len(set(sample)) == 10
+        assert all(item in items for item in sample)
+
+
+class TestVerifiedHeadersCache(TestCase):
+    def setUp(self):
+        self.cache = VerifiedHeadersCache(max_entries=2)
+        self.verify_sig = mock.Mock(return_value=True)
+
+    def _header(self, task_id="xyz", signature=b"sig"):
+        header = get_dict_task_header(task_id)
+        header["deadline"] = 1000.0
+        header["signature"] = signature
+        return header
+
+    def test_verify(self):
+        header = self._header()
+        assert self.cache.verify(header, self.verify_sig)
+        self.verify_sig.assert_called_once_with(header)
+
+        header = self._header()
+        header["last_checking"] += 10
+        assert self.cache.verify(header, self.verify_sig)
+        assert self.verify_sig.call_count == 1
+        assert self.cache.metrics["hits"] == 1
+        assert self.cache.metrics["misses"] == 1
+        assert self.cache.metrics["hit_rate"] == 0.5
+
+    def test_changed_content(self):
+        self.cache.verify(self._header(), self.verify_sig)
+
+        header = self._header()
+        header["task_owner"]["node_name"] = "Eve's node"
+        self.verify_sig.return_value = False
+        assert not self.cache.verify(header, self.verify_sig)
+        assert not self.cache.verify(header, self.verify_sig)
+        assert self.verify_sig.call_count == 3
+        assert len(self.cache) == 1
+
+        assert self.cache.verify(self._header(), self.verify_sig)
+        assert self.verify_sig.call_count == 3
+
+    def test_changed_signature(self):
+        self.cache.verify(self._header(), self.verify_sig)
+        assert self.cache.verify(self._header(signature=b"new sig"),
+                                 self.verify_sig)
+        assert self.verify_sig.call_count == 2
+        assert len(self.cache) == 2
+
+    def test_max_entries(self):
+        for task_id in ["a", "b"]:
+            self.cache.verify(self._header(task_id), self.verify_sig)
+        self.cache.verify(self._header("a"), self.verify_sig)
+        self.cache.verify(self._header("c"), self.verify_sig)
+        assert len(self.cache) == 2
+        assert self.verify_sig.call_count == 3
+
+        self.cache.verify(self._header("a"), self.verify_sig)
+        assert self.verify_sig.call_count == 3
+        self.cache.verify(self._header("b"), self.verify_sig)
+        assert self.verify_sig.call_count == 4
+
+
 def get_dict_task_header(task_id="xyz"):
     return {
         "task_id": task_id,
@@ -1,10 +1,10 @@
 from golem_messages.message import ComputeTaskDef
 import os
+import pickle
 import random
 import shutil
 import time
 import uuid
-from collections import OrderedDict
 from unittest.mock import Mock, patch
 
 from apps.core.task.coretaskstate import TaskDefinition
@@ -18,12 +18,16 @@ from golem.resource.resource import TaskResourceHeader
 from golem.task.taskbase import Task, TaskHeader, \
     TaskEventListener, ResultType
 from golem.task.taskclient import TaskClient
+from golem.task.taskjournal import LazyDict
 from golem.task.taskmanager import TaskManager, logger, subtask_priority
 from golem.task.taskstate import SubtaskStatus, SubtaskState, TaskState, \
     TaskStatus, ComputerState
 from golem.tools.assertlogs import LogTestCase
 from golem.tools.testdirfixture import TestDirFixture
 from golem.tools.testwithreactor import TestDirFixtureWithReactor
+from golem.task.verificationqueue import VerificationQueue
+from tests.golem.task.test_verificationqueue import FakeReactor, \
+    ManualThreadPool
 
 from apps.dummy.dummyenvironment import DummyTaskEnvironment
 from apps.dummy.task.dummytask import (
@@ -180,6 +184,123 @@ class TestTaskManager(LogTestCase, TestDirFixtureWithReactor,
                 # check some task's properties...
                 assert restored_task.header.task_id == task.header.task_id
 
+    @patch('golem.task.taskmanager.TaskManager.get_task_definition_dict',
+           return_value={'bid': 1.0})
+    def test_restore_loads_tasks_lazily(self, *_):
+        task_ids = ["xyz0", "xyz1"]
+        for task_id in task_ids:
+            task = self._get_test_dummy_task(task_id)
+            task.task_definition.task_type = "Dummy"
+            self.tm.add_new_task(task)
+            self.tm.start_task(task_id)
+            assert self.tm._dump_filepath(task_id).is_file()
+        self.tm.tasks_states["xyz1"].status = TaskStatus.finished
+        self.tm.notice_task_updated("xyz1")
+
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        assert set(fresh_tm.tasks) == set(task_ids)
+        assert all(fresh_tm.tasks.is_pending(t) for t in task_ids)
+
+        # task dicts and resources are read from journal headers
+        assert fresh_tm.get_task_dict("xyz1") == \
+            self.tm.get_task_dict("xyz1")
+        assert [r[0] for r in fresh_tm.get_active_tasks_resources()] == \
+            ["xyz0"]
+        fresh_tm.update_feed.update()
+        assert all(fresh_tm.tasks.is_pending(t) for t in task_ids)
+
+        # only active tasks are loaded to check timeouts
+        fresh_tm.check_timeouts()
+        assert not fresh_tm.tasks.is_pending("xyz0")
+        assert fresh_tm.tasks.is_pending("xyz1")
+
+        assert fresh_tm.tasks_states["xyz1"].status == TaskStatus.finished
+        assert not fresh_tm.tasks.is_pending("xyz1")
+
+    @patch('golem.task.taskbase.Task.needs_computation', return_value=True)
+    def test_restore_subtask_index(self, *_):
+        task = self._get_test_dummy_task("xyz")
+        self.tm.add_new_task(task)
+        self.tm.start_task("xyz")
+        ctd = ComputeTaskDef()
+        ctd['task_id'] = "xyz"
+        ctd['subtask_id'] = "xxyyzz"
+        extra_data = Task.ExtraData(should_wait=False, ctd=ctd)
+        with patch.object(DummyTask, 'query_extra_data',
+                          return_value=extra_data):
+            self.tm.get_next_subtask("DEF", "DEF", "xyz", 1000, 10, 5, 10, 2,
+                                     "10.10.10.10")
+        self.tm.notice_task_updated("xyz")
+        self.tm.subtask_index.add("aabbcc", "unknown")
+
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        # subtasks are resolved without loading their tasks
+        assert fresh_tm.subtask2task_mapping == {"xxyyzz": "xyz"}
+        assert "aabbcc" not in fresh_tm.subtask2task_mapping
+        assert fresh_tm.tasks.is_pending("xyz")
+
+        fresh_tm.abort_task("xyz")
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        assert fresh_tm.subtask2task_mapping == {}
+
+    def test_restore_without_subtask_index(self):
+        task = self._get_test_dummy_task("xyz")
+        state = TaskState()
+        subtask_state = SubtaskState()
+        subtask_state.subtask_id = "xxyyzz"
+        state.subtask_states["xxyyzz"] = subtask_state
+        self.tm._journal("xyz").dump(task, state)
+        self.tm.subtask_index.path.unlink()
+
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        assert fresh_tm.subtask2task_mapping == {"xxyyzz": "xyz"}
+        assert fresh_tm.subtask_index.load({"xyz"}) == {"xxyyzz": "xyz"}
+
+    def test_restore_pickled_task(self):
+        task = self._get_test_dummy_task("xyz")
+        state = TaskState()
+        state.status = TaskStatus.waiting
+        path = self.tm.tasks_dir / 'xyz.pickle'
+        with path.open('wb') as f:
+            pickle.dump((task, state), f, protocol=2)
+
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        assert not path.exists()
+        assert fresh_tm._dump_filepath("xyz").is_file()
+        assert fresh_tm.tasks["xyz"].header.task_id == "xyz"
+        assert fresh_tm.tasks_states["xyz"].status == TaskStatus.waiting
+
+    def test_restore_pickled_task_dump_error(self):
+        task = self._get_test_dummy_task("xyz")
+        path = self.tm.tasks_dir / 'xyz.pickle'
+        with path.open('wb') as f:
+            pickle.dump((task, TaskState()), f, protocol=2)
+
+        with patch('golem.task.taskjournal.TaskJournal.dump',
+                   side_effect=OSError):
+            fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                                   root_path=self.path, task_persistence=True)
+        assert path.exists()
+        assert "xyz" not in fresh_tm.tasks
+
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        assert not path.exists()
+        assert fresh_tm.tasks["xyz"].header.task_id == "xyz"
+
+    def test_restore_pickled_task_corrupted(self):
+        path = self.tm.tasks_dir / 'xyz.pickle'
+        path.write_bytes(b'corrupted')
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        assert not path.exists()
+        assert not fresh_tm.tasks
+
 
 
     @patch('golem.task.taskbase.Task.needs_computation', return_value=True)
@@ -442,6 +563,115 @@ class TestTaskManager(LogTestCase, TestDirFixtureWithReactor,
         assert ctd['subtask_id'] == "sss4"
         assert self.tm.computed_task_received("sss4", [], 0)
 
+    @patch('golem.task.taskbase.Task.needs_computation', return_value=True)
+    @patch('golem.task.taskmanager.TaskManager.dump_task')
+    def test_verify_computed_task(self, *_):
+        threadpool = ManualThreadPool()
+        self.tm.verification_queue = VerificationQueue(
+            reactor=FakeReactor(), threadpool=threadpool)
+        callback = Mock()
+
+        task_mock = self._get_task_mock()
+        task_mock.verify_results = Mock(return_value="verified")
+        task_mock.results_verified = Mock()
+        task_mock.verify_subtask = Mock(return_value=True)
+        task_mock.finished_computation = Mock(return_value=False)
+        self.tm.add_new_task(task_mock)
+        self.tm.start_task("xyz")
+        ctd, _, _ = self.tm.get_next_subtask("DEF", "DEF", "xyz", 1000, 10,
+                                             5, 10, 2, "10.10.10.10")
+        assert ctd['subtask_id'] == "xxyyzz"
+
+        self.tm.verify_computed_task("xxyyzz", [], ResultType.FILES, callback)
+        assert not callback.called
+        assert not task_mock.verify_results.called
+        assert self.tm.verification_queue.metrics['running'] == 1
+        ss = self.tm.tasks_states["xyz"].subtask_states["xxyyzz"]
+        assert ss.subtask_status == SubtaskStatus.verifying
+
+        # Results received again are not queued
+        duplicate_callback = Mock()
+        with self.assertLogs(logger, level="WARNING"):
+            self.tm.verify_computed_task("xxyyzz", [], ResultType.FILES,
+                                         duplicate_callback)
+        duplicate_callback.assert_called_once_with(False)
+        assert len(threadpool.calls) == 1
+
+        threadpool.run()
+        task_mock.verify_results.assert_called_once_with(
+            "xxyyzz", [], ResultType.FILES)
+        task_mock.results_verified.assert_called_once_with(
+            "xxyyzz", [], ResultType.FILES, "verified")
+        callback.assert_called_once_with(True)
+        ss = self.tm.tasks_states["xyz"].subtask_states["xxyyzz"]
+        assert ss.subtask_status == SubtaskStatus.finished
+        assert self.tm.tasks_states["xyz"].status == TaskStatus.computing
+
+        # Results of the subtask have already been accepted
+        callback.reset_mock()
+        with self.assertLogs(logger, level="WARNING"):
+            self.tm.verify_computed_task("xxyyzz", [], ResultType.FILES,
+                                         callback)
+        callback.assert_called_once_with(False)
+        assert not threadpool.calls
+
+        callback.reset_mock()
+        with self.assertLogs(logger, level="WARNING"):
+            self.tm.verify_computed_task("unknown", [], ResultType.FILES,
+                                         callback)
+        callback.assert_called_once_with(False)
+
+        # Verification error fails the subtask
+        task_mock = self._get_task_mock(task_id="abc", subtask_id="aabbcc")
+        task_mock.verify_results = Mock(side_effect=RuntimeError("broken"))
+        self.tm.add_new_task(task_mock)
+        self.tm.start_task("abc")
+        self.tm.get_next_subtask("DEF", "DEF", "abc", 1000, 10, 5, 10, 2,
+                                 "10.10.10.10")
+        callback.reset_mock()
+        self.tm.verify_computed_task("aabbcc", [], ResultType.FILES, callback)
+        threadpool.run()
+        callback.assert_called_once_with(False)
+        ss = self.tm.tasks_states["abc"].subtask_states["aabbcc"]
+        assert ss.subtask_status == SubtaskStatus.failure
+        assert "broken" in ss.stderr
+
+    @patch('golem.task.taskbase.Task.needs_computation', return_value=True)
+    @patch('golem.task.taskmanager.TaskManager.dump_task')
+    def test_verify_computed_task_changed(self, *_):
+        threadpool = ManualThreadPool()
+        self.tm.verification_queue = VerificationQueue(
+            reactor=FakeReactor(), threadpool=threadpool)
+        callback = Mock()
+
+        task_mock = self._get_task_mock()
+        task_mock.verify_results = Mock(return_value="verified")
+        task_mock.results_verified = Mock()
+        self.tm.add_new_task(task_mock)
+        self.tm.start_task("xyz")
+        self.tm.get_next_subtask("DEF", "DEF", "xyz", 1000, 10, 5, 10, 2,
+                                 "10.10.10.10")
+
+        # Subtask restarted during verification
+        self.tm.verify_computed_task("xxyyzz", [], ResultType.FILES, callback)
+        self.tm.restart_subtask("xxyyzz")
+        with self.assertLogs(logger, level="WARNING"):
+            threadpool.run()
+        callback.assert_called_once_with(False)
+        assert not task_mock.results_verified.called
+        ss = self.tm.tasks_states["xyz"].subtask_states["xxyyzz"]
+        assert ss.subtask_status == SubtaskStatus.restarted
+
+        # Task aborted during verification
+        callback.reset_mock()
+        ss.subtask_status = SubtaskStatus.downloading
+        self.tm.verify_computed_task("xxyyzz", [], ResultType.FILES, callback)
+        self.tm.abort_task("xyz")
+        with self.assertLogs(logger, level="WARNING"):
+            threadpool.run()
+        callback.assert_called_once_with(False)
+        assert not task_mock.results_verified.called
+
 
     @patch('golem.task.taskmanager.TaskManager.dump_task')
     def test_task_result_incoming(self, dump_mock):
@@ -553,6 +783,36 @@ class TestTaskManager(LogTestCase, TestDirFixtureWithReactor,
             assert self.tm.tasks_states["qwe"].status == TaskStatus.timeout
             assert self.tm.tasks_states["qwe"].subtask_states["qwerty"].subtask_status == SubtaskStatus.failure
 
+    @patch('golem.task.taskbase.Task.needs_computation', return_value=True)
+    def test_check_timeouts_rescheduled(self, _):
+        t = self._get_task_mock(timeout=0.05, subtask_timeout=0.05)
+        self.tm.add_new_task(t)
+        self.tm.start_task("xyz")
+        self.tm.get_next_subtask("ABC", "ABC", "xyz", 1000, 10, 5, 10, 2,
+                                 "10.10.10.10")
+        assert "xyz" in self.tm.task_deadlines
+        assert ("xyz", "xxyyzz") in self.tm.subtask_deadlines
+
+        # Longer task timeout and restarted subtask
+        self.tm.change_timeouts("xyz", 10, 10)
+        self.tm.restart_subtask("xxyyzz")
+        time.sleep(0.1)
+        assert self.tm.check_timeouts() == []
+        assert self.tm.tasks_states["xyz"].status in self.tm.activeStatus
+        ss = self.tm.tasks_states["xyz"].subtask_states["xxyyzz"]
+        assert ss.subtask_status == SubtaskStatus.restarted
+        assert not self.tm.subtask_deadlines
+
+        # Deadline changed without rescheduling is checked again later
+        t.header.deadline = timeout_to_deadline(10)
+        self.tm.task_deadlines.schedule("xyz", get_timestamp_utc() - 1)
+        self.tm.check_timeouts()
+        assert self.tm.tasks_states["xyz"].status in self.tm.activeStatus
+        assert self.tm.task_deadlines.get_deadline("xyz") == t.header.deadline
+
+        self.tm.abort_task("xyz")
+        assert not self.tm.task_deadlines
+
     def test_task_event_listener(self):
         self.tm.notice_task_updated = Mock()
         assert isinstance(self.tm, TaskEventListener)
@@ -631,6 +891,12 @@ class TestTaskManager(LogTestCase, TestDirFixtureWithReactor,
         assert isinstance(all_subtasks, list)
         assert all(isinstance(t, dict) for t in all_subtasks)
 
+        delta = tm.update_feed.update()
+        assert set(delta['tasks']) == set(tm.tasks)
+        assert delta['tasks'][task_id] == tm.get_task_dict(task_id)
+        assert len(delta['subtasks'][task_id]) == len(all_subtasks)
+        assert tm.update_feed.snapshot()['seq'] == delta['seq']
+
     @patch('golem.network.p2p.node.Node.collect_network_info')
     @patch('apps.blender.task.blenderrendertask.'
            'BlenderTaskTypeInfo.get_preview')
@@ -753,7 +1019,7 @@ class TestTaskManager(LogTestCase, TestDirFixtureWithReactor,
             assert subtask_state.subtask_status == SubtaskStatus.restarted
 
     def __build_tasks(self, tm, n, fixed_frames=False):
-        tm.tasks = OrderedDict()
+        tm.tasks = LazyDict()
         tm.tasks_states = dict()
         tm.subtask_states = dict()
 
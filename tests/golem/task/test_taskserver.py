@@ -1,7 +1,9 @@
 import datetime
+import functools
 from golem_messages.message import ComputeTaskDef
 import os
 import random
+import time
 import uuid
 from collections import deque
 from math import ceil
@@ -18,12 +20,13 @@ from golem.core.keysauth import EllipticalKeysAuth
 from golem.core.variables import APP_VERSION
 from golem.environments.environment import SupportStatus, UnsupportReason
 from golem.network.p2p.node import Node
-from golem.task import tasksession
+from golem.task import taskserver, tasksession
 from golem.task.taskbase import TaskHeader, ResultType
+from golem.task.taskkeeper import compute_header_digest
 from golem.task.taskserver import TASK_CONN_TYPES
 from golem.task.taskserver import TaskServer, WaitingTaskResult, logger
 from golem.task.tasksession import TaskSession
-from golem.task.taskstate import TaskState
+from golem.task.taskstate import TaskState, TaskStatus
 from golem.tools.assertlogs import LogTestCase
 from golem.tools.testwithappconfig import TestWithKeysAuth
 from golem.tools.testwithreactor import TestDatabaseWithReactor
@@ -329,6 +332,43 @@ class TestTaskServer(TestWithKeysAuth, LogTestCase, testutils.DatabaseFixture):
         saved_task = next(th for th in ts.get_tasks_headers() if th["task_id"] == "xyz_2")
         self.assertEqual(saved_task["signature"], new_header["signature"])
 
+    def test_add_known_task_header(self):
+        ts = TaskServer(Node(), ClientConfigDescriptor(),
+                        EllipticalKeysAuth(self.path), self.client,
+                        use_docker_machine_manager=False)
+        self.ts = ts
+        task_header = get_example_task_header()
+        task_header["signature"] = b"signature"
+        ts.task_keeper.add_task_header(task_header)
+
+        with patch.object(ts, 'verify_header_sig') as verify:
+            assert ts.add_task_header(dict(task_header))
+            assert not verify.called
+
+            verify.return_value = False
+            new_header = dict(task_header, signature=b"new signature")
+            assert not ts.add_task_header(new_header)
+            verify.assert_called_once_with(new_header)
+
+    def test_get_tasks_headers_with_digests(self):
+        ts = TaskServer(Node(), ClientConfigDescriptor(),
+                        EllipticalKeysAuth(self.path), self.client,
+                        use_docker_machine_manager=False)
+        self.ts = ts
+        for task_id in ["xyz", "xyz_2"]:
+            task_header = get_example_task_header()
+            task_header["task_id"] = task_id
+            task_header["signature"] = task_id.encode()
+            ts.task_keeper.add_task_header(task_header)
+
+        digests = ts.get_tasks_digests()
+        assert digests == {"xyz": compute_header_digest(b"xyz"),
+                           "xyz_2": compute_header_digest(b"xyz_2")}
+        assert len(ts.get_tasks_headers()) == 2
+        assert ts.get_tasks_headers([]) == []
+        headers = ts.get_tasks_headers(["xyz_2", "unknown"])
+        assert [th["task_id"] for th in headers] == ["xyz_2"]
+
     def test_sync(self):
         ccd = ClientConfigDescriptor()
         ts = TaskServer(Node(), ccd, EllipticalKeysAuth(self.path), self.client,
@@ -552,8 +592,8 @@ class TestTaskServer(TestWithKeysAuth, LogTestCase, testutils.DatabaseFixture):
 
         self.assertTrue(ts.remove_pending_conn.called)
         self.assertTrue(ts.remove_responses.called)
-        self.assertFalse(wtr.alreadySending)
-        self.assertTrue(wtr.lastSendingTrial)
+        self.assertFalse(wtr.already_sending)
+        self.assertTrue(wtr.last_sending_trial)
 
         ts.remove_pending_conn.called = False
         ts.remove_responses.called = False
@@ -774,6 +814,148 @@ class TestTaskServer2(TestWithKeysAuth, TestDatabaseWithReactor):
         self.ts.task_sessions[subtask_id] = subtask_session
         self.assertEqual([subtask_session], self.ts._find_sessions(subtask_id))
 
+    def test_add_pending_request_pooled(self):
+        self.ts.active = True
+        established = MagicMock()
+        req_type = TASK_CONN_TYPES['task_failure']
+        self.ts.conn_established_for_type[req_type] = established
+        args = {'key_id': 'key_id', 'subtask_id': 'xyz', 'err_msg': 'error'}
+        node = Node(key='key_id', prv_port=40102, pub_addr='10.10.10.10')
+
+        self.ts._add_pending_request(req_type, node, 40102, 'key_id', args)
+        assert not established.called
+        assert len(self.ts.pending_connections) == 1
+
+        session = MagicMock(key_id='key_id', conn_id='conn_id')
+        self.ts.session_pool.add(session)
+        self.ts.session_pool.release(session)
+        self.ts._add_pending_request(req_type, node, 40102, None, args)
+        established.assert_called_once_with(session, 'conn_id', **args)
+        assert len(self.ts.pending_connections) == 1
+
+        # The session is busy, a concurrent exchange uses a new connection
+        self.ts._add_pending_request(req_type, node, 40102, 'key_id', args)
+        assert established.call_count == 1
+        assert len(self.ts.pending_connections) == 2
+        self.ts.session_pool.release(session)
+
+        self.ts.remove_task_session(session)
+        self.ts._add_pending_request(req_type, node, 40102, 'key_id', args)
+        assert established.call_count == 1
+        assert len(self.ts.pending_connections) == 3
+
+    def _establish_dispatch_connections(self):
+        # Connections are established, their sessions verified and pooled
+        sessions = []
+        for conn_id, pc in list(self.ts.pending_connections.items()):
+            session = MagicMock(key_id=pc.key_id, conn_id=conn_id,
+                                address='10.10.10.10', port=40102,
+                                last_message_time=time.time())
+            pc.established(session, conn_id, **pc.args)
+            self.ts.session_pool.add(session)
+            self.ts.verified_conn(conn_id)
+            sessions.append(session)
+        return sessions
+
+    def _send_results_backlog(self, nodes, results):
+        self.ts.active = True
+        self.ts.network = MagicMock()
+        self.ts.dispatch_limiter.max_connections = 50
+        self.ts.session_pool.max_sessions = 100
+        for i in range(results):
+            node = nodes[i % len(nodes)]
+            subtask_id = 'subtask{}'.format(i)
+            self.ts.results_to_send[subtask_id] = WaitingTaskResult(
+                'task', subtask_id, [], ResultType.DATA, 1.0, 0, 0.0,
+                node.pub_addr, node.prv_port, node.key, node)
+
+        sessions = []
+        ticks = 0
+        while not all(wtr.already_sending
+                      for wtr in self.ts.results_to_send.values()):
+            ticks += 1
+            self.ts.sync_network()
+            assert len(self.ts.pending_connections) <= 50
+            sessions += self._establish_dispatch_connections()
+            for session in sessions:
+                # A session carries one result at a time; the requestor
+                # accepts it and the session becomes idle
+                assert session.send_report_computed_task.call_count <= 1
+                if session.send_report_computed_task.called:
+                    session.send_report_computed_task.reset_mock()
+                    self.ts.session_pool.release(session)
+        return ticks
+
+    def test_send_waiting_results_backlog(self):
+        nodes = [Node(key='node{}'.format(i), prv_port=40102,
+                      pub_addr='10.10.10.{}'.format(i)) for i in range(100)]
+        ticks = self._send_results_backlog(nodes, 500)
+        # Each pooled session and up to 50 new connections carry a result
+        # in each tick
+        assert ticks <= 5
+        assert len(self.ts.session_pool) == 100
+
+    def test_send_waiting_results_backlog_single_node(self):
+        node = Node(key='node', prv_port=40102, pub_addr='10.10.10.10')
+        ticks = self._send_results_backlog([node], 500)
+        # Up to 50 new connections to the node and its pooled session carry
+        # results in each tick
+        assert ticks <= 10
+
+    def test_send_waiting_payments_backlog(self):
+        self.ts.active = True
+        self.ts.network = MagicMock()
+        self.ts.dispatch_limiter.max_connections = 10
+        nodes = [Node(key='node{}'.format(i), prv_port=40102,
+                      pub_addr='10.10.10.{}'.format(i)) for i in range(10)]
+        for i in range(30):
+            self.ts.payments_to_send.add(model.Payment(
+                subtask='subtask{}'.format(i), payee=b'0x00', value=1,
+                details=model.PaymentDetails(node_info=nodes[i % 10])))
+
+        sessions = []
+        for _ in range(3):
+            self.ts.sync_network()
+            assert len(self.ts.pending_connections) <= 10
+            for session in self._establish_dispatch_connections():
+                # The payment has been sent, the exchange ended
+                session.end_exchange.assert_called_once_with()
+                self.ts.session_pool.release(session)
+                session.end_exchange.side_effect = functools.partial(
+                    self.ts.session_pool.release, session)
+                sessions.append(session)
+        # All payments to a node with an idle pooled session are sent
+        # over it in one tick
+        assert all(hasattr(payment, '_last_try')
+                   for payment in self.ts.payments_to_send)
+        assert sum(session.inform_worker_about_payment.call_count
+                   for session in sessions) == 30
+
+    def test_dispatch_backoff(self):
+        self.ts.active = True
+        self.ts.network = MagicMock()
+        node = Node(key='node', prv_port=40102, pub_addr='10.10.10.10')
+        wtr = WaitingTaskResult('task', 'subtask', [], ResultType.DATA, 1.0,
+                                0, 0.0, node.pub_addr, node.prv_port,
+                                node.key, node)
+        self.ts.results_to_send['subtask'] = wtr
+        self.ts.sync_network()
+        conn_id, = self.ts.pending_connections
+        self.ts.final_conn_failure(conn_id)
+        assert not wtr.already_sending
+
+        # Other nodes are not affected
+        other = Node(key='other', prv_port=40102, pub_addr='10.10.10.11')
+        self.ts.failures_to_send['subtask2'] = \
+            taskserver.WaitingTaskFailure('task', 'subtask2', 'error',
+                                          other.pub_addr, other.prv_port,
+                                          other.key, other)
+        wtr.delay_time = 0
+        self.ts.sync_network()
+        assert [pc.key_id for pc in self.ts.pending_connections.values()] \
+            == ['other']
+        assert self.ts.dispatch_limiter.metrics['backed_off'] == 1
+
     @patch("golem.task.taskserver.TaskServer._add_pending_request")
     @patch("golem.task.taskserver.TaskServer._find_sessions")
     def test_send_waiting(self, find_sessions_mock, add_pending_mock):
@@ -959,11 +1141,13 @@ class TestRestoreResources(TestWithKeysAuth, LogTestCase,
         self.task_count = 3
 
     @staticmethod
-    def _create_tasks(task_server, count):
+    def _create_tasks(task_server, count, status=TaskStatus.waiting):
         for _ in range(count):
             task_id = str(uuid.uuid4())
             task_server.task_manager.tasks[task_id] = Mock()
-            task_server.task_manager.tasks_states[task_id] = TaskState()
+            task_state = TaskState()
+            task_state.status = status
+            task_server.task_manager.tasks_states[task_id] = task_state
 
     def test_without_tasks(self):
         with patch.object(self.resource_manager, 'add_task',
@@ -1018,3 +1202,14 @@ class TestRestoreResources(TestWithKeysAuth, LogTestCase,
         assert self.ts.task_manager.notify_update_task.call_count == \
             self.task_count
 
+    def test_restore_resources_of_active_tasks(self):
+        self._create_tasks(self.ts, self.task_count)
+        self._create_tasks(self.ts, 2, status=TaskStatus.finished)
+        for state in self.ts.task_manager.tasks_states.values():
+            state.resource_hash = "a1b2c3"
+
+        self.ts.restore_resources()
+        assert self.resource_manager.add_task.call_count == self.task_count
+        # resource hashes have not changed
+        assert not self.ts.task_manager.notify_update_task.called
+
@@ -183,8 +183,11 @@ class TestTaskSession(LogTestCase, testutils.TempDirFixture,
         conn = Mock()
         ts = TaskSession(conn)
         ts.task_server = Mock()
+        ts.task_server.session_pool.release.return_value = False
         ts.task_manager = Mock()
         ts.task_manager.verify_subtask.return_value = True
+        ts.task_manager.verify_computed_task.side_effect = \
+            lambda *args: args[-1](True)
 
         extra_data = dict(
             # the result is explicitly serialized using cPickle
@@ -222,6 +225,70 @@ class TestTaskSession(LogTestCase, testutils.TempDirFixture,
         assert not ts.msgs_to_send
         assert conn.close.called
 
+    def test_result_received_pooled(self):
+        conn = Mock()
+        ts = TaskSession(conn)
+        ts.task_server = Mock()
+        ts.task_server.session_pool.release.return_value = True
+        ts.task_manager = Mock()
+        ts.task_manager.verify_subtask.return_value = True
+
+        extra_data = dict(
+            result=pickle.dumps({'stdout': 'xyz'}),
+            result_type=ResultType.DATA,
+            subtask_id='xxyyzz'
+        )
+        ts.result_received(extra_data, decrypt=False)
+
+        # Session is released when results have been verified
+        assert not ts.task_server.session_pool.release.called
+        args, _ = ts.task_manager.verify_computed_task.call_args
+        assert args[0] == 'xxyyzz'
+        assert args[2] == ResultType.DATA
+        args[-1](True)
+
+        assert isinstance(ts.msgs_to_send[0], message.SubtaskResultAccepted)
+        ts.task_server.session_pool.release.assert_called_once_with(ts)
+        assert not conn.close.called
+
+    def test_react_to_rand_val(self):
+        ts = TaskSession(Mock())
+        ts.disconnect = Mock()
+
+        ts._react_to_rand_val(message.RandVal(rand_val=ts.rand_val + 1))
+        assert not ts.verified
+        assert not ts.task_server.session_pool.add.called
+
+        ts._react_to_rand_val(message.RandVal(rand_val=ts.rand_val))
+        assert ts.verified
+        ts.task_server.session_pool.add.assert_called_once_with(ts)
+
+    def test_end_exchange(self):
+        ts = TaskSession(Mock())
+        ts.disconnect = Mock()
+        pool = ts.task_server.session_pool
+
+        pool.release.return_value = True
+        ts.end_exchange()
+        assert not ts.exchange_ended
+        assert not ts.conn.close.called
+
+        # Not pooled yet, released once it is verified
+        pool.release.return_value = False
+        ts.end_exchange()
+        assert ts.exchange_ended
+        assert not ts.conn.close.called
+        pool.release.reset_mock()
+        ts._react_to_rand_val(message.RandVal(rand_val=ts.rand_val))
+        pool.release.assert_called_once_with(ts)
+        assert not ts.exchange_ended
+
+    @patch('golem.task.tasksession.TaskSession.send')
+    def test_send_hello_verified(self, send_mock):
+        self.task_session.verified = True
+        self.task_session.send_hello()
+        assert not send_mock.called
+
     def test_react_to_task_result_hash(self):
 
         def create_pull_package(result):
@@ -0,0 +1,114 @@
+import unittest
+
+from mock import Mock
+
+from golem.task.verificationqueue import VerificationQueue
+
+
+class FakeReactor(object):
+
+    @staticmethod
+    def callFromThread(f, *args, **kwargs):
+        f(*args, **kwargs)
+
+
+class ManualThreadPool(object):
+    """ Keeps submitted functions until they are run by the test """
+
+    def __init__(self):
+        self.calls = []
+
+    def callInThreadWithCallback(self, on_result, f, *args, **kwargs):
+        self.calls.append((on_result, f, args, kwargs))
+
+    def run(self, index=0):
+        on_result, f, args, kwargs = self.calls.pop(index)
+        try:
+            result = f(*args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            from twisted.python.failure import Failure
+            on_result(False, Failure(exc))
+        else:
+            on_result(True, result)
+
+
+class TestVerificationQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.threadpool = ManualThreadPool()
+        self.queue = VerificationQueue(max_workers=2, max_per_task=1,
+                                       reactor=FakeReactor(),
+                                       threadpool=self.threadpool)
+        self.results = []
+
+    def _submit(self, task_id, value, priority=0.0):
+        self.queue.submit(task_id, lambda: value, self.results.append,
+                          Mock(), priority=priority)
+
+    def test_limits(self):
+        self._submit("task1", 1)
+        self._submit("task1", 2)
+        self._submit("task2", 3)
+        self._submit("task3", 4)
+
+        # One verification of task1 at once, two workers
+        assert len(self.threadpool.calls) == 2
+        assert self.queue.metrics['queued'] == 2
+        assert self.queue.metrics['running'] == 2
+
+        # Waiting verification of task1 doesn't block the one of task3
+        self.threadpool.run(1)
+        assert self.results == [3]
+        assert len(self.threadpool.calls) == 2
+        self.threadpool.run(0)
+        assert self.results == [3, 1]
+        self.threadpool.run(1)
+        self.threadpool.run()
+        assert self.results == [3, 1, 2, 4]
+
+        assert not self.threadpool.calls
+        assert self.queue.metrics['verified'] == 4
+        assert self.queue.metrics['running'] == 0
+        assert not self.queue
+
+    def test_priority(self):
+        self.queue.max_workers = 1
+        self._submit("task1", 1, priority=0.1)
+        self._submit("task2", 2, priority=0.1)
+        self._submit("task3", 3, priority=0.9)
+        self._submit("task4", 4, priority=0.1)
+
+        while self.threadpool.calls:
+            self.threadpool.run()
+        assert self.results == [1, 3, 2, 4]
+
+    def test_error(self):
+        error = Mock()
+
+        def verify():
+            raise ValueError("broken result")
+
+        self.queue.submit("task1", verify, Mock(), error)
+        self.threadpool.run()
+        assert isinstance(error.call_args[0][0], ValueError)
+
+        # Failure in a callback doesn't break the queue
+        self.queue.submit("task1", lambda: 1, Mock(side_effect=KeyError),
+                          Mock())
+        self._submit("task1", 2)
+        self.threadpool.run()
+        self.threadpool.run()
+        assert self.results == [2]
+
+        metrics = self.queue.metrics
+        assert metrics['verified'] == 2
+        assert metrics['failed'] == 1
+        assert metrics['running'] == 0
+
+    def test_change_config(self):
+        self.queue.max_workers = 1
+        self._submit("task1", 1)
+        self._submit("task2", 2)
+        assert len(self.threadpool.calls) == 1
+        self.queue.change_config(max_workers=2)
+        assert len(self.threadpool.calls) == 2
@@ -3,7 +3,7 @@ import os
 import time
 import uuid
 from unittest import TestCase
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import Mock, MagicMock, patch, call
 
 from twisted.internet.defer import Deferred
 
@@ -30,6 +30,7 @@ from golem.network.p2p.peersession import PeerSessionInfo
 from golem.report import StatusPublisher
 from golem.resource.dirmanager import DirManager
 from golem.resource.resourceserver import ResourceServer
+from golem.rpc.mapping import rpceventnames
 from golem.rpc.mapping.rpceventnames import UI, Environment
 from golem.task.taskbase import Task, ResourceType
 from golem.task.taskserver import TaskServer
@@ -504,7 +505,21 @@ class TestTasksPublisherService(TestWithReactor):
         service._run()
 
         assert not log.debug.called
-        assert rpc_publisher.publish.call_count == 1
+        update_feed = task_manager.update_feed
+        rpc_publisher.publish.assert_has_calls([
+            call(rpceventnames.Task.evt_task_updates, update_feed.update()),
+            call(rpceventnames.Task.evt_task_list, update_feed.tasks()),
+        ])
+
+    def test_run_no_updates(self):
+        rpc_publisher = Mock()
+        task_manager = Mock()
+        task_manager.update_feed.update.return_value = None
+
+        service = TasksPublisherService(rpc_publisher, task_manager)
+        service._run()
+
+        assert not rpc_publisher.publish.called
 
 
 class TestTaskArchiverService(TestWithReactor):
@@ -27,6 +27,26 @@ class TestDatabase(TempDirFixture, PEP8MixIn):
         self.assertEqual(db._get_user_version(), db.SCHEMA_VERSION)
         db.db.close()
 
+    def test_create_indexes(self):
+        db = m.Database(self.path)
+        db.db.execute_sql('DROP INDEX "expectedincome_modified_date"')
+        db.db.close()
+
+        db = m.Database(self.path)
+        indexes = [i.name for i in db.db.get_indexes('expectedincome')]
+        assert 'expectedincome_modified_date' in indexes
+        assert 'expectedincome_sender_node_subtask' in indexes
+        db.db.close()
+
+    def test_create_indexes_names(self):
+        # Indexes created in place have the names given by peewee to the
+        # model indexes, so that they are not created twice
+        db = m.Database(self.path)
+        for name, table, _ in m.Database.INDEXES:
+            indexes = [i.name for i in db.db.get_indexes(table)]
+            assert indexes.count(name) == 1
+        db.db.close()
+
 
 class TestPayment(DatabaseFixture):
     def test_default_fields(self):
@@ -1,5 +1,6 @@
 import json
 import random
+import sys
 import time
 import unittest
 import rlp
@@ -18,7 +19,7 @@ from golem.ethereum import Client
 from golem.ethereum.contracts import TestGNT
 from golem.ethereum.node import Faucet
 from golem.ethereum.paymentprocessor import \
-    PaymentProcessor, GNTToken, GNTWToken, encode_payments
+    PaymentProcessor, PaymentBatchPolicy, GNTToken, GNTWToken, encode_payments
 from golem.model import Payment, PaymentStatus
 from golem.testutils import DatabaseFixture
 from golem.utils import encode_hex, decode_hex
@@ -66,6 +67,10 @@ class PaymentProcessorInternalTest(DatabaseFixture):
         self.client.send.side_effect = lambda tx: '0x' + encode_hex(tx.hash)
         self.nonce = random.randint(0, 9999)
         self.client.get_transaction_count.return_value = self.nonce
+        self.block_number = 0
+        self.receipt = None
+        self.client.get_block_number_and_receipts.side_effect = \
+            lambda hashes: (self.block_number, [self.receipt] * len(hashes))
         # FIXME: PaymentProcessor should be started and stopped!
         self.pp = PaymentProcessor(self.client, self.privkey)
         self.pp._loopingCall.clock = Clock()  # Disable looping call.
@@ -382,7 +387,7 @@ class PaymentProcessorInternalTest(DatabaseFixture):
         assert inprogress[tx.hash] == [p]
 
         # Check payment status in the Blockchain
-        self.client.get_transaction_receipt.return_value = None
+        self.receipt = None
         self.client.call.return_value = hex(balance_gnt - gnt_value)
         self.pp.monitor_progress()
         balance_eth_after_sendout = balance_eth - \
@@ -411,20 +416,20 @@ class PaymentProcessorInternalTest(DatabaseFixture):
             balance_eth_after_sendout - PaymentProcessor.ETH_BATCH_PAYMENT_BASE
 
         tx_block_number = 1337
-        self.client.get_block_number.return_value = tx_block_number
+        self.block_number = tx_block_number
         receipt = {
             'blockNumber': tx_block_number,
             'blockHash': '0x' + 64*'f',
             'gasUsed': 55001,
             'status': '0x1',
         }
-        self.client.get_transaction_receipt.return_value = receipt
+        self.receipt = receipt
         self.pp.monitor_progress()
         self.assertEqual(len(inprogress), 1)
 
-        self.client.get_block_number.return_value =\
+        self.block_number = \
             tx_block_number + self.pp.REQUIRED_CONFIRMATIONS
-        self.client.get_transaction_receipt.return_value = receipt
+        self.receipt = receipt
         self.pp.monitor_progress()
         self.assertEqual(len(inprogress), 0)
         self.assertEqual(p.status, PaymentStatus.confirmed)
@@ -450,7 +455,7 @@ class PaymentProcessorInternalTest(DatabaseFixture):
         tx = self.client.send.call_args[0][0]
 
         # Check payment status in the Blockchain
-        self.client.get_transaction_receipt.return_value = None
+        self.receipt = None
         self.client.call.return_value = hex(balance_gnt - gnt_value)
 
         tx_block_number = 1337
@@ -460,9 +465,9 @@ class PaymentProcessorInternalTest(DatabaseFixture):
             'gasUsed': 55001,
             'status': '0x0',
         }
-        self.client.get_block_number.return_value = \
+        self.block_number = \
             tx_block_number + self.pp.REQUIRED_CONFIRMATIONS
-        self.client.get_transaction_receipt.return_value = receipt
+        self.receipt = receipt
         self.pp.monitor_progress()
         self.assertEqual(len(inprogress), 0)
         self.assertEqual(p.status, PaymentStatus.awaiting)
@@ -473,7 +478,7 @@ class PaymentProcessorInternalTest(DatabaseFixture):
         tx = self.client.send.call_args[0][0]
 
         receipt['status'] = '0x1'
-        self.client.get_transaction_receipt.return_value = receipt
+        self.receipt = receipt
         self.pp.monitor_progress()
         self.assertEqual(len(inprogress), 0)
         self.assertEqual(p.status, PaymentStatus.confirmed)
@@ -482,6 +487,26 @@ class PaymentProcessorInternalTest(DatabaseFixture):
         self.assertEqual(p.details.fee, 55001 * self.pp.GAS_PRICE)
         self.assertEqual(self.pp._gnt_reserved(), 0)
 
+    def test_monitor_progress_batched(self):
+        hashes = [urandom(32) for _ in range(3)]
+        for i, h in enumerate(hashes):
+            p = Payment.create(subtask="p{}".format(i), payee=urandom(20),
+                               value=1, status=PaymentStatus.sent)
+            self.pp._inprogress[h] = [p]
+
+        self.block_number = 1337 + self.pp.REQUIRED_CONFIRMATIONS
+        self.receipt = {
+            'blockNumber': 1337,
+            'blockHash': '0x' + 64*'f',
+            'gasUsed': 55001,
+            'status': '0x1',
+        }
+        self.pp.monitor_progress()
+        self.client.get_block_number_and_receipts.assert_called_once_with(
+            ['0x' + encode_hex(h) for h in hashes])
+        self.client.get_transaction_receipt.assert_not_called()
+        assert not self.pp._inprogress
+
 
 class PaymentProcessorFunctionalTest(DatabaseFixture):
     """ In this suite we test Ethereum state changes done by PaymentProcessor.
@@ -528,8 +553,27 @@ class PaymentProcessorFunctionalTest(DatabaseFixture):
             assert success  # What happens in real RPC eth_send?
             return '0x' + encode_hex(tx.hash)
 
+        def batch_request(calls):
+            results = []
+            for method, params in calls:
+                if method == 'eth_getBalance':
+                    results.append(hex(self.client.get_balance(params[0])))
+                elif method == 'eth_call':
+                    obj, block = params
+                    results.append(call(obj['from'], obj['to'], obj['data'],
+                                        value=int(obj['value'], 16),
+                                        block=block))
+                else:
+                    raise ValueError("Unexpected call {}".format(method))
+            return results
+
         self.client.call.side_effect = call
         self.client.send.side_effect = send
+        self.client.batch_request.side_effect = batch_request
+        self.client.balance_request.side_effect = Client.balance_request
+        self.client.call_request.side_effect = Client.call_request
+        self.client.get_block_number_and_receipts.side_effect = \
+            lambda hashes: (self.state.block.number, [None] * len(hashes))
         self.pp = PaymentProcessor(self.client, self.privkey)
         self.clock = Clock()
         self.pp._loopingCall.clock = self.clock
@@ -611,7 +655,7 @@ class PaymentProcessorFunctionalTest(DatabaseFixture):
 
         self.pp.monitor_progress = Mock()
         self.pp.is_synchronized = lambda *_: True
-        self.pp.sendout = Mock()
+        self.pp.sendout = Mock(return_value=False)
 
         self.pp.get_gnt_from_faucet = failure
         self.pp.get_ether_from_faucet = failure
@@ -729,6 +773,84 @@ class InteractionWithTokenTest(DatabaseFixture):
         incomes = self.pp.get_incomes_from_block(block_number, receiver_address)
         self.assertEqual(expected_incomes, incomes)
 
+    def test_refresh_balances(self):
+        token_call = ('eth_call', [{}, 'pending'])
+        self.token.get_balance_requests.return_value = [token_call]
+        self.token.balance_from_results.side_effect = \
+            lambda results: int(results[0], 16)
+        self.client.balance_request.return_value = ('eth_getBalance', [])
+        self.client.batch_request.return_value = ['0x10', '0x20']
+
+        self.pp.refresh_balances()
+        self.client.batch_request.assert_called_once_with(
+            [('eth_getBalance', []), token_call])
+        assert self.pp.eth_balance() == 16
+        assert self.pp.gnt_balance() == 32
+        self.client.get_balance.assert_not_called()
+        self.token.get_balance.assert_not_called()
+
+    def test_sendout_full_batch(self):
+        pp = PaymentProcessor(self.client,
+                              self.privkey,
+                              token_factory=lambda *_: self.token,
+                              batch_policy=PaymentBatchPolicy(max_count=2))
+        self.client.get_balance.return_value = denoms.ether
+        self.token.get_balance.return_value = 1000 * denoms.ether
+        payments = []
+        for i, deadline in enumerate([300, 100, 200]):
+            p = make_awaiting_payment()
+            p.subtask = 's{}'.format(i)
+            assert pp.add(p, deadline=deadline)
+            payments.append(p)
+
+        tx = mock.Mock()
+        tx.hash = decode_hex('0xdead')
+        self.client.send.return_value = '0xdead'
+        self.token.batch_transfer.return_value = tx
+
+        # A full batch is sent before the deadline, most urgent first
+        assert pp.sendout()
+        self.token.batch_transfer.assert_called_once_with(
+            self.privkey, [payments[1], payments[2]])
+        assert pp._awaiting == [payments[0]]
+        assert check_deadline(pp.deadline, int(time.time()) + 300)
+        assert not pp.sendout()
+
+        pp.deadline = int(time.time())
+        assert pp.sendout()
+        assert not pp._awaiting
+        assert pp.deadline == sys.maxsize
+
+
+class PaymentBatchPolicyTest(unittest.TestCase):
+
+    @staticmethod
+    def _payments(count, value=1):
+        payments = []
+        for i in range(count):
+            p = make_awaiting_payment(value)
+            p.subtask = 's{}'.format(i)
+            payments.append(p)
+        return payments
+
+    def test_select(self):
+        policy = PaymentBatchPolicy(max_count=3, max_value=100)
+        payments = self._payments(2)
+        deadlines = {'s0': 20, 's1': 10}
+
+        assert policy.select([], {}, True) == []
+        assert policy.select(payments, deadlines, False) == []
+        assert policy.select(payments, deadlines, True) == \
+            [payments[1], payments[0]]
+
+        payments = self._payments(4)
+        deadlines = {p.subtask: 40 - i for i, p in enumerate(payments)}
+        assert policy.select(payments, deadlines, False) == \
+            payments[:0:-1]
+
+        payments = self._payments(2, value=50)
+        assert policy.select(payments, {}, False) == payments
+
 
 class GNTTokenTest(unittest.TestCase):
     def setUp(self):
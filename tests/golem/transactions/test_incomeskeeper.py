@@ -2,6 +2,7 @@ import datetime
 import random
 import sys
 import time
+from unittest.mock import patch
 
 from golem.model import db
 from golem.model import ExpectedIncome
@@ -157,3 +158,50 @@ class TestIncomesKeeper(TestWithDatabase, PEP8MixIn):
         self.incomes_keeper.run_once()
         with db.atomic():
             self.assertEqual(ExpectedIncome.select().count(), 0)
+
+    @patch('golem.transactions.incomeskeeper.dispatcher')
+    def test_run_once_many(self, dispatcher):
+        sender_node_id = generate_some_id('sender_node_id')
+        limit = IncomesKeeper.REQUEST_LIMIT
+        for i in range(2 * limit + 10):
+            self.incomes_keeper.expect(
+                sender_node_id=sender_node_id,
+                p2p_node=Node(),
+                task_id='task',
+                subtask_id='subtask{}'.format(i),
+                value=i + 1)
+        # paid
+        for i in range(0, 2 * limit + 10, 2):
+            Income.create(
+                sender_node=sender_node_id,
+                task='task',
+                subtask='subtask{}'.format(i),
+                transaction=generate_some_id('transaction_id'),
+                block_number=1,
+                value=i + 1)
+        # paid by another node
+        Income.create(sender_node='other', task='task', subtask='subtask1',
+                      transaction=generate_some_id('transaction_id'),
+                      block_number=1, value=2)
+        ExpectedIncome.update(
+            modified_date=datetime.datetime.now()
+            - datetime.timedelta(hours=1)).execute()
+
+        self.incomes_keeper.run_once()
+        unpaid = ['subtask{}'.format(i) for i in range(1, 2 * limit + 10, 2)]
+        self.assertCountEqual(
+            [e.subtask for e in ExpectedIncome.select()], unpaid)
+        asked = [c[1]['expected_income'].subtask
+                 for c in dispatcher.send.call_args_list]
+        self.assertEqual(len(asked), limit)
+
+        # the rest is asked for in the next run
+        dispatcher.send.reset_mock()
+        self.incomes_keeper.run_once()
+        asked += [c[1]['expected_income'].subtask
+                  for c in dispatcher.send.call_args_list]
+        self.assertCountEqual(asked, unpaid)
+
+        dispatcher.send.reset_mock()
+        self.incomes_keeper.run_once()
+        dispatcher.send.assert_not_called()